@@ -9,12 +9,18 @@ from utilities.persona_utilities import (
     load_random_personas,
 )
 from utilities.negotiation_utilities import save_negotiation_log
+from utilities.tracing_utilities import enable_tracing, export_chrome_trace
 
 
 def main():
     # Load local env variables
     load_dotenv()
 
+    # Optionally record a Chrome trace of the run (e.g., NEGOTIATION_TRACE=traces/run.json)
+    trace_path = os.getenv("NEGOTIATION_TRACE")
+    if trace_path:
+        enable_tracing()
+
     # Initialize OpenAI client instance used for accessing LLM
     openAI_client = OpenAI(
         base_url="https://api.inference.net/v1",
@@ -58,6 +64,10 @@ def main():
     else:
         print("Skipping negotiation session.")
 
+    # Save trace timeline if tracing was requested
+    if trace_path:
+        export_chrome_trace(trace_path)
+
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,43 @@
-from typing import Any, Optional
+import json
+import re
+from typing import Any, Optional, Union
 
 from openai import OpenAI
+from resources.event_stream import (
+    EventEmitter,
+    PersonaDone,
+    PersonaFieldStarted,
+    PersonaStarted,
+    StatusMessage,
+    get_emitter,
+)
+from resources.llm_backends import LLMBackend, get_backend
 from utilities.llm_utilities import prompt_llm_with_retry
+from utilities.tracing_utilities import span, traced
+
+# Persona fields generated by the LLM, in generation order
+PERSONA_FIELDS = (
+    "business_descr",
+    "cultural_profile",
+    "authority_dynamics",
+    "financial_info",
+    "unspoken_interests",
+)
+
+# Allowed sentence counts per field (loose bounds around the prompted counts)
+FIELD_SENTENCE_BOUNDS = {
+    "business_descr": (1, 5),
+    "cultural_profile": (1, 5),
+    "authority_dynamics": (1, 5),
+    "financial_info": (1, 4),
+    "unspoken_interests": (1, 5),
+}
+
+PERSONA_SYSTEM_PROMPT = """You are a business strategy expert and a professional writer specialized in generating realistic company personas for M&A negotiations. 
+Your task is to produce clear, concise, and well-structured responses that strictly adhere to the prompt instructions. 
+Make sure to use the exact sentence count and format requested, and maintain a tone that is both professional and direct. 
+Avoid extraneous commentary and ensure that each response contains only the necessary details.
+"""
 
 
 class BusinessPersona:
@@ -13,26 +49,25 @@ class BusinessPersona:
         self,
         role_in_acquisition: str,
         country_based: str,
-        openAI_client: OpenAI,
+        openAI_client: Union[OpenAI, LLMBackend],
         acquiring_business_descr: Optional[str],
         acquiring_business_financal_info: Optional[str],
         stream_content: bool,
+        events: Optional[EventEmitter] = None,
+        reasoning_budget: Optional[int] = None,
     ):
         self.role_in_acquisition = role_in_acquisition
         self.country_based = country_based
         self.openAI_client = openAI_client
+        self.backend = get_backend(openAI_client)
         self.acquiring_business_descr = acquiring_business_descr
         self.aquiring_business_financal_info = acquiring_business_financal_info
         self.stream_content = stream_content
-        self.system_message = {
-            "role": "system",
-            "content": """You are a business strategy expert and a professional writer specialized in generating realistic company personas for M&A negotiations. 
-Your task is to produce clear, concise, and well-structured responses that strictly adhere to the prompt instructions. 
-Make sure to use the exact sentence count and format requested, and maintain a tone that is both professional and direct. 
-Avoid extraneous commentary and ensure that each response contains only the necessary details.
-""",
-        }
+        self.reasoning_budget = reasoning_budget
+        self.events = get_emitter(events)
+        self.system_message = {"role": "system", "content": PERSONA_SYSTEM_PROMPT}
 
+    @traced("persona.generate", "persona")
     def _generate_business_persona(self) -> dict[str, Any]:
         """
         High-level function that controls persona construction.
@@ -43,8 +78,8 @@ Avoid extraneous commentary and ensure that each response contains only the nece
         Returns:
             returns (dict[str, Any]): A dictionary containing generated business persona.
         """
-        print(
-            f"\nGENERATING {self.role_in_acquisition.upper()}'S BUSINESS PERSONA\n{'*'*50}"
+        self.events.emit(
+            PersonaStarted, role=self.role_in_acquisition, country=self.country_based
         )
 
         # Begin building persona object
@@ -71,9 +106,10 @@ Avoid extraneous commentary and ensure that each response contains only the nece
         # Generate unspoken interests (hidden agenda)
         persona["unspoken_interests"] = self._get_unspoken_interests(persona)
 
-        print("*" * 50)
+        self.events.emit(PersonaDone, role=self.role_in_acquisition)
         return persona
 
+    @traced("persona.business_descr", "persona")
     def _get_business_description(
         self, aquiring_business_descr: Optional[str]
     ) -> tuple[str, str, str]:
@@ -86,7 +122,11 @@ Avoid extraneous commentary and ensure that each response contains only the nece
         Returns:
             returns (tuple[str, str, str]): A string with business description, LLM reasoning, and original user query.
         """
-        print("Generating business description...")
+        self.events.emit(
+            PersonaFieldStarted,
+            role=self.role_in_acquisition,
+            field_name="business_descr",
+        )
 
         # Content to prompt LLM with (if generating target description)
         if aquiring_business_descr:
@@ -109,9 +149,14 @@ Only describe the company itself.
 
         # Prompt LLM
         return prompt_llm_with_retry(
-            messages, self.openAI_client, stream_content=self.stream_content
+            messages,
+            self.backend,
+            stream_content=self.stream_content,
+            events=self.events,
+            reasoning_budget=self.reasoning_budget,
         )
 
+    @traced("persona.cultural_profile", "persona")
     def _get_cultural_profile(self, persona) -> tuple[str, str, str]:
         """
         Generates a cultural profile for a business (i.e., communication style, negotiation behavior, and business etiquette).
@@ -122,7 +167,11 @@ Only describe the company itself.
         Returns:
             returns (tuple[str, str, str]): A string with cultural profile, LLM reasoning, and original user query.
         """
-        print("\nGenerating cultural profile...")
+        self.events.emit(
+            PersonaFieldStarted,
+            role=self.role_in_acquisition,
+            field_name="cultural_profile",
+        )
 
         # Build prompt
         prompt = f"""Based on the business description below, write a cultural profile for the company in exactly 2–3 sentences. 
@@ -136,9 +185,14 @@ Business Description:
         # Build messages and prompt LLM
         messages = [self.system_message, {"role": "user", "content": prompt}]
         return prompt_llm_with_retry(
-            messages, self.openAI_client, stream_content=self.stream_content
+            messages,
+            self.backend,
+            stream_content=self.stream_content,
+            events=self.events,
+            reasoning_budget=self.reasoning_budget,
         )
 
+    @traced("persona.authority_dynamics", "persona")
     def _get_authority_dynamics(self, persona) -> tuple[str, str, str]:
         """
         Generates authority dynamics for a business (i.e., how decision-making power is distributed when negotiating business deals).
@@ -149,7 +203,11 @@ Business Description:
         Returns:
             returns (tuple[str, str, str]): A string with authority dynamics, LLM reasoning, and original user query.
         """
-        print("\nGenerating authority dynamics...")
+        self.events.emit(
+            PersonaFieldStarted,
+            role=self.role_in_acquisition,
+            field_name="authority_dynamics",
+        )
 
         # Build prompt
         prompt = f"""Based on the business description below, describe the company's authority dynamics in exactly 2–3 sentences. 
@@ -164,9 +222,14 @@ Business Description:
         # Build messages and prompt LLM
         messages = [self.system_message, {"role": "user", "content": prompt}]
         return prompt_llm_with_retry(
-            messages, self.openAI_client, stream_content=self.stream_content
+            messages,
+            self.backend,
+            stream_content=self.stream_content,
+            events=self.events,
+            reasoning_budget=self.reasoning_budget,
         )
 
+    @traced("persona.financial_info", "persona")
     def _get_financial_info(
         self, persona, acquiring_business_financal_info: Optional[str]
     ) -> tuple[str, str, str]:
@@ -180,7 +243,11 @@ Business Description:
         Returns:
             returns (tuple[str, str, str]): A string with financial info for company, LLM reasoning, and original user query.
         """
-        print("\nGenerating financial info...")
+        self.events.emit(
+            PersonaFieldStarted,
+            role=self.role_in_acquisition,
+            field_name="financial_info",
+        )
 
         # Extract business's role and build prompt accordingly
         role = persona["role_in_acquisition"].lower()
@@ -207,9 +274,14 @@ Reference – Acquiring Company’s Financial Info:
         # Build messages and prompt LLM
         messages = [self.system_message, {"role": "user", "content": prompt}]
         return prompt_llm_with_retry(
-            messages, self.openAI_client, stream_content=self.stream_content
+            messages,
+            self.backend,
+            stream_content=self.stream_content,
+            events=self.events,
+            reasoning_budget=self.reasoning_budget,
         )
 
+    @traced("persona.unspoken_interests", "persona")
     def _get_unspoken_interests(self, persona) -> tuple[str, str, str]:
         """
         Generates unspoken interests for business (i.e., information they might withold in a business acquisition deal)
@@ -220,7 +292,11 @@ Reference – Acquiring Company’s Financial Info:
         Returns:
             returns (tuple[str, str, str]): A string with unspoken interests for company, LLM reasoning, and original user query.
         """
-        print("\nGenerating unspoken interests...")
+        self.events.emit(
+            PersonaFieldStarted,
+            role=self.role_in_acquisition,
+            field_name="unspoken_interests",
+        )
 
         # Build prompt
         content = f"""Based on the business description below, create a hidden agenda this company will have when participating in an international business acquisition deal. 
@@ -239,7 +315,11 @@ Business Persona:
         # Build messages and prompt LLM
         messages = [self.system_message, {"role": "user", "content": content}]
         return prompt_llm_with_retry(
-            messages, self.openAI_client, stream_content=self.stream_content
+            messages,
+            self.backend,
+            stream_content=self.stream_content,
+            events=self.events,
+            reasoning_budget=self.reasoning_budget,
         )
 
     @classmethod
@@ -251,6 +331,8 @@ Business Persona:
         acquiring_business_descr: Optional[str] = None,
         acquiring_business_financal_info: Optional[str] = None,
         stream_content: bool = True,
+        events: Optional[EventEmitter] = None,
+        reasoning_budget: Optional[int] = None,
     ) -> dict[str, Any]:
         """
         Class method to generate a complete business persona dictionary.
@@ -258,10 +340,12 @@ Business Persona:
         Args:
             role_in_acquisition (str): Either "acquirer" or "target".
             country_based (str): Country the business is based in.
-            openAI_client (OpenAI): OpenAI client to use for generation.
+            openAI_client (Union[OpenAI, LLMBackend]): OpenAI client or LLM backend to use for generation.
             acquiring_business_descr (str, optional): Used only when generating a target persona.
             acquiring_business_financal_info (str, optional): Acquirer financial info used to generate plausible target business financial info if generating target.
             stream_content (bool, optional): If True, streams the LLM response token-by-token. Defaults to True.
+            events (Optional[EventEmitter], optional): Emitter for progress events. Defaults to an unbound emitter on the process-wide bus (console output).
+            reasoning_budget (Optional[int], optional): Maximum reasoning tokens per field; longer reasoning is cut off and the answer forced. Defaults to None (unlimited).
 
         Returns:
             returns (dict[str, Any]): A dictionary representing the generated persona.
@@ -273,5 +357,272 @@ Business Persona:
             acquiring_business_descr,
             acquiring_business_financal_info,
             stream_content,
+            events,
+            reasoning_budget,
         )
         return instance._generate_business_persona()
+
+    @staticmethod
+    def validate(
+        persona: Any, role_in_acquisition: str, country_based: str
+    ) -> list[str]:
+        """
+        Validates a persona against the persona schema used throughout the project.
+
+        Args:
+            persona (Any): Persona to validate; fields may be plain strings or `(response, reasoning, query)` tuples.
+            role_in_acquisition (str): Expected role ("acquirer" or "target").
+            country_based (str): Expected country.
+
+        Returns:
+            returns (list[str]): Validation errors (empty if the persona is valid).
+        """
+        if not isinstance(persona, dict):
+            return ["persona is not an object"]
+
+        errors = []
+        if (
+            persona.get("role_in_acquisition", role_in_acquisition)
+            != role_in_acquisition
+        ):
+            errors.append("role_in_acquisition does not match")
+        country = persona.get("country_based", country_based)
+        if not isinstance(country, str) or country.lower() != country_based.lower():
+            errors.append("country_based does not match")
+
+        for field_name in PERSONA_FIELDS:
+            value = persona.get(field_name)
+            if isinstance(value, (list, tuple)) and value:
+                value = value[0]
+            if not isinstance(value, str) or len(value.strip()) < 20:
+                errors.append(f"{field_name} is missing or too short")
+                continue
+
+            # Check sentence count loosely (abbreviations such as "Ltd." do not end sentences)
+            sentences = re.split(
+                r"(?<!\b[A-Z][a-z])(?<!\b[A-Z])[.!?]+\s+", value.strip()
+            )
+            low, high = FIELD_SENTENCE_BOUNDS[field_name]
+            if not low <= len(sentences) <= high:
+                errors.append(f"{field_name} has {len(sentences)} sentences")
+
+            # Financial info must quote actual figures
+            if field_name == "financial_info" and not re.search(r"\d", value):
+                errors.append("financial_info contains no figures")
+
+        return errors
+
+    @staticmethod
+    def _create_bulk_prompt(country_pairs: list[tuple[str, str]]) -> str:
+        """
+        Builds a prompt asking for several complete acquirer-target persona pairs in one JSON response.
+
+        Args:
+            country_pairs (list[tuple[str, str]]): Acquirer and target country for each requested pair.
+
+        Returns:
+            returns (str): The bulk generation prompt.
+        """
+        pairs_str = "\n".join(
+            f"{i}. Acquirer based in {acquirer_country}; target based in {target_country}"
+            for i, (acquirer_country, target_country) in enumerate(
+                country_pairs, start=1
+            )
+        )
+        return f"""Create {len(country_pairs)} realistic acquirer-target company persona pairs for international M&A negotiations, one pair for each line below:
+{pairs_str}
+
+For every company write:
+- "country_based": the country given above
+- "business_descr": exactly 2–3 sentences describing the company, using a realistic company name and a typical industry for the region. Each target must be a likely acquisition target for its acquirer: complementary in purpose or capability, but not identical.
+- "cultural_profile": exactly 2–3 sentences on the company's communication style, negotiation behavior, and business etiquette.
+- "authority_dynamics": exactly 2–3 sentences on how decision-making power is distributed when negotiating business deals (e.g., full autonomy, management approval, or chain of command).
+- "financial_info": exactly 1–2 sentences with typical annual revenue, profit margin, and valuation range. Acquirers are large enough to acquire other companies; targets are clearly smaller acquisition targets.
+- "unspoken_interests": 2-3 direct and confident sentences describing the hidden agenda the company has in the acquisition deal.
+
+Respond with only a JSON array in the order above, using this structure:
+```json
+[
+  {{
+    "acquirer": {{"country_based": "...", "business_descr": "...", "cultural_profile": "...", "authority_dynamics": "...", "financial_info": "...", "unspoken_interests": "..."}},
+    "target": {{"country_based": "...", "business_descr": "...", "cultural_profile": "...", "authority_dynamics": "...", "financial_info": "...", "unspoken_interests": "..."}}
+  }}
+]
+```
+"""
+
+    @staticmethod
+    def _parse_bulk_response(response_text: str) -> list[Any]:
+        """
+        Extracts the JSON array of persona pairs from a bulk generation response.
+
+        Args:
+            response_text (str): Full response text generated by the LLM.
+
+        Returns:
+            returns (list[Any]): The parsed records (empty if no valid JSON array was found).
+        """
+        # Prefer a fenced JSON block, otherwise fall back to the outermost brackets
+        match = re.search(
+            r"```(?:json)?\s*(\[.*\])\s*```", response_text, flags=re.DOTALL
+        )
+        if match:
+            json_str = match.group(1)
+        else:
+            start, end = response_text.find("["), response_text.rfind("]")
+            if start == -1 or end <= start:
+                return []
+            json_str = response_text[start : end + 1]
+
+        try:
+            parsed = json.loads(json_str)
+        except json.JSONDecodeError:
+            return []
+        return parsed if isinstance(parsed, list) else []
+
+    @staticmethod
+    def _persona_from_record(
+        record: dict[str, Any], role_in_acquisition: str, country_based: str
+    ) -> dict[str, Any]:
+        """
+        Converts a validated bulk record into the standard persona structure. Bulk fields have no per-field reasoning or query, so those tuple slots are left empty.
+
+        Args:
+            record (dict[str, Any]): Validated persona record from the bulk response.
+            role_in_acquisition (str): The persona's role.
+            country_based (str): The persona's country.
+
+        Returns:
+            returns (dict[str, Any]): Persona dictionary with `(response, reasoning, query)` field tuples.
+        """
+        persona = {
+            "role_in_acquisition": role_in_acquisition,
+            "country_based": country_based,
+        }
+        for field_name in PERSONA_FIELDS:
+            persona[field_name] = (record[field_name].strip(), "", "")
+        persona["generation_mode"] = "bulk"
+        return persona
+
+    @classmethod
+    def generate_bulk(
+        cls,
+        country_pairs: list[tuple[str, str]],
+        openAI_client: Union[OpenAI, LLMBackend],
+        batch_size: int = 5,
+        max_attempts: int = 2,
+        stream_content: bool = False,
+        events: Optional[EventEmitter] = None,
+    ) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+        """
+        Class method to generate several complete acquirer-target persona pairs with one structured LLM call per batch, instead of ten calls per pair. Records that fail validation, and batches whose call fails, are regenerated in a smaller bulk call; pairs that still fail fall back to field-by-field generation. Pairs whose field-by-field generation fails too are left out, so one failing call never loses the rest of the batch.
+
+        Args:
+            country_pairs (list[tuple[str, str]]): Acquirer and target country for each pair to generate.
+            openAI_client (Union[OpenAI, LLMBackend]): OpenAI client or LLM backend to use for generation.
+            batch_size (int, optional): Number of pairs requested per LLM call. Defaults to 5.
+            max_attempts (int, optional): Number of bulk attempts before falling back to field-by-field generation. Defaults to 2.
+            stream_content (bool, optional): If True, streams the LLM response token-by-token. Defaults to False.
+            events (Optional[EventEmitter], optional): Emitter for progress events. Defaults to an unbound emitter on the process-wide bus (console output).
+
+        Returns:
+            returns (list[tuple[dict[str, Any], dict[str, Any]]]): Acquirer and target persona for each country pair that could be generated, in request order.
+        """
+        events = get_emitter(events)
+        system_message = {"role": "system", "content": PERSONA_SYSTEM_PROMPT}
+        results = [None] * len(country_pairs)
+        pending = list(range(len(country_pairs)))
+
+        for attempt in range(1, max_attempts + 1):
+            # Retries use smaller batches, e.g. in case a long response was cut off
+            attempt_batch_size = max(1, batch_size // 2 ** (attempt - 1))
+            for start in range(0, len(pending), attempt_batch_size):
+                batch = pending[start : start + attempt_batch_size]
+                events.emit(
+                    StatusMessage,
+                    text=f"\nGenerating {len(batch)} persona pairs in one call (attempt {attempt}/{max_attempts})...",
+                )
+
+                # Prompt LLM for the whole batch
+                prompt = cls._create_bulk_prompt([country_pairs[i] for i in batch])
+                messages = [system_message, {"role": "user", "content": prompt}]
+                try:
+                    with span("persona.generate_bulk", "persona", pairs=len(batch)):
+                        response, _, _ = prompt_llm_with_retry(
+                            messages,
+                            openAI_client,
+                            stream_content=stream_content,
+                            events=events,
+                        )
+                except RuntimeError as e:
+                    # The batch stays pending and is requested again
+                    events.emit(
+                        StatusMessage,
+                        text=f"Bulk generation of {len(batch)} persona pairs failed: {e}",
+                    )
+                    continue
+                records = cls._parse_bulk_response(response)
+
+                # Keep only records that match the persona schema
+                for index, record in zip(batch, records):
+                    acquirer_country, target_country = country_pairs[index]
+                    if not isinstance(record, dict):
+                        continue
+                    errors = cls.validate(
+                        record.get("acquirer"), "acquirer", acquirer_country
+                    ) + cls.validate(record.get("target"), "target", target_country)
+                    if errors:
+                        events.emit(
+                            StatusMessage,
+                            text=f"Persona pair {index + 1} failed validation: {'; '.join(errors)}",
+                        )
+                        continue
+                    results[index] = (
+                        cls._persona_from_record(
+                            record["acquirer"], "acquirer", acquirer_country
+                        ),
+                        cls._persona_from_record(
+                            record["target"], "target", target_country
+                        ),
+                    )
+
+            # Only records that failed (or were missing) are requested again
+            pending = [i for i in pending if results[i] is None]
+            if not pending:
+                break
+
+        # Fall back to field-by-field generation for records that never validated
+        for index in pending:
+            acquirer_country, target_country = country_pairs[index]
+            events.emit(
+                StatusMessage,
+                text=f"Falling back to field-by-field generation for persona pair {index + 1}.",
+            )
+            try:
+                acquirer_persona = cls.generate(
+                    "acquirer",
+                    acquirer_country,
+                    openAI_client,
+                    stream_content=stream_content,
+                    events=events,
+                )
+                target_persona = cls.generate(
+                    "target",
+                    target_country,
+                    openAI_client,
+                    acquiring_business_descr=acquirer_persona["business_descr"][0],
+                    acquiring_business_financal_info=acquirer_persona["financial_info"][
+                        0
+                    ],
+                    stream_content=stream_content,
+                    events=events,
+                )
+            except RuntimeError as e:
+                events.emit(
+                    StatusMessage,
+                    text=f"Skipping persona pair {index + 1}, generation failed: {e}",
+                )
+                continue
+            results[index] = (acquirer_persona, target_persona)
+
+        return [pair for pair in results if pair is not None]
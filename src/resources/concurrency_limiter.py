@@ -0,0 +1,175 @@
+import threading
+import time
+from typing import Any, Optional
+
+from resources.deadlines import DeadlineExceeded, StreamStalled
+
+# Exception class names (OpenAI SDK and standard library) that signal an overloaded provider
+OVERLOAD_ERROR_NAMES = ("RateLimitError", "APITimeoutError", "TimeoutError")
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """
+    Tells whether an error means the provider is overloaded (HTTP 429 or a timeout) rather than that the request itself failed. Turn and session deadlines and stalls detected by a `DeadlineBackend` are the caller's own limits, not overload.
+
+    Args:
+        error (BaseException): The error raised by an LLM call.
+
+    Returns:
+        returns (bool): True for rate limits and provider timeouts.
+    """
+    if isinstance(error, (DeadlineExceeded, StreamStalled)):
+        return False
+    if getattr(error, "status_code", None) in (429, 503):
+        return True
+    return any(cls.__name__ in OVERLOAD_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD (additive increase, multiplicative decrease) limit on the number of in-flight LLM requests. While requests succeed at a healthy latency the limit grows by about one per `limit` completed requests; rate limits (429s) and timeouts cut it by `backoff_ratio`, and latency well above the observed baseline shrinks it gently. Requests beyond the limit wait in a FIFO queue, so batch workloads settle near the provider's real throughput ceiling.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_backoff_ratio: float = 0.9,
+    ):
+        """
+        Args:
+            initial_limit (int, optional): Starting number of concurrent requests. Defaults to 4.
+            min_limit (int, optional): Lower bound of the limit. Defaults to 1.
+            max_limit (int, optional): Upper bound of the limit. Defaults to 64.
+            backoff_ratio (float, optional): Factor applied to the limit on a 429 or timeout. Defaults to 0.5.
+            latency_tolerance (float, optional): Latency above this multiple of the baseline counts as congestion. Defaults to 2.0.
+            latency_backoff_ratio (float, optional): Factor applied to the limit on congested latency. Defaults to 0.9.
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit."
+            )
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.latency_backoff_ratio = latency_backoff_ratio
+
+        self.condition = threading.Condition()
+        self._limit = float(initial_limit)
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.next_ticket = 0
+        self.serving_ticket = 0
+
+        # Slowly rising minimum of observed latencies, the "uncongested" reference
+        self.baseline_latency: Optional[float] = None
+
+        # Only requests started after the last decrease may decrease the limit again
+        self.last_decrease = 0.0
+        self.counters = {
+            "requests": 0,
+            "successes": 0,
+            "overloads": 0,
+            "errors": 0,
+            "slow": 0,
+        }
+
+    @property
+    def limit(self) -> int:
+        """
+        Current number of requests allowed in flight.
+        """
+        return int(self._limit)
+
+    def acquire(self) -> float:
+        """
+        Waits (in FIFO order) until a request may start and reserves its slot.
+
+        Returns:
+            returns (float): Start time of the request, to pass to `release`.
+        """
+        with self.condition:
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            self.queue_depth += 1
+            while ticket != self.serving_ticket or self.in_flight >= int(self._limit):
+                self.condition.wait()
+            self.queue_depth -= 1
+            self.serving_ticket += 1
+            self.in_flight += 1
+            self.counters["requests"] += 1
+
+            # The next request in line may fit as well
+            self.condition.notify_all()
+        return time.monotonic()
+
+    def release(
+        self,
+        started: float,
+        latency: Optional[float] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Frees a request's slot and adapts the limit to its outcome.
+
+        Args:
+            started (float): Value returned by `acquire`.
+            latency (Optional[float], optional): Latency signal of a successful request in seconds (e.g., time to first chunk). Defaults to None (not judged).
+            error (Optional[BaseException], optional): The error the request failed with. Defaults to None (success).
+        """
+        with self.condition:
+            was_limited = self.in_flight + self.queue_depth >= int(self._limit)
+            self.in_flight -= 1
+
+            if error is not None and is_overload_error(error):
+                self.counters["overloads"] += 1
+                self._decrease(started, self.backoff_ratio)
+            elif error is not None:
+                # Failures unrelated to load neither grow nor shrink the limit
+                self.counters["errors"] += 1
+            elif latency is not None and self._is_congested(latency):
+                self.counters["slow"] += 1
+                self._decrease(started, self.latency_backoff_ratio)
+            else:
+                self.counters["successes"] += 1
+                # Only grow while the limit is actually what holds requests back
+                if was_limited:
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self.condition.notify_all()
+
+    def _is_congested(self, latency: float) -> bool:
+        if self.baseline_latency is None or latency < self.baseline_latency:
+            self.baseline_latency = latency
+            return False
+        congested = latency > self.latency_tolerance * self.baseline_latency
+
+        # Let the baseline drift up slowly, so a permanently slower provider is not read as congestion forever
+        self.baseline_latency += 0.01 * (latency - self.baseline_latency)
+        return congested
+
+    def _decrease(self, started: float, ratio: float) -> None:
+        # One decrease per congestion episode, not one per request that was already in flight
+        if started < self.last_decrease:
+            return
+        self._limit = max(self.min_limit, self._limit * ratio)
+        self.last_decrease = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the limiter's state and counters.
+
+        Returns:
+            returns (dict[str, Any]): `limit`, `in_flight`, `queue_depth`, `baseline_latency_s` and the request counters (`requests`, `successes`, `overloads`, `errors`, `slow`).
+        """
+        with self.condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "baseline_latency_s": self.baseline_latency,
+                **self.counters,
+            }
@@ -0,0 +1,63 @@
+from collections import deque
+from typing import Any, Optional
+
+from utilities.term_sheet_utilities import normalize_term_sheet
+
+
+class ConvergenceDetector:
+    """
+    An online detector that tracks the numeric headline terms of a negotiation's term sheet after every turn and reports when the offers have stayed within a relative tolerance for a number of consecutive turns.
+    """
+
+    def __init__(self, window: int = 4, tolerance: float = 0.01):
+        """
+        Args:
+            window (int, optional): Number of consecutive turns (K) the terms must stay within tolerance. Defaults to 4 (two rounds).
+            tolerance (float, optional): Maximum relative spread allowed for each numeric term across the window. Defaults to 0.01.
+        """
+        if window < 1:
+            raise ValueError("Convergence window must be at least 1 turn.")
+
+        self.window = window
+        self.tolerance = tolerance
+
+        # Normalized terms for the last `window` turns plus the turn they are compared against
+        self.history = deque(maxlen=window + 1)
+
+    def update(self, term_sheet: Optional[dict[str, Any]]) -> bool:
+        """
+        Records the term sheet after a turn and checks whether the negotiation has converged.
+
+        Args:
+            term_sheet (Optional[dict[str, Any]]): The cumulative term sheet after the turn.
+
+        Returns:
+            returns (bool): True if the numeric terms have stayed within tolerance for `window` turns.
+        """
+        self.history.append(normalize_term_sheet(term_sheet))
+        return self.has_converged()
+
+    def has_converged(self) -> bool:
+        """
+        Checks whether every numeric term has stayed within the relative tolerance across the full window.
+
+        Returns:
+            returns (bool): True if the negotiation has converged.
+        """
+        # Not enough turns observed yet
+        if len(self.history) < self.history.maxlen:
+            return False
+
+        # All turns in the window must quote the same (non-empty) set of terms
+        keys = set(self.history[0])
+        if not keys or any(set(terms) != keys for terms in self.history):
+            return False
+
+        # Relative spread of every term must stay inside the tolerance
+        for key in keys:
+            values = [terms[key] for terms in self.history]
+            low, high = min(values), max(values)
+            scale = max(abs(low), abs(high))
+            if scale and (high - low) / scale > self.tolerance:
+                return False
+        return True
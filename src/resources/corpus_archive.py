@@ -0,0 +1,292 @@
+import gzip
+import json
+import os
+import random
+from typing import Any, Optional
+
+from utilities.tracing_utilities import traced
+
+# Archive layout version stored in the index sidecar
+ARCHIVE_FORMAT_VERSION = 1
+
+# Shard file extension for each supported codec
+SHARD_EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+
+
+class CorpusArchive:
+    """
+    A class to pack many negotiation histories and persona files into a few compressed shards with a sidecar offset index.
+
+    Every negotiation turn and every persona is compressed as an independent gzip member (or zstd frame), so a single session or turn can be read by seeking to its offset without decompressing the rest of its shard.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        codec: str = "gzip",
+        max_shard_bytes: int = 64 * 1024 * 1024,
+    ):
+        """
+        Args:
+            folder (str): Directory holding the shards and the `index.json` sidecar. Created if it does not exist.
+            codec (str, optional): Compression codec for new archives, either 'gzip' or 'zstd' (requires the `zstandard` package). Existing archives keep the codec in their index. Defaults to "gzip".
+            max_shard_bytes (int, optional): Size after which a new shard is started. Defaults to 64 MiB.
+        """
+        self.folder = folder
+        self.max_shard_bytes = max_shard_bytes
+        self.index_path = os.path.join(folder, "index.json")
+        os.makedirs(folder, exist_ok=True)
+
+        # Load existing index or start a new one
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r") as f:
+                self.index = json.load(f)
+        else:
+            self.index = {
+                "format": ARCHIVE_FORMAT_VERSION,
+                "codec": codec,
+                "shards": [],
+                "entries": {},
+            }
+
+        self._compress, self._decompress = self._get_codec(self.index["codec"])
+
+    @staticmethod
+    def _get_codec(codec: str) -> tuple[Any, Any]:
+        """
+        Returns compression and decompression functions for a codec name.
+
+        Args:
+            codec (str): Either 'gzip' or 'zstd'.
+
+        Returns:
+            returns (tuple[Any, Any]): `(compress, decompress)` functions operating on bytes.
+        """
+        if codec == "gzip":
+            return gzip.compress, gzip.decompress
+        if codec == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError(
+                    "The 'zstd' codec requires the `zstandard` package (pip install zstandard)."
+                ) from e
+            return (
+                zstandard.ZstdCompressor(level=10).compress,
+                zstandard.ZstdDecompressor().decompress,
+            )
+        raise ValueError(f"Unknown archive codec: {codec}")
+
+    def _current_shard(self) -> str:
+        """
+        Returns the shard new records are appended to, starting a new shard if the last one is full.
+
+        Returns:
+            returns (str): The shard's file name.
+        """
+        shards = self.index["shards"]
+        if shards:
+            path = os.path.join(self.folder, shards[-1])
+            if os.path.getsize(path) < self.max_shard_bytes:
+                return shards[-1]
+
+        # Start new shard
+        shard_name = f"shard_{len(shards):05d}.{SHARD_EXTENSIONS[self.index['codec']]}"
+        open(os.path.join(self.folder, shard_name), "wb").close()
+        shards.append(shard_name)
+        return shard_name
+
+    @traced("io.archive_write", "io")
+    def _add(self, key: str, kind: str, parts: list[Any], metadata: dict) -> None:
+        """
+        Compresses each part as its own member, appends them to the current shard, and records their offsets.
+
+        Args:
+            key (str): Unique session identifier (e.g., the original file name without extension).
+            kind (str): Either 'negotiation' or 'personas'.
+            parts (list[Any]): JSON-serializable parts (turns or personas) stored as separate members.
+            metadata (dict): Extra fields stored in the index entry.
+        """
+        shard_name = self._current_shard()
+        members = []
+        with open(os.path.join(self.folder, shard_name), "ab") as f:
+            for part in parts:
+                blob = self._compress(json.dumps(part).encode("utf-8"))
+                members.append([f.tell(), len(blob)])
+                f.write(blob)
+
+        self.index["entries"][key] = {
+            "kind": kind,
+            "shard": shard_name,
+            "members": members,
+            **metadata,
+        }
+
+    @traced("io.archive_read", "io")
+    def _read_member(self, entry: dict, member_index: int) -> Any:
+        """
+        Reads and decompresses a single member of an index entry.
+
+        Args:
+            entry (dict): The index entry.
+            member_index (int): Position of the member within the entry.
+
+        Returns:
+            returns (Any): The decoded JSON part.
+        """
+        offset, length = entry["members"][member_index]
+        with open(os.path.join(self.folder, entry["shard"]), "rb") as f:
+            f.seek(offset)
+            blob = f.read(length)
+        return json.loads(self._decompress(blob))
+
+    @traced("io.archive_read", "io")
+    def _read_all_members(self, entry: dict) -> list[Any]:
+        """
+        Reads every member of an index entry with a single contiguous read of the shard.
+
+        Args:
+            entry (dict): The index entry.
+
+        Returns:
+            returns (list[Any]): The decoded JSON parts in order.
+        """
+        members = entry["members"]
+        if not members:
+            return []
+
+        # Members of one entry are written back to back, so read their span at once
+        start = members[0][0]
+        end = members[-1][0] + members[-1][1]
+        with open(os.path.join(self.folder, entry["shard"]), "rb") as f:
+            f.seek(start)
+            span = f.read(end - start)
+
+        return [
+            json.loads(self._decompress(span[offset - start : offset - start + length]))
+            for offset, length in members
+        ]
+
+    def _get_entry(self, key: str, kind: str) -> dict:
+        """
+        Looks up an index entry and checks its kind.
+
+        Args:
+            key (str): Session identifier.
+            kind (str): Expected entry kind.
+
+        Returns:
+            returns (dict): The index entry.
+        """
+        entry = self.index["entries"].get(key)
+        if entry is None or entry["kind"] != kind:
+            raise KeyError(f"No {kind} entry named '{key}' in archive {self.folder}")
+        return entry
+
+    def add_negotiation(self, key: str, log: list[dict[str, Any]]) -> None:
+        """
+        Adds a negotiation log to the archive, storing each turn as a separate member.
+
+        Args:
+            key (str): Unique session identifier.
+            log (list[dict[str, Any]]): Full negotiation log.
+        """
+        self._add(key, "negotiation", log, {"num_turns": len(log)})
+
+    def add_personas(self, key: str, personas: dict[str, Any]) -> None:
+        """
+        Adds an acquirer-target persona pair to the archive, storing each persona as a separate member.
+
+        Args:
+            key (str): Unique persona file identifier.
+            personas (dict[str, Any]): Object with `acquirer` and `target` personas.
+        """
+        roles = list(personas.keys())
+        self._add(key, "personas", [personas[role] for role in roles], {"roles": roles})
+
+    def read_negotiation(self, key: str) -> list[dict[str, Any]]:
+        """
+        Reads a full negotiation log.
+
+        Args:
+            key (str): Session identifier.
+
+        Returns:
+            returns (list[dict[str, Any]]): The negotiation log.
+        """
+        entry = self._get_entry(key, "negotiation")
+        return self._read_all_members(entry)
+
+    def read_turn(self, key: str, turn_index: int) -> dict[str, Any]:
+        """
+        Reads a single turn of a negotiation without decompressing the other turns.
+
+        Args:
+            key (str): Session identifier.
+            turn_index (int): Zero-based turn index.
+
+        Returns:
+            returns (dict[str, Any]): The log entry of that turn.
+        """
+        entry = self._get_entry(key, "negotiation")
+        return self._read_member(entry, turn_index)
+
+    def read_personas(self, key: str) -> dict[str, Any]:
+        """
+        Reads an acquirer-target persona pair.
+
+        Args:
+            key (str): Persona file identifier.
+
+        Returns:
+            returns (dict[str, Any]): Object with `acquirer` and `target` personas.
+        """
+        entry = self._get_entry(key, "personas")
+        return dict(zip(entry["roles"], self._read_all_members(entry)))
+
+    def keys(self, kind: Optional[str] = None) -> list[str]:
+        """
+        Lists archived session identifiers in sorted order.
+
+        Args:
+            kind (Optional[str], optional): Only list entries of this kind ('negotiation' or 'personas'). Defaults to None (all entries).
+
+        Returns:
+            returns (list[str]): Sorted identifiers.
+        """
+        return sorted(
+            key
+            for key, entry in self.index["entries"].items()
+            if kind is None or entry["kind"] == kind
+        )
+
+    def random_key(self, kind: str) -> Optional[str]:
+        """
+        Picks a random archived identifier of the given kind using only the index.
+
+        Args:
+            kind (str): Entry kind.
+
+        Returns:
+            returns (Optional[str]): A random identifier, or None if no entries of that kind exist.
+        """
+        keys = self.keys(kind)
+        return random.choice(keys) if keys else None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index["entries"]
+
+    def flush(self) -> None:
+        """
+        Atomically writes the index sidecar to disk.
+        """
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def __enter__(self) -> "CorpusArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
@@ -0,0 +1,187 @@
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+# Deadline of the turn or session running in the current context (see `deadline_scope`)
+_current_deadline: contextvars.ContextVar[Optional[tuple[float, str]]] = (
+    contextvars.ContextVar("current_deadline", default=None)
+)
+
+# Socket read timeout of requests sent in the current context (see `read_timeout_scope`)
+_current_read_timeout: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "current_read_timeout", default=None
+)
+
+# Timeout counters per endpoint, shared by every backend talking to it
+_endpoint_stats: dict[str, dict[str, Any]] = {}
+_endpoint_stats_lock = threading.Lock()
+
+# Outcomes counted per endpoint (`record_request`)
+OUTCOMES = (
+    "completed",
+    "first_token_timeouts",
+    "chunk_gap_timeouts",
+    "turn_timeouts",
+    "session_timeouts",
+    "errors",
+)
+
+
+class StreamStalled(TimeoutError):
+    """
+    Raised when a stream sends no data for too long: 'first_token' before its first chunk, 'chunk_gap' between two chunks.
+    """
+
+    def __init__(self, kind: str, waited_s: float):
+        super().__init__(f"Stream stalled ({kind}) after {waited_s:.1f}s without data.")
+        self.kind = kind
+        self.waited_s = waited_s
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when the deadline of a turn or session has passed ('turn' or 'session').
+    """
+
+    def __init__(self, kind: str):
+        super().__init__(f"The {kind} deadline has passed.")
+        self.kind = kind
+
+
+@contextlib.contextmanager
+def deadline_scope(
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    kind: str = "turn",
+) -> Iterator[Optional[tuple[float, str]]]:
+    """
+    Sets the deadline of the LLM calls made while the block runs (e.g., one turn, including retries). Scopes nest: the earliest deadline applies.
+
+    Args:
+        timeout (Optional[float], optional): Seconds from now until the deadline of this scope. Defaults to None.
+        deadline (Optional[float], optional): Absolute `time.monotonic()` deadline, e.g. of the session the turn belongs to (counted as a 'session' deadline). Defaults to None.
+        kind (str, optional): Kind reported for the `timeout` deadline. Defaults to "turn".
+
+    Returns:
+        returns (Iterator[Optional[tuple[float, str]]]): The effective deadline and its kind (None if unlimited).
+    """
+    candidates = [_current_deadline.get()]
+    if timeout is not None:
+        candidates.append((time.monotonic() + timeout, kind))
+    if deadline is not None:
+        candidates.append((deadline, "session"))
+    candidates = [candidate for candidate in candidates if candidate is not None]
+    effective = min(candidates) if candidates else None
+    token = _current_deadline.set(effective)
+    try:
+        yield effective
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[tuple[float, str]]:
+    """
+    Returns the deadline of the current context as `(monotonic time, kind)`, or None if unlimited.
+    """
+    return _current_deadline.get()
+
+
+def time_left() -> Optional[float]:
+    """
+    Returns the seconds left until the current deadline (negative once it has passed), or None if unlimited.
+    """
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline[0] - time.monotonic()
+
+
+def check_deadline() -> None:
+    """
+    Raises `DeadlineExceeded` if the current deadline has passed.
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None and time.monotonic() >= deadline[0]:
+        raise DeadlineExceeded(deadline[1])
+
+
+@contextlib.contextmanager
+def read_timeout_scope(timeout: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Bounds every socket read of the requests sent while the block runs (e.g., by a wrapper that abandons stalled streams), so a stream nobody reads anymore fails on its own and frees its connection and concurrency slot. Scopes nest: the shortest timeout applies.
+
+    Args:
+        timeout (Optional[float]): Seconds a single read may wait. None keeps the enclosing timeout.
+
+    Returns:
+        returns (Iterator[Optional[float]]): The effective read timeout (None if unlimited).
+    """
+    current = _current_read_timeout.get()
+    effective = current if timeout is None else min(timeout, current or timeout)
+    token = _current_read_timeout.set(effective)
+    try:
+        yield effective
+    finally:
+        _current_read_timeout.reset(token)
+
+
+def read_timeout() -> Optional[float]:
+    """
+    Returns the read timeout of the current context in seconds, or None if unlimited.
+    """
+    return _current_read_timeout.get()
+
+
+def record_request(
+    endpoint: str, outcome: str, first_token_s: Optional[float] = None
+) -> None:
+    """
+    Counts the outcome of one request to an endpoint.
+
+    Args:
+        endpoint (str): Endpoint name (e.g., the API base URL).
+        outcome (str): One of OUTCOMES.
+        first_token_s (Optional[float], optional): Seconds until the first chunk arrived, if it did. Defaults to None.
+    """
+    with _endpoint_stats_lock:
+        stats = _endpoint_stats.setdefault(
+            endpoint,
+            {
+                "requests": 0,
+                **{key: 0 for key in OUTCOMES},
+                "first_token_s_total": 0.0,
+                "first_token_s_max": 0.0,
+                "first_tokens": 0,
+            },
+        )
+        stats["requests"] += 1
+        stats[outcome] += 1
+        if first_token_s is not None:
+            stats["first_tokens"] += 1
+            stats["first_token_s_total"] += first_token_s
+            stats["first_token_s_max"] = max(stats["first_token_s_max"], first_token_s)
+
+
+def endpoint_stats() -> dict[str, dict[str, Any]]:
+    """
+    Returns the request outcomes per endpoint.
+
+    Returns:
+        returns (dict[str, dict[str, Any]]): Per endpoint: `requests`, the OUTCOMES counters, `timeout_rate` and the mean and maximum time to first token in seconds.
+    """
+    with _endpoint_stats_lock:
+        report = {}
+        for endpoint, stats in _endpoint_stats.items():
+            timeouts = sum(stats[key] for key in OUTCOMES if key.endswith("_timeouts"))
+            report[endpoint] = {
+                "requests": stats["requests"],
+                **{key: stats[key] for key in OUTCOMES},
+                "timeout_rate": timeouts / stats["requests"],
+                "first_token_s_mean": (
+                    stats["first_token_s_total"] / stats["first_tokens"]
+                    if stats["first_tokens"]
+                    else None
+                ),
+                "first_token_s_max": stats["first_token_s_max"],
+            }
+        return report
@@ -0,0 +1,564 @@
+import dataclasses
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional, TextIO
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    """
+    Base class of all progress events emitted by negotiation sessions, persona generation and LLM calls.
+    """
+
+    session_id: Optional[str] = field(default=None, kw_only=True)
+    timestamp: float = field(default_factory=time.time, kw_only=True)
+
+    @property
+    def kind(self) -> str:
+        return type(self).__name__
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Converts the event into a JSON-serializable dictionary tagged with its kind.
+
+        Returns:
+            returns (dict[str, Any]): The event's fields plus a `kind` entry.
+        """
+        return {"kind": self.kind, **dataclasses.asdict(self)}
+
+
+@dataclass(frozen=True, slots=True)
+class StatusMessage(Event):
+    """
+    Free-form progress note (e.g., retries or detector decisions).
+    """
+
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class LLMError(Event):
+    """
+    An LLM request or stream failed.
+    """
+
+    message: str
+
+
+@dataclass(frozen=True, slots=True)
+class SessionStarted(Event):
+    """
+    A negotiation session started.
+    """
+
+    acquirer_name: str
+    target_name: str
+    num_rounds: int
+
+
+@dataclass(frozen=True, slots=True)
+class RoundStarted(Event):
+    """
+    A negotiation round started.
+    """
+
+    round_index: int
+    num_rounds: int
+
+
+@dataclass(frozen=True, slots=True)
+class TurnStarted(Event):
+    """
+    A party started its negotiation turn.
+    """
+
+    round_index: int
+    role: str
+    company_name: str
+
+
+@dataclass(frozen=True, slots=True)
+class ReasoningStarted(Event):
+    """
+    The LLM opened its `<think>` section.
+    """
+
+
+@dataclass(frozen=True, slots=True)
+class ReasoningDone(Event):
+    """
+    The LLM closed its `<think>` section.
+    """
+
+    reasoning_chars: int
+
+
+@dataclass(frozen=True, slots=True)
+class ReasoningBudgetHit(Event):
+    """
+    The LLM's reasoning reached its token budget and was cut off; the answer is forced with a `</think>` continuation.
+    """
+
+    reasoning_tokens: int
+    reasoning_budget: int
+
+
+@dataclass(frozen=True, slots=True)
+class TokenChunk(Event):
+    """
+    A streamed chunk of the user-facing (non-reasoning) LLM response.
+    """
+
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class ResponseDone(Event):
+    """
+    An LLM response finished streaming.
+    """
+
+    response_chars: int
+
+
+@dataclass(frozen=True, slots=True)
+class TermSheetUpdated(Event):
+    """
+    A turn changed the cumulative term sheet.
+    """
+
+    role: str
+    term_sheet: dict[str, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class StateChanged(Event):
+    """
+    A party declared a different negotiation state than on its previous turn.
+    """
+
+    role: str
+    negotiation_state: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class TurnCompleted(Event):
+    """
+    A party finished its turn (message as logged).
+    """
+
+    round_index: int
+    role: str
+    message: str
+    negotiation_state: Optional[str]
+    latency_ms: float
+
+
+@dataclass(frozen=True, slots=True)
+class SessionEnded(Event):
+    """
+    A negotiation session ended.
+    """
+
+    stop_reason: str
+    num_turns: int
+    term_sheet: dict[str, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class PersonaStarted(Event):
+    """
+    Generation of a business persona started.
+    """
+
+    role: str
+    country: str
+
+
+@dataclass(frozen=True, slots=True)
+class PersonaFieldStarted(Event):
+    """
+    Generation of one business persona field started.
+    """
+
+    role: str
+    field_name: str
+
+
+@dataclass(frozen=True, slots=True)
+class PersonaDone(Event):
+    """
+    Generation of a business persona finished.
+    """
+
+    role: str
+
+
+@dataclass(frozen=True, slots=True)
+class PersonasSaved(Event):
+    """
+    A generated acquirer-target persona pair was saved.
+    """
+
+    filepath: str
+
+
+class EventSink:
+    """
+    Base class for event subscribers. Sinks are called synchronously from the emitting thread and must be thread-safe.
+    """
+
+    def handle(self, event: Event) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class QuietSink(EventSink):
+    """
+    A sink that discards every event.
+    """
+
+    def handle(self, event: Event) -> None:
+        return None
+
+
+class ConsoleSink(EventSink):
+    """
+    A sink that prints progress to the console the way a single interactive run always has.
+    """
+
+    # Human-readable labels for persona fields
+    FIELD_LABELS = {
+        "business_descr": "business description",
+        "cultural_profile": "cultural profile",
+        "authority_dynamics": "authority dynamics",
+        "financial_info": "financial info",
+        "unspoken_interests": "unspoken interests",
+    }
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        stream_tokens: bool = True,
+        flush_tokens: bool = True,
+        token_buffer_chars: int = 20,
+    ):
+        """
+        Args:
+            stream (Optional[TextIO], optional): Output stream. Defaults to stdout.
+            stream_tokens (bool, optional): If True, prints response chunks as they arrive. Defaults to True.
+            flush_tokens (bool, optional): If True, flushes the stream whenever buffered chunks are printed; otherwise output is only flushed at the end of each response. Defaults to True.
+            token_buffer_chars (int, optional): Number of characters buffered before chunks are printed. Defaults to 20.
+        """
+        self.stream = stream or sys.stdout
+        self.stream_tokens = stream_tokens
+        self.flush_tokens = flush_tokens
+        self.token_buffer_chars = token_buffer_chars
+        self.buffer = ""
+        self.lock = threading.Lock()
+
+    def _write(self, text: str, flush: bool = False) -> None:
+        self.stream.write(text)
+        if flush:
+            self.stream.flush()
+
+    def handle(self, event: Event) -> None:
+        with self.lock:
+            if isinstance(event, TokenChunk):
+                if not self.stream_tokens:
+                    return
+                # Print buffered chunks once enough text (or a newline) arrived
+                self.buffer += event.text
+                if len(self.buffer) > self.token_buffer_chars or "\n" in self.buffer:
+                    self._write(self.buffer.lstrip("\n"), flush=self.flush_tokens)
+                    self.buffer = ""
+            elif isinstance(event, ResponseDone):
+                if self.buffer:
+                    self._write(self.buffer.lstrip("\n"))
+                    self.buffer = ""
+                self._write("\n" if self.stream_tokens else "", flush=True)
+            elif isinstance(event, StatusMessage):
+                self._write(f"{event.text}\n", flush=True)
+            elif isinstance(event, LLMError):
+                self._write(f"{event.message}\n", flush=True)
+            elif isinstance(event, ReasoningStarted):
+                self._write("LLM thinking...\n", flush=True)
+            elif isinstance(event, ReasoningBudgetHit):
+                self._write(
+                    f"Reasoning budget of {event.reasoning_budget} tokens reached, forcing answer...\n",
+                    flush=True,
+                )
+            elif isinstance(event, SessionStarted):
+                self._write(
+                    f"\nRUNNING NEGOTIATION\n{'*' * 50}\n"
+                    f"ACQUIRER: {event.acquirer_name}\n"
+                    f"TARGET: {event.target_name}\n",
+                    flush=True,
+                )
+            elif isinstance(event, RoundStarted):
+                self._write(
+                    f"\n{'=' * 50}\nRound {event.round_index}/{event.num_rounds}\n{'=' * 50}\n",
+                    flush=True,
+                )
+            elif isinstance(event, TurnStarted):
+                self._write(
+                    f"\n{event.role.upper()} ({event.company_name})\n", flush=True
+                )
+            elif isinstance(event, SessionEnded):
+                term_sheet_str = "\n".join(
+                    f"{key.upper()}: {value}" for key, value in event.term_sheet.items()
+                )
+                self._write(
+                    f"{'*' * 50}\nNEGOTIATION COMPLETE\n"
+                    f"\nLast Term Sheet:\n{term_sheet_str}\n\n",
+                    flush=True,
+                )
+            elif isinstance(event, PersonaStarted):
+                self._write(
+                    f"\nGENERATING {event.role.upper()}'S BUSINESS PERSONA\n{'*' * 50}\n",
+                    flush=True,
+                )
+            elif isinstance(event, PersonaFieldStarted):
+                label = self.FIELD_LABELS.get(event.field_name, event.field_name)
+                self._write(f"\nGenerating {label}...\n", flush=True)
+            elif isinstance(event, PersonaDone):
+                self._write(f"{'*' * 50}\n", flush=True)
+            elif isinstance(event, PersonasSaved):
+                self._write(
+                    f"New personas created and saved to: {event.filepath}\n\n",
+                    flush=True,
+                )
+
+
+class ProgressSink(EventSink):
+    """
+    A sink that aggregates events from many concurrent sessions into one compact status table, redrawn at most every `refresh_interval` seconds.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, refresh_interval: float = 1.0):
+        """
+        Args:
+            stream (Optional[TextIO], optional): Output stream. Defaults to stdout.
+            refresh_interval (float, optional): Minimum number of seconds between redraws. Defaults to 1.0.
+        """
+        self.stream = stream or sys.stdout
+        self.refresh_interval = refresh_interval
+        self.sessions: dict[str, dict[str, Any]] = {}
+        self.last_render = 0.0
+        self.lock = threading.Lock()
+
+    def _session(self, session_id: Optional[str]) -> dict[str, Any]:
+        return self.sessions.setdefault(
+            session_id or "-",
+            {
+                "status": "starting",
+                "round": "",
+                "turns": 0,
+                "chars": 0,
+                "states": {},
+                "valuation": "",
+            },
+        )
+
+    def handle(self, event: Event) -> None:
+        with self.lock:
+            session = self._session(event.session_id)
+            force_render = False
+
+            # Update the session's aggregated status
+            if isinstance(event, SessionStarted):
+                session["status"] = f"{event.acquirer_name} -> {event.target_name}"
+            elif isinstance(event, RoundStarted):
+                session["round"] = f"{event.round_index}/{event.num_rounds}"
+            elif isinstance(event, TurnStarted):
+                session["turns"] += 1
+                session["status"] = f"{event.role} turn"
+            elif isinstance(event, ReasoningStarted):
+                session["status"] = "thinking"
+            elif isinstance(event, TokenChunk):
+                session["chars"] += len(event.text)
+            elif isinstance(event, TermSheetUpdated):
+                session["valuation"] = str(event.term_sheet.get("valuation", ""))
+            elif isinstance(event, StateChanged):
+                session["states"][event.role] = event.negotiation_state
+            elif isinstance(event, SessionEnded):
+                session["status"] = f"done ({event.stop_reason})"
+                force_render = True
+            elif isinstance(event, PersonaFieldStarted):
+                session["status"] = f"{event.role} persona: {event.field_name}"
+            elif isinstance(event, LLMError):
+                session["status"] = "LLM error"
+
+            # Redraw table if enough time has passed
+            now = time.monotonic()
+            if force_render or now - self.last_render >= self.refresh_interval:
+                self.last_render = now
+                self._render()
+
+    def _render(self) -> None:
+        """
+        Writes the status table for all sessions in a single write.
+        """
+        lines = [f"{'session':<10} {'round':<7} {'turns':>5} {'chars':>8}  status"]
+        for session_id, session in self.sessions.items():
+            states = ", ".join(
+                f"{role}={state}" for role, state in session["states"].items()
+            )
+            lines.append(
+                f"{session_id:<10} {session['round']:<7} {session['turns']:>5} {session['chars']:>8}  "
+                f"{session['status']}"
+                + (f" | {session['valuation']}" if session["valuation"] else "")
+                + (f" | {states}" if states else "")
+            )
+        self.stream.write("\n".join(lines) + "\n\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        with self.lock:
+            self._render()
+
+
+class FileSink(EventSink):
+    """
+    A sink that appends every event (except token chunks, unless requested) as a JSON line to a file.
+    """
+
+    def __init__(self, filepath: str, include_tokens: bool = False):
+        """
+        Args:
+            filepath (str): Destination JSONL file.
+            include_tokens (bool, optional): If True, token chunk events are written as well. Defaults to False.
+        """
+        self.filepath = filepath
+        self.include_tokens = include_tokens
+        self.file = open(filepath, "a", encoding="utf-8")
+        self.lock = threading.Lock()
+
+    def handle(self, event: Event) -> None:
+        if isinstance(event, TokenChunk) and not self.include_tokens:
+            return
+        line = json.dumps(event.to_dict())
+        with self.lock:
+            self.file.write(line + "\n")
+            if isinstance(event, SessionEnded):
+                self.file.flush()
+
+    def close(self) -> None:
+        with self.lock:
+            self.file.close()
+
+
+class EventBus:
+    """
+    Fans events out to all subscribed sinks.
+    """
+
+    def __init__(self, sinks: Optional[list[EventSink]] = None):
+        self.sinks: list[EventSink] = list(sinks or [])
+
+    def subscribe(self, sink: EventSink) -> EventSink:
+        """
+        Adds a sink to the bus.
+
+        Args:
+            sink (EventSink): The sink to add.
+
+        Returns:
+            returns (EventSink): The added sink (for chaining).
+        """
+        self.sinks = self.sinks + [sink]
+        return sink
+
+    def unsubscribe(self, sink: EventSink) -> None:
+        """
+        Removes a sink from the bus.
+
+        Args:
+            sink (EventSink): The sink to remove.
+        """
+        self.sinks = [s for s in self.sinks if s is not sink]
+
+    def clear(self) -> None:
+        """
+        Removes all sinks, closing them.
+        """
+        sinks, self.sinks = self.sinks, []
+        for sink in sinks:
+            sink.close()
+
+    def emit(self, event: Event) -> None:
+        """
+        Delivers an event to every subscribed sink.
+
+        Args:
+            event (Event): The event to deliver.
+        """
+        for sink in self.sinks:
+            sink.handle(event)
+
+    def bind(self, session_id: Optional[str]) -> "EventEmitter":
+        """
+        Returns an emitter that stamps all its events with a session ID.
+
+        Args:
+            session_id (Optional[str]): Identifier of the emitting session.
+
+        Returns:
+            returns (EventEmitter): The bound emitter.
+        """
+        return EventEmitter(self, session_id)
+
+
+class EventEmitter:
+    """
+    Emits events on a bus on behalf of one session.
+    """
+
+    __slots__ = ("bus", "session_id")
+
+    def __init__(self, bus: EventBus, session_id: Optional[str]):
+        self.bus = bus
+        self.session_id = session_id
+
+    def emit(self, event_type: type, **fields: Any) -> None:
+        """
+        Builds and emits an event, skipping construction entirely if the bus has no sinks.
+
+        Args:
+            event_type (type): The `Event` subclass to emit.
+            **fields (Any): The event's fields.
+        """
+        if self.bus.sinks:
+            self.bus.emit(event_type(session_id=self.session_id, **fields))
+
+
+# Process-wide default bus, printing to the console like a single interactive run
+_default_event_bus = EventBus([ConsoleSink()])
+
+
+def get_event_bus() -> EventBus:
+    """
+    Returns the process-wide default event bus (with a `ConsoleSink` subscribed unless it was replaced).
+
+    Returns:
+        returns (EventBus): The default bus.
+    """
+    return _default_event_bus
+
+
+def get_emitter(events: Optional[EventEmitter] = None) -> EventEmitter:
+    """
+    Returns the given emitter, or an unbound emitter on the default bus.
+
+    Args:
+        events (Optional[EventEmitter], optional): An already bound emitter. Defaults to None.
+
+    Returns:
+        returns (EventEmitter): The emitter to use.
+    """
+    return events if events is not None else _default_event_bus.bind(None)
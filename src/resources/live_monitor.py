@@ -0,0 +1,481 @@
+import collections
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+from resources.event_stream import (
+    Event,
+    EventSink,
+    LLMError,
+    RoundStarted,
+    SessionEnded,
+    SessionStarted,
+    StateChanged,
+    TermSheetUpdated,
+    TokenChunk,
+    TurnCompleted,
+    TurnStarted,
+)
+
+# Event kinds sent to viewers (token chunks are only counted, reasoning events are too chatty)
+MONITORED_EVENTS = (
+    SessionStarted,
+    RoundStarted,
+    TurnStarted,
+    TurnCompleted,
+    TermSheetUpdated,
+    StateChanged,
+    SessionEnded,
+    LLMError,
+)
+
+
+class MonitoredSession:
+    """
+    Live status of one session and a bounded buffer of its latest events, from which late joiners catch up.
+    """
+
+    __slots__ = ("session_id", "status", "events", "ended")
+
+    def __init__(self, session_id: str, buffer_size: int):
+        self.session_id = session_id
+        self.status = {
+            "session_id": session_id,
+            "acquirer": "",
+            "target": "",
+            "round": "",
+            "turns": 0,
+            "chars": 0,
+            "states": {},
+            "term_sheet": {},
+            "status": "starting",
+            "updated": time.time(),
+        }
+        self.events: collections.deque = collections.deque(maxlen=buffer_size)
+        self.ended = False
+
+    def update(self, event: Event) -> None:
+        status = self.status
+        status["updated"] = event.timestamp
+        if isinstance(event, SessionStarted):
+            status["acquirer"] = event.acquirer_name
+            status["target"] = event.target_name
+            status["status"] = "running"
+        elif isinstance(event, RoundStarted):
+            status["round"] = f"{event.round_index}/{event.num_rounds}"
+        elif isinstance(event, TurnStarted):
+            status["status"] = f"{event.role} turn"
+        elif isinstance(event, TurnCompleted):
+            status["turns"] += 1
+        elif isinstance(event, TermSheetUpdated):
+            status["term_sheet"] = event.term_sheet
+        elif isinstance(event, StateChanged):
+            status["states"] = {**status["states"], event.role: event.negotiation_state}
+        elif isinstance(event, SessionEnded):
+            status["status"] = f"done ({event.stop_reason})"
+            self.ended = True
+        elif isinstance(event, LLMError):
+            status["status"] = "LLM error"
+
+
+class MonitorSink(EventSink):
+    """
+    A sink that keeps the state the live monitor serves: a status snapshot and a bounded event buffer per session, plus a bounded ring of all recent events that viewers read from.
+
+    Handling an event only appends to these buffers under a short lock; serialization and delivery happen on the viewers' threads, so the negotiation workers are not slowed down by the number of viewers.
+    """
+
+    def __init__(
+        self,
+        session_buffer_size: int = 200,
+        history_size: int = 10000,
+        max_finished_sessions: int = 500,
+    ):
+        """
+        Args:
+            session_buffer_size (int, optional): Events kept per session for viewers joining late. Defaults to 200.
+            history_size (int, optional): Events kept across all sessions for viewers catching up after a reconnect. Defaults to 10000.
+            max_finished_sessions (int, optional): Finished sessions kept; older ones are dropped. Defaults to 500.
+        """
+        self.session_buffer_size = session_buffer_size
+        self.max_finished_sessions = max_finished_sessions
+        self.lock = threading.Lock()
+        self.sequence = 0
+
+        # Entries are [sequence, session ID, event, serialized payload (filled by the first viewer)]
+        self.recent: collections.deque = collections.deque(maxlen=history_size)
+        self.sessions: dict[str, MonitoredSession] = {}
+        self.finished: collections.deque = collections.deque()
+
+    def handle(self, event: Event) -> None:
+        session_id = event.session_id or "-"
+        if isinstance(event, TokenChunk):
+            # Only counted; an unlocked increment may rarely miss a chunk, which a progress counter can afford
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.status["chars"] += len(event.text)
+            return
+        if not isinstance(event, MONITORED_EVENTS):
+            return
+
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = MonitoredSession(
+                    session_id, self.session_buffer_size
+                )
+            self.sequence += 1
+            entry = [self.sequence, session_id, event, None]
+            self.recent.append(entry)
+            session.events.append(entry)
+            session.update(event)
+
+            if isinstance(event, SessionEnded):
+                self.finished.append(session_id)
+                while len(self.finished) > self.max_finished_sessions:
+                    self.sessions.pop(self.finished.popleft(), None)
+
+    def snapshot(self, session_id: Optional[str] = None) -> dict[str, Any]:
+        """
+        Returns the status of every session (or one) and the current sequence number.
+
+        Args:
+            session_id (Optional[str], optional): Session to describe. Defaults to None (all sessions).
+
+        Returns:
+            returns (dict[str, Any]): `sequence` and `sessions` (list of status dictionaries).
+        """
+        with self.lock:
+            sessions = (
+                [self.sessions[session_id]]
+                if session_id in self.sessions
+                else [] if session_id is not None else list(self.sessions.values())
+            )
+            return {
+                "sequence": self.sequence,
+                "sessions": [dict(session.status) for session in sessions],
+            }
+
+    def session_backlog(self, session_id: str) -> list[list]:
+        """
+        Returns the buffered latest events of a session, for a viewer joining late.
+        """
+        with self.lock:
+            session = self.sessions.get(session_id)
+            return list(session.events) if session is not None else []
+
+    def events_since(
+        self, sequence: int, session_id: Optional[str] = None
+    ) -> tuple[list[list], bool]:
+        """
+        Returns the events after a sequence number.
+
+        Args:
+            sequence (int): Sequence number of the last event the viewer received.
+            session_id (Optional[str], optional): Only return this session's events. Defaults to None.
+
+        Returns:
+            returns (tuple[list[list], bool]): The new entries, and whether events were missed because they already left the buffers (the viewer should resync from a snapshot).
+        """
+        with self.lock:
+            if session_id is not None:
+                session = self.sessions.get(session_id)
+                if session is None:
+                    return [], False
+                buffer = session.events
+                new_entries = []
+                for entry in reversed(buffer):
+                    if entry[0] <= sequence:
+                        break
+                    new_entries.append(entry)
+                new_entries.reverse()
+                missed = (
+                    bool(buffer)
+                    and len(new_entries) == len(buffer)
+                    and (buffer.maxlen == len(buffer))
+                )
+                return new_entries, missed
+
+            if not self.recent or self.recent[-1][0] <= sequence:
+                return [], False
+            first_sequence = self.recent[0][0]
+            start = sequence + 1 - first_sequence
+            if start < 0:
+                return list(self.recent), True
+            return list(itertools.islice(self.recent, start, None)), False
+
+
+def _payload(entry: list) -> str:
+    """
+    Serializes a buffered event as one Server-Sent Events message (cached on the entry, so each event is serialized once for all viewers).
+    """
+    if entry[3] is None:
+        event = entry[2]
+        entry[3] = (
+            f"id: {entry[0]}\nevent: {event.kind}\ndata: {json.dumps(event.to_dict())}\n\n"
+        )
+    return entry[3]
+
+
+class LiveMonitor:
+    """
+    Small local HTTP server fanning the events of running sessions out to browsers over Server-Sent Events.
+
+    - `GET /` serves a page listing all sessions, with a live feed of the selected one.
+    - `GET /sessions` returns the status snapshot as JSON.
+    - `GET /events` streams all sessions' events; `GET /events?session=<id>` streams one session, starting with its buffered latest events.
+
+    Each viewer connection polls the sink's buffers on its own thread every `poll_interval` seconds and sends what is new in one write; reconnecting browsers resume from their `Last-Event-ID`.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        sink: Optional[MonitorSink] = None,
+        poll_interval: float = 0.25,
+        keepalive_interval: float = 15.0,
+    ):
+        """
+        Args:
+            host (str, optional): Interface to listen on. Defaults to "127.0.0.1" (local only).
+            port (int, optional): Port to listen on (0 picks a free port). Defaults to 8765.
+            sink (Optional[MonitorSink], optional): Sink collecting the events; subscribe it to the sessions' event buses. Defaults to a new sink.
+            poll_interval (float, optional): Seconds between two reads of the buffers per viewer. Defaults to 0.25.
+            keepalive_interval (float, optional): Seconds of silence after which a keep-alive comment is sent. Defaults to 15.0.
+        """
+        self.sink = sink or MonitorSink()
+        self.poll_interval = poll_interval
+        self.keepalive_interval = keepalive_interval
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "LiveMonitor":
+        """
+        Serves requests on a background thread.
+
+        Returns:
+            returns (LiveMonitor): The monitor (for chaining).
+        """
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="live-monitor", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Closes all viewer streams and stops the server.
+        """
+        self.stopped.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self) -> type:
+        monitor = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                return None
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                session_id = query.get("session", [None])[0]
+                try:
+                    if url.path == "/":
+                        self._send(200, "text/html; charset=utf-8", PAGE_HTML)
+                    elif url.path == "/sessions":
+                        self._send(
+                            200,
+                            "application/json",
+                            json.dumps(monitor.sink.snapshot(session_id)),
+                        )
+                    elif url.path == "/events":
+                        monitor._stream(self, session_id)
+                    else:
+                        self._send(404, "text/plain", "Not found")
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+
+            def _send(self, status: int, content_type: str, body: str) -> None:
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return RequestHandler
+
+    def _stream(
+        self, handler: BaseHTTPRequestHandler, session_id: Optional[str]
+    ) -> None:
+        """
+        Streams events to one viewer until it disconnects or the monitor stops.
+
+        Args:
+            handler (BaseHTTPRequestHandler): The viewer's request handler.
+            session_id (Optional[str]): Session to stream, or None for all sessions.
+        """
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Connection", "keep-alive")
+        handler.end_headers()
+
+        def write(text: str) -> None:
+            handler.wfile.write(text.encode("utf-8"))
+            handler.wfile.flush()
+
+        def snapshot() -> int:
+            state = self.sink.snapshot(session_id)
+            write(f"event: snapshot\ndata: {json.dumps(state)}\n\n")
+            return state["sequence"]
+
+        # Reconnecting viewers resume after the last event they received
+        last_event_id = handler.headers.get("Last-Event-ID")
+        if last_event_id and last_event_id.isdigit():
+            sequence = int(last_event_id)
+        else:
+            sequence = snapshot()
+            if session_id is not None:
+                # Late joiners of one session catch up on its buffered latest events
+                backlog = self.sink.session_backlog(session_id)
+                if backlog:
+                    write("".join(_payload(entry) for entry in backlog))
+                    sequence = max(sequence, backlog[-1][0])
+
+        last_write = time.monotonic()
+        while not self.stopped.is_set():
+            entries, missed = self.sink.events_since(sequence, session_id)
+            if missed:
+                sequence = snapshot()
+                entries = [entry for entry in entries if entry[0] > sequence]
+            if entries:
+                write("".join(_payload(entry) for entry in entries))
+                sequence = entries[-1][0]
+                last_write = time.monotonic()
+            elif time.monotonic() - last_write >= self.keepalive_interval:
+                write(": keep-alive\n\n")
+                last_write = time.monotonic()
+            time.sleep(self.poll_interval)
+
+
+PAGE_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Live Negotiation Monitor</title>
+<style>
+  body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; margin: 0; display: flex; height: 100vh; color: #222; }
+  #sessions { width: 55%; overflow-y: auto; border-right: 1px solid #ddd; }
+  #feed { flex: 1; overflow-y: auto; padding: 0 16px; }
+  h1 { font-size: 18px; margin: 12px 16px; }
+  h2 { font-size: 16px; margin: 12px 0; }
+  table { border-collapse: collapse; width: 100%; font-size: 13px; }
+  th, td { text-align: left; padding: 4px 8px; border-bottom: 1px solid #eee; white-space: nowrap; }
+  tr.session { cursor: pointer; }
+  tr.session:hover, tr.selected { background: #eef4ff; }
+  .turn { border: 1px solid #e5e5e5; border-radius: 6px; padding: 8px; margin-bottom: 8px; font-size: 13px; white-space: pre-wrap; }
+  .turn.acquirer { border-left: 4px solid #007bff; }
+  .turn.target { border-left: 4px solid #dc3545; }
+  .note { color: #666; font-size: 12px; margin-bottom: 6px; }
+</style>
+</head>
+<body>
+<div id="sessions">
+  <h1>Live Negotiation Monitor <span id="count" class="note"></span></h1>
+  <table>
+    <thead><tr><th>Session</th><th>Parties</th><th>Round</th><th>Turns</th><th>Status</th><th>Valuation</th></tr></thead>
+    <tbody id="rows"></tbody>
+  </table>
+</div>
+<div id="feed"><h2>Select a session</h2></div>
+<script>
+const sessions = new Map();
+const rows = document.getElementById("rows");
+let selected = null, feedSource = null, pending = false;
+
+function escapeHtml(text) {
+  const div = document.createElement("div");
+  div.textContent = text == null ? "" : String(text);
+  return div.innerHTML;
+}
+
+function status(id) {
+  if (!sessions.has(id)) sessions.set(id, {session_id: id, acquirer: "", target: "", round: "", turns: 0, status: "", term_sheet: {}});
+  return sessions.get(id);
+}
+
+function apply(kind, event) {
+  const s = status(event.session_id || "-");
+  if (kind === "SessionStarted") { s.acquirer = event.acquirer_name; s.target = event.target_name; s.status = "running"; }
+  else if (kind === "RoundStarted") s.round = event.round_index + "/" + event.num_rounds;
+  else if (kind === "TurnStarted") s.status = event.role + " turn";
+  else if (kind === "TurnCompleted") s.turns += 1;
+  else if (kind === "TermSheetUpdated") s.term_sheet = event.term_sheet;
+  else if (kind === "SessionEnded") s.status = "done (" + event.stop_reason + ")";
+  else if (kind === "LLMError") s.status = "LLM error";
+}
+
+// Redraw at most once per animation frame, however many events arrive
+function render() {
+  if (pending) return;
+  pending = true;
+  requestAnimationFrame(() => {
+    pending = false;
+    rows.innerHTML = [...sessions.values()].map(s =>
+      `<tr class="session${s.session_id === selected ? " selected" : ""}" data-id="${escapeHtml(s.session_id)}">` +
+      `<td>${escapeHtml(s.session_id)}</td><td>${escapeHtml(s.acquirer)} → ${escapeHtml(s.target)}</td>` +
+      `<td>${escapeHtml(s.round)}</td><td>${s.turns}</td><td>${escapeHtml(s.status)}</td>` +
+      `<td>${escapeHtml((s.term_sheet || {}).valuation || "")}</td></tr>`).join("");
+    document.getElementById("count").textContent = sessions.size + " sessions";
+  });
+}
+
+const source = new EventSource("events");
+source.addEventListener("snapshot", e => {
+  for (const s of JSON.parse(e.data).sessions) sessions.set(s.session_id, s);
+  render();
+});
+for (const kind of ["SessionStarted", "RoundStarted", "TurnStarted", "TurnCompleted", "TermSheetUpdated", "StateChanged", "SessionEnded", "LLMError"]) {
+  source.addEventListener(kind, e => { apply(kind, JSON.parse(e.data)); render(); });
+}
+
+rows.addEventListener("click", e => {
+  const row = e.target.closest("tr.session");
+  if (!row) return;
+  selected = row.dataset.id;
+  render();
+  const feed = document.getElementById("feed");
+  feed.innerHTML = `<h2>Session ${escapeHtml(selected)}</h2>`;
+  if (feedSource) feedSource.close();
+  feedSource = new EventSource("events?session=" + encodeURIComponent(selected));
+  const add = html => { feed.insertAdjacentHTML("beforeend", html); feed.scrollTop = feed.scrollHeight; };
+  feedSource.addEventListener("TurnCompleted", e => {
+    const t = JSON.parse(e.data);
+    add(`<div class="turn ${escapeHtml(t.role)}"><div class="note">Round ${t.round_index} · ${escapeHtml(t.role)} · ${escapeHtml(t.negotiation_state)} · ${t.latency_ms} ms</div>${escapeHtml(t.message)}</div>`);
+  });
+  feedSource.addEventListener("TermSheetUpdated", e => {
+    add(`<div class="note">Term sheet: ${escapeHtml(JSON.stringify(JSON.parse(e.data).term_sheet))}</div>`);
+  });
+  feedSource.addEventListener("SessionEnded", e => {
+    add(`<div class="note"><b>Ended: ${escapeHtml(JSON.parse(e.data).stop_reason)}</b></div>`);
+  });
+});
+</script>
+</body>
+</html>
+"""
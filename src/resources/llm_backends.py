@@ -0,0 +1,795 @@
+import asyncio
+import collections
+import contextvars
+import itertools
+import queue
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Union
+
+from openai import OpenAI
+
+from resources.concurrency_limiter import AdaptiveConcurrencyLimiter
+from resources.deadlines import (
+    DeadlineExceeded,
+    StreamStalled,
+    check_deadline,
+    current_deadline,
+    endpoint_stats,
+    read_timeout,
+    read_timeout_scope,
+    record_request,
+    time_left,
+)
+from resources.token_budget import report_usage
+
+# Scripted turns are either fixed texts or functions of the request messages
+ScriptEntry = Union[str, Callable[[list[dict]], str]]
+
+THINK_CLOSE_TAG = "</think>"
+
+# Default backend of each OpenAI client (see `get_backend`); clients live as long as the process
+_client_backends: dict[OpenAI, "LimitedBackend"] = {}
+_client_backends_lock = threading.Lock()
+
+
+class LLMBackend:
+    """
+    Interface of the language model backends used by `prompt_llm`. A backend streams the raw text of a chat completion (including the `<think>` section of reasoning models) as string chunks.
+
+    Subclasses implement `stream`; `astream` defaults to running `stream` on a worker thread.
+    """
+
+    def stream(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool = False,
+    ) -> Iterator[str]:
+        """
+        Streams a chat completion.
+
+        Args:
+            messages (list[dict]): Messages formatted for the OpenAI Chat API.
+            model (str): Model identifier (backends serving a single model may ignore it).
+            continue_final_message (bool, optional): If True, the last message is a partial assistant message that the completion continues instead of starting a new one. Defaults to False.
+
+        Returns:
+            returns (Iterator[str]): Text chunks. Closing the iterator stops generation.
+        """
+        raise NotImplementedError
+
+    async def astream(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Asynchronous version of `stream`. By default every chunk is pulled from `stream` on a worker thread, so blocking backends do not stall the event loop.
+
+        Args:
+            messages (list[dict]): Messages formatted for the OpenAI Chat API.
+            model (str): Model identifier.
+            continue_final_message (bool, optional): See `stream`. Defaults to False.
+
+        Returns:
+            returns (AsyncIterator[str]): Text chunks.
+        """
+        iterator = self.stream(messages, model, continue_final_message)
+        sentinel = object()
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, iterator, sentinel)
+                if chunk is sentinel:
+                    break
+                yield chunk
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    Backend for OpenAI-compatible HTTP APIs (the project's default, e.g. Inference.net).
+    """
+
+    # Sent with continuation requests so the server extends the partial assistant message instead of starting a new one (vLLM-compatible servers)
+    CONTINUATION_EXTRA_BODY = {
+        "continue_final_message": True,
+        "add_generation_prompt": False,
+    }
+
+    def __init__(
+        self,
+        openAI_client: OpenAI,
+        async_client: Optional[Any] = None,
+        include_usage: bool = True,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            openAI_client (OpenAI): Client used for synchronous requests.
+            async_client (Optional[AsyncOpenAI], optional): Client used by `astream`. Defaults to None (synchronous client on a worker thread).
+            include_usage (bool, optional): If True, streams request the provider's token usage, which is reported to budget accounting (see `resources/token_budget.py`). Disable for servers rejecting `stream_options`. Defaults to True.
+            timeout (Optional[float], optional): HTTP timeout of every request in seconds (connecting and each read, so it also bounds the gap between streamed chunks). Lowered to the read timeout set by a wrapper (see `read_timeout_scope`) and to the time left before the current turn or session deadline (see `resources/deadlines.py`). Defaults to None (the client's timeout).
+        """
+        self.openAI_client = openAI_client
+        self.async_client = async_client
+        self.include_usage = include_usage
+        self.timeout = timeout
+
+    def _request_options(self, continue_final_message: bool) -> dict[str, Any]:
+        options = {}
+        if continue_final_message:
+            options["extra_body"] = self.CONTINUATION_EXTRA_BODY
+        if self.include_usage:
+            options["stream_options"] = {"include_usage": True}
+
+        # Requests never wait past the deadline of the turn or session they belong to, nor a read past the wrapper's read timeout
+        check_deadline()
+        timeout = self.timeout
+        for limit in (time_left(), read_timeout()):
+            if limit is not None:
+                timeout = limit if timeout is None else min(timeout, limit)
+        if timeout is not None:
+            options["timeout"] = timeout
+        return options
+
+    @staticmethod
+    def _report_usage(chunk: Any) -> None:
+        # The final chunk of a stream requested with include_usage carries the usage and no choices
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            report_usage(usage.prompt_tokens, usage.completion_tokens)
+
+    def stream(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool = False,
+    ) -> Iterator[str]:
+        # The request is sent right away; only reading the chunks is lazy
+        response = self.openAI_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            **self._request_options(continue_final_message),
+        )
+        return self._iter_content(response)
+
+    def _iter_content(self, response: Any) -> Iterator[str]:
+        try:
+            for chunk in response:
+                self._report_usage(chunk)
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+        finally:
+            # Closing the response stops the provider from generating the rest
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+
+    async def astream(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool = False,
+    ) -> AsyncIterator[str]:
+        if self.async_client is None:
+            async for chunk in super().astream(messages, model, continue_final_message):
+                yield chunk
+            return
+
+        response = await self.async_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            **self._request_options(continue_final_message),
+        )
+        try:
+            async for chunk in response:
+                self._report_usage(chunk)
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                await close()
+
+
+class ScriptedBackend(LLMBackend):
+    """
+    Deterministic in-process backend that replays scripted responses, chunked like a streamed model response. Used to run whole negotiations in tests and benchmarks without sockets or serialization.
+
+    Scripted texts may contain a `<think>...</think>` section, which is streamed as separate tag chunks like the default reasoning model does. Every call consumes one script entry; a continuation after a forced `</think>` streams only the answer part of its entry.
+    """
+
+    def __init__(
+        self,
+        script: Union[ScriptEntry, list[ScriptEntry]],
+        repeat: bool = True,
+        chunk_pattern: str = r"\s*\S+|\s+",
+    ):
+        """
+        Args:
+            script (Union[ScriptEntry, list[ScriptEntry]]): Responses returned in order. Each entry is a text or a function mapping the request messages to a text.
+            repeat (bool, optional): If True, the script starts over once exhausted; otherwise a RuntimeError is raised. Defaults to True.
+            chunk_pattern (str, optional): Regex defining one streamed chunk. Defaults to one word with its leading whitespace.
+        """
+        entries = script if isinstance(script, list) else [script]
+        if not entries:
+            raise ValueError("The script needs at least one response.")
+        self.entries = itertools.cycle(entries) if repeat else iter(entries)
+        self.chunk_pattern = re.compile(chunk_pattern)
+        self.lock = threading.Lock()
+        self.num_calls = 0
+
+    def _next_text(self, messages: list[dict]) -> str:
+        with self.lock:
+            entry = next(self.entries, None)
+            self.num_calls += 1
+        if entry is None:
+            raise RuntimeError("Scripted backend ran out of responses.")
+        return entry(messages) if callable(entry) else entry
+
+    def _chunks(self, text: str) -> Iterator[str]:
+        # Reasoning tags are streamed as chunks of their own, like the default model does
+        for part in re.split(r"(</?think>)", text):
+            if part in ("<think>", THINK_CLOSE_TAG):
+                yield part
+            elif part:
+                yield from self.chunk_pattern.findall(part)
+
+    def stream(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool = False,
+    ) -> Iterator[str]:
+        text = self._next_text(messages)
+
+        # A continuation after a forced </think> only produces the answer
+        if continue_final_message and THINK_CLOSE_TAG in text:
+            text = text.split(THINK_CLOSE_TAG, 1)[1]
+        yield from self._chunks(text)
+
+
+class LocalModelBackend(LLMBackend):
+    """
+    Optional backend running a Hugging Face causal language model on the local CPU (requires the `transformers` and `torch` packages, which are not installed by default).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_new_tokens: int = 1024,
+        device: str = "cpu",
+        **generation_kwargs: Any,
+    ):
+        """
+        Args:
+            model_name (str): Hugging Face model ID or local path (e.g., "deepseek-ai/DeepSeek-R1-Distill-Qwen-1.5B").
+            max_new_tokens (int, optional): Maximum generated tokens per call. Defaults to 1024.
+            device (str, optional): Torch device. Defaults to "cpu".
+            **generation_kwargs (Any): Extra arguments for `model.generate` (e.g., temperature).
+        """
+        try:
+            from transformers import (
+                AutoModelForCausalLM,
+                AutoTokenizer,
+                StoppingCriteria,
+                StoppingCriteriaList,
+                TextIteratorStreamer,
+            )
+        except ImportError as e:
+            raise ImportError(
+                "LocalModelBackend requires the optional 'transformers' and 'torch' packages: pip install transformers torch"
+            ) from e
+
+        class StopWhenSet(StoppingCriteria):
+            # Ends generation once the consumer closed the stream
+            def __init__(self, stop_event: threading.Event):
+                self.stop_event = stop_event
+
+            def __call__(self, input_ids, scores, **kwargs) -> bool:
+                return self.stop_event.is_set()
+
+        self.streamer_class = TextIteratorStreamer
+        self.stopping_criteria = lambda stop_event: StoppingCriteriaList(
+            [StopWhenSet(stop_event)]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForCausalLM.from_pretrained(model_name).to(device)
+        self.device = device
+        self.max_new_tokens = max_new_tokens
+        self.generation_kwargs = generation_kwargs
+
+        # One generation at a time (concurrent generate calls would only compete for the same cores)
+        self.lock = threading.Lock()
+
+    def stream(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool = False,
+    ) -> Iterator[str]:
+        input_ids = self.tokenizer.apply_chat_template(
+            messages,
+            add_generation_prompt=not continue_final_message,
+            continue_final_message=continue_final_message,
+            return_tensors="pt",
+        ).to(self.device)
+        streamer = self.streamer_class(
+            self.tokenizer, skip_prompt=True, skip_special_tokens=False
+        )
+
+        stop_event = threading.Event()
+
+        with self.lock:
+            # Generation runs on a thread and hands decoded text to the streamer
+            thread = threading.Thread(
+                target=self.model.generate,
+                kwargs={
+                    "input_ids": input_ids,
+                    "max_new_tokens": self.max_new_tokens,
+                    "streamer": streamer,
+                    "stopping_criteria": self.stopping_criteria(stop_event),
+                    **self.generation_kwargs,
+                },
+                daemon=True,
+            )
+            thread.start()
+            try:
+                for text in streamer:
+                    if text:
+                        yield text
+            finally:
+                stop_event.set()
+                thread.join()
+
+
+class LimitedBackend(LLMBackend):
+    """
+    Wraps a backend so every request passes through an adaptive concurrency limiter (see `resources/concurrency_limiter.py`). A request holds its slot until its stream ends or is closed; the time to the first chunk is the latency signal, and rate-limit and timeout errors make the limiter back off.
+
+    Share one instance between all sessions of a batch so they share the limit. Plain OpenAI clients get a shared instance with default settings from `get_backend`; wrap the client explicitly to configure the limiter.
+    """
+
+    def __init__(
+        self,
+        backend: Union[OpenAI, LLMBackend],
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ):
+        """
+        Args:
+            backend (Union[OpenAI, LLMBackend]): The backend (or OpenAI client) whose requests are limited. An OpenAI client is used without its default limiter.
+            limiter (Optional[AdaptiveConcurrencyLimiter], optional): The limiter. Defaults to a new limiter with default settings.
+        """
+        self.backend = (
+            backend if isinstance(backend, LLMBackend) else OpenAIBackend(backend)
+        )
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the limiter's current limit, queue depth and counters (see `AdaptiveConcurrencyLimiter.stats`).
+        """
+        return self.limiter.stats()
+
+    def stream(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool = False,
+    ) -> Iterator[str]:
+        started = self.limiter.acquire()
+        first_chunk_latency = None
+        iterator = None
+        try:
+            iterator = self.backend.stream(messages, model, continue_final_message)
+            for chunk in iterator:
+                if first_chunk_latency is None:
+                    first_chunk_latency = time.monotonic() - started
+                yield chunk
+        except GeneratorExit:
+            # Closed early by the consumer (e.g., reasoning budget hit): still a healthy request
+            self.limiter.release(started, latency=first_chunk_latency)
+            raise
+        except Exception as e:
+            self.limiter.release(started, error=e)
+            raise
+        else:
+            self.limiter.release(started, latency=first_chunk_latency)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+
+class HedgedBackend(LLMBackend):
+    """
+    Wraps a backend and hedges slow streams: if the first chunk (or the next chunk) of a stream takes longer than a percentile of the recently observed waits, a duplicate request is sent and whichever stream delivers a chunk first is kept; the other one is cancelled.
+
+    A duplicate fired mid-stream continues the text received so far (`continue_final_message`), so the output stays one consistent response. Hedges are capped to a fraction of all requests, and counters of fired and won hedges are available through `stats`.
+    """
+
+    # Chunk waits remembered per kind (first chunk / between chunks) for the thresholds
+    WINDOW_SIZE = 500
+
+    # Thresholds are re-derived from the window after this many new samples
+    RECOMPUTE_EVERY = 25
+
+    def __init__(
+        self,
+        backend: Union[OpenAI, LLMBackend],
+        percentile: float = 0.95,
+        max_extra_load: float = 0.1,
+        min_samples: int = 20,
+        min_delay_s: float = 0.05,
+        read_timeout: Optional[float] = 60.0,
+    ):
+        """
+        Args:
+            backend (Union[OpenAI, LLMBackend]): The backend (or OpenAI client) whose requests are hedged.
+            percentile (float, optional): A wait longer than this percentile of the observed waits fires the hedge. Defaults to 0.95.
+            max_extra_load (float, optional): Maximum ratio of hedge requests to original requests. Defaults to 0.1.
+            min_samples (int, optional): Waits observed before hedging starts (thresholds are meaningless before). Defaults to 20.
+            min_delay_s (float, optional): Lower bound of the hedge threshold in seconds. Defaults to 0.05.
+            read_timeout (Optional[float], optional): Seconds a single socket read of an OpenAI request may wait. A cancelled stream stays blocked in its read until then, holding its connection and any `LimitedBackend` slot. Defaults to 60.0 (None keeps the client's timeout).
+        """
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1.")
+        self.backend = get_backend(backend)
+        self.percentile = percentile
+        self.max_extra_load = max_extra_load
+        self.min_samples = min_samples
+        self.min_delay_s = min_delay_s
+        self.read_timeout = read_timeout
+
+        self.lock = threading.Lock()
+        self.waits = {
+            "first": collections.deque(maxlen=self.WINDOW_SIZE),
+            "next": collections.deque(maxlen=self.WINDOW_SIZE),
+        }
+        self.new_samples = {"first": 0, "next": 0}
+        self.thresholds: dict[str, Optional[float]] = {"first": None, "next": None}
+        self.counters = {
+            "requests": 0,
+            "hedges_fired": 0,
+            "hedges_won": 0,
+            "hedges_capped": 0,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the hedging counters and the current thresholds.
+
+        Returns:
+            returns (dict[str, Any]): `requests`, `hedges_fired`, `hedges_won` (the duplicate delivered first), `hedges_capped` (skipped because of the extra-load cap), `first_chunk_threshold_s` and `next_chunk_threshold_s`.
+        """
+        with self.lock:
+            return {
+                **self.counters,
+                "first_chunk_threshold_s": self.thresholds["first"],
+                "next_chunk_threshold_s": self.thresholds["next"],
+            }
+
+    def _record_wait(self, kind: str, wait_s: float) -> None:
+        with self.lock:
+            window = self.waits[kind]
+            window.append(wait_s)
+            self.new_samples[kind] += 1
+            if len(window) < self.min_samples:
+                return
+            if (
+                self.thresholds[kind] is None
+                or self.new_samples[kind] >= self.RECOMPUTE_EVERY
+            ):
+                ordered = sorted(window)
+                index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+                self.thresholds[kind] = max(self.min_delay_s, ordered[index])
+                self.new_samples[kind] = 0
+
+    def _try_hedge(self) -> bool:
+        # Hedges may only add `max_extra_load` requests per original request
+        with self.lock:
+            if (
+                self.counters["hedges_fired"] + 1
+                > self.max_extra_load * self.counters["requests"]
+            ):
+                self.counters["hedges_capped"] += 1
+                return False
+            self.counters["hedges_fired"] += 1
+            return True
+
+    def _start(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool,
+        chunks: queue.Queue,
+        cancelled: threading.Event,
+        stream_id: int,
+    ) -> None:
+        """
+        Pumps one stream into the shared queue on a daemon thread until it ends or is cancelled.
+        """
+
+        def pump() -> None:
+            iterator = None
+            try:
+                # A cancelled stream is only closed after its next read, so reads must not block for long
+                with read_timeout_scope(self.read_timeout):
+                    iterator = self.backend.stream(
+                        messages, model, continue_final_message
+                    )
+                    for chunk in iterator:
+                        if cancelled.is_set():
+                            break
+                        chunks.put((stream_id, chunk, None))
+            except Exception as e:
+                chunks.put((stream_id, None, e))
+                return
+            finally:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+            chunks.put((stream_id, None, None))
+
+        # Run in a copy of the caller's context, so usage reports reach the caller's budget accounting
+        threading.Thread(
+            target=contextvars.copy_context().run, args=(pump,), daemon=True
+        ).start()
+
+    def stream(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool = False,
+    ) -> Iterator[str]:
+        with self.lock:
+            self.counters["requests"] += 1
+
+        chunks: queue.Queue = queue.Queue()
+        cancel_events = {0: threading.Event()}
+        self._start(
+            messages, model, continue_final_message, chunks, cancel_events[0], 0
+        )
+
+        current = 0
+        racing = False
+        can_hedge = True
+        received: list[str] = []
+        wait_start = time.perf_counter()
+        try:
+            while True:
+                kind = "next" if received else "first"
+                threshold = self.thresholds[kind] if can_hedge else None
+                try:
+                    stream_id, chunk, error = chunks.get(timeout=threshold)
+                except queue.Empty:
+                    # Stalled beyond the threshold: race one duplicate against the stalled stream
+                    can_hedge = False
+                    if not self._try_hedge():
+                        continue
+                    hedge_messages, hedge_continues = self._hedge_request(
+                        messages, continue_final_message, "".join(received)
+                    )
+                    cancel_events[1] = threading.Event()
+                    self._start(
+                        hedge_messages,
+                        model,
+                        hedge_continues,
+                        chunks,
+                        cancel_events[1],
+                        1,
+                    )
+                    racing = True
+                    continue
+
+                if racing:
+                    racing = False
+                    if error is not None:
+                        # The failed stream drops out of the race, keep waiting on the other one
+                        cancel_events[stream_id].set()
+                        current = 1 - stream_id
+                        continue
+
+                    # The first stream to make progress wins; the other one is cancelled
+                    cancel_events[1 - stream_id].set()
+                    current = stream_id
+                    if stream_id == 1:
+                        with self.lock:
+                            self.counters["hedges_won"] += 1
+                elif stream_id != current:
+                    # Leftovers of the cancelled stream
+                    continue
+
+                if error is not None:
+                    raise error
+                if chunk is None:
+                    return
+
+                if can_hedge:
+                    self._record_wait(kind, time.perf_counter() - wait_start)
+                received.append(chunk)
+                wait_start = time.perf_counter()
+                yield chunk
+        finally:
+            for cancelled in cancel_events.values():
+                cancelled.set()
+
+    def _hedge_request(
+        self, messages: list[dict], continue_final_message: bool, received: str
+    ) -> tuple[list[dict], bool]:
+        """
+        Builds the duplicate request: the original one if nothing was received yet, otherwise a continuation of the received text.
+
+        Returns:
+            returns (tuple[list[dict], bool]): The messages and the `continue_final_message` flag for the duplicate.
+        """
+        if not received:
+            return messages, continue_final_message
+        if continue_final_message:
+            partial = messages[-1]
+            return (
+                messages[:-1]
+                + [{"role": partial["role"], "content": partial["content"] + received}],
+                True,
+            )
+        return messages + [{"role": "assistant", "content": received}], True
+
+
+class DeadlineBackend(LLMBackend):
+    """
+    Wraps a backend and aborts streams that stall: no first chunk within `first_token_timeout`, no next chunk within `chunk_timeout`, or no progress before the deadline of the current turn or session (see `deadline_scope`). The stream is read on a daemon thread, so a connection that hangs inside a read cannot hold up the caller; it is abandoned and closed once the read returns. OpenAI requests get the same read timeout, so an abandoned stream frees its connection and `LimitedBackend` slot about when the caller gives up on it.
+
+    Stalls raise `StreamStalled` (so `prompt_llm_with_retry` retries the call), passed deadlines raise `DeadlineExceeded`. Neither counts as provider overload for a `LimitedBackend`. Outcomes are counted per endpoint (see `endpoint_stats`).
+    """
+
+    def __init__(
+        self,
+        backend: Union[OpenAI, LLMBackend],
+        first_token_timeout: Optional[float] = 60.0,
+        chunk_timeout: Optional[float] = 30.0,
+        endpoint: Optional[str] = None,
+    ):
+        """
+        Args:
+            backend (Union[OpenAI, LLMBackend]): The backend (or OpenAI client) whose streams are watched.
+            first_token_timeout (Optional[float], optional): Seconds allowed until the first chunk. Defaults to 60.0 (None waits for the deadline only).
+            chunk_timeout (Optional[float], optional): Seconds allowed between two chunks. Defaults to 30.0.
+            endpoint (Optional[str], optional): Name the outcomes are counted under. Defaults to the base URL of the wrapped OpenAI client, or the backend's class name.
+        """
+        self.backend = get_backend(backend)
+        self.first_token_timeout = first_token_timeout
+        self.chunk_timeout = chunk_timeout
+        self.endpoint = endpoint or _endpoint_name(self.backend)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the request outcomes of this backend's endpoint (see `endpoint_stats`).
+        """
+        return endpoint_stats().get(self.endpoint, {"requests": 0})
+
+    def _read_timeout(self) -> Optional[float]:
+        """
+        Socket read timeout of the watched requests: the longer of the two stall timeouts, or None if either is unlimited (the deadline still bounds the request).
+        """
+        if self.first_token_timeout is None or self.chunk_timeout is None:
+            return None
+        return max(self.first_token_timeout, self.chunk_timeout)
+
+    def stream(
+        self,
+        messages: list[dict],
+        model: str,
+        continue_final_message: bool = False,
+    ) -> Iterator[str]:
+        check_deadline()
+        deadline = current_deadline()
+        chunks: queue.Queue = queue.Queue()
+        cancelled = threading.Event()
+
+        def pump() -> None:
+            iterator = None
+            try:
+                # An abandoned stream is only closed after its next read, so its reads time out like the watchdog does
+                with read_timeout_scope(self._read_timeout()):
+                    iterator = self.backend.stream(
+                        messages, model, continue_final_message
+                    )
+                    for chunk in iterator:
+                        if cancelled.is_set():
+                            break
+                        chunks.put((chunk, None))
+            except Exception as e:
+                chunks.put((None, e))
+                return
+            finally:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+            chunks.put((None, None))
+
+        # Run in a copy of the caller's context, so usage reports and deadlines reach the request
+        threading.Thread(
+            target=contextvars.copy_context().run, args=(pump,), daemon=True
+        ).start()
+
+        started = time.monotonic()
+        first_token_s = None
+        wait_start = started
+        outcome = "completed"
+        try:
+            while True:
+                kind = "chunk_gap" if first_token_s is not None else "first_token"
+                limit = (
+                    self.chunk_timeout
+                    if first_token_s is not None
+                    else self.first_token_timeout
+                )
+                # The deadline of the turn or session cuts the wait short
+                if deadline is not None:
+                    left = deadline[0] - time.monotonic()
+                    if limit is None or left < limit:
+                        limit, kind = max(0.0, left), deadline[1]
+                try:
+                    chunk, error = chunks.get(timeout=limit)
+                except queue.Empty:
+                    outcome = f"{kind}_timeouts"
+                    if kind in ("turn", "session"):
+                        raise DeadlineExceeded(kind)
+                    raise StreamStalled(kind, time.monotonic() - wait_start)
+
+                if error is not None:
+                    outcome = "errors"
+                    raise error
+                if chunk is None:
+                    return
+                if first_token_s is None:
+                    first_token_s = time.monotonic() - started
+                wait_start = time.monotonic()
+                yield chunk
+        finally:
+            cancelled.set()
+            record_request(self.endpoint, outcome, first_token_s)
+
+
+def _endpoint_name(backend: LLMBackend) -> str:
+    """
+    Names the endpoint behind a backend: the base URL of the innermost OpenAI client, or the innermost backend's class name.
+    """
+    while hasattr(backend, "backend"):
+        backend = backend.backend
+    client = getattr(backend, "openAI_client", None)
+    base_url = getattr(client, "base_url", None)
+    return str(base_url) if base_url is not None else type(backend).__name__
+
+
+def get_backend(client: Union[OpenAI, LLMBackend]) -> LLMBackend:
+    """
+    Returns the backend to use for a client: backends are used as they are. OpenAI clients are wrapped in an `OpenAIBackend` behind a `LimitedBackend`, created once per client, so all sessions and persona generations sharing a client share one adaptive concurrency limit.
+
+    Args:
+        client (Union[OpenAI, LLMBackend]): An OpenAI(-compatible) client or a backend.
+
+    Returns:
+        returns (LLMBackend): The backend.
+    """
+    if isinstance(client, LLMBackend):
+        return client
+    with _client_backends_lock:
+        backend = _client_backends.get(client)
+        if backend is None:
+            backend = _client_backends[client] = LimitedBackend(OpenAIBackend(client))
+        return backend
@@ -0,0 +1,713 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Union
+
+from openai import OpenAI
+from resources.event_stream import (
+    EventBus,
+    RoundStarted,
+    SessionEnded,
+    SessionStarted,
+    StatusMessage,
+    TermSheetUpdated,
+    TurnStarted,
+)
+from resources.deadlines import DeadlineExceeded, deadline_scope
+from resources.llm_backends import LLMBackend
+from resources.negotiation_session import (
+    STOP_MESSAGES,
+    TURN_ATTEMPTS,
+    NegotiationSession,
+)
+from resources.token_budget import TokenBudget
+from utilities.llm_utilities import prompt_llm_with_retry
+from utilities.tracing_utilities import span, traced
+
+# Appended to every bidder's user prompt so it knows it is competing
+COMPETITION_INSTRUCTION = (
+    "Other acquirers are bidding for the same TARGET company at the same time. "
+    "You cannot see their offers, but the TARGET's responses may reflect them. "
+    "Make your offer competitive while protecting your company's interests."
+)
+
+
+class MultiBidderNegotiationSession(NegotiationSession):
+    """
+    A class to simulate a competitive acquisition in which several acquirers bid for one target. In every round all bidders respond concurrently to the same history snapshot, then the target responds to all of them at once, so a round costs one bidder latency plus one target latency.
+    """
+
+    def __init__(
+        self,
+        acquirers: list[dict[str, Any]],
+        target: dict[str, Any],
+        openAI_client: Union[OpenAI, LLMBackend],
+        num_rounds: int,
+        stream_content: bool,
+        max_workers: Optional[int] = None,
+        event_bus: Optional[EventBus] = None,
+        stop_event: Optional[threading.Event] = None,
+        tags: Optional[dict[str, Any]] = None,
+        budget: Optional[TokenBudget] = None,
+        turn_timeout: Optional[float] = None,
+        session_timeout: Optional[float] = None,
+    ):
+        if len(acquirers) < 2:
+            raise ValueError("A multi-bidder negotiation needs at least two acquirers.")
+
+        # Parent setup covers the shared helpers; detectors are not used with several bidders
+        super().__init__(
+            acquirers[0],
+            target,
+            openAI_client,
+            num_rounds,
+            stream_content,
+            convergence_window=None,
+            repetition_action=None,
+            event_bus=event_bus,
+            stop_event=stop_event,
+            tags=tags,
+            budget=budget,
+            repair_turns=False,
+            turn_timeout=turn_timeout,
+            session_timeout=session_timeout,
+        )
+        self.acquirers = acquirers
+        self.max_workers = max_workers or len(acquirers)
+
+        # Unique display names for each bidder (used as keys for per-bidder term sheets)
+        self.bidder_names = []
+        for acquirer in acquirers:
+            name = self._extract_company_name(acquirer["business_descr"][0])
+            if name in self.bidder_names:
+                name = f"{name} #{len(self.bidder_names) + 1}"
+            self.bidder_names.append(name)
+
+        # Line opening the target's section for one bidder, e.g. "To Acme Corp:" (longest names first)
+        names_pattern = "|".join(
+            re.escape(name) for name in sorted(self.bidder_names, key=len, reverse=True)
+        )
+        self.bidder_section_pattern = re.compile(
+            rf"^[ \t#*]*To\s+\"?({names_pattern})\"?[ \t*]*:[ \t*]*",
+            flags=re.IGNORECASE | re.MULTILINE,
+        )
+
+        # Create system prompts for each bidder and for the target
+        self.bidder_system_messages = [
+            self._create_system_prompt(acquirer, target) for acquirer in acquirers
+        ]
+        self.target_system_message = self._create_target_system_prompt(
+            target, acquirers
+        )
+
+    @traced("negotiation.multi_bidder_session", "negotiation")
+    def _run_negotiation(self) -> list[dict[str, Any]]:
+        """
+        High-level function that executes a full multi-bidder negotiation for up to `num_rounds` rounds.
+
+        Returns:
+            returns (list[dict[str, Any]]): A complete log of the negotiation. Entries have the same fields as a two-party log plus:
+                - company_name (str): The responding company.
+                - round (int): Round index of the turn.
+                - term_sheet_snapshot (dict[str, Any]): For bidders, their own cumulative term sheet; for the target, all bidders' term sheets keyed by bidder name.
+                - skipped_turns (list[dict[str, Any]]): Only on the final entry, if any turn failed every attempt; the `round`, `role` and `company_name` of each skipped turn.
+                - stop_reason (str): Only on the final entry; 'bidder_selected', 'cancelled', 'budget', 'deadline' or 'max_rounds'.
+                - selected_bidder (Optional[str]): Only on the final entry; the bidder whose terms the target accepted.
+                - session_config (dict[str, Any]): Only on the final entry; as for two-party sessions, plus the bidders' countries.
+        """
+        target_name = self._extract_company_name(self.target["business_descr"][0])
+        self.events.emit(
+            SessionStarted,
+            acquirer_name=", ".join(self.bidder_names),
+            target_name=target_name,
+            num_rounds=self.num_rounds,
+        )
+
+        # Init objects for storing negotiation details
+        negotiation_history = []
+        negotiation_log = []
+        term_sheets = {name: {} for name in self.bidder_names}
+        bidder_states = {name: None for name in self.bidder_names}
+        stop_reason = "max_rounds"
+        selected_bidder = None
+
+        # Turns skipped after failing every attempt (recorded on the final log entry)
+        skipped_turns = []
+
+        # Every LLM call of the session is cut off at the session deadline
+        session_deadline = (
+            time.monotonic() + self.session_timeout
+            if self.session_timeout is not None
+            else None
+        )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for round_index in range(1, self.num_rounds + 1):
+                # Stop between rounds if the session was cancelled, timed out or used up its budget
+                if self.stop_event is not None and self.stop_event.is_set():
+                    stop_reason = "cancelled"
+                elif (
+                    session_deadline is not None
+                    and time.monotonic() >= session_deadline
+                ):
+                    stop_reason = "deadline"
+                elif self.budget is not None and self.budget.exhausted():
+                    stop_reason = "budget"
+                if stop_reason != "max_rounds":
+                    self.events.emit(
+                        StatusMessage, text=f"\n{STOP_MESSAGES[stop_reason]}"
+                    )
+                    break
+
+                self.events.emit(
+                    RoundStarted, round_index=round_index, num_rounds=self.num_rounds
+                )
+
+                # All bidders respond concurrently to the same history snapshot; a failing bidder only loses its own turn
+                history_snapshot = list(negotiation_history)
+                futures = [
+                    executor.submit(
+                        self._run_bidder_turn,
+                        i,
+                        round_index,
+                        history_snapshot,
+                        session_deadline,
+                    )
+                    for i in range(len(self.acquirers))
+                ]
+                bidder_turns = []
+                for name, future in zip(self.bidder_names, futures):
+                    try:
+                        bidder_turns.append(future.result())
+                    except DeadlineExceeded:
+                        stop_reason = "deadline"
+                        bidder_turns.append(None)
+                    except Exception as e:
+                        self.events.emit(
+                            StatusMessage, text=f"\nTurn of {name} failed: {e}"
+                        )
+                        bidder_turns.append(None)
+
+                # Record bidder turns in a stable order
+                for name, turn in zip(self.bidder_names, bidder_turns):
+                    if turn is None:
+                        if stop_reason != "deadline":
+                            skipped_turns.append(
+                                {
+                                    "round": round_index,
+                                    "role": "acquirer",
+                                    "company_name": name,
+                                }
+                            )
+                        continue
+                    response, reasoning, query = turn
+                    new_terms = self._extract_term_sheet_from_response(response)
+                    if new_terms:
+                        term_sheets[name].update(new_terms)
+                        self.events.emit(
+                            TermSheetUpdated,
+                            role=f"acquirer ({name})",
+                            term_sheet=term_sheets[name].copy(),
+                        )
+                    bidder_states[name] = self._extract_negotiation_state(response)
+
+                    negotiation_history.append(
+                        {"role": f"acquirer ({name})", "message": response}
+                    )
+                    negotiation_log.append(
+                        {
+                            "role": "acquirer",
+                            "company_name": name,
+                            "round": round_index,
+                            "message": response,
+                            "reasoning": reasoning,
+                            "query": query,
+                            "negotiation_state": bidder_states[name],
+                            "term_sheet_snapshot": term_sheets[name].copy(),
+                        }
+                    )
+                if stop_reason == "deadline":
+                    self.events.emit(
+                        StatusMessage, text=f"\n{STOP_MESSAGES[stop_reason]}"
+                    )
+                    break
+
+                # The target has nothing to answer if every bid of the round failed
+                if all(turn is None for turn in bidder_turns):
+                    continue
+
+                # Target responds to every bidder in one turn
+                try:
+                    target_turn = self._run_target_turn(
+                        round_index, target_name, negotiation_history, session_deadline
+                    )
+                except DeadlineExceeded:
+                    stop_reason = "deadline"
+                    self.events.emit(
+                        StatusMessage, text=f"\n{STOP_MESSAGES[stop_reason]}"
+                    )
+                    break
+                if target_turn is None:
+                    skipped_turns.append(
+                        {
+                            "round": round_index,
+                            "role": "target",
+                            "company_name": target_name,
+                        }
+                    )
+                    continue
+                response, reasoning, query = target_turn
+                for name, new_terms in self._extract_bidder_term_sheets(
+                    response
+                ).items():
+                    term_sheets[name].update(new_terms)
+                    self.events.emit(
+                        TermSheetUpdated,
+                        role=f"target ({name})",
+                        term_sheet=term_sheets[name].copy(),
+                    )
+                target_state = self._extract_negotiation_state(response)
+
+                negotiation_history.append({"role": "target", "message": response})
+                negotiation_log.append(
+                    {
+                        "role": "target",
+                        "company_name": target_name,
+                        "round": round_index,
+                        "message": response,
+                        "reasoning": reasoning,
+                        "query": query,
+                        "negotiation_state": target_state,
+                        "term_sheet_snapshot": {
+                            name: sheet.copy() for name, sheet in term_sheets.items()
+                        },
+                    }
+                )
+
+                # Negotiation ends once the target accepts a bidder that declared complete
+                selected_bidder = self._extract_selected_bidder(response)
+                if (
+                    target_state == "complete"
+                    and selected_bidder
+                    and bidder_states[selected_bidder] == "complete"
+                ):
+                    stop_reason = "bidder_selected"
+                    self.events.emit(
+                        StatusMessage,
+                        text=f"\nTarget accepted the offer from {selected_bidder}. Ending early.",
+                    )
+                    break
+
+        # Record why the negotiation ended on the final log entry
+        if negotiation_log:
+            negotiation_log[-1]["stop_reason"] = stop_reason
+            negotiation_log[-1]["selected_bidder"] = (
+                selected_bidder if stop_reason == "bidder_selected" else None
+            )
+            if skipped_turns:
+                negotiation_log[-1]["skipped_turns"] = skipped_turns
+            negotiation_log[-1]["session_config"] = self._session_config()
+
+        self.events.emit(
+            SessionEnded,
+            stop_reason=stop_reason,
+            num_turns=len(negotiation_log),
+            term_sheet=(
+                term_sheets[selected_bidder]
+                if stop_reason == "bidder_selected"
+                else {name: sheet.copy() for name, sheet in term_sheets.items()}
+            ),
+        )
+        return negotiation_log
+
+    def _run_bidder_turn(
+        self,
+        bidder_index: int,
+        round_index: int,
+        history_snapshot: list[dict[str, str]],
+        session_deadline: Optional[float] = None,
+    ) -> Optional[tuple[str, str, str]]:
+        """
+        Generates one bidder's turn. Each bidder only sees its own messages and its own part of the target's responses.
+
+        Args:
+            bidder_index (int): Position of the bidder in `acquirers`.
+            round_index (int): Current round index.
+            history_snapshot (list[dict[str, str]]): Negotiation history at the start of the round.
+            session_deadline (Optional[float], optional): Monotonic deadline of the session. Defaults to None.
+
+        Returns:
+            returns (Optional[tuple[str, str, str]]): The bidder's response, reasoning and query, or None if every attempt failed.
+        """
+        name = self.bidder_names[bidder_index]
+        own_role = f"acquirer ({name})"
+        self.events.emit(
+            TurnStarted, round_index=round_index, role="acquirer", company_name=name
+        )
+
+        with span(
+            "negotiation.turn",
+            "negotiation",
+            round=round_index,
+            role="acquirer",
+            bidder=name,
+        ):
+            visible_history = [
+                (
+                    {
+                        "role": "target",
+                        "message": self._target_reply_for_bidder(
+                            entry["message"], name
+                        ),
+                    }
+                    if entry["role"] == "target"
+                    else entry
+                )
+                for entry in history_snapshot
+                if entry["role"] in (own_role, "target")
+            ]
+            messages = self._get_messages(
+                self.bidder_system_messages[bidder_index],
+                visible_history,
+                [COMPETITION_INSTRUCTION],
+            )
+            return self._prompt_turn(messages, session_deadline)
+
+    def _run_target_turn(
+        self,
+        round_index: int,
+        target_name: str,
+        negotiation_history: list[dict[str, str]],
+        session_deadline: Optional[float] = None,
+    ) -> Optional[tuple[str, str, str]]:
+        """
+        Generates the target's response to all bidders of the round.
+
+        Args:
+            round_index (int): Current round index.
+            target_name (str): The target's company name.
+            negotiation_history (list[dict[str, str]]): Full negotiation history, including this round's bids.
+            session_deadline (Optional[float], optional): Monotonic deadline of the session. Defaults to None.
+
+        Returns:
+            returns (Optional[tuple[str, str, str]]): The target's response, reasoning and query, or None if every attempt failed.
+        """
+        self.events.emit(
+            TurnStarted,
+            round_index=round_index,
+            role="target",
+            company_name=target_name,
+        )
+
+        with span("negotiation.turn", "negotiation", round=round_index, role="target"):
+            messages = [
+                {"role": "system", "content": self.target_system_message},
+                {
+                    "role": "user",
+                    "content": self._create_target_user_prompt(negotiation_history),
+                },
+            ]
+            return self._prompt_turn(messages, session_deadline)
+
+    def _prompt_turn(
+        self, messages: list[dict], session_deadline: Optional[float]
+    ) -> Optional[tuple[str, str, str]]:
+        """
+        Prompts the LLM for one turn within the turn and session deadlines and charges its tokens to the budget. A turn that passes its turn deadline or fails is retried, up to `TURN_ATTEMPTS` attempts.
+
+        Args:
+            messages (list[dict]): The turn's prompt.
+            session_deadline (Optional[float]): Monotonic deadline of the session.
+
+        Returns:
+            returns (Optional[tuple[str, str, str]]): The response, reasoning and query, or None if every attempt failed. `DeadlineExceeded` is raised once the session deadline passes.
+        """
+        for attempt in range(1, TURN_ATTEMPTS + 1):
+            call_info = {}
+            try:
+                # Deadlines are set per worker thread (context variables do not cross into the pool)
+                with deadline_scope(self.turn_timeout, session_deadline):
+                    return prompt_llm_with_retry(
+                        messages,
+                        self.backend,
+                        stream_content=self.stream_content,
+                        events=self.events,
+                        reasoning_budget=(
+                            self.budget.call_token_limit()
+                            if self.budget is not None
+                            else None
+                        ),
+                        call_info=call_info,
+                    )
+            except (DeadlineExceeded, RuntimeError) as e:
+                self.events.emit(
+                    StatusMessage,
+                    text=f"\n{e} (turn attempt {attempt}/{TURN_ATTEMPTS})",
+                )
+                if isinstance(e, DeadlineExceeded) and e.kind == "session":
+                    raise
+            finally:
+                # Tokens of failed attempts are charged too
+                if self.budget is not None:
+                    self.budget.charge(
+                        call_info.get("prompt_tokens", 0),
+                        call_info.get("completion_tokens", 0),
+                    )
+        return None
+
+    def _session_config(self) -> dict[str, Any]:
+        """
+        Describes the session's configuration like a two-party session, with the countries of all bidders.
+
+        Returns:
+            returns (dict[str, Any]): The session config.
+        """
+        return {
+            **super()._session_config(),
+            "acquirer_countries": [
+                acquirer.get("country_based") for acquirer in self.acquirers
+            ],
+            "num_bidders": len(self.acquirers),
+        }
+
+    def _create_target_system_prompt(
+        self, target_persona: dict[str, Any], acquirer_personas: list[dict[str, Any]]
+    ) -> str:
+        """
+        Generates the target's system prompt, describing every competing bidder.
+
+        Args:
+            target_persona (dict[str, Any]): The target company's persona.
+            acquirer_personas (list[dict[str, Any]]): The competing acquirers' personas.
+
+        Returns:
+            returns (str): The target's system prompt.
+        """
+        bidders_str = "\n".join(
+            f"""- Bidder "{name}" ({persona['country_based']}): {persona['business_descr'][0]}
+  Financial Info: {persona['financial_info'][0]}"""
+            for name, persona in zip(self.bidder_names, acquirer_personas)
+        )
+        return f"""You are a representative of the TARGET company in an international business acquisition in which several companies are bidding to acquire your company.
+Your role: strongly advocate for your company's best interests, play the bidders' offers against each other, and finalize a binding acquisition agreement with the best bidder.
+
+Your Company:
+- Role in the Acquisition: TARGET
+- Location: {target_persona['country_based']}
+- Company Description: {target_persona['business_descr'][0]}
+- Financial Info: {target_persona["financial_info"][0]}
+- Cultural Profile: {target_persona['cultural_profile'][0]}
+- Authority Dynamics: {target_persona['authority_dynamics'][0]}
+- Unspoken Interests: {target_persona['unspoken_interests'][0]}
+
+Competing Bidders:
+{bidders_str}
+
+Instructions
+1. Deal Terms: Respond to each bidder with concrete terms – e.g., valuation, payment structure (cash vs. stock, earn-outs), synergy targets, timelines for due diligence, etc.
+2. Push for Advantage: Use the competition between bidders to secure the best possible outcome for your company.
+3. Hidden Agenda: Weave in your company's unspoken interests without explicitly stating them as "hidden."
+4. Negotiate: Ask for clarifications, counter suboptimal terms, highlight concerns (like potential risks or synergy limits).
+5. Response Format: Provide only official negotiation statements (no salutations, sign-offs, or extraneous text).
+6. Professional Tone: Keep it concise and direct, reflecting your company's communication style.
+"""
+
+    def _create_target_user_prompt(
+        self, negotiation_history: list[dict[str, str]]
+    ) -> str:
+        """
+        Generates the target's user prompt asking for a response to every bidder.
+
+        Args:
+            negotiation_history (list[dict[str, str]]): Full negotiation history, including this round's bids.
+
+        Returns:
+            returns (str): Formatted user message to prompt the target's response.
+        """
+        history_str = "\n".join(
+            f"{entry['role'].upper()}:\n{entry['message']}"
+            for entry in negotiation_history
+        )
+        bidder_keys = ",\n".join(
+            f'  "{name}": {{"valuation": "...", "payment_structure": "...", ...}}'
+            for name in self.bidder_names
+        )
+        return f"""Below is the ongoing negotiation history between your company and the competing bidders.
+Respond to every bidder's latest offer with your company's official negotiation response.
+
+Focus on these M&A deal points for each bidder:
+- Valuation (provide a numeric figure or multiple, e.g. $XX million, X times revenue, etc.)
+- Payment Structure (cash, stock, earn-out terms, etc.)
+- Key Synergies and Potential Friction (where do you see alignment or conflict?)
+- Due Diligence / Timeline (how long for diligence, when to sign definitive agreements?)
+
+Address each bidder in its own section starting with a line "To [bidder name]:". Each bidder only sees its own section and terms.
+
+Remember:
+- Push for your company's best interests and use the competing offers as leverage
+- Reflect your company's culture, authority dynamics, and unspoken interests
+- Do not include salutations or sign-offs
+- Maintain a professional, concise tone
+
+Append the terms you propose to each bidder in **JSON** at the end of your response, keyed by bidder name:
+```json
+{{
+{bidder_keys}
+}}
+```
+
+Finally, be sure to end with:
+
+Selected Bidder: [bidder name or none]
+Company Negotiation State: [pending or complete].
+
+- Selected Bidder: the bidder whose terms your company accepts (only when complete)
+- pending: your company still wishes to negotiate the terms
+- complete: your company is satified and will agree to the selected bidder's terms
+
+Negotiation History:
+{history_str}
+"""
+
+    def _extract_bidder_term_sheets(
+        self, response_text: str
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Extracts the per-bidder term sheets from the target's response.
+
+        Args:
+            response_text (str): The target's full response.
+
+        Returns:
+            returns (dict[str, dict[str, Any]]): Term sheet updates keyed by bidder name (only bidders that could be matched).
+        """
+        parsed = self._extract_term_sheet_from_response(response_text)
+        if not parsed:
+            return {}
+
+        # Match JSON keys to bidder names case-insensitively
+        lookup = {name.lower(): name for name in self.bidder_names}
+        return {
+            lookup[key.strip().lower()]: terms
+            for key, terms in parsed.items()
+            if key.strip().lower() in lookup and isinstance(terms, dict)
+        }
+
+    def _extract_selected_bidder(self, response_text: str) -> Optional[str]:
+        """
+        Extracts the bidder the target accepted from its 'Selected Bidder' line.
+
+        Args:
+            response_text (str): The target's full response.
+
+        Returns:
+            returns (Optional[str]): The matched bidder name, or None if no bidder was selected.
+        """
+        text = response_text.replace("*", "")
+        match = re.search(r"Selected\s+Bidder\s*:\s*\[?([^\]\n]+)", text, re.IGNORECASE)
+        if not match:
+            return None
+
+        # Exact match only, so "Bidder 1" does not select "Bidder 10"
+        selected = match.group(1).strip().strip(".").strip("\"'").strip().lower()
+        for name in self.bidder_names:
+            if name.lower() == selected:
+                return name
+        return None
+
+    def _target_reply_for_bidder(self, response_text: str, name: str) -> str:
+        """
+        Builds the part of a target response one bidder may see: the opening statement and the section addressed to that bidder, its own terms, and a state that is only complete if that bidder was selected. Sections and terms meant for other bidders are left out; if the target did not address the bidders in sections, only the terms and state are shown.
+
+        Args:
+            response_text (str): The target's full response.
+            name (str): The bidder's name.
+
+        Returns:
+            returns (str): The target response as shown to that bidder.
+        """
+        # Drop the JSON block and closing lines, which cover every bidder
+        text = re.sub(r"```json.*?```", "", response_text, flags=re.DOTALL)
+        text = re.sub(
+            r"^.*(?:Selected\s+Bidder|Negotiation\s+State).*$",
+            "",
+            text.replace("*", ""),
+            flags=re.IGNORECASE | re.MULTILINE,
+        )
+
+        # Split into [opening, name, section, name, section, ...]
+        parts = self.bidder_section_pattern.split(text)
+        sections = {
+            section_name.lower(): section.strip()
+            for section_name, section in zip(parts[1::2], parts[2::2])
+        }
+        visible = []
+        if sections:
+            visible = [parts[0].strip(), sections.get(name.lower(), "")]
+
+        terms = self._extract_bidder_term_sheets(response_text).get(name)
+        if terms:
+            visible.append(f"```json\n{json.dumps(terms, indent=2)}\n```")
+
+        state = (
+            "complete"
+            if self._extract_negotiation_state(response_text) == "complete"
+            and self._extract_selected_bidder(response_text) == name
+            else "pending"
+        )
+        visible.append(f"Company Negotiation State: {state}")
+        return "\n\n".join(part for part in visible if part)
+
+    @classmethod
+    def run(
+        cls,
+        acquirers: list[dict[str, Any]],
+        target: dict[str, Any],
+        openAI_client: Union[OpenAI, LLMBackend],
+        num_rounds: int = 10,
+        stream_content: bool = True,
+        max_workers: Optional[int] = None,
+        event_bus: Optional[EventBus] = None,
+        stop_event: Optional[threading.Event] = None,
+        tags: Optional[dict[str, Any]] = None,
+        budget: Optional[TokenBudget] = None,
+        turn_timeout: Optional[float] = None,
+        session_timeout: Optional[float] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Class method for running a multi-bidder negotiation session.
+
+        Args:
+            acquirers (list[dict[str, Any]]): Personas of the competing acquirers (at least two).
+            target (dict[str, Any]): Target company persona.
+            openAI_client (Union[OpenAI, LLMBackend]): OpenAI client or LLM backend for communication.
+            num_rounds (int, optional): Max number of negotiation rounds. Defaults to 10.
+            stream_content (bool, optional): If True, streams the LLM response token-by-token. Defaults to True.
+            max_workers (Optional[int], optional): Maximum number of bidder turns generated concurrently. Defaults to the number of bidders.
+            event_bus (Optional[EventBus], optional): Bus receiving the session's progress events. Defaults to the process-wide bus (console output).
+            stop_event (Optional[threading.Event], optional): When set from another thread, the session stops before its next round with stop reason 'cancelled'. Defaults to None.
+            tags (Optional[dict[str, Any]], optional): Labels recorded in the session config. Defaults to None.
+            budget (Optional[TokenBudget], optional): Token and cost budget of the session. Every call is charged against it, reasoning is capped to its call limit, and the session stops before the next round once it is used up (stop reason 'budget'). Defaults to None.
+            turn_timeout (Optional[float], optional): Seconds one party's turn may take; a turn still unfinished at its deadline is retried once, then skipped (recorded in `skipped_turns`). Defaults to None (unlimited).
+            session_timeout (Optional[float], optional): Seconds the whole session may take; it ends with stop reason 'deadline'. Defaults to None (unlimited).
+
+        Returns:
+            returns (list[dict[str, Any]]): Full log of negotiation exchanges and per-bidder terms.
+        """
+        instance = cls(
+            acquirers,
+            target,
+            openAI_client,
+            num_rounds,
+            stream_content,
+            max_workers,
+            event_bus,
+            stop_event=stop_event,
+            tags=tags,
+            budget=budget,
+            turn_timeout=turn_timeout,
+            session_timeout=session_timeout,
+        )
+        return instance._run_negotiation()
@@ -0,0 +1,670 @@
+import argparse
+import json
+import os
+import random
+import socketserver
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Union
+
+from dotenv import load_dotenv
+from openai import OpenAI
+
+from resources.concurrency_limiter import AdaptiveConcurrencyLimiter
+from resources.event_stream import (
+    Event,
+    EventBus,
+    EventSink,
+    PersonasSaved,
+    TokenChunk,
+)
+from resources.live_monitor import LiveMonitor
+from resources.llm_backends import (
+    DeadlineBackend,
+    HedgedBackend,
+    LimitedBackend,
+    LLMBackend,
+    get_backend,
+)
+from resources.negotiation_session import NegotiationSession
+from resources.participants import RuleBasedNegotiator
+from resources.token_budget import TokenBudget
+from utilities.daemon_utilities import DEFAULT_SOCKET_PATH
+from utilities.negotiation_utilities import save_negotiation_log
+from utilities.persona_utilities import (
+    create_personas,
+    create_personas_bulk,
+    load_personas_from_file,
+)
+
+# Countries used for persona jobs that do not specify their own
+DEFAULT_ACQUIRING_COUNTRIES = ["US", "UK", "France", "Japan", "Canada"]
+DEFAULT_TARGET_COUNTRIES = ["Africa", "Russia", "Singapore", "China", "India", "Brazil"]
+
+# Statuses after which a job no longer changes
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class Job:
+    """
+    A negotiation or persona job submitted to the daemon, together with the events it has emitted so far.
+    """
+
+    def __init__(self, kind: str, params: dict[str, Any]):
+        self.job_id = uuid.uuid4().hex[:8]
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.result: dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stop_event = threading.Event()
+        self.future = None
+
+        # Emitted events (as dictionaries), appended by the job's sink
+        self.events: list[dict[str, Any]] = []
+        self.condition = threading.Condition()
+
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def set_status(self, status: str, **fields: Any) -> None:
+        """
+        Updates the job's status and wakes up every client streaming its events.
+
+        Args:
+            status (str): New status ('queued', 'running', 'completed', 'failed' or 'cancelled').
+            **fields (Any): Job attributes to update along with the status (e.g., `error`).
+        """
+        with self.condition:
+            self.status = status
+            for name, value in fields.items():
+                setattr(self, name, value)
+            if status == "running":
+                self.started_at = time.time()
+            elif status in FINISHED_STATUSES:
+                self.finished_at = time.time()
+            self.condition.notify_all()
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Returns the job's JSON-serializable status (without its events).
+
+        Returns:
+            returns (dict[str, Any]): Job ID, kind, status, timings, result and error.
+        """
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "num_events": len(self.events),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobSink(EventSink):
+    """
+    A sink that records a job's events for status queries and streaming clients.
+    """
+
+    def __init__(self, job: Job, include_tokens: bool = False):
+        """
+        Args:
+            job (Job): The job whose events are recorded.
+            include_tokens (bool, optional): If True, token chunk events are recorded as well. Defaults to False.
+        """
+        self.job = job
+        self.include_tokens = include_tokens
+
+    def handle(self, event: Event) -> None:
+        if isinstance(event, TokenChunk) and not self.include_tokens:
+            return
+        with self.job.condition:
+            self.job.events.append(event.to_dict())
+            if isinstance(event, PersonasSaved):
+                self.job.result.setdefault("persona_files", []).append(event.filepath)
+            self.job.condition.notify_all()
+
+
+class NegotiationDaemon:
+    """
+    A long-running local server that keeps the OpenAI client and the persona pool warm and runs negotiation and persona jobs submitted over a Unix socket. Requests and responses are JSON lines (see `utilities/daemon_utilities.py` for the client side).
+    """
+
+    def __init__(
+        self,
+        openAI_client: Union[OpenAI, LLMBackend],
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        max_workers: int = 4,
+        personas_folder: str = "generated_personas",
+        histories_folder: str = "negotiation_histories",
+        budget: Optional[TokenBudget] = None,
+        monitor: Optional[LiveMonitor] = None,
+        turn_timeout: Optional[float] = None,
+        session_timeout: Optional[float] = None,
+    ):
+        self.openAI_client = openAI_client
+        self.budget = budget
+        self.monitor = monitor
+        self.turn_timeout = turn_timeout
+        self.session_timeout = session_timeout
+        self.socket_path = socket_path
+        self.personas_folder = personas_folder
+        self.histories_folder = histories_folder
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="daemon-job"
+        )
+        self.jobs: dict[str, Job] = {}
+        self.jobs_lock = threading.Lock()
+        self.server = None
+
+        # Persona pool kept in memory, so negotiation jobs never touch the disk to pick personas
+        self.persona_pool: list[tuple[str, dict[str, Any], dict[str, Any]]] = []
+        self.persona_pool_lock = threading.Lock()
+        self._load_persona_pool()
+
+    def _load_persona_pool(self) -> None:
+        """
+        Loads every persona file of the personas folder into the in-memory pool.
+        """
+        if not os.path.isdir(self.personas_folder):
+            return
+        for filename in sorted(os.listdir(self.personas_folder)):
+            if filename.endswith(".json"):
+                self._add_to_persona_pool(os.path.join(self.personas_folder, filename))
+
+    def _add_to_persona_pool(self, filepath: str) -> None:
+        """
+        Adds the persona pair saved in `filepath` to the pool (skipping invalid files).
+
+        Args:
+            filepath (str): Persona file to load.
+        """
+        # Compact records keep the pool small (sessions only read the field responses)
+        acquirer, target = load_personas_from_file(filepath, compact=True)
+        if acquirer and target:
+            with self.persona_pool_lock:
+                self.persona_pool.append((filepath, acquirer, target))
+
+    def _get_personas(
+        self, personas_file: Optional[str]
+    ) -> tuple[str, dict[str, Any], dict[str, Any]]:
+        """
+        Returns the requested persona pair from the pool, or a random pair if none was requested.
+
+        Args:
+            personas_file (Optional[str]): Path of the persona file to use, if any.
+
+        Returns:
+            returns (tuple[str, dict[str, Any], dict[str, Any]]): Persona filepath, acquirer persona and target persona.
+        """
+        with self.persona_pool_lock:
+            pool = list(self.persona_pool)
+
+        if personas_file is None:
+            if not pool:
+                raise ValueError(
+                    "The persona pool is empty. Submit a personas job first."
+                )
+            return random.choice(pool)
+
+        for entry in pool:
+            if os.path.abspath(entry[0]) == os.path.abspath(personas_file):
+                return entry
+
+        # Files created outside the daemon are loaded and pooled on first use
+        self._add_to_persona_pool(personas_file)
+        with self.persona_pool_lock:
+            if self.persona_pool and self.persona_pool[-1][0] == personas_file:
+                return self.persona_pool[-1]
+        raise ValueError(f"No valid personas found in {personas_file}.")
+
+    def submit(self, kind: str, params: dict[str, Any]) -> Job:
+        """
+        Queues a job for execution.
+
+        Args:
+            kind (str): 'negotiation' or 'personas'.
+            params (dict[str, Any]): Job parameters (see `_run_negotiation_job` and `_run_personas_job`).
+
+        Returns:
+            returns (Job): The queued job.
+        """
+        if kind not in ("negotiation", "personas"):
+            raise ValueError("Job kind must be either 'negotiation' or 'personas'.")
+
+        job = Job(kind, params)
+        with self.jobs_lock:
+            self.jobs[job.job_id] = job
+        job.future = self.executor.submit(self._run_job, job)
+        return job
+
+    def cancel(self, job: Job) -> None:
+        """
+        Cancels a job. Queued jobs are dropped immediately; running negotiations stop before their next turn and running persona jobs before their next persona pair.
+
+        Args:
+            job (Job): The job to cancel.
+        """
+        job.stop_event.set()
+        if job.future is not None and job.future.cancel():
+            job.set_status("cancelled")
+
+    def _run_job(self, job: Job) -> None:
+        """
+        Runs a job on a worker thread and records its outcome.
+
+        Args:
+            job (Job): The job to run.
+        """
+        if job.stop_event.is_set():
+            job.set_status("cancelled")
+            return
+
+        job.set_status("running")
+        event_bus = EventBus(
+            [JobSink(job, include_tokens=job.params.get("include_tokens", False))]
+        )
+        if self.monitor is not None:
+            event_bus.subscribe(self.monitor.sink)
+        try:
+            if job.kind == "negotiation":
+                self._run_negotiation_job(job, event_bus)
+            else:
+                self._run_personas_job(job, event_bus)
+        except Exception as e:
+            job.set_status("failed", error=f"{type(e).__name__}: {e}")
+            return
+
+        job.set_status("cancelled" if job.stop_event.is_set() else "completed")
+
+    def _run_negotiation_job(self, job: Job, event_bus: EventBus) -> None:
+        """
+        Runs a negotiation session between a pooled persona pair and saves its log.
+
+        Supported parameters: `personas_file` (defaults to a random pooled pair), `num_rounds`, `convergence_window`, `convergence_tolerance`, `convergence_action`, `repetition_action`, `reasoning_budget`, `repair_turns`, `turn_timeout` and `session_timeout` (default to the daemon's), `rule_based_role` ('acquirer' or 'target', played by a `RuleBasedNegotiator`), `rule_based_beta`, `max_session_tokens` and `max_session_cost` (limits within the daemon's budget), `tags` and `save` (defaults to True).
+
+        If the daemon runs with a budget that is already committed, the job fails without starting the session.
+
+        Args:
+            job (Job): The negotiation job.
+            event_bus (EventBus): Bus recording the job's events.
+        """
+        params = job.params
+        personas_file, acquirer, target = self._get_personas(
+            params.get("personas_file")
+        )
+        job.result["personas_file"] = personas_file
+
+        # Reserve the session's limits in the daemon's budget before launching it
+        budget = None
+        if self.budget is not None:
+            budget = self.budget.child(
+                params.get("max_session_tokens"), params.get("max_session_cost")
+            )
+            if not self.budget.reserve(budget):
+                raise RuntimeError("The daemon's token/cost budget is committed.")
+
+        participants = None
+        rule_based_role = params.get("rule_based_role")
+        if rule_based_role:
+            persona, counterpart = (
+                (target, acquirer)
+                if rule_based_role == "target"
+                else (acquirer, target)
+            )
+            participants = {
+                rule_based_role: RuleBasedNegotiator(
+                    rule_based_role,
+                    beta=params.get("rule_based_beta", 1.0),
+                    persona=persona,
+                    counterpart=counterpart,
+                )
+            }
+
+        try:
+            negotiation_log = NegotiationSession.run(
+                acquirer=acquirer,
+                target=target,
+                openAI_client=self.openAI_client,
+                num_rounds=params.get("num_rounds", 10),
+                stream_content=True,
+                convergence_window=params.get("convergence_window", 4),
+                convergence_tolerance=params.get("convergence_tolerance", 0.01),
+                convergence_action=params.get("convergence_action", "close"),
+                repetition_action=params.get("repetition_action", "inject"),
+                event_bus=event_bus,
+                stop_event=job.stop_event,
+                reasoning_budget=params.get("reasoning_budget"),
+                repair_turns=params.get("repair_turns", True),
+                turn_timeout=params.get("turn_timeout", self.turn_timeout),
+                session_timeout=params.get("session_timeout", self.session_timeout),
+                tags=params.get("tags"),
+                participants=participants,
+                budget=budget,
+            )
+        finally:
+            if budget is not None:
+                self.budget.release(budget)
+                # Charges save the spending only every few seconds
+                self.budget.save()
+                job.result["tokens"] = budget.spent_tokens
+                job.result["cost"] = budget.spent_cost
+
+        job.result["num_turns"] = len(negotiation_log)
+        if negotiation_log:
+            job.result["stop_reason"] = negotiation_log[-1].get("stop_reason")
+        if params.get("save", True) and negotiation_log:
+            job.result["negotiation_file"] = save_negotiation_log(
+                negotiation_log, folder=self.histories_folder
+            )
+
+    def _run_personas_job(self, job: Job, event_bus: EventBus) -> None:
+        """
+        Generates and saves new persona pairs and adds them to the persona pool.
+
+        Supported parameters: `num_pairs` (defaults to 1), `bulk` (one structured LLM call per batch, defaults to False), `acquiring_countries` and `target_countries`.
+
+        Args:
+            job (Job): The personas job.
+            event_bus (EventBus): Bus recording the job's events.
+        """
+        params = job.params
+        num_pairs = params.get("num_pairs", 1)
+        acquiring_countries = params.get(
+            "acquiring_countries", DEFAULT_ACQUIRING_COUNTRIES
+        )
+        target_countries = params.get("target_countries", DEFAULT_TARGET_COUNTRIES)
+
+        if params.get("bulk", False):
+            create_personas_bulk(
+                num_pairs,
+                acquiring_countries,
+                target_countries,
+                self.openAI_client,
+                folder=self.personas_folder,
+                event_bus=event_bus,
+            )
+        else:
+            for _ in range(num_pairs):
+                if job.stop_event.is_set():
+                    break
+                create_personas(
+                    acquiring_countries,
+                    target_countries,
+                    self.openAI_client,
+                    folder=self.personas_folder,
+                    event_bus=event_bus,
+                )
+
+        # New pairs are immediately available to negotiation jobs
+        for filepath in job.result.get("persona_files", []):
+            self._add_to_persona_pool(filepath)
+
+    def handle_request(self, request: dict[str, Any], write) -> None:
+        """
+        Executes one client request. Most operations answer with a single JSON line; 'stream' writes one line per event until the job finishes.
+
+        Args:
+            request (dict[str, Any]): The decoded request, e.g. `{"op": "submit", "kind": "negotiation", "params": {...}}`.
+            write (Callable[[dict[str, Any]], None]): Sends one JSON line to the client.
+        """
+        op = request.get("op")
+
+        if op == "ping":
+            reply = {"ok": True, "pid": os.getpid(), "personas": len(self.persona_pool)}
+
+            # Report the state of deadline, hedging and concurrency wrappers around the client
+            backend = get_backend(self.openAI_client)
+            wrapper_keys = {
+                DeadlineBackend: "deadlines",
+                HedgedBackend: "hedging",
+                LimitedBackend: "concurrency",
+            }
+            while type(backend) in wrapper_keys:
+                reply[wrapper_keys[type(backend)]] = backend.stats()
+                backend = backend.backend
+            if self.budget is not None:
+                reply["budget"] = self.budget.stats()
+            write(reply)
+            return
+        if op == "submit":
+            job = self.submit(request.get("kind"), request.get("params") or {})
+            write({"ok": True, "job": job.summary()})
+            return
+        if op == "list":
+            with self.jobs_lock:
+                jobs = [job.summary() for job in self.jobs.values()]
+            write({"ok": True, "jobs": jobs})
+            return
+        if op == "shutdown":
+            write({"ok": True})
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return
+
+        # Remaining operations refer to an existing job
+        with self.jobs_lock:
+            job = self.jobs.get(request.get("job_id"))
+        if job is None:
+            write({"ok": False, "error": f"Unknown job: {request.get('job_id')}"})
+            return
+
+        if op == "status":
+            write({"ok": True, "job": job.summary()})
+        elif op == "cancel":
+            self.cancel(job)
+            write({"ok": True, "job": job.summary()})
+        elif op == "stream":
+            self._stream_events(job, request.get("since", 0), write)
+        else:
+            write({"ok": False, "error": f"Unknown operation: {op}"})
+
+    def _stream_events(self, job: Job, since: int, write) -> None:
+        """
+        Writes the job's events starting at index `since`, waiting for new ones until the job finishes, then a final line with the job's status.
+
+        Args:
+            job (Job): The job to stream.
+            since (int): Index of the first event to send.
+            write (Callable[[dict[str, Any]], None]): Sends one JSON line to the client.
+        """
+        next_index = since
+        while True:
+            with job.condition:
+                while next_index >= len(job.events) and not job.is_finished():
+                    job.condition.wait(timeout=1.0)
+                new_events = job.events[next_index:]
+                finished = job.is_finished()
+            for event in new_events:
+                write({"ok": True, "event": event})
+            next_index += len(new_events)
+            if finished and next_index >= len(job.events):
+                break
+        write({"ok": True, "done": True, "job": job.summary()})
+
+    def serve_forever(self) -> None:
+        """
+        Listens on the Unix socket until a 'shutdown' request is received.
+        """
+        # Remove a stale socket left behind by a previous daemon
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        daemon = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                def write(message: dict[str, Any]) -> None:
+                    self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+                # A connection may send several requests, one JSON object per line
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        daemon.handle_request(json.loads(line), write)
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+                    except Exception as e:
+                        write({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+        socketserver.ThreadingUnixStreamServer.daemon_threads = True
+        self.server = socketserver.ThreadingUnixStreamServer(
+            self.socket_path, RequestHandler
+        )
+        print(
+            f"Negotiation daemon listening on {self.socket_path} "
+            f"({len(self.persona_pool)} persona pairs pooled)"
+        )
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def shutdown(self) -> None:
+        """
+        Stops accepting requests, cancels pending jobs and lets running jobs stop at their next turn.
+        """
+        with self.jobs_lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            if not job.is_finished():
+                self.cancel(job)
+        self.executor.shutdown(wait=True)
+        if self.server is not None:
+            self.server.shutdown()
+
+
+if __name__ == "__main__":
+    # Usage (from the `src` folder): python -m resources.negotiation_daemon
+    parser = argparse.ArgumentParser(
+        description="Run the negotiation daemon on a local Unix socket."
+    )
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--personas", default="generated_personas")
+    parser.add_argument("--histories", default="negotiation_histories")
+    parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        default=None,
+        help="Hedge LLM streams stalled beyond this percentile of observed chunk waits (e.g. 0.95)",
+    )
+    parser.add_argument(
+        "--hedge-max-extra-load",
+        type=float,
+        default=0.1,
+        help="Maximum ratio of hedge requests to original requests",
+    )
+    parser.add_argument(
+        "--adaptive-concurrency",
+        action="store_true",
+        help="Bound the AIMD concurrency limiter all LLM calls pass through by --max-concurrency instead of its defaults (raise --workers accordingly)",
+    )
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--max-tokens", type=int, default=None)
+    parser.add_argument("--max-cost", type=float, default=None)
+    parser.add_argument("--call-max-tokens", type=int, default=None)
+    parser.add_argument(
+        "--prompt-price",
+        type=float,
+        default=0.0,
+        help="Price per million prompt tokens.",
+    )
+    parser.add_argument(
+        "--completion-price",
+        type=float,
+        default=0.0,
+        help="Price per million completion tokens.",
+    )
+    parser.add_argument(
+        "--budget-state",
+        default="daemon_budget.json",
+        help="File keeping the budget's spending across restarts",
+    )
+    parser.add_argument(
+        "--monitor-port",
+        type=int,
+        default=None,
+        help="Serve a live monitor of running negotiations on this local port",
+    )
+    parser.add_argument(
+        "--first-token-timeout",
+        type=float,
+        default=None,
+        help="Abort and retry LLM streams without a first chunk after this many seconds",
+    )
+    parser.add_argument(
+        "--chunk-timeout",
+        type=float,
+        default=None,
+        help="Abort and retry LLM streams that send no chunk for this many seconds",
+    )
+    parser.add_argument("--turn-timeout", type=float, default=None)
+    parser.add_argument("--session-timeout", type=float, default=None)
+    args = parser.parse_args()
+
+    load_dotenv()
+    openAI_client = OpenAI(
+        base_url="https://api.inference.net/v1",
+        api_key=os.getenv("INFERENCE_API_KEY"),
+    )
+    if args.adaptive_concurrency:
+        openAI_client = LimitedBackend(
+            openAI_client,
+            AdaptiveConcurrencyLimiter(
+                initial_limit=min(4, args.max_concurrency),
+                max_limit=args.max_concurrency,
+            ),
+        )
+    if args.hedge_percentile is not None:
+        # Hedges wrap the limiter, so duplicate requests also count against the limit
+        openAI_client = HedgedBackend(
+            openAI_client,
+            percentile=args.hedge_percentile,
+            max_extra_load=args.hedge_max_extra_load,
+        )
+    if args.first_token_timeout is not None or args.chunk_timeout is not None:
+        # Outermost, so a hedged race counts as one stream and stalls of both are caught
+        openAI_client = DeadlineBackend(
+            openAI_client,
+            first_token_timeout=args.first_token_timeout,
+            chunk_timeout=args.chunk_timeout,
+        )
+    budget = None
+    if args.max_tokens is not None or args.max_cost is not None:
+        budget = TokenBudget(
+            max_tokens=args.max_tokens,
+            max_cost=args.max_cost,
+            max_call_tokens=args.call_max_tokens,
+            prompt_cost_per_million=args.prompt_price,
+            completion_cost_per_million=args.completion_price,
+            state_file=args.budget_state,
+        )
+    monitor = None
+    if args.monitor_port is not None:
+        monitor = LiveMonitor(port=args.monitor_port).start()
+        print(f"Live monitor: {monitor.url}")
+    NegotiationDaemon(
+        openAI_client=openAI_client,
+        socket_path=args.socket,
+        max_workers=args.workers,
+        personas_folder=args.personas,
+        histories_folder=args.histories,
+        budget=budget,
+        monitor=monitor,
+        turn_timeout=args.turn_timeout,
+        session_timeout=args.session_timeout,
+    ).serve_forever()
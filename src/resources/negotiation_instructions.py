@@ -0,0 +1,23 @@
+# Appended to user prompts during a closing round forced by term sheet convergence
+CLOSING_ROUND_INSTRUCTION = (
+    "The offers on the table have stopped moving. This is the final round: "
+    "state your final position on the current terms and declare the negotiation "
+    "complete if your company can accept them."
+)
+
+# Appended to user prompts during a closing round forced by the session or sweep budget
+BUDGET_CLOSING_INSTRUCTION = (
+    "The budget for this negotiation is nearly used up. This is the final round: "
+    "state your final position on the current terms and declare the negotiation "
+    "complete if your company can accept them."
+)
+
+# Instructions that make a turn part of a closing round
+CLOSING_INSTRUCTIONS = (CLOSING_ROUND_INSTRUCTION, BUDGET_CLOSING_INSTRUCTION)
+
+# Appended to user prompts after both parties were caught restating the same positions
+DEADLOCK_INSTRUCTION = (
+    "The negotiation is deadlocked: both sides have been restating the same "
+    "positions. Do not repeat your previous statement. Break the deadlock by "
+    "proposing a concrete new trade-off or concession on at least one deal term."
+)
@@ -1,9 +1,65 @@
 import json
 import re
-from typing import Any, Optional
+import threading
+import time
+import uuid
+from typing import Any, Optional, Union
 
 from openai import OpenAI
-from utilities.llm_utilities import prompt_llm_with_retry
+from resources.convergence_detector import ConvergenceDetector
+from resources.deadlines import DeadlineExceeded, deadline_scope
+from resources.event_stream import (
+    EventBus,
+    RoundStarted,
+    SessionEnded,
+    SessionStarted,
+    StateChanged,
+    StatusMessage,
+    TermSheetUpdated,
+    TurnCompleted,
+    TurnStarted,
+    get_event_bus,
+)
+from resources.llm_backends import LLMBackend, get_backend
+from resources.negotiation_instructions import (
+    BUDGET_CLOSING_INSTRUCTION,
+    CLOSING_ROUND_INSTRUCTION,
+    DEADLOCK_INSTRUCTION,
+)
+from resources.participants import LLMParticipant, Participant
+from resources.repetition_detector import RepetitionDetector
+from resources.token_budget import TokenBudget
+from utilities.llm_utilities import prompt_llm
+from utilities.tracing_utilities import span, traced
+
+# Attempts at a turn that passed its deadline or failed before it is skipped
+TURN_ATTEMPTS = 2
+
+# Reasoning tokens allowed for a repair call (it only restates part of an existing statement)
+REPAIR_REASONING_BUDGET = 64
+
+# Amounts, percentages and durations that show a statement proposes concrete terms
+CONCRETE_TERMS_PATTERN = re.compile(
+    r"[$€£¥]\s?\d|\d\s?(?:million|billion|bn|%|percent|x\b|times|days|weeks|months)",
+    flags=re.IGNORECASE,
+)
+
+# What a repair call is asked for, per missing piece of a turn
+REPAIR_TASKS = {
+    "term_sheet": 'the term sheet the statement proposes, as JSON in a ```json code block with the keys "valuation", "payment_structure", "earn_out", "due_diligence_timeline" and "other_key_terms" (keep the terms on the table for anything the statement does not change)',
+    "state": "the company's negotiation state as one line, `Company Negotiation State: pending` if it still wishes to negotiate or `Company Negotiation State: complete` if it will agree to the terms",
+}
+
+# Printed when a negotiation ends before the maximum number of rounds
+STOP_MESSAGES = {
+    "both_complete": "Both parties have declared the negotiation complete. Ending early.",
+    "converged": "Term sheet has converged. Ending early.",
+    "stalled": "Negotiation is stuck restating the same positions. Ending early.",
+    "cancelled": "Negotiation was cancelled. Ending early.",
+    "budget": "Token or cost budget is used up. Ending early.",
+    "max_turns": "Turn limit of this session segment reached. Ending.",
+    "deadline": "Session deadline passed. Ending early.",
+}
 
 
 class NegotiationSession:
@@ -15,15 +71,73 @@ class NegotiationSession:
         self,
         acquirer: dict[str, Any],
         target: dict[str, Any],
-        openAI_client: OpenAI,
+        openAI_client: Union[OpenAI, LLMBackend],
         num_rounds: int,
         stream_content: bool,
+        convergence_window: Optional[int] = 4,
+        convergence_tolerance: float = 0.01,
+        convergence_action: str = "close",
+        repetition_action: Optional[str] = "inject",
+        event_bus: Optional[EventBus] = None,
+        stop_event: Optional[threading.Event] = None,
+        reasoning_budget: Optional[int] = None,
+        tags: Optional[dict[str, Any]] = None,
+        participants: Optional[dict[str, Participant]] = None,
+        budget: Optional[TokenBudget] = None,
+        parent_log: Optional[list[dict[str, Any]]] = None,
+        fork_turn: Optional[int] = None,
+        max_turns: Optional[int] = None,
+        repair_turns: bool = True,
+        turn_timeout: Optional[float] = None,
+        session_timeout: Optional[float] = None,
     ):
+        if convergence_action not in ("close", "stop"):
+            raise ValueError("convergence_action must be either 'close' or 'stop'.")
+        if repetition_action not in ("inject", "stop", None):
+            raise ValueError("repetition_action must be 'inject', 'stop' or None.")
+
         self.acquirer = acquirer
         self.target = target
         self.openAI_client = openAI_client
+        self.backend = get_backend(openAI_client)
         self.num_rounds = num_rounds
         self.stream_content = stream_content
+        self.convergence_window = convergence_window
+        self.convergence_tolerance = convergence_tolerance
+        self.convergence_action = convergence_action
+        self.repetition_action = repetition_action
+        self.stop_event = stop_event
+        self.reasoning_budget = reasoning_budget
+        self.tags = tags or {}
+        self.budget = budget
+        self.max_turns = max_turns
+        self.repair_turns = repair_turns
+        self.turn_timeout = turn_timeout
+        self.session_timeout = session_timeout
+
+        # A forked session continues from the first `fork_turn` turns of a parent session
+        if parent_log is not None:
+            fork_turn = len(parent_log) if fork_turn is None else fork_turn
+            if not 0 <= fork_turn <= len(parent_log):
+                raise ValueError(
+                    f"fork_turn must be between 0 and {len(parent_log)} (turns of the parent session)."
+                )
+        self.parent_log = parent_log
+        self.fork_turn = fork_turn
+
+        # Both sides are played by the LLM unless a participant is given for their role
+        llm_participant = LLMParticipant(
+            self.backend, self.stream_content, self.reasoning_budget
+        )
+        self.participants = {
+            "acquirer": llm_participant,
+            "target": llm_participant,
+            **(participants or {}),
+        }
+
+        # Progress is reported as events stamped with this session's ID
+        self.session_id = uuid.uuid4().hex[:6]
+        self.events = (event_bus or get_event_bus()).bind(self.session_id)
 
         # Create system prompts for each side
         self.acquirer_system_message = self._create_system_prompt(
@@ -33,6 +147,7 @@ class NegotiationSession:
             self.target, self.acquirer
         )
 
+    @traced("negotiation.session", "negotiation")
     def _run_negotiation(self) -> list[dict[str, Any]]:
         """
         High-level function that executes a full negotiation between acquirer and target for up to `num_rounds` rounds.
@@ -40,27 +155,43 @@ class NegotiationSession:
         Returns:
             returns (list[dict[str, Any]]): A complete log of the negotiation, including:
                 - role (str): Who responded.
+                - round (int): Round of the turn (from 1).
                 - message (str): The LLM's full response.
                 - reasoning (str): Internal LLM reasoning.
                 - query (str): The LLM prompt.
                 - negotiation_state (str): Either 'pending' or 'complete'.
                 - term_sheet_snapshot (dict[str, Any]): Latest cumulative deal terms.
+                - latency_ms (float): Wall-clock time of the turn's LLM call (including retries) or rule-based response.
+                - reasoning_tokens (int), reasoning_budget_hit (bool): Only if a reasoning budget is set; reasoning length and whether it was cut off.
+                - prompt_tokens (int), completion_tokens (int), cost (float): Only if a token budget is set; the turn's usage (reported by the provider or estimated) and its cost.
+                - repair (dict[str, Any]): Only on turns whose term sheet or state had to be repaired; the `missing` and `repaired` pieces and the repair's `latency_ms`.
+                - inherited (bool): Only on turns a fork copied from its parent session.
+                - skipped_turns (list[dict[str, Any]]): Only on the final entry, if any turn failed every attempt (turn deadline or LLM failure); the `round` and `role` of each skipped turn.
+                - stop_reason (str): Only on the final entry; why the session ended ('both_complete', 'converged', 'stalled', 'cancelled', 'budget', 'deadline', 'max_turns' or 'max_rounds').
+                - session_config (dict[str, Any]): Only on the final entry; countries, session settings and tags, used to group sessions for comparison.
         """
-        print(f"\nRUNNING NEGOTIATION\n{"*" * 50}")
-
         # Get acquiring and target company names from their descriptions and save in list
         acquirer_name = self._extract_company_name(self.acquirer["business_descr"][0])
         target_name = self._extract_company_name(self.target["business_descr"][0])
         company_names = [acquirer_name, target_name]
 
-        # Print company roles in negotiation and their names
-        print(f"{self.acquirer['role_in_acquisition'].upper()}: {acquirer_name}")
-        print(f"{self.target['role_in_acquisition'].upper()}: {target_name}")
+        # Announce session with company names
+        self.events.emit(
+            SessionStarted,
+            acquirer_name=acquirer_name,
+            target_name=target_name,
+            num_rounds=self.num_rounds,
+        )
 
-        # Init objects for storing negotiation details
-        negotiation_history = []
-        negotiation_log = []
-        current_term_sheet = {}
+        # Init objects for storing negotiation details (forks start from copies of their parent's turns)
+        negotiation_log = self._inherited_turns()
+        negotiation_history = [
+            {"role": entry["role"], "message": entry["message"]}
+            for entry in negotiation_log
+        ]
+        current_term_sheet = (
+            negotiation_log[-1]["term_sheet_snapshot"].copy() if negotiation_log else {}
+        )
 
         # Store business' information
         participants = [
@@ -72,88 +203,493 @@ class NegotiationSession:
         last_negotiation_state = None
         last_role_in_acquisition = None
         stop_negotiation = False
+        stop_reason = "max_rounds"
+
+        # Used for detecting term sheets that stopped moving (None disables detection)
+        convergence_detector = (
+            ConvergenceDetector(self.convergence_window, self.convergence_tolerance)
+            if self.convergence_window
+            else None
+        )
+        closing_turns_left = None
+        closing_reason = None
+
+        # Used for detecting parties restating near-identical positions (None disables detection)
+        repetition_detector = RepetitionDetector() if self.repetition_action else None
+        deadlock_turns_left = None
+        deadlock_instruction_injected = False
+
+        # Most expensive turn so far, the estimate for what a closing round will cost
+        max_turn_tokens = 0
+        max_turn_cost = 0.0
+
+        # Last declared state of each party (used for state change events)
+        declared_states = {}
+
+        # Replay inherited turns through the trackers, so a fork behaves as if it had played them
+        for entry in negotiation_log:
+            declared_states[entry["role"]] = entry["negotiation_state"]
+            last_negotiation_state = entry["negotiation_state"]
+            last_role_in_acquisition = entry["role"]
+            if convergence_detector:
+                convergence_detector.update(entry["term_sheet_snapshot"])
+            if repetition_detector:
+                repetition_detector.update(entry["role"], entry["message"])
+
+        # A fork resumes in the round and with the party its parent stopped at
+        roles = [party["role_in_acquisition"] for party, _ in participants]
+        start_round, start_party = self._resume_point(negotiation_log, roles)
+
+        # Turns skipped after failing every attempt (recorded on the final log entry), including the parent's before the fork point
+        skipped_turns = [
+            turn
+            for turn in self._inherited_skipped_turns()
+            if turn["role"] in roles
+            and (turn["round"], roles.index(turn["role"])) < (start_round, start_party)
+        ]
+
+        # Every LLM call of the session is cut off at the session deadline
+        session_deadline = (
+            time.monotonic() + self.session_timeout
+            if self.session_timeout is not None
+            else None
+        )
 
         # Negotiation loop
-        for round_index in range(1, self.num_rounds + 1):
-            print(f"\n{"="*50}\nRound {round_index}/{self.num_rounds}\n{"="*50}")
+        for round_index in range(start_round, self.num_rounds + 1):
+            self.events.emit(
+                RoundStarted, round_index=round_index, num_rounds=self.num_rounds
+            )
 
             # Allow each business to negotiate
             for i, (party, system_msg) in enumerate(participants):
-                # Print which company is negotiating
-                company_name = company_names[0] if i == 0 else company_names[1]
-                role_in_acquisition = party["role_in_acquisition"]
-                print(
-                    f"\n{role_in_acquisition.upper()} ({company_name})"
-                    if role_in_acquisition == "target"
-                    else f"{role_in_acquisition.upper()} ({company_name})"
-                )
-
-                # Get messages to pass to LLM
-                messages = self._get_messages(system_msg, negotiation_history)
-
-                # Get LLM response (negotiators response), its reasoning, and the query
-                response, reasoning, query = prompt_llm_with_retry(
-                    messages, self.openAI_client, stream_content=self.stream_content
-                )
-
-                # Extract terms json object from LLM response (if present) and update terms if it is not empty
-                new_terms = self._extract_term_sheet_from_response(response)
-                if new_terms:
-                    current_term_sheet.update(new_terms)
-
-                # Extract negotiation state from response
-                negotiation_state = self._extract_negotiation_state(response)
-
-                # Checks if both company's consecutively returned negotiation state as complete
+                if round_index == start_round and i < start_party:
+                    continue
+                # Stop between turns if the session was cancelled from another thread
+                if self.stop_event is not None and self.stop_event.is_set():
+                    stop_reason = "cancelled"
+                    stop_negotiation = True
+                    break
                 if (
-                    negotiation_state == "complete"
-                    and last_negotiation_state == "complete"
-                    and last_role_in_acquisition != role_in_acquisition
+                    session_deadline is not None
+                    and time.monotonic() >= session_deadline
                 ):
+                    stop_reason = "deadline"
                     stop_negotiation = True
+                    break
 
-                # Update last state and role
-                last_negotiation_state = negotiation_state
-                last_role_in_acquisition = role_in_acquisition
-
-                # Update negotiation history and log
-                negotiation_history.append(
-                    {"role": role_in_acquisition, "message": response}
-                )
-                negotiation_log.append(
-                    {
-                        "role": role_in_acquisition,
-                        "message": response,
-                        "reasoning": reasoning,
-                        "query": query,
-                        "negotiation_state": negotiation_state,
-                        "term_sheet_snapshot": current_term_sheet.copy(),
-                    }
+                # Announce which company is negotiating
+                company_name = company_names[0] if i == 0 else company_names[1]
+                role_in_acquisition = party["role_in_acquisition"]
+                self.events.emit(
+                    TurnStarted,
+                    round_index=round_index,
+                    role=role_in_acquisition,
+                    company_name=company_name,
                 )
 
+                # Trace the full turn (prompt building, LLM call, extraction and detection)
+                with span(
+                    "negotiation.turn",
+                    "negotiation",
+                    round=round_index,
+                    role=role_in_acquisition,
+                ):
+                    # Ask for final terms if offers converged and a closing round was forced
+                    additional_instructions = []
+                    if closing_turns_left is not None:
+                        additional_instructions.append(
+                            BUDGET_CLOSING_INSTRUCTION
+                            if closing_reason == "budget"
+                            else CLOSING_ROUND_INSTRUCTION
+                        )
+                    if deadlock_turns_left:
+                        additional_instructions.append(DEADLOCK_INSTRUCTION)
+                        deadlock_turns_left -= 1
+
+                    # Get messages to pass to LLM (rule-based participants do not read them)
+                    participant = self.participants[role_in_acquisition]
+                    messages = (
+                        self._get_messages(
+                            system_msg, negotiation_history, additional_instructions
+                        )
+                        if participant.uses_prompts
+                        else None
+                    )
+
+                    # Get the participant's response (negotiators response), its reasoning, and the query; a turn that times out or fails is retried, then skipped
+                    response = None
+                    for attempt in range(1, TURN_ATTEMPTS + 1):
+                        call_info = {}
+                        if self.budget is not None:
+                            # Cap the call's reasoning to the call budget and the tokens left
+                            call_info["max_reasoning_tokens"] = (
+                                self.budget.call_token_limit()
+                            )
+                        llm_start = time.perf_counter()
+                        repair = None
+                        try:
+                            # The turn (with retries and repair) must finish before the turn and session deadlines
+                            with deadline_scope(self.turn_timeout, session_deadline):
+                                response, reasoning, query = participant.respond(
+                                    messages,
+                                    negotiation_history,
+                                    current_term_sheet,
+                                    additional_instructions,
+                                    self.events,
+                                    call_info,
+                                )
+                                latency_ms = round(
+                                    (time.perf_counter() - llm_start) * 1000, 1
+                                )
+
+                                # Ask a short follow-up for the pieces a malformed turn is missing instead of regenerating it
+                                if (
+                                    self.repair_turns
+                                    and participant.uses_prompts
+                                    and response
+                                ):
+                                    missing = self._missing_turn_parts(
+                                        response, current_term_sheet
+                                    )
+                                    if missing:
+                                        response, repair = self._repair_turn(
+                                            response,
+                                            current_term_sheet,
+                                            missing,
+                                            call_info,
+                                        )
+                            break
+                        except (DeadlineExceeded, RuntimeError) as e:
+                            # The unfinished attempt is dropped; tokens it used are still charged
+                            response = None
+                            self.events.emit(
+                                StatusMessage,
+                                text=f"\n{e} (turn attempt {attempt}/{TURN_ATTEMPTS})",
+                            )
+                            if self.budget is not None:
+                                self.budget.charge(
+                                    call_info.get("prompt_tokens", 0),
+                                    call_info.get("completion_tokens", 0),
+                                )
+                            # Only the session deadline ends the session
+                            if isinstance(e, DeadlineExceeded) and e.kind == "session":
+                                stop_negotiation = True
+                                stop_reason = "deadline"
+                                break
+                    if stop_negotiation:
+                        break
+
+                    # Skip a turn that failed every attempt; the other party moves next
+                    if response is None:
+                        self.events.emit(
+                            StatusMessage,
+                            text=f"\nSkipping the {role_in_acquisition}'s turn in round {round_index}.",
+                        )
+                        skipped_turns.append(
+                            {"round": round_index, "role": role_in_acquisition}
+                        )
+                        continue
+
+                    # Charge the turn's tokens to the session budget (and the sweep budget above it)
+                    turn_cost = None
+                    if self.budget is not None:
+                        turn_tokens = call_info.get("prompt_tokens", 0) + call_info.get(
+                            "completion_tokens", 0
+                        )
+                        turn_cost = self.budget.charge(
+                            call_info.get("prompt_tokens", 0),
+                            call_info.get("completion_tokens", 0),
+                        )
+                        max_turn_tokens = max(max_turn_tokens, turn_tokens)
+                        max_turn_cost = max(max_turn_cost, turn_cost)
+
+                    # Extract terms json object from LLM response (if present) and update terms if it is not empty
+                    new_terms = self._extract_term_sheet_from_response(response)
+                    if new_terms:
+                        current_term_sheet.update(new_terms)
+                        self.events.emit(
+                            TermSheetUpdated,
+                            role=role_in_acquisition,
+                            term_sheet=current_term_sheet.copy(),
+                        )
+
+                    # Extract negotiation state from response and report changes
+                    negotiation_state = self._extract_negotiation_state(response)
+                    if (
+                        role_in_acquisition not in declared_states
+                        or declared_states[role_in_acquisition] != negotiation_state
+                    ):
+                        declared_states[role_in_acquisition] = negotiation_state
+                        self.events.emit(
+                            StateChanged,
+                            role=role_in_acquisition,
+                            negotiation_state=negotiation_state,
+                        )
+
+                    # Checks if both company's consecutively returned negotiation state as complete
+                    if (
+                        negotiation_state == "complete"
+                        and last_negotiation_state == "complete"
+                        and last_role_in_acquisition != role_in_acquisition
+                    ):
+                        stop_negotiation = True
+                        stop_reason = "both_complete"
+
+                    # Count down a forced closing round and end the session when it is over
+                    if closing_turns_left is not None:
+                        closing_turns_left -= 1
+                        if closing_turns_left == 0 and not stop_negotiation:
+                            stop_negotiation = True
+                            stop_reason = closing_reason
+
+                    # Force a closing round while the budget still covers one; prompts grow every turn, so one turn more than the round is kept in reserve at the most expensive turn so far
+                    elif (
+                        self.budget is not None
+                        and not stop_negotiation
+                        and not self.budget.can_afford(
+                            max_turn_tokens * (len(participants) + 1),
+                            max_turn_cost * (len(participants) + 1),
+                        )
+                    ):
+                        self.events.emit(
+                            StatusMessage,
+                            text="\nBudget nearly used up, forcing a closing round.",
+                        )
+                        closing_turns_left = len(participants)
+                        closing_reason = "budget"
+
+                    # Check if offers have stopped moving, then stop or force a closing round
+                    elif (
+                        convergence_detector
+                        and convergence_detector.update(current_term_sheet)
+                        and not stop_negotiation
+                    ):
+                        self.events.emit(
+                            StatusMessage,
+                            text=f"\nTerm sheet converged over the last {self.convergence_window} turns.",
+                        )
+                        if self.convergence_action == "stop":
+                            stop_negotiation = True
+                            stop_reason = "converged"
+                        else:
+                            closing_turns_left = len(participants)
+                            closing_reason = "converged"
+
+                    # A closing round running over the budget ends at once
+                    if (
+                        closing_reason == "budget"
+                        and not stop_negotiation
+                        and self.budget.exhausted()
+                    ):
+                        stop_negotiation = True
+                        stop_reason = "budget"
+
+                    # Check if both parties are looping, then inject a deadlock breaker once or stop
+                    if repetition_detector and not stop_negotiation:
+                        repetition_detector.update(role_in_acquisition, response)
+                        if repetition_detector.is_stalled():
+                            self.events.emit(
+                                StatusMessage,
+                                text="\nParties are restating the same positions.",
+                            )
+                            if (
+                                self.repetition_action == "stop"
+                                or deadlock_instruction_injected
+                            ):
+                                stop_negotiation = True
+                                stop_reason = "stalled"
+                            else:
+                                deadlock_turns_left = len(participants)
+                                deadlock_instruction_injected = True
+                                repetition_detector.reset()
+
+                    # Update last state and role
+                    last_negotiation_state = negotiation_state
+                    last_role_in_acquisition = role_in_acquisition
+
+                    self.events.emit(
+                        TurnCompleted,
+                        round_index=round_index,
+                        role=role_in_acquisition,
+                        message=response,
+                        negotiation_state=negotiation_state,
+                        latency_ms=latency_ms,
+                    )
+
+                    # Update negotiation history and log
+                    negotiation_history.append(
+                        {"role": role_in_acquisition, "message": response}
+                    )
+                    negotiation_log.append(
+                        {
+                            "role": role_in_acquisition,
+                            "round": round_index,
+                            "message": response,
+                            "reasoning": reasoning,
+                            "query": query,
+                            "negotiation_state": negotiation_state,
+                            "term_sheet_snapshot": current_term_sheet.copy(),
+                            "latency_ms": latency_ms,
+                        }
+                    )
+                    if self.reasoning_budget is not None:
+                        negotiation_log[-1]["reasoning_tokens"] = call_info.get(
+                            "reasoning_tokens"
+                        )
+                        negotiation_log[-1]["reasoning_budget_hit"] = call_info.get(
+                            "reasoning_budget_hit", False
+                        )
+                    if self.budget is not None:
+                        negotiation_log[-1]["prompt_tokens"] = call_info.get(
+                            "prompt_tokens", 0
+                        )
+                        negotiation_log[-1]["completion_tokens"] = call_info.get(
+                            "completion_tokens", 0
+                        )
+                        negotiation_log[-1]["cost"] = turn_cost
+                    if repair is not None:
+                        negotiation_log[-1]["repair"] = repair
+
+                    # End a session segment (e.g., a shared prefix of a sweep tree) at its turn limit
+                    if (
+                        self.max_turns is not None
+                        and len(negotiation_log) >= self.max_turns
+                        and not stop_negotiation
+                    ):
+                        stop_negotiation = True
+                        stop_reason = "max_turns"
+
                 # Break out of inner loop if negotiations have ended
                 if stop_negotiation:
                     break
 
             # Break out of outer loop if negotiations have ended
             if stop_negotiation:
-                print(
-                    "\nBoth parties have declared the negotiation complete. Ending early."
-                )
+                self.events.emit(StatusMessage, text=f"\n{STOP_MESSAGES[stop_reason]}")
                 break
 
-        print(f"{"*" * 50}\nNEGOTIATION COMPLETE")
-
-        # Convert last term sheet into str and print
-        current_term_sheet_str = "\n".join(
-            f"{key.upper()}: {value}" for key, value in current_term_sheet.items()
+        # Record why the negotiation ended on the final log entry
+        if negotiation_log:
+            negotiation_log[-1]["stop_reason"] = stop_reason
+            if skipped_turns:
+                negotiation_log[-1]["skipped_turns"] = skipped_turns
+            negotiation_log[-1]["session_config"] = self._session_config()
+
+        self.events.emit(
+            SessionEnded,
+            stop_reason=stop_reason,
+            num_turns=len(negotiation_log),
+            term_sheet=current_term_sheet.copy(),
         )
-        print(f"\nLast Term Sheet:\n{current_term_sheet_str}\n")
 
         return negotiation_log
 
+    def _inherited_turns(self) -> list[dict[str, Any]]:
+        """
+        Copies the first `fork_turn` turns of the parent session for a fork, marked as inherited and without the parent's final-entry fields.
+
+        Returns:
+            returns (list[dict[str, Any]]): The inherited log entries (empty if the session is not a fork).
+        """
+        if self.parent_log is None:
+            return []
+        inherited = []
+        for entry in self.parent_log[: self.fork_turn]:
+            entry = {
+                key: value
+                for key, value in entry.items()
+                if key not in ("stop_reason", "skipped_turns", "session_config")
+            }
+            entry["term_sheet_snapshot"] = dict(entry.get("term_sheet_snapshot") or {})
+            entry["inherited"] = True
+            inherited.append(entry)
+        return inherited
+
+    def _inherited_skipped_turns(self) -> list[dict[str, Any]]:
+        """
+        Returns the turns the parent session skipped (recorded on its final entry), empty if the session is not a fork.
+        """
+        if not self.parent_log:
+            return []
+        return list(self.parent_log[-1].get("skipped_turns") or [])
+
+    def _resume_point(
+        self, negotiation_log: list[dict[str, Any]], roles: list[str]
+    ) -> tuple[int, int]:
+        """
+        Returns where a session continues after its inherited turns: the round and the party following the last inherited turn. Turns may have been skipped, so the number of turns alone does not tell; logs without `round` entries (written before rounds were recorded) are assumed to alternate strictly.
+
+        Args:
+            negotiation_log (list[dict[str, Any]]): The inherited log entries.
+            roles (list[str]): Roles of the parties in turn order.
+
+        Returns:
+            returns (tuple[int, int]): Round (from 1) and index of the party to play next.
+        """
+        if not negotiation_log:
+            return 1, 0
+        last_entry = negotiation_log[-1]
+        if last_entry.get("round") is None or last_entry["role"] not in roles:
+            start_round, start_party = divmod(len(negotiation_log), len(roles))
+            return start_round + 1, start_party
+        next_party = roles.index(last_entry["role"]) + 1
+        return (
+            last_entry["round"] + next_party // len(roles),
+            next_party % len(roles),
+        )
+
+    def _lineage(self) -> list[dict[str, Any]]:
+        """
+        Returns the chain of sessions this session was forked from, oldest first: each link names a session and the number of its turns passed on to the next one.
+
+        Returns:
+            returns (list[dict[str, Any]]): `session_id` and `fork_turn` of every ancestor (empty if the session is not a fork).
+        """
+        if self.parent_log is None:
+            return []
+        parent_config = (
+            self.parent_log[-1].get("session_config") or {} if self.parent_log else {}
+        )
+        return list(parent_config.get("lineage") or []) + [
+            {
+                "session_id": parent_config.get("session_id"),
+                "fork_turn": self.fork_turn,
+            }
+        ]
+
+    def _session_config(self) -> dict[str, Any]:
+        """
+        Describes the session's configuration (recorded on the final log entry so stored sessions can be grouped and compared).
+
+        Returns:
+            returns (dict[str, Any]): Session ID and lineage, countries, session settings, backend name and user-defined tags.
+        """
+        return {
+            "session_id": self.session_id,
+            "lineage": self._lineage(),
+            "acquirer_country": self.acquirer.get("country_based"),
+            "target_country": self.target.get("country_based"),
+            "num_rounds": self.num_rounds,
+            "convergence_window": self.convergence_window,
+            "convergence_action": self.convergence_action,
+            "repetition_action": self.repetition_action,
+            "reasoning_budget": self.reasoning_budget,
+            "repair_turns": self.repair_turns,
+            "turn_timeout": self.turn_timeout,
+            "session_timeout": self.session_timeout,
+            "backend": type(self.backend).__name__,
+            "acquirer_participant": self.participants["acquirer"].name,
+            "target_participant": self.participants["target"].name,
+            "budget": self.budget.stats() if self.budget is not None else None,
+            **self.tags,
+        }
+
     def _get_messages(
-        self, system_message: str, negotiation_history: list[dict[str, str]]
+        self,
+        system_message: str,
+        negotiation_history: list[dict[str, str]],
+        additional_instructions: Optional[list[str]] = None,
     ) -> list[dict[str, str]]:
         """
         Combines the system and user prompts into an OpenAI messages structure.
@@ -161,12 +697,15 @@ class NegotiationSession:
         Args:
             system_message (str): System-level instructions for the LLM.
             negotiation_history (list[dict[str, str]]): List of messages so far in the negotiation.
+            additional_instructions (Optional[list[str]], optional): Extra instructions appended to the user prompt for this turn only. Defaults to None.
 
         Returns:
             returns (list[dict[str, str]]): Formatted message list suitable for OpenAI's chat API.
         """
         # Retrieve user prompt
-        user_prompt = self._create_user_prompt(negotiation_history)
+        user_prompt = self._create_user_prompt(
+            negotiation_history, additional_instructions
+        )
 
         # Build and return messages
         return [
@@ -215,12 +754,18 @@ Instructions
 6. Professional Tone: Keep it concise and direct, reflecting your company's communication style.
 """
 
-    def _create_user_prompt(self, negotiation_history: list[dict[str, str]]) -> str:
+    @traced("negotiation.build_prompt", "negotiation")
+    def _create_user_prompt(
+        self,
+        negotiation_history: list[dict[str, str]],
+        additional_instructions: Optional[list[str]] = None,
+    ) -> str:
         """
         Generates a user prompt based on the current negotiation history.
 
         Args:
             negotiation_history (list[dict[str, str]]): List of all previous negotiation exchanges.
+            additional_instructions (Optional[list[str]], optional): Extra instructions appended to the end of the prompt. Defaults to None.
 
         Returns:
             returns (str): Formatted user message to prompt the next LLM response.
@@ -308,8 +853,14 @@ Company Negotiation State: [pending or complete].
 - pending: your company still wishes to negotiate the terms
 - complete: your company is satified and will agree to the terms
 """
+        # Append turn-specific instructions (e.g., a forced closing round)
+        if additional_instructions:
+            prompt += "\nAdditional Instructions:\n" + "\n".join(
+                f"- {instruction}" for instruction in additional_instructions
+            )
         return prompt
 
+    @traced("negotiation.extract_term_sheet", "negotiation")
     def _extract_term_sheet_from_response(
         self,
         response_text: str,
@@ -338,6 +889,7 @@ Company Negotiation State: [pending or complete].
         except json.JSONDecodeError:
             return None
 
+    @traced("negotiation.extract_state", "negotiation")
     def _extract_negotiation_state(self, response_text: str) -> Optional[str]:
         """
         Extracts the current negotiation state from a formatted LLM response (pending or complete)
@@ -366,6 +918,132 @@ Company Negotiation State: [pending or complete].
             return match.group(1).lower()
         return None
 
+    def _missing_turn_parts(
+        self, response_text: str, term_sheet: dict[str, Any]
+    ) -> list[str]:
+        """
+        Validates a turn's response locally. The state line is always required; the term sheet JSON is required when its block does not parse, when no terms are on the table yet, or when the statement names concrete figures (amounts, percentages, durations) without one.
+
+        Args:
+            response_text (str): The full LLM response text.
+            term_sheet (dict[str, Any]): Terms on the table before the turn.
+
+        Returns:
+            returns (list[str]): The missing pieces, 'term_sheet' and/or 'state' (empty if the turn is well-formed).
+        """
+        missing = []
+        if self._extract_term_sheet_from_response(response_text) is None and (
+            "```json" in response_text
+            or not term_sheet
+            or CONCRETE_TERMS_PATTERN.search(response_text)
+        ):
+            missing.append("term_sheet")
+        if self._extract_negotiation_state(response_text) is None:
+            missing.append("state")
+        return missing
+
+    @traced("negotiation.repair_turn", "negotiation")
+    def _repair_turn(
+        self,
+        response_text: str,
+        term_sheet: dict[str, Any],
+        missing: list[str],
+        call_info: dict[str, Any],
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        Asks the LLM for only the missing pieces of a malformed turn, given the statement already produced, and merges them into the response. The repair prompt holds just the statement and the terms on the table, and its reasoning is capped to `REPAIR_REASONING_BUDGET`, so it costs a small fraction of regenerating the turn.
+
+        Args:
+            response_text (str): The malformed response.
+            term_sheet (dict[str, Any]): Terms on the table before the turn.
+            missing (list[str]): Missing pieces, as returned by `_missing_turn_parts`.
+            call_info (dict[str, Any]): Usage of the turn's call; the repair's tokens are added to it, so budgets charge them with the turn.
+
+        Returns:
+            returns (tuple[str, dict[str, Any]]): The merged response, and the repair record (`missing`, `repaired`, `latency_ms`, `prompt_tokens`, `completion_tokens`).
+        """
+        self.events.emit(
+            StatusMessage,
+            text=f"\nTurn is missing its {' and '.join(missing)}, asking for a repair...",
+        )
+        prompt = (
+            "The negotiation statement below is incomplete. Reply with only "
+            + " and ".join(REPAIR_TASKS[part] for part in missing)
+            + ".\n\nTerms currently on the table:\n"
+            + json.dumps(term_sheet, indent=2)
+            + "\n\nStatement:\n"
+            + response_text
+        )
+        messages = [
+            {
+                "role": "system",
+                "content": "You complete the formatting of M&A negotiation statements.",
+            },
+            {"role": "user", "content": prompt},
+        ]
+
+        # Keep the repair's reasoning short (and within the token budget)
+        reasoning_budget = REPAIR_REASONING_BUDGET
+        if self.budget is not None:
+            reasoning_budget = min(
+                reasoning_budget, self.budget.call_token_limit() or reasoning_budget
+            )
+
+        repair_info = {}
+        repair_start = time.perf_counter()
+        answer, _ = prompt_llm(
+            messages,
+            self.backend,
+            reasoning_budget=reasoning_budget,
+            events=self.events,
+            call_info=repair_info,
+        )
+        latency_ms = round((time.perf_counter() - repair_start) * 1000, 1)
+        for key in ("prompt_tokens", "completion_tokens"):
+            call_info[key] = call_info.get(key, 0) + repair_info.get(key, 0)
+
+        # Merge what the answer provides: the term sheet replaces an unparseable block and goes before the state line, the state line ends the response
+        repaired = []
+        merged = response_text.rstrip()
+        terms = (
+            self._extract_term_sheet_from_response(answer)
+            if answer and "term_sheet" in missing
+            else None
+        )
+        state = (
+            self._extract_negotiation_state(answer)
+            if answer and "state" in missing
+            else None
+        )
+        if terms:
+            merged = re.sub(r"```json(?:.*?```|.*$)", "", merged, flags=re.DOTALL)
+            lines = merged.rstrip().split("\n")
+            state_line = []
+            if self._extract_negotiation_state(lines[-1]) is not None:
+                state_line = [lines.pop()]
+            block = f"```json\n{json.dumps(terms, indent=2)}\n```"
+            merged = (
+                "\n".join(lines).rstrip() + "\n\n" + "\n".join([block, *state_line])
+            )
+            repaired.append("term_sheet")
+        if state:
+            merged += f"\n\nCompany Negotiation State: {state}"
+            repaired.append("state")
+
+        if len(repaired) < len(missing):
+            self.events.emit(
+                StatusMessage,
+                text=f"\nRepair did not supply the {' and '.join(p for p in missing if p not in repaired)}.",
+            )
+        return merged, {
+            "missing": missing,
+            "repaired": repaired,
+            "latency_ms": latency_ms,
+            "prompt_tokens": repair_info.get("prompt_tokens", 0),
+            "completion_tokens": repair_info.get("completion_tokens", 0),
+        }
+
+    @traced("negotiation.extract_company_name", "negotiation")
     def _extract_company_name(self, description: str) -> str:
         """
         Extracts the company name from a business description.
@@ -398,9 +1076,23 @@ Company Negotiation State: [pending or complete].
         cls,
         acquirer: dict[str, Any],
         target: dict[str, Any],
-        openAI_client: OpenAI,
+        openAI_client: Union[OpenAI, LLMBackend],
         num_rounds: int = 10,
         stream_content: bool = True,
+        convergence_window: Optional[int] = 4,
+        convergence_tolerance: float = 0.01,
+        convergence_action: str = "close",
+        repetition_action: Optional[str] = "inject",
+        event_bus: Optional[EventBus] = None,
+        stop_event: Optional[threading.Event] = None,
+        reasoning_budget: Optional[int] = None,
+        tags: Optional[dict[str, Any]] = None,
+        participants: Optional[dict[str, Participant]] = None,
+        budget: Optional[TokenBudget] = None,
+        max_turns: Optional[int] = None,
+        repair_turns: bool = True,
+        turn_timeout: Optional[float] = None,
+        session_timeout: Optional[float] = None,
     ) -> list[dict[str, Any]]:
         """
         Class method for running a negotiation session.
@@ -408,12 +1100,82 @@ Company Negotiation State: [pending or complete].
         Args:
             acquirer (dict[str, Any]): Acquirer company persona.
             target (dict[str, Any]): Target company persona.
-            openAI_client (OpenAI): OpenAI client for communication.
+            openAI_client (Union[OpenAI, LLMBackend]): OpenAI client or LLM backend for communication.
             num_rounds (int, optional): Max number of negotiation rounds. Defaults to 10.
             stream_content (bool, optional): If True, streams the LLM response token-by-token. Defaults to True.
+            convergence_window (Optional[int], optional): Number of consecutive turns the numeric terms must stay within tolerance before the session is wound down. None disables convergence detection. Defaults to 4.
+            convergence_tolerance (float, optional): Maximum relative movement of each numeric term within the window. Defaults to 0.01.
+            convergence_action (str, optional): 'close' forces one closing round once terms converge, 'stop' ends the session immediately. Defaults to "close".
+            repetition_action (Optional[str], optional): What to do when both parties keep restating near-identical positions: 'inject' adds a deadlock-breaking instruction once (and stops if the loop persists), 'stop' ends the session. None disables detection. Defaults to "inject".
+            event_bus (Optional[EventBus], optional): Bus receiving the session's progress events. Defaults to the process-wide bus (console output).
+            stop_event (Optional[threading.Event], optional): When set from another thread, the session stops before its next turn with stop reason 'cancelled'. Defaults to None.
+            reasoning_budget (Optional[int], optional): Maximum reasoning tokens per turn; longer reasoning is cut off and the answer forced. Budget hits are recorded in the log. Defaults to None (unlimited).
+            tags (Optional[dict[str, Any]], optional): Labels recorded in the session config (e.g., `{"prompt_variant": "b"}`) for grouping sessions in comparisons. Defaults to None.
+            participants (Optional[dict[str, Participant]], optional): Participants replacing the LLM for a role, e.g. `{"target": RuleBasedNegotiator("target")}`. Defaults to None (the LLM plays both sides).
+            budget (Optional[TokenBudget], optional): Token and cost budget of the session (e.g., a child of a sweep budget). Turns are charged against it, reasoning is capped to its call limit, and a closing round is forced while it still covers one; stop reason 'budget'. Defaults to None (no accounting).
+            max_turns (Optional[int], optional): Total turns after which the session ends with stop reason 'max_turns', e.g. to generate a prefix that several forks share. Defaults to None (no limit).
+            turn_timeout (Optional[float], optional): Seconds a turn may take, including retries and repair; a turn still unfinished at its deadline is retried once with a fresh deadline, then skipped (recorded in `skipped_turns`). Stalled streams are detected by wrapping the client in a `DeadlineBackend`. Defaults to None (unlimited).
+            session_timeout (Optional[float], optional): Seconds the whole session may take; every LLM call is cut off at the deadline, and the session ends with stop reason 'deadline'. Defaults to None (unlimited).
+            repair_turns (bool, optional): If True, LLM turns missing their state line, or their term sheet JSON when one is needed, are completed by a short follow-up call asking only for the missing piece (recorded as `repair` in the log). Defaults to True.
 
         Returns:
             returns (list[dict[str, Any]]): Full log of negotiation exchanges and terms.
         """
-        instance = cls(acquirer, target, openAI_client, num_rounds, stream_content)
+        instance = cls(
+            acquirer,
+            target,
+            openAI_client,
+            num_rounds,
+            stream_content,
+            convergence_window,
+            convergence_tolerance,
+            convergence_action,
+            repetition_action,
+            event_bus,
+            stop_event,
+            reasoning_budget,
+            tags,
+            participants,
+            budget,
+            max_turns=max_turns,
+            repair_turns=repair_turns,
+            turn_timeout=turn_timeout,
+            session_timeout=session_timeout,
+        )
+        return instance._run_negotiation()
+
+    @classmethod
+    def fork(
+        cls,
+        parent_log: list[dict[str, Any]],
+        fork_turn: int,
+        acquirer: dict[str, Any],
+        target: dict[str, Any],
+        openAI_client: Union[OpenAI, LLMBackend],
+        **kwargs: Any,
+    ) -> list[dict[str, Any]]:
+        """
+        Continues a saved session from one of its turns, e.g. with a changed persona, round limit or backend for the later turns. The first `fork_turn` turns are copied from the parent (marked `inherited`), together with the term sheet on the table and the convergence and repetition trackers, so only the remaining turns are generated. The fork's session config records its `lineage`, the chain of parent session IDs and fork turns.
+
+        Args:
+            parent_log (list[dict[str, Any]]): Log of the parent session (as returned by `run` or saved to a file).
+            fork_turn (int): Number of the parent's turns to keep (0 forks before the first turn).
+            acquirer (dict[str, Any]): Acquirer company persona for the remaining turns.
+            target (dict[str, Any]): Target company persona for the remaining turns.
+            openAI_client (Union[OpenAI, LLMBackend]): OpenAI client or LLM backend for the remaining turns.
+            **kwargs (Any): Further arguments of `run` (`num_rounds` counts the inherited rounds too).
+
+        Returns:
+            returns (list[dict[str, Any]]): Full log of the fork, inherited turns included.
+        """
+        instance = cls(
+            acquirer,
+            target,
+            openAI_client,
+            kwargs.pop("num_rounds", 10),
+            kwargs.pop("stream_content", True),
+            parent_log=parent_log,
+            fork_turn=fork_turn,
+            **kwargs,
+        )
         return instance._run_negotiation()
@@ -0,0 +1,417 @@
+import json
+import re
+from typing import Any, Optional, Union
+
+from openai import OpenAI
+
+from resources.event_stream import EventEmitter
+from resources.llm_backends import LLMBackend, get_backend
+from resources.negotiation_instructions import CLOSING_INSTRUCTIONS
+from utilities.llm_utilities import prompt_llm_with_retry
+from utilities.term_sheet_utilities import (
+    _persona_text,
+    normalize_term_sheet,
+    stated_valuation_range,
+)
+
+# Anchor of the valuation curves when no valuation is known yet
+DEFAULT_REFERENCE_VALUATION = 100e6
+
+# Term sheet JSON block of a response (same format the session extracts)
+TERM_SHEET_PATTERN = re.compile(r"```json\s*(\{.*?\})\s*```", flags=re.DOTALL)
+
+
+class Participant:
+    """
+    Interface of one negotiating party in a `NegotiationSession`. Each turn the session asks the participant for its response, written in the session's format (message text with an optional JSON term sheet and a `Company Negotiation State` line).
+    """
+
+    # Name recorded in the session config
+    name = "participant"
+
+    # If False, the session skips building the prompt messages for this participant
+    uses_prompts = True
+
+    def respond(
+        self,
+        messages: Optional[list[dict]],
+        negotiation_history: list[dict[str, str]],
+        term_sheet: dict[str, Any],
+        additional_instructions: list[str],
+        events: EventEmitter,
+        call_info: dict[str, Any],
+    ) -> tuple[str, str, str]:
+        """
+        Produces the participant's next turn.
+
+        Args:
+            messages (Optional[list[dict]]): Prompt messages for the turn (None if `uses_prompts` is False).
+            negotiation_history (list[dict[str, str]]): Previous turns (`role` and `message`).
+            term_sheet (dict[str, Any]): Cumulative term sheet currently on the table.
+            additional_instructions (list[str]): Turn-specific instructions (e.g., a forced closing round).
+            events (EventEmitter): Emitter for progress events.
+            call_info (dict[str, Any]): May hold `max_reasoning_tokens`, the reasoning the turn may use under the session's token budget. Filled with metadata about the turn (e.g., reasoning and prompt tokens).
+
+        Returns:
+            returns (tuple[str, str, str]): The response, its reasoning and the query that produced it.
+        """
+        raise NotImplementedError
+
+
+class LLMParticipant(Participant):
+    """
+    A party played by the language model (the default for both sides).
+    """
+
+    name = "llm"
+
+    def __init__(
+        self,
+        openAI_client: Union[OpenAI, LLMBackend],
+        stream_content: bool = False,
+        reasoning_budget: Optional[int] = None,
+    ):
+        self.backend = get_backend(openAI_client)
+        self.stream_content = stream_content
+        self.reasoning_budget = reasoning_budget
+
+    def respond(
+        self,
+        messages: Optional[list[dict]],
+        negotiation_history: list[dict[str, str]],
+        term_sheet: dict[str, Any],
+        additional_instructions: list[str],
+        events: EventEmitter,
+        call_info: dict[str, Any],
+    ) -> tuple[str, str, str]:
+        # The session may lower the reasoning budget to what its token budget has left
+        reasoning_budget = self.reasoning_budget
+        max_reasoning_tokens = call_info.pop("max_reasoning_tokens", None)
+        if max_reasoning_tokens is not None:
+            reasoning_budget = min(
+                reasoning_budget or max_reasoning_tokens, max_reasoning_tokens
+            )
+        return prompt_llm_with_retry(
+            messages,
+            self.backend,
+            stream_content=self.stream_content,
+            events=events,
+            reasoning_budget=reasoning_budget,
+            call_info=call_info,
+        )
+
+
+class ConcessionCurve:
+    """
+    Time-dependent concession from an opening value to a limit: `value(t) = start + (limit - start) * t ** (1 / beta)` for negotiation progress `t` in [0, 1]. `beta` < 1 concedes late (boulware), `beta` > 1 concedes early (conceder), 1 is linear.
+    """
+
+    __slots__ = ("start", "limit", "beta")
+
+    def __init__(self, start: float, limit: float, beta: float = 1.0):
+        if beta <= 0:
+            raise ValueError("beta must be positive.")
+        self.start = start
+        self.limit = limit
+        self.beta = beta
+
+    def value(self, progress: float) -> float:
+        progress = min(1.0, max(0.0, progress))
+        return self.start + (self.limit - self.start) * progress ** (1 / self.beta)
+
+    def utility(self, value: float) -> float:
+        """
+        Position of a value between the limit (0) and the opening value (1); values beyond the limit are negative.
+        """
+        if self.start == self.limit:
+            return 1.0 if value == self.start else -1.0
+        return min(1.0, (value - self.limit) / (self.start - self.limit))
+
+    def __repr__(self) -> str:
+        return f"ConcessionCurve({self.start}, {self.limit}, beta={self.beta})"
+
+
+def default_curves(role: str, beta: float = 1.0) -> dict[str, ConcessionCurve]:
+    """
+    Returns typical concession curves of each role over the normalized terms of `normalize_term_sheet`. Valuations are multiples of the reference valuation; the acquirer's and target's limits overlap slightly, so agreement is possible.
+
+    Args:
+        role (str): 'acquirer' or 'target'.
+        beta (float, optional): Concession shape of every curve. Defaults to 1.0 (linear).
+
+    Returns:
+        returns (dict[str, ConcessionCurve]): Curves for `valuation`, `cash_share`, `earn_out_share` and `diligence_weeks`.
+    """
+    if role == "acquirer":
+        return {
+            "valuation": ConcessionCurve(0.7, 1.0, beta),
+            "cash_share": ConcessionCurve(0.4, 0.7, beta),
+            "earn_out_share": ConcessionCurve(0.3, 0.1, beta),
+            "diligence_weeks": ConcessionCurve(16, 8, beta),
+        }
+    if role == "target":
+        return {
+            "valuation": ConcessionCurve(1.4, 0.95, beta),
+            "cash_share": ConcessionCurve(0.9, 0.6, beta),
+            "earn_out_share": ConcessionCurve(0.05, 0.2, beta),
+            "diligence_weeks": ConcessionCurve(4, 10, beta),
+        }
+    raise ValueError("role must be either 'acquirer' or 'target'.")
+
+
+class RuleBasedNegotiator(Participant):
+    """
+    Deterministic counterparty following concession curves over valuation, cash/stock split, earn-out and due diligence timeline. It accepts the terms on the table once they are within its limits and at least as good for it as its own next offer, and otherwise counters with the next point on its curves, in the same term-sheet JSON and `Company Negotiation State` format as the LLM.
+
+    Replacing one side of a session with it halves the LLM calls of experiments that study the other side.
+    """
+
+    name = "rule_based"
+    uses_prompts = False
+
+    def __init__(
+        self,
+        role: str,
+        curves: Optional[dict[str, ConcessionCurve]] = None,
+        num_turns: int = 8,
+        reference_valuation: Optional[float] = None,
+        beta: float = 1.0,
+        persona: Optional[dict[str, Any]] = None,
+        counterpart: Optional[dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            role (str): 'acquirer' or 'target'.
+            curves (Optional[dict[str, ConcessionCurve]], optional): Concession curves per normalized term (valuation curves as multiples of the reference valuation). Defaults to `default_curves(role, beta)`.
+            num_turns (int, optional): Own turns until the limits are reached. Defaults to 8.
+            reference_valuation (Optional[float], optional): Valuation the curves are relative to. Defaults to None (the midpoint of the valuation range the target's persona states, else the counterparty's first proposed valuation, or DEFAULT_REFERENCE_VALUATION before it made one).
+            beta (float, optional): Concession shape of the default curves. Defaults to 1.0.
+            persona (Optional[dict[str, Any]], optional): The negotiator's own persona. Defaults to None.
+            counterpart (Optional[dict[str, Any]], optional): The counterparty's persona. Defaults to None.
+        """
+        self.role = role
+        self.curves = curves or default_curves(role, beta)
+        self.num_turns = num_turns
+        self.reference_valuation = reference_valuation
+
+        # Both sides price the target from the valuation range its persona states
+        target = persona if role == "target" else counterpart
+        valuation_range = stated_valuation_range(
+            _persona_text(target, "financial_info")
+        )
+        if reference_valuation is None and valuation_range is not None:
+            self.reference_valuation = sum(valuation_range) / 2
+
+    def offer(
+        self,
+        turn_index: int,
+        reference_valuation: float,
+        opening_valuation: Optional[float] = None,
+    ) -> dict[str, float]:
+        """
+        Returns the normalized terms offered at one of the negotiator's turns.
+
+        Args:
+            turn_index (int): Number of own turns taken before (0 for the first).
+            reference_valuation (float): Valuation the valuation curve is relative to.
+            opening_valuation (Optional[float], optional): First valuation the counterparty proposed, which bounds the valuation limit (see `valuation_curve`). Defaults to None.
+
+        Returns:
+            returns (dict[str, float]): Normalized terms (see `normalize_term_sheet`).
+        """
+        progress = turn_index / max(1, self.num_turns - 1)
+        curves = {
+            **self.curves,
+            "valuation": self.valuation_curve(reference_valuation, opening_valuation),
+        }
+        terms = {
+            term: curve.value(progress)
+            for term, curve in curves.items()
+            if curve is not None
+        }
+        if "valuation" in terms:
+            terms["valuation"] *= reference_valuation
+        return terms
+
+    def utility(
+        self,
+        terms: dict[str, float],
+        reference_valuation: float,
+        opening_valuation: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Mean position of the terms between the negotiator's limits (0) and opening values (1).
+
+        Args:
+            terms (dict[str, float]): Normalized terms.
+            reference_valuation (float): Valuation the valuation curve is relative to.
+            opening_valuation (Optional[float], optional): First valuation the counterparty proposed, which bounds the valuation limit (see `valuation_curve`). Defaults to None.
+
+        Returns:
+            returns (Optional[float]): The utility, negative if any term is beyond its limit; None if no term is known.
+        """
+        utilities = []
+        for term, value in terms.items():
+            if term == "valuation":
+                curve = self.valuation_curve(reference_valuation, opening_valuation)
+                value /= reference_valuation
+            else:
+                curve = self.curves.get(term)
+            if curve is None:
+                continue
+            utilities.append(curve.utility(value))
+        if not utilities:
+            return None
+        if min(utilities) < 0:
+            return min(utilities)
+        return sum(utilities) / len(utilities)
+
+    def valuation_curve(
+        self, reference_valuation: float, opening_valuation: Optional[float] = None
+    ) -> Optional[ConcessionCurve]:
+        """
+        Returns the valuation curve, with its limit kept between the negotiator's own opening and the counterparty's opening valuation: it concedes at most to their midpoint, so it never ends up weaker than accepting the counterparty's opening.
+
+        Args:
+            reference_valuation (float): Valuation the valuation curve is relative to.
+            opening_valuation (Optional[float], optional): First valuation the counterparty proposed. Defaults to None (the limit is not bounded).
+
+        Returns:
+            returns (Optional[ConcessionCurve]): The curve (as multiples of the reference valuation), or None if the negotiator has no valuation curve.
+        """
+        curve = self.curves.get("valuation")
+        if curve is None or opening_valuation is None:
+            return curve
+        opening = opening_valuation / reference_valuation
+        midpoint = (curve.start + opening) / 2
+        # Only a counterparty opening on the side the negotiator concedes towards bounds the limit
+        if curve.limit < curve.start and opening < curve.start:
+            limit = max(curve.limit, midpoint)
+        elif curve.limit > curve.start and opening > curve.start:
+            limit = min(curve.limit, midpoint)
+        else:
+            return curve
+        return ConcessionCurve(curve.start, limit, curve.beta)
+
+    def respond(
+        self,
+        messages: Optional[list[dict]],
+        negotiation_history: list[dict[str, str]],
+        term_sheet: dict[str, Any],
+        additional_instructions: list[str],
+        events: EventEmitter,
+        call_info: dict[str, Any],
+    ) -> tuple[str, str, str]:
+        turn_index = sum(1 for turn in negotiation_history if turn["role"] == self.role)
+        on_table = normalize_term_sheet(term_sheet)
+        opening_valuation = self._opening_valuation(negotiation_history)
+        reference_valuation = (
+            self.reference_valuation or opening_valuation or DEFAULT_REFERENCE_VALUATION
+        )
+
+        next_offer = self.offer(turn_index, reference_valuation, opening_valuation)
+        offer_utility = self.utility(next_offer, reference_valuation, opening_valuation)
+
+        # A valuation quoted only as a revenue multiple cannot be priced, so it is countered
+        unpriced = "valuation_multiple" in on_table and "valuation" not in on_table
+
+        # Terms missing from the table count as the negotiator's own next offer
+        table_utility = (
+            self.utility(
+                {**next_offer, **on_table}, reference_valuation, opening_valuation
+            )
+            if negotiation_history and on_table and not unpriced
+            else None
+        )
+        closing = any(
+            instruction in additional_instructions
+            for instruction in CLOSING_INSTRUCTIONS
+        )
+
+        if table_utility is not None and (
+            table_utility >= offer_utility or (closing and table_utility >= 0)
+        ):
+            reasoning = f"Terms on the table have utility {table_utility:.2f} (next own offer {offer_utility:.2f}); accepting."
+            response = (
+                "We accept the terms currently on the table.\n\n"
+                f"```json\n{json.dumps(term_sheet, indent=2)}\n```\n\n"
+                "Company Negotiation State: complete"
+            )
+            return response, reasoning, ""
+
+        reasoning = f"Turn {turn_index + 1} of {self.num_turns} on the concession curves; " + (
+            f"terms on the table have utility {table_utility:.2f} below the next own offer ({offer_utility:.2f})."
+            if table_utility is not None
+            else (
+                "the valuation on the table is a revenue multiple; countering with an amount."
+                if unpriced
+                else "opening offer."
+            )
+        )
+        offered_terms = self._format_terms(next_offer)
+        response = (
+            "Our final position is " if closing else "We propose "
+        ) + self._describe_terms(
+            offered_terms
+        ) + f"\n\n```json\n{json.dumps(offered_terms, indent=2)}\n```\n\n" "Company Negotiation State: pending"
+        return response, reasoning, ""
+
+    def _describe_terms(self, term_sheet: dict[str, str]) -> str:
+        """
+        States the offered terms in prose, so consecutive offers read differently (the repetition detector compares the prose).
+        """
+        parts = []
+        if "valuation" in term_sheet:
+            parts.append(f"a valuation of {term_sheet['valuation']}")
+        if "payment_structure" in term_sheet:
+            parts.append(f"payment as {term_sheet['payment_structure']}")
+        if "earn_out" in term_sheet:
+            parts.append(f"an earn-out of {term_sheet['earn_out']}")
+        if "due_diligence_timeline" in term_sheet:
+            parts.append(
+                f"a due diligence period of {term_sheet['due_diligence_timeline']}"
+            )
+        return ", ".join(parts) + "."
+
+    def _opening_valuation(
+        self, negotiation_history: list[dict[str, str]]
+    ) -> Optional[float]:
+        """
+        Returns the first money valuation the counterparty proposed, which bounds the valuation limit and anchors the valuation curve when no reference valuation is known. Revenue multiples are skipped, as they cannot be turned into an amount without the revenue.
+        """
+        for turn in negotiation_history:
+            if turn["role"] == self.role:
+                continue
+            match = TERM_SHEET_PATTERN.search(turn["message"])
+            if not match:
+                continue
+            # Normalized term sheets keep multiples under `valuation_multiple`
+            try:
+                valuation = normalize_term_sheet(json.loads(match.group(1))).get(
+                    "valuation"
+                )
+            except (json.JSONDecodeError, AttributeError):
+                continue
+            if valuation:
+                return valuation
+        return None
+
+    def _format_terms(self, terms: dict[str, float]) -> dict[str, str]:
+        """
+        Writes normalized terms as a term sheet in the wording `normalize_term_sheet` parses.
+        """
+        term_sheet = {}
+        if "valuation" in terms:
+            term_sheet["valuation"] = f"${terms['valuation'] / 1e6:,.1f} million"
+        if "cash_share" in terms:
+            cash = round(terms["cash_share"] * 100)
+            term_sheet["payment_structure"] = f"{cash}% cash, {100 - cash}% stock"
+        if "earn_out_share" in terms:
+            term_sheet["earn_out"] = (
+                f"{terms['earn_out_share'] * 100:.0f}% of the purchase price"
+            )
+        if "diligence_weeks" in terms:
+            term_sheet["due_diligence_timeline"] = (
+                f"{terms['diligence_weeks']:.0f} weeks"
+            )
+        return term_sheet
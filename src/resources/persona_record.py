@@ -0,0 +1,183 @@
+import functools
+import json
+from collections.abc import Mapping, Sequence
+from typing import Any, Iterator, Optional
+
+from resources.business_persona import PERSONA_FIELDS
+
+# Keys stored eagerly next to the generated fields
+PERSONA_KEYS = ("role_in_acquisition", "country_based")
+
+
+@functools.lru_cache(maxsize=16)
+def _read_details(filepath: str, side: str) -> dict[str, tuple[str, str]]:
+    """
+    Reads the reasoning and query of every field of one persona from its file. The few most recently read personas are cached.
+
+    Args:
+        filepath (str): Persona file.
+        side (str): 'acquirer' or 'target'.
+
+    Returns:
+        returns (dict[str, tuple[str, str]]): Field names mapped to (reasoning, query).
+    """
+    with open(filepath, "r") as f:
+        persona = json.load(f).get(side) or {}
+    details = {}
+    for field in PERSONA_FIELDS:
+        value = persona.get(field)
+        if isinstance(value, (list, tuple)) and len(value) >= 3:
+            details[field] = (value[1], value[2])
+        else:
+            details[field] = ("", "")
+    return details
+
+
+class PersonaField(Sequence):
+    """
+    A persona field as the `(response, reasoning, query)` sequence consumers expect. The response is held in memory; the reasoning and query are read from the persona file only when indexed.
+    """
+
+    __slots__ = ("record", "field")
+
+    def __init__(self, record: "PersonaRecord", field: str):
+        self.record = record
+        self.field = field
+
+    def __len__(self) -> int:
+        return 3
+
+    def __getitem__(self, index):
+        response = self.record.responses[PERSONA_FIELDS.index(self.field)]
+        if index == 0 or index == -3:
+            return response
+        return (response, *self.record.details(self.field))[index]
+
+    def __repr__(self) -> str:
+        return f"PersonaField({self.field!r}, {self[0][:40]!r}...)"
+
+
+class PersonaRecord(Mapping):
+    """
+    Compact, read-only persona compatible with the persona dictionaries of `BusinessPersona` (`persona["business_descr"][0]`, `persona.get("country_based")`, ...).
+
+    Only the role, country and the response of every field are kept in memory. The much longer reasoning and query strings stay in the persona file and are read when a field is indexed past its response, so persona pools hold many more personas.
+    """
+
+    __slots__ = (
+        "role_in_acquisition",
+        "country_based",
+        "responses",
+        "extra",
+        "filepath",
+        "side",
+        "_details",
+    )
+
+    def __init__(
+        self,
+        persona: dict[str, Any],
+        filepath: Optional[str] = None,
+        side: Optional[str] = None,
+    ):
+        """
+        Args:
+            persona (dict[str, Any]): Persona dictionary as generated or loaded from a file.
+            filepath (Optional[str], optional): Persona file the persona was loaded from. If given, reasoning and queries are dropped and read from it on access. Defaults to None (they are kept in memory).
+            side (Optional[str], optional): 'acquirer' or 'target', the persona's key in the file. Defaults to None.
+        """
+        self.role_in_acquisition = persona.get("role_in_acquisition")
+        self.country_based = persona.get("country_based")
+        self.filepath = filepath
+        self.side = side
+
+        responses = []
+        details = {}
+        for field in PERSONA_FIELDS:
+            value = persona.get(field)
+            if isinstance(value, (list, tuple)):
+                responses.append(value[0] if value else "")
+                details[field] = (value[1], value[2]) if len(value) >= 3 else ("", "")
+            else:
+                responses.append(value)
+                details[field] = ("", "")
+        self.responses = tuple(responses)
+        self._details = None if filepath is not None else details
+
+        # Keys added by newer generators (e.g., generation_mode) are kept as they are
+        self.extra = {
+            key: value
+            for key, value in persona.items()
+            if key not in PERSONA_KEYS and key not in PERSONA_FIELDS
+        } or None
+
+    @classmethod
+    def load_pair(
+        cls, filepath: str
+    ) -> tuple[Optional["PersonaRecord"], Optional["PersonaRecord"]]:
+        """
+        Loads the acquirer and target personas of a persona file as compact records.
+
+        Args:
+            filepath (str): Persona file.
+
+        Returns:
+            returns (tuple[Optional[PersonaRecord], Optional[PersonaRecord]]): The acquirer and target records (None for a missing side).
+        """
+        with open(filepath, "r") as f:
+            data = json.load(f)
+        return tuple(
+            cls(data[side], filepath, side) if data.get(side) else None
+            for side in ("acquirer", "target")
+        )
+
+    def details(self, field: str) -> tuple[str, str]:
+        """
+        Returns the reasoning and query of a field, reading them from the persona file if needed.
+
+        Args:
+            field (str): One of PERSONA_FIELDS.
+
+        Returns:
+            returns (tuple[str, str]): The field's reasoning and query.
+        """
+        if self._details is not None:
+            return self._details[field]
+        return _read_details(self.filepath, self.side)[field]
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Materializes the full persona dictionary (as saved in persona files), including reasoning and queries.
+
+        Returns:
+            returns (dict[str, Any]): The persona.
+        """
+        return {
+            key: list(value) if isinstance(value, PersonaField) else value
+            for key, value in self.items()
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        if key in PERSONA_KEYS:
+            return getattr(self, key)
+        if key in PERSONA_FIELDS:
+            if self.responses[PERSONA_FIELDS.index(key)] is None:
+                raise KeyError(key)
+            return PersonaField(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from PERSONA_KEYS
+        for field, response in zip(PERSONA_FIELDS, self.responses):
+            if response is not None:
+                yield field
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"PersonaRecord({self.role_in_acquisition!r}, {self.country_based!r}, {self.filepath!r})"
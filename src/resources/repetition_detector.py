@@ -0,0 +1,151 @@
+import random
+import re
+import zlib
+from collections import deque
+from typing import Optional
+
+# Mersenne prime used as the modulus of the MinHash permutations
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+class RepetitionDetector:
+    """
+    An incremental MinHash detector that flags negotiation loops, i.e., turns in which a party restates a near-identical position to one of its own recent messages.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        shingle_size: int = 3,
+        threshold: float = 0.8,
+        history_size: int = 3,
+        patience: int = 2,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            num_perm (int, optional): Number of hash permutations in each MinHash signature. Defaults to 64.
+            shingle_size (int, optional): Number of consecutive words per shingle. Defaults to 3.
+            threshold (float, optional): Estimated Jaccard similarity at or above which a message counts as a repeat. Defaults to 0.8.
+            history_size (int, optional): Number of each party's recent messages a new message is compared against. Defaults to 3.
+            patience (int, optional): Number of consecutive repeated turns (across both parties) that constitutes a stalled loop. Defaults to 2.
+            seed (int, optional): Seed for the hash permutations. Defaults to 1.
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.history_size = history_size
+        self.patience = patience
+
+        # Random affine permutations (a * x + b) mod p, one per signature slot
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+        # Recent signatures per role and count of consecutive repeated turns
+        self.signatures: dict[str, deque] = {}
+        self.repeated_turns = 0
+
+    def _shingles(self, text: str) -> set[int]:
+        """
+        Splits a negotiation message into hashed word shingles, ignoring the term sheet JSON and the negotiation state line.
+
+        Args:
+            text (str): The negotiation message.
+
+        Returns:
+            returns (set[int]): The set of 32-bit shingle hashes.
+        """
+        # Remove term sheet JSON and state line so only the prose is compared
+        text = re.sub(r"```json.*?```", " ", text, flags=re.DOTALL)
+        text = re.sub(r"negotiation\s+state.*", " ", text, flags=re.IGNORECASE)
+        words = re.findall(r"[a-z0-9$%.]+", text.lower())
+
+        # Short messages are treated as a single shingle
+        if len(words) < self.shingle_size:
+            return {zlib.crc32(" ".join(words).encode())} if words else set()
+
+        return {
+            zlib.crc32(" ".join(words[i : i + self.shingle_size]).encode())
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> Optional[tuple[int, ...]]:
+        """
+        Computes the MinHash signature of a message.
+
+        Args:
+            text (str): The negotiation message.
+
+        Returns:
+            returns (Optional[tuple[int, ...]]): The signature, or None if the message contains no words.
+        """
+        shingles = self._shingles(text)
+        if not shingles:
+            return None
+        return tuple(
+            min((a * shingle + b) % MERSENNE_PRIME for shingle in shingles)
+            for a, b in self.permutations
+        )
+
+    @staticmethod
+    def similarity(signature_a: tuple[int, ...], signature_b: tuple[int, ...]) -> float:
+        """
+        Estimates the Jaccard similarity of two messages from their MinHash signatures.
+
+        Args:
+            signature_a (tuple[int, ...]): Signature of the first message.
+            signature_b (tuple[int, ...]): Signature of the second message.
+
+        Returns:
+            returns (float): Fraction of matching signature slots in [0, 1].
+        """
+        matches = sum(a == b for a, b in zip(signature_a, signature_b))
+        return matches / len(signature_a)
+
+    def update(self, role: str, message: str) -> float:
+        """
+        Records a party's new message and compares it against that party's recent messages.
+
+        Args:
+            role (str): The party's role in the acquisition.
+            message (str): The party's negotiation message.
+
+        Returns:
+            returns (float): The highest estimated similarity to one of the party's recent messages (0.0 if none).
+        """
+        signature = self.signature(message)
+        recent = self.signatures.setdefault(role, deque(maxlen=self.history_size))
+
+        # Compare against the party's own recent messages only
+        max_similarity = 0.0
+        if signature is not None:
+            max_similarity = max(
+                (self.similarity(signature, previous) for previous in recent),
+                default=0.0,
+            )
+            recent.append(signature)
+
+        # Track consecutive repeated turns across both parties
+        if max_similarity >= self.threshold:
+            self.repeated_turns += 1
+        else:
+            self.repeated_turns = 0
+        return max_similarity
+
+    def is_stalled(self) -> bool:
+        """
+        Checks whether the last `patience` turns were all repeats.
+
+        Returns:
+            returns (bool): True if the negotiation is stuck in a loop.
+        """
+        return self.repeated_turns >= self.patience
+
+    def reset(self) -> None:
+        """
+        Clears the consecutive repeat count (e.g., after a deadlock-breaking instruction was injected).
+        """
+        self.repeated_turns = 0
@@ -0,0 +1,641 @@
+import json
+import math
+import os
+import pickle
+import re
+from array import array
+from collections import Counter
+from typing import Any, Optional, Union
+
+import numpy as np
+
+from utilities.tracing_utilities import traced
+
+# Persona fields that are indexed (response text only)
+PERSONA_FIELDS = (
+    "business_descr",
+    "cultural_profile",
+    "authority_dynamics",
+    "financial_info",
+    "unspoken_interests",
+)
+
+# Negotiation log fields that are indexed
+NEGOTIATION_FIELDS = ("message", "reasoning")
+
+# Frequent words that carry no meaning for search and only bloat the posting lists
+STOPWORDS = frozenset(
+    """a an and are as at be but by for from has have in is it its of on or our
+    that the their this to was we were will with""".split()
+)
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Share of dead documents (of re-indexed or deleted files) at which the index is compacted
+COMPACT_FRACTION = 0.25
+
+# Layout version of saved indexes; indexes saved with another version are rebuilt
+INDEX_FORMAT_VERSION = 2
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits text into lowercase alphanumeric search terms, dropping stopwords.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        returns (list[str]): The text's terms in order.
+    """
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS
+    ]
+
+
+def _name_key(company_name: str) -> str:
+    """
+    Normalizes a company name to its first two words, which is how names are matched against transcripts (e.g., "GreenPak Solutions Pte. Ltd." and "GreenPak Solutions Pte Ltd" share the key "greenpak solutions").
+    """
+    return " ".join(TOKEN_PATTERN.findall(company_name.lower())[:2])
+
+
+def _extract_company_name(description: str) -> str:
+    """
+    Extracts the company name from a business description (same rule as the negotiation session).
+    """
+    cleaned = re.sub(r"\*\*([^*]+)\*\*", r"\1", description).strip()
+    match = re.match(
+        r"^(.+?)\s*(?:(?:is a)|(?:, based)|(?:headquartered))",
+        cleaned,
+        flags=re.IGNORECASE,
+    )
+    return match.group(1).strip() if match else cleaned.split(".")[0].strip()
+
+
+class SearchIndex:
+    """
+    An incrementally maintained inverted index over negotiation messages, reasoning and persona fields, with BM25 ranking and filters for field, role, country and turn.
+
+    Every indexed text (one field of one turn, or one persona field) is a document. Document metadata is kept in parallel compact arrays and each term maps to a posting list of document IDs and term frequencies, so a query only touches the posting lists of its own terms. Documents of re-indexed or deleted files are marked dead and skipped; once they make up `COMPACT_FRACTION` of the index, it is compacted.
+    """
+
+    def __init__(self):
+        self.format = INDEX_FORMAT_VERSION
+
+        # Indexed source files: path -> (session ID, modification time)
+        self.sources: dict[str, tuple[int, float]] = {}
+        self.session_paths: list[str] = []
+
+        # First document ID of each session (a session's documents are contiguous)
+        self.session_start = array("I")
+
+        # Interned metadata values (documents store indexes into these lists)
+        self.fields: list[str] = list(NEGOTIATION_FIELDS + PERSONA_FIELDS)
+        self.roles: list[str] = []
+        self.countries: list[str] = []
+
+        # Per-document metadata (parallel arrays indexed by document ID)
+        self.doc_session = array("I")
+        self.doc_field = array("B")
+        self.doc_role = array("H")
+        self.doc_country = array("H")
+        self.doc_turn = array("i")
+        self.doc_length = array("I")
+        self.doc_live = array("B")
+
+        # Count and total length of live documents, and count of dead ones
+        self.num_docs = 0
+        self.total_length = 0
+        self.num_dead_docs = 0
+
+        # Posting lists: term -> (document IDs, term frequencies)
+        self.postings: dict[str, tuple[array, array]] = {}
+
+        # Company name keys of indexed persona pairs by file, used to link transcripts to countries
+        self.persona_pairs: dict[str, tuple[str, str, str, str]] = {}
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    def _intern(self, values: list[str], value: Optional[str]) -> int:
+        """
+        Returns the index of `value` in `values`, appending it if new. Index 0 is reserved for 'unknown'.
+        """
+        if not value:
+            return 0
+        value = value.lower()
+        try:
+            return values.index(value) + 1
+        except ValueError:
+            values.append(value)
+            return len(values)
+
+    def _add_document(
+        self,
+        session_id: int,
+        field_name: str,
+        role: Optional[str],
+        country: Optional[str],
+        turn: int,
+        text: str,
+    ) -> None:
+        """
+        Adds one text to the index.
+
+        Args:
+            session_id (int): ID of the source file.
+            field_name (str): Indexed field (e.g., 'message' or 'cultural_profile').
+            role (Optional[str]): 'acquirer', 'target' or None.
+            country (Optional[str]): Country of the speaking/described company, if known.
+            turn (int): 1-based turn number in the negotiation (0 for persona fields).
+            text (str): The text to index.
+        """
+        terms = tokenize(text or "")
+        if not terms:
+            return
+
+        doc_id = len(self.doc_length)
+        self.doc_session.append(session_id)
+        self.doc_field.append(self.fields.index(field_name))
+        self.doc_role.append(self._intern(self.roles, role))
+        self.doc_country.append(self._intern(self.countries, country))
+        self.doc_turn.append(turn)
+        self.doc_length.append(len(terms))
+        self.doc_live.append(1)
+        self.num_docs += 1
+        self.total_length += len(terms)
+
+        for term, frequency in Counter(terms).items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = (array("I"), array("H"))
+            posting[0].append(doc_id)
+            posting[1].append(min(frequency, 65535))
+
+    def _register_source(self, filepath: str) -> Optional[int]:
+        """
+        Registers a source file and returns its session ID, or None if it is already indexed and unchanged. Changed files are re-indexed and their old documents dropped.
+        """
+        mtime = os.path.getmtime(filepath)
+        previous = self.sources.get(filepath)
+        if previous is not None:
+            if previous[1] == mtime:
+                return None
+            self._remove_source(filepath)
+
+        session_id = len(self.session_paths)
+        self.session_paths.append(filepath)
+        self.session_start.append(len(self.doc_length))
+        self.sources[filepath] = (session_id, mtime)
+        return session_id
+
+    def _remove_source(self, filepath: str) -> None:
+        """
+        Drops an indexed source file: its documents are marked dead, and the index is compacted once dead documents reach `COMPACT_FRACTION`.
+        """
+        session_id, _ = self.sources.pop(filepath)
+        self.persona_pairs.pop(filepath, None)
+
+        start = self.session_start[session_id]
+        end = (
+            self.session_start[session_id + 1]
+            if session_id + 1 < len(self.session_start)
+            else len(self.doc_length)
+        )
+        self.doc_live[start:end] = array("B", bytes(end - start))
+        self.num_docs -= end - start
+        self.total_length -= sum(self.doc_length[start:end])
+        self.num_dead_docs += end - start
+
+        if self.num_dead_docs >= COMPACT_FRACTION * len(self.doc_length):
+            self._compact()
+
+    @traced("search.compact", "search")
+    def _compact(self) -> None:
+        """
+        Rebuilds the metadata arrays and posting lists without dead documents, and renumbers the remaining documents and sessions.
+        """
+        live = np.frombuffer(self.doc_live, dtype=np.uint8).astype(bool)
+        new_doc_ids = np.cumsum(live) - 1
+        live_before = np.concatenate([[0], np.cumsum(live)])
+
+        # Keep the sessions of registered files (including ones without documents)
+        live_sessions = np.array(
+            sorted(session_id for session_id, _ in self.sources.values()),
+            dtype=np.int64,
+        )
+        new_session_ids = np.zeros(len(self.session_paths), dtype=np.uint32)
+        new_session_ids[live_sessions] = np.arange(len(live_sessions))
+        self.session_paths = [self.session_paths[i] for i in live_sessions]
+        starts = np.frombuffer(self.session_start, dtype=np.uint32)[live_sessions]
+        self.session_start = array("I", live_before[starts].astype(np.uint32).tobytes())
+        self.sources = {
+            path: (int(new_session_ids[session_id]), mtime)
+            for path, (session_id, mtime) in self.sources.items()
+        }
+
+        # Metadata arrays keep only live documents
+        for name in ("doc_field", "doc_role", "doc_country", "doc_turn", "doc_length"):
+            values = getattr(self, name)
+            kept = np.frombuffer(values, dtype=values.typecode)[live]
+            setattr(self, name, array(values.typecode, kept.tobytes()))
+        sessions = np.frombuffer(self.doc_session, dtype=np.uint32)[live]
+        self.doc_session = array("I", new_session_ids[sessions].tobytes())
+        self.doc_live = array("B", b"\x01" * int(live.sum()))
+        self.num_dead_docs = 0
+
+        # Posting lists keep only live documents, under their new IDs
+        for term, (doc_ids, frequencies) in list(self.postings.items()):
+            doc_ids = np.frombuffer(doc_ids, dtype=np.uint32)
+            keep = live[doc_ids]
+            if not keep.any():
+                del self.postings[term]
+                continue
+            self.postings[term] = (
+                array("I", new_doc_ids[doc_ids[keep]].astype(np.uint32).tobytes()),
+                array("H", np.frombuffer(frequencies, dtype=np.uint16)[keep].tobytes()),
+            )
+
+    def add_personas_file(self, filepath: str) -> bool:
+        """
+        Indexes the persona fields of a persona file.
+
+        Args:
+            filepath (str): Persona JSON file with "acquirer" and "target" entries.
+
+        Returns:
+            returns (bool): True if the file was (re-)indexed, False if it was already up to date.
+        """
+        session_id = self._register_source(filepath)
+        if session_id is None:
+            return False
+
+        with open(filepath, "r") as f:
+            data = json.load(f)
+
+        for role in ("acquirer", "target"):
+            persona = data.get(role) or {}
+            for field_name in PERSONA_FIELDS:
+                value = persona.get(field_name)
+                if isinstance(value, list):
+                    value = value[0] if value else ""
+                self._add_document(
+                    session_id,
+                    field_name,
+                    role,
+                    persona.get("country_based"),
+                    0,
+                    value or "",
+                )
+
+        # Remember company names so transcripts can be linked to countries
+        acquirer, target = data.get("acquirer") or {}, data.get("target") or {}
+        if acquirer.get("business_descr") and target.get("business_descr"):
+            self.persona_pairs[filepath] = (
+                _name_key(_extract_company_name(acquirer["business_descr"][0])),
+                _name_key(_extract_company_name(target["business_descr"][0])),
+                acquirer.get("country_based", ""),
+                target.get("country_based", ""),
+            )
+        return True
+
+    def add_negotiation_file(self, filepath: str) -> bool:
+        """
+        Indexes the messages and reasoning of a negotiation log. If both company names of an indexed persona pair appear in the opening turns, each turn is tagged with the speaking company's country.
+
+        Args:
+            filepath (str): Negotiation log JSON file.
+
+        Returns:
+            returns (bool): True if the file was (re-)indexed, False if it was already up to date.
+        """
+        session_id = self._register_source(filepath)
+        if session_id is None:
+            return False
+
+        with open(filepath, "r") as f:
+            negotiation_log = json.load(f)
+
+        countries = self._link_countries(negotiation_log)
+        for turn, entry in enumerate(negotiation_log, start=1):
+            role = entry.get("role")
+            for field_name in NEGOTIATION_FIELDS:
+                self._add_document(
+                    session_id,
+                    field_name,
+                    role,
+                    countries.get(role),
+                    turn,
+                    entry.get(field_name) or "",
+                )
+        return True
+
+    def _link_countries(self, negotiation_log: list[dict[str, Any]]) -> dict[str, str]:
+        """
+        Finds the persona pair a negotiation was run with by matching company names in its opening turns.
+
+        Args:
+            negotiation_log (list[dict[str, Any]]): The negotiation log.
+
+        Returns:
+            returns (dict[str, str]): Country per role, or an empty dict if no pair matched.
+        """
+        opening = " ".join(
+            TOKEN_PATTERN.findall(
+                " ".join(
+                    entry.get("message") or "" for entry in negotiation_log[:2]
+                ).lower()
+            )
+        )
+        for acquirer_key, target_key, acquirer_country, target_country in reversed(
+            self.persona_pairs.values()
+        ):
+            if (
+                acquirer_key
+                and target_key
+                and acquirer_key in opening
+                and target_key in opening
+            ):
+                return {"acquirer": acquirer_country, "target": target_country}
+        return {}
+
+    @traced("search.update", "search")
+    def update(
+        self,
+        histories_folder: str = "negotiation_histories",
+        personas_folder: str = "generated_personas",
+    ) -> int:
+        """
+        Indexes every new or changed file of the persona and negotiation history folders, and drops indexed files that no longer exist. Personas are indexed first, so new transcripts can be linked to their countries.
+
+        Args:
+            histories_folder (str, optional): Folder with negotiation log JSON files. Defaults to "negotiation_histories".
+            personas_folder (str, optional): Folder with persona JSON files. Defaults to "generated_personas".
+
+        Returns:
+            returns (int): Number of files (re-)indexed or dropped.
+        """
+        num_indexed = 0
+        for folder, add_file in (
+            (personas_folder, self.add_personas_file),
+            (histories_folder, self.add_negotiation_file),
+        ):
+            if not os.path.isdir(folder):
+                continue
+            for filename in sorted(os.listdir(folder)):
+                if filename.endswith(".json"):
+                    num_indexed += add_file(os.path.join(folder, filename))
+
+        # Drop files that were deleted since they were indexed
+        for filepath in [path for path in self.sources if not os.path.exists(path)]:
+            self._remove_source(filepath)
+            num_indexed += 1
+        return num_indexed
+
+    def _filter_mask(
+        self,
+        doc_ids: np.ndarray,
+        field_ids: Optional[list[int]],
+        role_id: Optional[int],
+        country_id: Optional[int],
+        turn: Optional[tuple[int, int]],
+    ) -> np.ndarray:
+        """
+        Returns a boolean mask of the documents that pass the search filters.
+        """
+        mask = np.ones(len(doc_ids), dtype=bool)
+        if self.num_dead_docs:
+            mask &= np.frombuffer(self.doc_live, dtype=np.uint8)[doc_ids].astype(bool)
+        if field_ids is not None:
+            mask &= np.isin(
+                np.frombuffer(self.doc_field, dtype=np.uint8)[doc_ids], field_ids
+            )
+        if role_id is not None:
+            mask &= np.frombuffer(self.doc_role, dtype=np.uint16)[doc_ids] == role_id
+        if country_id is not None:
+            mask &= (
+                np.frombuffer(self.doc_country, dtype=np.uint16)[doc_ids] == country_id
+            )
+        if turn is not None:
+            turns = np.frombuffer(self.doc_turn, dtype=np.int32)[doc_ids]
+            mask &= (turns >= turn[0]) & (turns <= turn[1])
+        return mask
+
+    @traced("search.query", "search")
+    def search(
+        self,
+        query: str,
+        fields: Optional[list[str]] = None,
+        role: Optional[str] = None,
+        country: Optional[str] = None,
+        turn: Optional[Union[int, tuple[int, int]]] = None,
+        match_all: bool = True,
+        limit: int = 10,
+    ) -> list[dict[str, Any]]:
+        """
+        Returns the indexed texts that best match a query, ranked by BM25. Posting lists and document metadata are scored as zero-copy NumPy views, so common terms stay fast on large corpora.
+
+        Args:
+            query (str): Free-text query (e.g., "IP retention").
+            fields (Optional[list[str]], optional): Only search these fields (e.g., ["message"] or ["authority_dynamics"]). Defaults to all fields.
+            role (Optional[str], optional): Only search texts of 'acquirer' or 'target'. Defaults to None.
+            country (Optional[str], optional): Only search texts of companies based in this country. Defaults to None.
+            turn (Optional[Union[int, tuple[int, int]]], optional): Only search this negotiation turn or inclusive turn range. Defaults to None.
+            match_all (bool, optional): If True, every query term must appear in a result; otherwise any term suffices. Defaults to True.
+            limit (int, optional): Maximum number of results. Defaults to 10.
+
+        Returns:
+            returns (list[dict[str, Any]]): Results with `score`, `path`, `field`, `role`, `country` and `turn`.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not len(self):
+            return []
+
+        # Resolve filters to interned IDs (unknown values cannot match anything)
+        field_ids = (
+            [self.fields.index(f) for f in fields if f in self.fields]
+            if fields is not None
+            else None
+        )
+        role_id = country_id = None
+        if role is not None:
+            if role.lower() not in self.roles:
+                return []
+            role_id = self.roles.index(role.lower()) + 1
+        if country is not None:
+            if country.lower() not in self.countries:
+                return []
+            country_id = self.countries.index(country.lower()) + 1
+        if isinstance(turn, int):
+            turn = (turn, turn)
+
+        postings = [self.postings.get(term) for term in terms]
+        if match_all and any(posting is None for posting in postings):
+            return []
+        postings = [
+            (
+                np.frombuffer(doc_ids, dtype=np.uint32),
+                np.frombuffer(frequencies, dtype=np.uint16),
+            )
+            for doc_ids, frequencies in (p for p in postings if p is not None)
+        ]
+        if not postings:
+            return []
+
+        # Document frequencies count live documents only
+        live = np.frombuffer(self.doc_live, dtype=np.uint8)
+        postings = [
+            (
+                doc_ids,
+                frequencies,
+                (
+                    int(np.count_nonzero(live[doc_ids]))
+                    if self.num_dead_docs
+                    else len(doc_ids)
+                ),
+            )
+            for doc_ids, frequencies in postings
+        ]
+
+        # BM25 weight of each term and document length normalization
+        num_docs = self.num_docs
+        doc_lengths = np.frombuffer(self.doc_length, dtype=np.uint32)
+        average_length = self.total_length / num_docs
+
+        def term_scores(
+            doc_ids: np.ndarray, frequencies: np.ndarray, document_frequency: int
+        ) -> np.ndarray:
+            idf = math.log(
+                1 + (num_docs - document_frequency + 0.5) / (document_frequency + 0.5)
+            )
+            length_norm = BM25_K1 * (
+                1 - BM25_B + BM25_B * doc_lengths[doc_ids] / average_length
+            )
+            frequencies = frequencies.astype(np.float64)
+            return idf * frequencies * (BM25_K1 + 1) / (frequencies + length_norm)
+
+        if match_all:
+            # Candidates must occur in every posting list (intersected rarest first)
+            postings.sort(key=lambda posting: len(posting[0]))
+            candidates = postings[0][0]
+            for doc_ids, _, _ in postings[1:]:
+                candidates = np.intersect1d(candidates, doc_ids, assume_unique=True)
+            candidates = candidates[
+                self._filter_mask(candidates, field_ids, role_id, country_id, turn)
+            ]
+            scores = np.zeros(len(candidates))
+            for doc_ids, frequencies, document_frequency in postings:
+                # Posting lists are sorted by document ID, so lookups are binary searches
+                positions = np.searchsorted(doc_ids, candidates)
+                scores += term_scores(
+                    candidates, frequencies[positions], document_frequency
+                )
+        else:
+            all_ids = np.concatenate([doc_ids for doc_ids, _, _ in postings])
+            all_scores = np.concatenate(
+                [
+                    term_scores(doc_ids, frequencies, document_frequency)
+                    for doc_ids, frequencies, document_frequency in postings
+                ]
+            )
+            candidates, inverse = np.unique(all_ids, return_inverse=True)
+            scores = np.bincount(inverse, weights=all_scores)
+            mask = self._filter_mask(candidates, field_ids, role_id, country_id, turn)
+            candidates, scores = candidates[mask], scores[mask]
+
+        # Partial sort: only the top results are ordered
+        if len(scores) > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self._describe(int(candidates[i]), float(scores[i])) for i in top]
+
+    def _describe(self, doc_id: int, score: float) -> dict[str, Any]:
+        """
+        Builds the result entry of a document.
+        """
+        role_id, country_id = self.doc_role[doc_id], self.doc_country[doc_id]
+        return {
+            "score": round(score, 4),
+            "path": self.session_paths[self.doc_session[doc_id]],
+            "field": self.fields[self.doc_field[doc_id]],
+            "role": self.roles[role_id - 1] if role_id else None,
+            "country": self.countries[country_id - 1] if country_id else None,
+            "turn": self.doc_turn[doc_id] or None,
+        }
+
+    def snippet(self, result: dict[str, Any], query: str, width: int = 160) -> str:
+        """
+        Reads a result's text from its source file and returns the passage around the first query term.
+
+        Args:
+            result (dict[str, Any]): A search result.
+            query (str): The query the result was found with.
+            width (int, optional): Approximate snippet length in characters. Defaults to 160.
+
+        Returns:
+            returns (str): The snippet (empty if the source file is gone).
+        """
+        try:
+            with open(result["path"], "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return ""
+
+        if result["turn"]:
+            text = data[result["turn"] - 1].get(result["field"]) or ""
+        else:
+            text = data[result["role"]][result["field"]]
+            text = text[0] if isinstance(text, list) else text
+
+        lowered = text.lower()
+        positions = [lowered.find(term) for term in tokenize(query)]
+        positions = [position for position in positions if position != -1]
+        start = max(0, min(positions, default=0) - width // 4)
+        return " ".join(text[start : start + width].split())
+
+    @traced("search.save", "search")
+    def save(self, filepath: str = "search_index.pkl") -> str:
+        """
+        Saves the index atomically (written to a temporary file, then renamed).
+
+        Args:
+            filepath (str, optional): Destination file. Defaults to "search_index.pkl".
+
+        Returns:
+            returns (str): The path of the saved index.
+        """
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{filepath}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, filepath)
+        return filepath
+
+    @classmethod
+    @traced("search.load", "search")
+    def load(cls, filepath: str = "search_index.pkl") -> "SearchIndex":
+        """
+        Loads a saved index, or returns an empty index if the file does not exist or was saved in another layout (the next `update` rebuilds it).
+
+        Args:
+            filepath (str, optional): Saved index file. Defaults to "search_index.pkl".
+
+        Returns:
+            returns (SearchIndex): The loaded index.
+        """
+        index = cls()
+        if os.path.exists(filepath):
+            with open(filepath, "rb") as f:
+                state = pickle.load(f)
+            if state.get("format") == INDEX_FORMAT_VERSION:
+                index.__dict__.update(state)
+        return index
@@ -0,0 +1,365 @@
+import contextlib
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+# Characters per token of the local estimate used when the provider reports no usage
+CHARS_PER_TOKEN = 4
+
+# Usage of the LLM call running in the current context (see `usage_scope`)
+_current_usage: contextvars.ContextVar[Optional[dict[str, int]]] = (
+    contextvars.ContextVar("current_usage", default=None)
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens of a text locally (about four characters per token).
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        returns (int): Estimated number of tokens.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def report_usage(prompt_tokens: int, completion_tokens: int) -> None:
+    """
+    Reports the token usage of one provider request to the enclosing `usage_scope` (no-op outside of one). Called by backends that receive usage data.
+
+    Args:
+        prompt_tokens (int): Prompt tokens billed for the request.
+        completion_tokens (int): Completion tokens billed for the request.
+    """
+    usage = _current_usage.get()
+    if usage is None:
+        return
+    usage["prompt_tokens"] += prompt_tokens or 0
+    usage["completion_tokens"] += completion_tokens or 0
+    usage["requests"] += 1
+
+
+@contextlib.contextmanager
+def usage_scope() -> Iterator[dict[str, int]]:
+    """
+    Collects the usage reported by backends while the block runs (summed over requests, e.g., a reasoning continuation or a hedged duplicate).
+
+    Returns:
+        returns (Iterator[dict[str, int]]): Dictionary filled with `prompt_tokens`, `completion_tokens` and `requests` (the number of requests that reported usage).
+    """
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0}
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+class TokenBudget:
+    """
+    Token and cost limit at one level (call, session or sweep), with the spending charged against it.
+
+    Budgets form a chain: a session budget created with `child` passes every charge on to the sweep budget it belongs to, and a session counts as over budget once either is. Sweep budgets can also reserve the limits of running sessions (`reserve`), so a scheduler launches a session only while the budget is not yet committed. With a `state_file`, spending and records survive restarts: records are saved when they are stored, spending at most every `save_interval` seconds while charging (call `save` once the work is done).
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        max_call_tokens: Optional[int] = None,
+        prompt_cost_per_million: float = 0.0,
+        completion_cost_per_million: float = 0.0,
+        state_file: Optional[str] = None,
+        parent: Optional["TokenBudget"] = None,
+        save_interval: float = 5.0,
+    ):
+        """
+        Args:
+            max_tokens (Optional[int], optional): Total tokens (prompt and completion) allowed. Defaults to None (unlimited).
+            max_cost (Optional[float], optional): Total cost allowed, in the currency of the prices. Defaults to None (unlimited).
+            max_call_tokens (Optional[int], optional): Reasoning tokens allowed per call; calls are also capped to the tokens left. Defaults to None (unlimited).
+            prompt_cost_per_million (float, optional): Price of one million prompt tokens. Defaults to 0.0.
+            completion_cost_per_million (float, optional): Price of one million completion tokens. Defaults to 0.0.
+            state_file (Optional[str], optional): JSON file the spending and records are loaded from and saved to. Defaults to None (kept in memory).
+            parent (Optional[TokenBudget], optional): Budget every charge is passed on to. Defaults to None.
+            save_interval (float, optional): Seconds between saves of the spending while charging (0 saves on every charge). Defaults to 5.0.
+        """
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.max_call_tokens = max_call_tokens
+        self.prompt_cost_per_million = prompt_cost_per_million
+        self.completion_cost_per_million = completion_cost_per_million
+        self.state_file = state_file
+        self.parent = parent
+        self.save_interval = save_interval
+
+        self.lock = threading.RLock()
+        # Serializes writes of the state file, which run outside of `lock`
+        self.save_lock = threading.Lock()
+        self.saved_at = time.monotonic()
+        self.spent_tokens = 0
+        self.spent_cost = 0.0
+        self.num_calls = 0
+
+        # Child budgets of running sessions whose unspent limits are committed
+        self.reservations: list[TokenBudget] = []
+
+        # Records persisted with the spending (e.g., finished sweep sessions by key)
+        self.records: dict[str, Any] = {}
+
+        if state_file and os.path.exists(state_file):
+            with open(state_file, "r") as f:
+                state = json.load(f)
+            self.spent_tokens = state.get("spent_tokens", 0)
+            self.spent_cost = state.get("spent_cost", 0.0)
+            self.num_calls = state.get("num_calls", 0)
+            self.records = state.get("records", {})
+
+    def child(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        max_call_tokens: Optional[int] = None,
+    ) -> "TokenBudget":
+        """
+        Creates a budget (e.g., for one session) charged against this one, with the same prices.
+
+        Args:
+            max_tokens (Optional[int], optional): Tokens allowed for the child. Defaults to None (only this budget's limit applies).
+            max_cost (Optional[float], optional): Cost allowed for the child. Defaults to None.
+            max_call_tokens (Optional[int], optional): Reasoning tokens allowed per call. Defaults to this budget's value.
+
+        Returns:
+            returns (TokenBudget): The child budget.
+        """
+        return TokenBudget(
+            max_tokens=max_tokens,
+            max_cost=max_cost,
+            max_call_tokens=max_call_tokens or self.max_call_tokens,
+            prompt_cost_per_million=self.prompt_cost_per_million,
+            completion_cost_per_million=self.completion_cost_per_million,
+            parent=self,
+        )
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """
+        Returns the cost of a call's tokens at this budget's prices.
+        """
+        return (
+            prompt_tokens * self.prompt_cost_per_million
+            + completion_tokens * self.completion_cost_per_million
+        ) / 1e6
+
+    def charge(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """
+        Charges one call to this budget and its parents.
+
+        Args:
+            prompt_tokens (int): Prompt tokens of the call.
+            completion_tokens (int): Completion tokens of the call.
+
+        Returns:
+            returns (float): Cost of the call.
+        """
+        cost = self.cost(prompt_tokens, completion_tokens)
+        budget = self
+        while budget is not None:
+            with budget.lock:
+                budget.spent_tokens += prompt_tokens + completion_tokens
+                budget.spent_cost += cost
+                budget.num_calls += 1
+                now = time.monotonic()
+                due = bool(budget.state_file) and (
+                    now - budget.saved_at >= budget.save_interval
+                )
+                if due:
+                    budget.saved_at = now
+            # Rewriting the state file on every call would serialize concurrent sessions on disk I/O
+            if due:
+                budget.save()
+            budget = budget.parent
+        return cost
+
+    def remaining(self) -> tuple[Optional[float], Optional[float]]:
+        """
+        Returns the tokens and cost left before this budget or one of its parents is used up (None if unlimited). Parents also subtract what they committed to other running sessions (see `reserve`).
+
+        Returns:
+            returns (tuple[Optional[float], Optional[float]]): Remaining tokens and remaining cost.
+        """
+        remaining_tokens, remaining_cost = None, None
+        budget, child = self, None
+        while budget is not None:
+            with budget.lock:
+                committed_tokens, committed_cost = budget._outstanding(exclude=child)
+                if budget.max_tokens is not None:
+                    left = budget.max_tokens - budget.spent_tokens - committed_tokens
+                    remaining_tokens = _min(remaining_tokens, left)
+                if budget.max_cost is not None:
+                    left = budget.max_cost - budget.spent_cost - committed_cost
+                    remaining_cost = _min(remaining_cost, left)
+            budget, child = budget.parent, budget
+        return remaining_tokens, remaining_cost
+
+    def can_afford(self, tokens: float, cost: float) -> bool:
+        """
+        Tells whether spending `tokens` and `cost` more stays within this budget and its parents.
+        """
+        remaining_tokens, remaining_cost = self.remaining()
+        return (remaining_tokens is None or tokens <= remaining_tokens) and (
+            remaining_cost is None or cost <= remaining_cost
+        )
+
+    def exhausted(self) -> bool:
+        """
+        Tells whether this budget or one of its parents is used up.
+        """
+        remaining_tokens, remaining_cost = self.remaining()
+        return (remaining_tokens is not None and remaining_tokens <= 0) or (
+            remaining_cost is not None and remaining_cost <= 0
+        )
+
+    def call_token_limit(self) -> Optional[int]:
+        """
+        Returns the reasoning tokens the next call may use: `max_call_tokens`, lowered to the tokens left in the budget chain.
+
+        Returns:
+            returns (Optional[int]): The limit, or None if unlimited.
+        """
+        remaining_tokens, _ = self.remaining()
+        limit = self.max_call_tokens
+        if remaining_tokens is not None:
+            limit = _min(limit, max(1, int(remaining_tokens)))
+        return limit
+
+    def reserve(self, child: "TokenBudget") -> bool:
+        """
+        Commits the limits of a child budget (a session about to be launched), unless this budget cannot cover them on top of what is spent and committed to running sessions. A reserved child's unspent limit counts as committed until it is released.
+
+        Args:
+            child (TokenBudget): Budget created with `child`. Unlimited dimensions reserve nothing.
+
+        Returns:
+            returns (bool): True if the reservation was made.
+        """
+        with self.lock:
+            if self.exhausted():
+                return False
+            committed_tokens, committed_cost = self._outstanding()
+            if self.max_tokens is not None and (
+                self.spent_tokens + committed_tokens + (child.max_tokens or 0)
+                > self.max_tokens
+            ):
+                return False
+            if self.max_cost is not None and (
+                self.spent_cost + committed_cost + (child.max_cost or 0.0)
+                > self.max_cost
+            ):
+                return False
+            self.reservations.append(child)
+            return True
+
+    def release(self, child: "TokenBudget") -> None:
+        """
+        Drops the reservation of a child whose session ended (its actual spending was charged while it ran).
+        """
+        with self.lock:
+            if child in self.reservations:
+                self.reservations.remove(child)
+
+    def committed(self) -> bool:
+        """
+        Tells whether the budget is fully committed: spent, or promised to running sessions.
+        """
+        with self.lock:
+            committed_tokens, committed_cost = self._outstanding()
+            return (
+                self.max_tokens is not None
+                and self.spent_tokens + committed_tokens >= self.max_tokens
+            ) or (
+                self.max_cost is not None
+                and self.spent_cost + committed_cost >= self.max_cost
+            )
+
+    def _outstanding(
+        self, exclude: Optional["TokenBudget"] = None
+    ) -> tuple[float, float]:
+        """
+        Sums the part of the reserved children's limits they have not spent yet.
+        """
+        tokens, cost = 0, 0.0
+        for child in self.reservations:
+            if child is exclude:
+                continue
+            if child.max_tokens is not None:
+                tokens += max(0, child.max_tokens - child.spent_tokens)
+            if child.max_cost is not None:
+                cost += max(0.0, child.max_cost - child.spent_cost)
+        return tokens, cost
+
+    def record(self, key: str, value: Any) -> None:
+        """
+        Stores a record with the budget's state (persisted if a state file is set).
+        """
+        with self.lock:
+            self.records[key] = value
+        self.save()
+
+    def save(self) -> None:
+        """
+        Writes the spending and records to the state file (no-op without one). The file is replaced atomically, so a crash never leaves it half-written, and the write runs outside of `lock`, so charges go on meanwhile.
+        """
+        if not self.state_file:
+            return
+        with self.save_lock:
+            with self.lock:
+                self.saved_at = time.monotonic()
+                state = json.dumps(
+                    {
+                        "spent_tokens": self.spent_tokens,
+                        "spent_cost": self.spent_cost,
+                        "num_calls": self.num_calls,
+                        "max_tokens": self.max_tokens,
+                        "max_cost": self.max_cost,
+                        "records": self.records,
+                    },
+                    indent=2,
+                )
+            folder = os.path.dirname(self.state_file)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            temp_file = f"{self.state_file}.tmp"
+            with open(temp_file, "w") as f:
+                f.write(state)
+            os.replace(temp_file, self.state_file)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the budget's limits, spending and reservations.
+        """
+        with self.lock:
+            return {
+                "max_tokens": self.max_tokens,
+                "max_cost": self.max_cost,
+                "spent_tokens": self.spent_tokens,
+                "spent_cost": self.spent_cost,
+                "num_calls": self.num_calls,
+                "running": len(self.reservations),
+            }
+
+
+def _min(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    """
+    Minimum of two optional limits (None means unlimited).
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
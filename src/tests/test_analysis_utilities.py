@@ -0,0 +1,72 @@
+import json
+import os
+import unittest
+
+from utilities.analysis_utilities import (
+    METRICS,
+    is_completed,
+    load_sessions,
+    session_metrics,
+)
+
+# Logs saved before stop reasons and session configs were recorded
+LEGACY_FOLDER = os.path.join(os.path.dirname(__file__), "..", "negotiation_histories")
+
+
+def turn(role, state, valuation):
+    return {
+        "role": role,
+        "message": "",
+        "negotiation_state": state,
+        "term_sheet_snapshot": {"valuation": valuation},
+    }
+
+
+class AnalysisUtilitiesTest(unittest.TestCase):
+    def test_legacy_log_completes_from_its_last_states(self):
+        filename = sorted(os.listdir(LEGACY_FOLDER))[0]
+        with open(os.path.join(LEGACY_FOLDER, filename), "r") as f:
+            negotiation_log = json.load(f)
+        self.assertNotIn("stop_reason", negotiation_log[-1])
+        self.assertEqual(session_metrics(negotiation_log)["completed"], 1.0)
+
+    def test_legacy_corpus_completion_rate(self):
+        _, metrics = load_sessions(LEGACY_FOLDER)
+        self.assertEqual(metrics[:, METRICS.index("completed")].tolist(), [1.0] * 5)
+
+    def test_legacy_completion_needs_both_roles(self):
+        negotiation_log = [
+            turn("acquirer", "pending", "$40 million"),
+            turn("target", "complete", "$50 million"),
+            turn("target", "complete", "$50 million"),
+        ]
+        self.assertFalse(is_completed(negotiation_log))
+        negotiation_log[-1]["role"] = "acquirer"
+        self.assertTrue(is_completed(negotiation_log))
+
+    def test_stop_reason_decides_when_recorded(self):
+        negotiation_log = [
+            turn("acquirer", "complete", "$50 million"),
+            turn("target", "complete", "$50 million"),
+        ]
+        negotiation_log[-1]["stop_reason"] = "converged"
+        self.assertFalse(is_completed(negotiation_log))
+        negotiation_log[-1]["stop_reason"] = "both_complete"
+        self.assertTrue(is_completed(negotiation_log))
+        self.assertFalse(is_completed([]))
+
+    def test_reciprocity_of_paired_concessions(self):
+        negotiation_log = [
+            turn("acquirer", "pending", "$40 million"),
+            turn("target", "pending", "$60 million"),
+            turn("acquirer", "pending", "$44 million"),
+            turn("target", "pending", "$52 million"),
+        ]
+        metrics = session_metrics(negotiation_log)
+        self.assertAlmostEqual(metrics["reciprocity"], 0.5)
+        self.assertEqual(metrics["final_valuation"], 52e6)
+        self.assertEqual(metrics["completed"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import re
+import unittest
+
+from resources.business_persona import BusinessPersona
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+
+COUNTRY_PAIRS = [("US", "India"), ("Germany", "Brazil"), ("Japan", "Kenya")]
+
+
+def persona_record(country, name):
+    return {
+        "country_based": country,
+        "business_descr": f"{name} is a logistics company based in {country}. It runs regional freight hubs.",
+        "cultural_profile": "The team is direct and data driven. It values punctual meetings.",
+        "authority_dynamics": "The CEO signs off on every deal. The board reviews large acquisitions.",
+        "financial_info": "Annual revenue is $120 million with a 12% margin, and it is valued at $300-400 million.",
+        "unspoken_interests": "It wants access to new ports. It hopes to keep its own brand.",
+    }
+
+
+def bulk_response(messages, max_pairs):
+    """
+    Answers bulk prompts of up to `max_pairs` pairs with valid records and fails larger ones with an empty answer.
+    """
+    prompt = messages[-1]["content"]
+    pairs = re.findall(r"Acquirer based in (\w+); target based in (\w+)", prompt)
+    if not pairs or len(pairs) > max_pairs:
+        return "<think>Too much at once.</think>"
+    records = [
+        {
+            "acquirer": persona_record(acquirer_country, "Atlas Freight"),
+            "target": persona_record(target_country, "Delta Shipping"),
+        }
+        for acquirer_country, target_country in pairs
+    ]
+    return f"<think>Drafting.</think>```json\n{json.dumps(records)}\n```"
+
+
+class GenerateBulkTest(unittest.TestCase):
+    def generate(self, backend, **kwargs):
+        bus = EventBus()
+        return BusinessPersona.generate_bulk(
+            COUNTRY_PAIRS, backend, events=bus.bind("test"), **kwargs
+        )
+
+    def test_one_call_per_batch(self):
+        backend = ScriptedBackend(lambda messages: bulk_response(messages, 3))
+        persona_pairs = self.generate(backend, batch_size=3)
+        self.assertEqual(backend.num_calls, 1)
+        self.assertEqual(
+            [(a["country_based"], t["country_based"]) for a, t in persona_pairs],
+            COUNTRY_PAIRS,
+        )
+        self.assertEqual(persona_pairs[0][0]["generation_mode"], "bulk")
+
+    def test_failed_batch_call_is_retried_in_smaller_batches(self):
+        backend = ScriptedBackend(lambda messages: bulk_response(messages, 1))
+        persona_pairs = self.generate(backend, batch_size=2, max_attempts=2)
+        self.assertEqual(len(persona_pairs), 3)
+        self.assertEqual(persona_pairs[2][1]["country_based"], "Kenya")
+
+    def test_invalid_records_are_regenerated(self):
+        calls = []
+
+        def respond(messages):
+            calls.append(messages)
+            response = bulk_response(messages, 3)
+            # The first response places the first acquirer in the wrong country
+            if len(calls) == 1:
+                response = response.replace(
+                    '"country_based": "US"', '"country_based": "Canada"', 1
+                )
+            return response
+
+        persona_pairs = self.generate(ScriptedBackend(respond), batch_size=3)
+        self.assertEqual(len(calls), 2)
+        self.assertIn("Acquirer based in US", calls[1][-1]["content"])
+        self.assertNotIn("Germany", calls[1][-1]["content"])
+        self.assertEqual(len(persona_pairs), 3)
+
+    def test_pairs_that_cannot_be_generated_are_left_out(self):
+        backend = ScriptedBackend("<think>Nothing to say.</think>")
+        self.assertEqual(self.generate(backend, batch_size=3), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
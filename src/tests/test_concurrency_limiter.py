@@ -0,0 +1,128 @@
+import threading
+import time
+import unittest
+
+from openai import OpenAI
+
+from resources.concurrency_limiter import AdaptiveConcurrencyLimiter, is_overload_error
+from resources.llm_backends import (
+    HedgedBackend,
+    LimitedBackend,
+    OpenAIBackend,
+    ScriptedBackend,
+    get_backend,
+)
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def saturate(limiter):
+    """
+    Starts requests until the limit is reached and returns their start times.
+    """
+    return [limiter.acquire() for _ in range(limiter.limit)]
+
+
+class AdaptiveConcurrencyLimiterTest(unittest.TestCase):
+    def test_limit_grows_while_it_holds_requests_back(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+        for _ in range(4):
+            for started in saturate(limiter):
+                limiter.release(started, latency=0.1)
+        self.assertEqual(limiter.limit, 3)
+
+    def test_limit_does_not_grow_below_capacity(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+        for _ in range(10):
+            limiter.release(limiter.acquire(), latency=0.1)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_overload_halves_the_limit_once_per_episode(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        in_flight = saturate(limiter)
+        for started in in_flight:
+            limiter.release(started, error=RateLimitError("429"))
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.stats()["overloads"], 8)
+
+        # A request started after the decrease may decrease it again
+        limiter.release(limiter.acquire(), error=TimeoutError())
+        self.assertEqual(limiter.limit, 2)
+
+    def test_limit_stays_within_bounds(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2, max_limit=3)
+        limiter.release(limiter.acquire(), error=RateLimitError())
+        self.assertEqual(limiter.limit, 2)
+        for _ in range(20):
+            for started in saturate(limiter):
+                limiter.release(started, latency=0.1)
+        self.assertEqual(limiter.limit, 3)
+
+    def test_slow_responses_shrink_the_limit_gently(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10)
+        limiter.release(limiter.acquire(), latency=0.1)
+        limiter.release(limiter.acquire(), latency=1.0)
+        self.assertEqual(limiter.limit, 9)
+        self.assertEqual(limiter.stats()["slow"], 1)
+
+    def test_other_errors_leave_the_limit_alone(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+        limiter.release(limiter.acquire(), error=ValueError("bad request"))
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.stats()["errors"], 1)
+
+    def test_overload_errors(self):
+        self.assertTrue(is_overload_error(RateLimitError()))
+        self.assertTrue(is_overload_error(TimeoutError()))
+        status_error = ValueError()
+        status_error.status_code = 503
+        self.assertTrue(is_overload_error(status_error))
+        self.assertFalse(is_overload_error(ValueError()))
+
+    def test_requests_beyond_the_limit_wait(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        first = limiter.acquire()
+        acquired = threading.Event()
+        waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertFalse(acquired.is_set())
+        self.assertEqual(limiter.stats()["queue_depth"], 1)
+
+        limiter.release(first, latency=0.1)
+        waiter.join(timeout=1)
+        self.assertTrue(acquired.is_set())
+
+
+class LimitedBackendTest(unittest.TestCase):
+    def test_stream_holds_a_slot_until_closed(self):
+        backend = LimitedBackend(ScriptedBackend("one two three"))
+        stream = backend.stream([], "model")
+        next(stream)
+        self.assertEqual(backend.stats()["in_flight"], 1)
+        stream.close()
+        stats = backend.stats()
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["successes"], 1)
+
+    def test_openai_clients_share_a_default_limiter(self):
+        client = OpenAI(api_key="test", base_url="http://localhost:1/v1")
+        backend = get_backend(client)
+        self.assertIsInstance(backend, LimitedBackend)
+        self.assertIsInstance(backend.backend, OpenAIBackend)
+        self.assertIs(get_backend(client), backend)
+        self.assertIs(HedgedBackend(client).backend, backend)
+
+        # An explicit limiter replaces the default one instead of stacking on it
+        explicit = LimitedBackend(client, AdaptiveConcurrencyLimiter(initial_limit=2))
+        self.assertIsInstance(explicit.backend, OpenAIBackend)
+
+    def test_backends_are_used_as_they_are(self):
+        scripted = ScriptedBackend("text")
+        self.assertIs(get_backend(scripted), scripted)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import random
+import unittest
+
+from resources.convergence_detector import ConvergenceDetector
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.negotiation_session import NegotiationSession
+from utilities.analysis_utilities import session_metrics
+from utilities.benchmark_utilities import synthetic_persona
+from utilities.term_sheet_utilities import normalize_term_sheet, parse_valuation
+
+# The same offer every turn, so the term sheet stops moving at once
+STEADY_TURN = """<think>Hold the line.</think>We keep our offer.
+```json
+{"valuation": "$50 million", "payment_structure": "70% cash, 30% stock"}
+```
+Company Negotiation State: pending"""
+
+
+class ParseValuationTest(unittest.TestCase):
+    def test_money_and_multiples_carry_their_unit(self):
+        self.assertEqual(parse_valuation("$50 million"), (50e6, "money"))
+        self.assertEqual(parse_valuation("1.2x annual revenue"), (1.2, "multiple"))
+        self.assertIsNone(parse_valuation("to be agreed"))
+
+    def test_multiples_get_their_own_key(self):
+        terms = normalize_term_sheet({"valuation": "1.2x annual revenue"})
+        self.assertEqual(terms, {"valuation_multiple": 1.2})
+
+
+class ConvergenceDetectorTest(unittest.TestCase):
+    def test_converges_on_steady_terms(self):
+        detector = ConvergenceDetector(window=2, tolerance=0.01)
+        results = [detector.update({"valuation": "$50 million"}) for _ in range(3)]
+        self.assertEqual(results, [False, False, True])
+
+    def test_moving_terms_do_not_converge(self):
+        detector = ConvergenceDetector(window=2, tolerance=0.01)
+        for amount in (40, 45, 50, 55):
+            converged = detector.update({"valuation": f"${amount} million"})
+        self.assertFalse(converged)
+
+    def test_money_and_multiple_are_never_compared(self):
+        detector = ConvergenceDetector(window=1, tolerance=0.01)
+        detector.update({"valuation": "$1.2 million"})
+        self.assertFalse(detector.update({"valuation": "1.2x revenue"}))
+
+
+class ConvergenceStopTest(unittest.TestCase):
+    def test_session_stops_when_terms_converge(self):
+        rng = random.Random(0)
+        negotiation_log = NegotiationSession.run(
+            synthetic_persona(rng, "acquirer", "US"),
+            synthetic_persona(rng, "target", "India"),
+            ScriptedBackend(STEADY_TURN),
+            num_rounds=10,
+            stream_content=False,
+            convergence_window=2,
+            convergence_action="stop",
+            repetition_action=None,
+            event_bus=EventBus(),
+        )
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "converged")
+        self.assertEqual(len(negotiation_log), 3)
+
+
+class ReciprocityTest(unittest.TestCase):
+    def test_multiples_are_left_out_of_money_concessions(self):
+        offers = [
+            ("acquirer", "$40 million"),
+            ("target", "$60 million"),
+            ("acquirer", "1.1x revenue"),
+            ("target", "$55 million"),
+            ("acquirer", "$45 million"),
+        ]
+        negotiation_log = [
+            {"role": role, "term_sheet_snapshot": {"valuation": valuation}}
+            for role, valuation in offers
+        ]
+        # Acquirer moved 40 -> 45 (5), target 60 -> 55 (5)
+        self.assertAlmostEqual(session_metrics(negotiation_log)["reciprocity"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from resources.corpus_archive import CorpusArchive
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.negotiation_session import NegotiationSession
+from utilities.archive_utilities import export_archive, import_folders
+from utilities.benchmark_utilities import synthetic_persona
+
+TURNS = [
+    """We open at a fair price.
+```json
+{"valuation": "$40 million"}
+```
+Company Negotiation State: pending""",
+    """That undervalues us.
+```json
+{"valuation": "$60 million"}
+```
+Company Negotiation State: pending""",
+]
+
+
+def scripted_session(seed):
+    rng = random.Random(seed)
+    # Round-trip through JSON like persona files loaded from disk
+    personas = json.loads(
+        json.dumps(
+            {
+                "acquirer": synthetic_persona(rng, "acquirer", "US"),
+                "target": synthetic_persona(rng, "target", "India"),
+            }
+        )
+    )
+    negotiation_log = NegotiationSession.run(
+        personas["acquirer"],
+        personas["target"],
+        ScriptedBackend(TURNS),
+        num_rounds=2,
+        stream_content=False,
+        event_bus=EventBus(),
+    )
+    return personas, negotiation_log
+
+
+class CorpusArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        # Keys follow the file names of the history and persona folders
+        self.sessions = {f"{seed:06d}": scripted_session(seed) for seed in range(3)}
+
+    def test_round_trip(self):
+        archive_folder = os.path.join(self.folder.name, "archive")
+        with CorpusArchive(archive_folder) as archive:
+            for key, (personas, negotiation_log) in self.sessions.items():
+                archive.add_negotiation(f"negotiation_{key}", negotiation_log)
+                archive.add_personas(f"personas_{key}", personas)
+
+        # Reopen from the index sidecar
+        archive = CorpusArchive(archive_folder)
+        self.assertEqual(
+            archive.keys("negotiation"),
+            [f"negotiation_{key}" for key in sorted(self.sessions)],
+        )
+        for key, (personas, negotiation_log) in self.sessions.items():
+            self.assertEqual(
+                archive.read_negotiation(f"negotiation_{key}"), negotiation_log
+            )
+            self.assertEqual(archive.read_personas(f"personas_{key}"), personas)
+
+    def test_read_turn(self):
+        archive = CorpusArchive(os.path.join(self.folder.name, "archive"))
+        for key, (_, negotiation_log) in self.sessions.items():
+            archive.add_negotiation(key, negotiation_log)
+
+        negotiation_log = self.sessions["000001"][1]
+        for turn_index, entry in enumerate(negotiation_log):
+            self.assertEqual(archive.read_turn("000001", turn_index), entry)
+
+    def test_small_shards_roll_over(self):
+        archive = CorpusArchive(
+            os.path.join(self.folder.name, "archive"), max_shard_bytes=1
+        )
+        for key, (_, negotiation_log) in self.sessions.items():
+            archive.add_negotiation(key, negotiation_log)
+
+        self.assertEqual(len(archive.index["shards"]), len(self.sessions))
+        self.assertEqual(archive.read_turn("000002", 1), self.sessions["000002"][1][1])
+
+    def test_wrong_kind_raises_key_error(self):
+        archive = CorpusArchive(os.path.join(self.folder.name, "archive"))
+        personas, negotiation_log = self.sessions["000000"]
+        archive.add_negotiation("000000", negotiation_log)
+        with self.assertRaises(KeyError):
+            archive.read_personas("000000")
+
+    def test_import_and_export_folders(self):
+        histories = os.path.join(self.folder.name, "histories")
+        persona_folder = os.path.join(self.folder.name, "personas")
+        os.makedirs(histories)
+        os.makedirs(persona_folder)
+        for key, (personas, negotiation_log) in self.sessions.items():
+            with open(os.path.join(histories, f"negotiation_{key}.json"), "w") as f:
+                json.dump(negotiation_log, f)
+            with open(os.path.join(persona_folder, f"personas_{key}.json"), "w") as f:
+                json.dump(personas, f)
+
+        archive_folder = os.path.join(self.folder.name, "archive")
+        exported = os.path.join(self.folder.name, "exported")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(
+                import_folders(archive_folder, histories, persona_folder), (3, 3)
+            )
+            # Re-running skips files already archived
+            self.assertEqual(
+                import_folders(archive_folder, histories, persona_folder), (0, 0)
+            )
+            export_archive(
+                archive_folder,
+                os.path.join(exported, "histories"),
+                os.path.join(exported, "personas"),
+            )
+
+        for key, (personas, negotiation_log) in self.sessions.items():
+            with open(
+                os.path.join(exported, "histories", f"negotiation_{key}.json")
+            ) as f:
+                self.assertEqual(json.load(f), negotiation_log)
+            with open(os.path.join(exported, "personas", f"personas_{key}.json")) as f:
+                self.assertEqual(json.load(f), personas)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import random
+import time
+import unittest
+import uuid
+from types import SimpleNamespace
+
+from resources.concurrency_limiter import AdaptiveConcurrencyLimiter, is_overload_error
+from resources.deadlines import (
+    DeadlineExceeded,
+    StreamStalled,
+    deadline_scope,
+    endpoint_stats,
+)
+from resources.event_stream import EventBus
+from resources.llm_backends import (
+    DeadlineBackend,
+    LimitedBackend,
+    OpenAIBackend,
+    ScriptedBackend,
+)
+from resources.negotiation_session import TURN_ATTEMPTS, NegotiationSession
+from utilities.benchmark_utilities import synthetic_persona
+from utilities.llm_utilities import prompt_llm_with_retry
+
+TURN = """We offer $50 million.
+```json
+{"valuation": "$50 million"}
+```
+Company Negotiation State: pending"""
+
+
+class StalledClient:
+    """
+    Stand-in for an OpenAI client whose streams never send a chunk: a read blocks until the request's timeout (or `default_timeout`, like the client's own), then fails.
+    """
+
+    def __init__(self, default_timeout=5.0):
+        self.default_timeout = default_timeout
+        self.timeouts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+
+        def read():
+            time.sleep(timeout or self.default_timeout)
+            raise TimeoutError("Read timed out.")
+            yield
+
+        return read()
+
+
+def wait_for_release(limiter, timeout=2.0):
+    """
+    Waits until the limiter has no request in flight; returns the in-flight count.
+    """
+    stop = time.monotonic() + timeout
+    while limiter.in_flight and time.monotonic() < stop:
+        time.sleep(0.01)
+    return limiter.in_flight
+
+
+def speaker(messages):
+    """
+    Role of the party a negotiation prompt is for (named first in its system prompt).
+    """
+    marker = "Role in the Acquisition: "
+    system = messages[0]["content"]
+    start = system.index(marker) + len(marker)
+    return system[start:].split()[0].lower()
+
+
+def slow_party_backend(slow_role, delay, reply=TURN):
+    """
+    Backend answering `slow_role` with `reply` after `delay` seconds, and the other party with a regular turn at once.
+    """
+
+    def respond(messages):
+        if speaker(messages) != slow_role:
+            return TURN
+        time.sleep(delay)
+        return reply
+
+    return ScriptedBackend(respond)
+
+
+class DeadlineSessionTest(unittest.TestCase):
+    def run_session(self, backend, **kwargs):
+        rng = random.Random(0)
+        return NegotiationSession.run(
+            synthetic_persona(rng, "acquirer", "US"),
+            synthetic_persona(rng, "target", "India"),
+            backend,
+            num_rounds=2,
+            stream_content=False,
+            event_bus=EventBus(),
+            **kwargs,
+        )
+
+    def test_turn_timeout_skips_the_turn(self):
+        backend = DeadlineBackend(
+            slow_party_backend("target", 0.5),
+            first_token_timeout=None,
+            chunk_timeout=None,
+            endpoint=f"test-{uuid.uuid4().hex}",
+        )
+        negotiation_log = self.run_session(backend, turn_timeout=0.1)
+
+        # The session goes on with the acquirer's turns and records the skipped ones
+        self.assertEqual([entry["role"] for entry in negotiation_log], ["acquirer"] * 2)
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "max_rounds")
+        self.assertEqual(
+            negotiation_log[-1]["skipped_turns"],
+            [{"round": 1, "role": "target"}, {"round": 2, "role": "target"}],
+        )
+        self.assertEqual(backend.stats()["turn_timeouts"], 2 * TURN_ATTEMPTS)
+
+    def test_failed_turn_is_skipped(self):
+        # Empty responses fail every retry of the call
+        backend = slow_party_backend("target", 0.0, reply="")
+        negotiation_log = self.run_session(backend)
+        self.assertEqual(len(negotiation_log), 2)
+        self.assertEqual(len(negotiation_log[-1]["skipped_turns"]), 2)
+
+    def test_session_timeout_ends_the_session(self):
+        backend = DeadlineBackend(
+            slow_party_backend("target", 0.5),
+            first_token_timeout=None,
+            chunk_timeout=None,
+            endpoint=f"test-{uuid.uuid4().hex}",
+        )
+        negotiation_log = self.run_session(
+            backend, turn_timeout=10, session_timeout=0.15
+        )
+        self.assertEqual(len(negotiation_log), 1)
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "deadline")
+        self.assertNotIn("skipped_turns", negotiation_log[-1])
+        self.assertEqual(backend.stats()["session_timeouts"], 1)
+
+
+class DeadlineBackendTest(unittest.TestCase):
+    def test_stalled_stream_is_retried(self):
+        calls = []
+
+        def respond(messages):
+            calls.append(messages)
+            if len(calls) == 1:
+                time.sleep(0.5)
+            return TURN
+
+        endpoint = f"test-{uuid.uuid4().hex}"
+        backend = DeadlineBackend(
+            ScriptedBackend(respond), first_token_timeout=0.05, endpoint=endpoint
+        )
+        response, _, _ = prompt_llm_with_retry(
+            [{"role": "user", "content": "Make an offer."}],
+            backend,
+            events=EventBus().bind("test"),
+        )
+        self.assertTrue(response.startswith("We offer"))
+        self.assertEqual(len(calls), 2)
+        stats = endpoint_stats()[endpoint]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["first_token_timeouts"], 1)
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["timeout_rate"], 0.5)
+        self.assertLess(stats["first_token_s_max"], 0.5)
+
+    def test_abandoned_stream_frees_its_limiter_slot(self):
+        client = StalledClient()
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+        backend = DeadlineBackend(
+            LimitedBackend(OpenAIBackend(client), limiter),
+            first_token_timeout=0.1,
+            chunk_timeout=0.05,
+            endpoint=f"test-{uuid.uuid4().hex}",
+        )
+        with self.assertRaises(StreamStalled):
+            list(backend.stream([{"role": "user", "content": "Offer?"}], "model"))
+
+        # The request's own reads time out with the watchdog instead of the client default
+        self.assertEqual(client.timeouts, [0.1])
+        self.assertEqual(wait_for_release(limiter, timeout=1.0), 0)
+
+    def test_passed_deadline_stops_retries(self):
+        backend = ScriptedBackend(TURN)
+        with deadline_scope(timeout=0.0):
+            with self.assertRaises(DeadlineExceeded) as raised:
+                prompt_llm_with_retry(
+                    [{"role": "user", "content": "Make an offer."}],
+                    backend,
+                    events=EventBus().bind("test"),
+                )
+        self.assertEqual(raised.exception.kind, "turn")
+        self.assertEqual(backend.num_calls, 0)
+
+    def test_deadlines_are_not_overload(self):
+        self.assertFalse(is_overload_error(DeadlineExceeded("turn")))
+        self.assertFalse(is_overload_error(DeadlineExceeded("session")))
+        self.assertFalse(is_overload_error(StreamStalled("first_token", 1.0)))
+        self.assertTrue(is_overload_error(TimeoutError()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from visualize_negotiations.generate_dashboard import aggregate, summarize_session
+
+LEGACY_LOG = [
+    {
+        "role": "acquirer",
+        "negotiation_state": "complete",
+        "term_sheet_snapshot": {"valuation": "$40 million"},
+    },
+    {
+        "role": "target",
+        "negotiation_state": "complete",
+        "term_sheet_snapshot": {"valuation": "$50 million"},
+    },
+]
+PERSONAS = {"acquirer": {"country_based": "US"}, "target": {"country_based": "India"}}
+
+
+class GenerateDashboardTest(unittest.TestCase):
+    def test_legacy_log_takes_countries_from_its_personas(self):
+        summary = summarize_session(LEGACY_LOG, PERSONAS)
+        self.assertEqual(summary["pair"], "US → India")
+        self.assertTrue(summary["completed"])
+        self.assertEqual(summary["curve"], [1.0, 1.25])
+        self.assertEqual(summarize_session(LEGACY_LOG)["pair"], "unknown → unknown")
+
+    def test_session_config_countries_win(self):
+        log = [dict(entry) for entry in LEGACY_LOG]
+        log[-1]["session_config"] = {
+            "acquirer_country": "France",
+            "target_country": "Brazil",
+        }
+        self.assertEqual(summarize_session(log, PERSONAS)["pair"], "France → Brazil")
+
+    def test_completion_rate_by_pair(self):
+        cache = {
+            "a.json": {"summary": summarize_session(LEGACY_LOG, PERSONAS)},
+            "b.json": {"summary": summarize_session(LEGACY_LOG[:1], PERSONAS)},
+        }
+        data = aggregate(cache)
+        self.assertEqual(data["completion_rate"], 0.5)
+        self.assertEqual(data["pairs"]["US → India"]["sessions"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
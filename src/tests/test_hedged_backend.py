@@ -0,0 +1,151 @@
+import threading
+import time
+import unittest
+
+from resources.concurrency_limiter import AdaptiveConcurrencyLimiter
+from resources.llm_backends import (
+    HedgedBackend,
+    LimitedBackend,
+    LLMBackend,
+    OpenAIBackend,
+)
+from tests.test_deadlines import StalledClient, wait_for_release
+
+
+class DelayedBackend(LLMBackend):
+    """
+    Streams a fixed text word by word; the n-th request waits `delays[n]` seconds before its first chunk (0 once the delays are used up).
+    """
+
+    def __init__(self, text, delays=()):
+        self.words = text.split(" ")
+        self.delays = list(delays)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def stream(self, messages, model, continue_final_message=False):
+        with self.lock:
+            index = len(self.requests)
+            self.requests.append((messages, continue_final_message))
+        if index < len(self.delays):
+            time.sleep(self.delays[index])
+        received = messages[-1]["content"] if continue_final_message else ""
+        remaining = " ".join(self.words)[len(received) :]
+        for i, word in enumerate(remaining.split(" ")):
+            yield word if i == 0 else " " + word
+
+
+MESSAGES = [{"role": "user", "content": "Offer?"}]
+TEXT = "We offer fifty million in cash."
+
+
+def warm_up(hedged, num_requests):
+    for _ in range(num_requests):
+        "".join(hedged.stream(MESSAGES, "model"))
+
+
+class HedgedBackendTest(unittest.TestCase):
+    def test_no_hedging_before_min_samples(self):
+        backend = DelayedBackend(TEXT, delays=[0.2])
+        hedged = HedgedBackend(backend, min_samples=20, max_extra_load=1.0)
+        self.assertEqual("".join(hedged.stream(MESSAGES, "model")), TEXT)
+        self.assertEqual(hedged.stats()["hedges_fired"], 0)
+        self.assertIsNone(hedged.stats()["first_chunk_threshold_s"])
+
+    def test_stalled_first_chunk_is_hedged(self):
+        backend = DelayedBackend(TEXT)
+        hedged = HedgedBackend(
+            backend, min_samples=5, max_extra_load=1.0, min_delay_s=0.01
+        )
+        warm_up(hedged, 5)
+        self.assertIsNotNone(hedged.stats()["first_chunk_threshold_s"])
+
+        # The next original request stalls; its duplicate answers at once
+        backend.delays = [0] * len(backend.requests) + [1.0]
+        started = time.perf_counter()
+        self.assertEqual("".join(hedged.stream(MESSAGES, "model")), TEXT)
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+        stats = hedged.stats()
+        self.assertEqual(stats["hedges_fired"], 1)
+        self.assertEqual(stats["hedges_won"], 1)
+        # Nothing was received yet, so the duplicate is the original request
+        self.assertEqual(backend.requests[-1], (MESSAGES, False))
+
+    def test_hedges_are_capped(self):
+        backend = DelayedBackend(TEXT)
+        hedged = HedgedBackend(
+            backend, min_samples=5, max_extra_load=0.1, min_delay_s=0.01
+        )
+        warm_up(hedged, 5)
+
+        # 6 requests allow no hedge at a 10% cap
+        backend.delays = [0] * len(backend.requests) + [0.1]
+        self.assertEqual("".join(hedged.stream(MESSAGES, "model")), TEXT)
+        stats = hedged.stats()
+        self.assertEqual(stats["hedges_fired"], 0)
+        self.assertEqual(stats["hedges_capped"], 1)
+
+    def test_cancelled_stream_frees_its_limiter_slot(self):
+        delayed = DelayedBackend(TEXT)
+        client = StalledClient()
+
+        class StallingBackend(LLMBackend):
+            """
+            Answers at once, except for the request at `stall_index`, which goes to a stalled endpoint.
+            """
+
+            stall_index = None
+
+            def stream(self, messages, model, continue_final_message=False):
+                if len(delayed.requests) == self.stall_index:
+                    delayed.requests.append((messages, continue_final_message))
+                    return OpenAIBackend(client).stream(
+                        messages, model, continue_final_message
+                    )
+                return delayed.stream(messages, model, continue_final_message)
+
+        backend = StallingBackend()
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+        hedged = HedgedBackend(
+            LimitedBackend(backend, limiter),
+            min_samples=5,
+            max_extra_load=1.0,
+            min_delay_s=0.01,
+            read_timeout=0.2,
+        )
+        warm_up(hedged, 5)
+
+        # The original request stalls and loses to its duplicate
+        backend.stall_index = len(delayed.requests)
+        self.assertEqual("".join(hedged.stream(MESSAGES, "model")), TEXT)
+        self.assertEqual(hedged.stats()["hedges_won"], 1)
+
+        # The loser's read times out soon instead of holding its slot for the client default
+        self.assertEqual(client.timeouts, [0.2])
+        self.assertEqual(wait_for_release(limiter, timeout=1.0), 0)
+
+    def test_mid_stream_hedge_continues_received_text(self):
+        hedged = HedgedBackend(DelayedBackend(TEXT))
+        messages, continues = hedged._hedge_request(MESSAGES, False, "We offer")
+        self.assertTrue(continues)
+        self.assertEqual(messages[-1], {"role": "assistant", "content": "We offer"})
+
+        partial = MESSAGES + [{"role": "assistant", "content": "We"}]
+        messages, continues = hedged._hedge_request(partial, True, " offer")
+        self.assertTrue(continues)
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[-1]["content"], "We offer")
+
+    def test_errors_are_raised(self):
+        class FailingBackend(LLMBackend):
+            def stream(self, messages, model, continue_final_message=False):
+                raise ConnectionError("endpoint down")
+                yield
+
+        with self.assertRaises(ConnectionError):
+            "".join(HedgedBackend(FailingBackend()).stream(MESSAGES, "model"))
+
+
+if __name__ == "__main__":
+    unittest.main()
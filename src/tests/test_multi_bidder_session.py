@@ -0,0 +1,220 @@
+import random
+import threading
+import time
+import unittest
+from unittest import mock
+
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.multi_bidder_session import MultiBidderNegotiationSession
+from resources.token_budget import TokenBudget
+from utilities.benchmark_utilities import synthetic_persona
+
+TARGET_REPLY = """We have received several offers.
+
+To Bidder 1:
+Your price of $40 million is too low; come up to $55 million.
+
+To Bidder 10:
+Your cash offer of $70 million is close to acceptable.
+
+```json
+{
+  "Bidder 1": {"valuation": "$55 million"},
+  "Bidder 10": {"valuation": "$72 million"}
+}
+```
+
+Selected Bidder: Bidder 10
+Company Negotiation State: {state}"""
+
+BIDDER_REPLY = """We offer fair terms.
+```json
+{"valuation": "$50 million"}
+```
+Company Negotiation State: complete"""
+
+
+def named_persona(rng, name, role):
+    persona = synthetic_persona(rng, role, "US")
+    persona["business_descr"] = (
+        f"{name} is a company based in US. {persona['business_descr'][0]}",
+        *persona["business_descr"][1:],
+    )
+    return persona
+
+
+class MultiBidderSessionTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.acquirers = [
+            named_persona(rng, f"Bidder {i}", "acquirer") for i in (1, 10)
+        ]
+        self.target = named_persona(rng, "Harbor Group", "target")
+
+    def make_session(self, script, **kwargs):
+        return MultiBidderNegotiationSession(
+            self.acquirers,
+            self.target,
+            ScriptedBackend(script),
+            num_rounds=2,
+            stream_content=False,
+            event_bus=EventBus(),
+            **kwargs,
+        )
+
+    def test_bidders_only_see_their_own_section_and_terms(self):
+        bidder_prompts = []
+
+        def respond(messages):
+            if "several companies are bidding" in messages[0]["content"]:
+                return TARGET_REPLY.replace("{state}", "pending")
+            bidder_prompts.append(messages[1]["content"])
+            return BIDDER_REPLY
+
+        session = self.make_session(respond)
+        self.assertEqual(session.bidder_names, ["Bidder 1", "Bidder 10"])
+        session._run_negotiation()
+
+        # Second-round prompts of both bidders see the first target reply
+        second_round = bidder_prompts[2:]
+        bidder_1 = next(p for p in second_round if "$55 million" in p)
+        bidder_10 = next(p for p in second_round if "$72 million" in p)
+        self.assertNotIn("$72 million", bidder_1)
+        self.assertNotIn("$70 million", bidder_1)
+        self.assertNotIn("$55 million", bidder_10)
+        self.assertNotIn("$40 million", bidder_10)
+        self.assertNotIn("Selected Bidder", bidder_1 + bidder_10)
+
+    def test_reply_view_without_sections_shows_terms_only(self):
+        session = self.make_session(BIDDER_REPLY)
+        reply = 'Everyone must improve.\n```json\n{"Bidder 1": {"valuation": "$55 million"}, "Bidder 10": {"valuation": "$72 million"}}\n```\nCompany Negotiation State: pending'
+        view = session._target_reply_for_bidder(reply, "Bidder 1")
+        self.assertNotIn("Everyone", view)
+        self.assertIn("$55 million", view)
+        self.assertNotIn("$72 million", view)
+
+    def test_state_is_complete_only_for_the_selected_bidder(self):
+        session = self.make_session(BIDDER_REPLY)
+        reply = TARGET_REPLY.replace("{state}", "complete")
+        self.assertTrue(
+            session._target_reply_for_bidder(reply, "Bidder 10").endswith(
+                "State: complete"
+            )
+        )
+        self.assertTrue(
+            session._target_reply_for_bidder(reply, "Bidder 1").endswith(
+                "State: pending"
+            )
+        )
+
+    def test_selected_bidder_matches_exactly(self):
+        session = self.make_session(BIDDER_REPLY)
+        self.assertEqual(
+            session._extract_selected_bidder("Selected Bidder: Bidder 10"), "Bidder 10"
+        )
+        self.assertEqual(
+            session._extract_selected_bidder("**Selected Bidder:** [Bidder 1]."),
+            "Bidder 1",
+        )
+        self.assertIsNone(session._extract_selected_bidder("Selected Bidder: Bidder 2"))
+        self.assertIsNone(session._extract_selected_bidder("Selected Bidder: none"))
+
+    def test_session_ends_when_target_selects_a_complete_bidder(self):
+        def respond(messages):
+            if "several companies are bidding" in messages[0]["content"]:
+                return TARGET_REPLY.replace("{state}", "complete")
+            return BIDDER_REPLY
+
+        negotiation_log = self.make_session(respond)._run_negotiation()
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "bidder_selected")
+        self.assertEqual(negotiation_log[-1]["selected_bidder"], "Bidder 10")
+
+    def test_failing_bidder_only_loses_its_own_turn(self):
+        def respond(messages):
+            if "several companies are bidding" in messages[0]["content"]:
+                return TARGET_REPLY.replace("{state}", "pending")
+            # Empty responses fail every retry of Bidder 1's calls
+            return "" if "Bidder 1 is" in messages[0]["content"] else BIDDER_REPLY
+
+        negotiation_log = self.make_session(respond)._run_negotiation()
+        self.assertEqual(
+            [(entry["role"], entry["company_name"]) for entry in negotiation_log],
+            [("acquirer", "Bidder 10"), ("target", "Harbor Group")] * 2,
+        )
+        self.assertEqual(
+            negotiation_log[-1]["skipped_turns"],
+            [
+                {"round": 1, "role": "acquirer", "company_name": "Bidder 1"},
+                {"round": 2, "role": "acquirer", "company_name": "Bidder 1"},
+            ],
+        )
+        session_config = negotiation_log[-1]["session_config"]
+        self.assertEqual(session_config["num_bidders"], 2)
+        self.assertEqual(session_config["acquirer_countries"], ["US", "US"])
+
+    def test_unexpected_bidder_error_is_contained(self):
+        session = self.make_session(
+            lambda messages: (
+                TARGET_REPLY.replace("{state}", "pending")
+                if "several companies are bidding" in messages[0]["content"]
+                else BIDDER_REPLY
+            )
+        )
+        run_bidder_turn = session._run_bidder_turn
+
+        def failing_turn(bidder_index, *args):
+            if bidder_index == 0:
+                raise ValueError("broken prompt")
+            return run_bidder_turn(bidder_index, *args)
+
+        with mock.patch.object(session, "_run_bidder_turn", failing_turn):
+            negotiation_log = session._run_negotiation()
+        self.assertEqual(len(negotiation_log), 4)
+        self.assertEqual(len(negotiation_log[-1]["skipped_turns"]), 2)
+
+    def test_stop_event_cancels_between_rounds(self):
+        stop_event = threading.Event()
+
+        def respond(messages):
+            if "several companies are bidding" in messages[0]["content"]:
+                stop_event.set()
+                return TARGET_REPLY.replace("{state}", "pending")
+            return BIDDER_REPLY
+
+        negotiation_log = self.make_session(
+            respond, stop_event=stop_event
+        )._run_negotiation()
+        self.assertEqual(len(negotiation_log), 3)
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "cancelled")
+
+    def test_budget_is_charged_and_ends_the_session(self):
+        budget = TokenBudget(max_tokens=1)
+        negotiation_log = self.make_session(
+            lambda messages: (
+                TARGET_REPLY.replace("{state}", "pending")
+                if "several companies are bidding" in messages[0]["content"]
+                else BIDDER_REPLY
+            ),
+            budget=budget,
+        )._run_negotiation()
+        self.assertEqual(budget.num_calls, 3)
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "budget")
+        self.assertIsNotNone(negotiation_log[-1]["session_config"]["budget"])
+
+    def test_session_deadline_ends_the_session(self):
+        def respond(messages):
+            if "several companies are bidding" in messages[0]["content"]:
+                time.sleep(0.3)
+                return TARGET_REPLY.replace("{state}", "pending")
+            return BIDDER_REPLY
+
+        negotiation_log = self.make_session(
+            respond, session_timeout=0.1
+        )._run_negotiation()
+        self.assertEqual(len(negotiation_log), 3)
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "deadline")
+
+
+if __name__ == "__main__":
+    unittest.main()
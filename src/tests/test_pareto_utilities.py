@@ -0,0 +1,92 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.negotiation_session import NegotiationSession
+from utilities.benchmark_utilities import synthetic_persona
+from utilities.pareto_utilities import UtilityModel, load_corpus, session_models
+
+TURN = """We offer $50 million.
+```json
+{"valuation": "$50 million"}
+```
+Company Negotiation State: pending"""
+
+
+def stating_valuation(persona, text):
+    """
+    Copy of a persona whose financial info states `text`.
+    """
+    persona = json.loads(json.dumps(persona))
+    persona["financial_info"] = [text, "", ""]
+    return persona
+
+
+class ParetoUtilitiesTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.acquirer = synthetic_persona(rng, "acquirer", "US")
+        self.target = stating_valuation(
+            synthetic_persona(rng, "target", "India"),
+            "Our valuation is estimated between $80 million and $120 million.",
+        )
+        self.negotiation_log = NegotiationSession.run(
+            self.acquirer,
+            self.target,
+            ScriptedBackend(TURN),
+            num_rounds=1,
+            stream_content=False,
+            event_bus=EventBus(),
+        )
+
+    def test_sessions_do_not_record_utility_models(self):
+        self.assertNotIn("utility_models", self.negotiation_log[-1]["session_config"])
+
+    def test_models_come_from_the_personas(self):
+        acquirer_model, target_model = session_models(
+            self.negotiation_log, {"acquirer": self.acquirer, "target": self.target}
+        )
+        expected = UtilityModel.from_personas("target", self.target, self.acquirer)
+        self.assertEqual(target_model.to_dict(), expected.to_dict())
+        self.assertEqual(target_model.to_dict()["limits"]["valuation"], 80e6)
+        self.assertEqual(acquirer_model.role, "acquirer")
+
+    def test_models_without_personas_center_on_the_first_valuation(self):
+        # The first valuation quoted was $50 million
+        _, target_model = session_models(self.negotiation_log)
+        self.assertEqual(target_model.to_dict()["limits"]["valuation"], 40e6)
+
+    def test_recorded_models_of_older_logs(self):
+        recorded = UtilityModel.from_personas("target", self.target, self.acquirer)
+        old_log = json.loads(json.dumps(self.negotiation_log))
+        old_log[-1]["session_config"]["utility_models"] = {
+            "acquirer": recorded.to_dict(),
+            "target": recorded.to_dict(),
+        }
+        _, target_model = session_models(old_log)
+        self.assertEqual(target_model.to_dict(), recorded.to_dict())
+
+    def test_load_corpus_pairs_logs_with_persona_files(self):
+        with tempfile.TemporaryDirectory() as folder:
+            logs_folder = os.path.join(folder, "logs")
+            personas_folder = os.path.join(folder, "personas")
+            os.makedirs(logs_folder)
+            os.makedirs(personas_folder)
+            with open(os.path.join(logs_folder, "negotiation_a.json"), "w") as f:
+                json.dump(self.negotiation_log, f)
+            with open(os.path.join(personas_folder, "personas_a.json"), "w") as f:
+                json.dump({"acquirer": self.acquirer, "target": self.target}, f)
+
+            names, logs, models = load_corpus(logs_folder, personas_folder)
+        self.assertEqual(names, ["negotiation_a.json"])
+        self.assertEqual(len(logs), 1)
+        expected = UtilityModel.from_personas("acquirer", self.acquirer, self.target)
+        self.assertEqual(models[0][0].to_dict(), expected.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
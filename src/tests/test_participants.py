@@ -0,0 +1,165 @@
+import json
+import random
+import unittest
+
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.negotiation_instructions import (
+    BUDGET_CLOSING_INSTRUCTION,
+    CLOSING_ROUND_INSTRUCTION,
+)
+from resources.negotiation_session import NegotiationSession
+from resources.participants import (
+    DEFAULT_REFERENCE_VALUATION,
+    ConcessionCurve,
+    RuleBasedNegotiator,
+)
+from utilities.benchmark_utilities import synthetic_persona
+
+
+def opening(valuation, **terms):
+    term_sheet = {"valuation": valuation, **terms}
+    return {
+        "role": "acquirer",
+        "message": f"We open with:\n```json\n{json.dumps(term_sheet)}\n```\nCompany Negotiation State: pending",
+    }
+
+
+def proposed_terms(response):
+    return json.loads(response.split("```json")[1].split("```")[0])
+
+
+class RuleBasedNegotiatorTest(unittest.TestCase):
+    def respond(self, negotiator, history, term_sheet=None, instructions=()):
+        response, _, _ = negotiator.respond(
+            None,
+            history,
+            term_sheet or {},
+            list(instructions),
+            EventBus().bind("test"),
+            {},
+        )
+        return response
+
+    def test_concession_curve(self):
+        curve = ConcessionCurve(10, 20, beta=1.0)
+        self.assertEqual(curve.value(0), 10)
+        self.assertEqual(curve.value(0.5), 15)
+        self.assertEqual(curve.value(2), 20)
+        self.assertEqual(curve.utility(10), 1.0)
+        self.assertEqual(curve.utility(20), 0.0)
+        self.assertLess(curve.utility(25), 0)
+
+    def test_money_opening_anchors_the_valuation(self):
+        target = RuleBasedNegotiator("target")
+        history = [opening("$50 million")]
+        response = self.respond(target, history, {"valuation": "$50 million"})
+        # The target opens 40% above the acquirer's first offer
+        self.assertEqual(proposed_terms(response)["valuation"], "$70.0 million")
+        self.assertTrue(response.endswith("Company Negotiation State: pending"))
+
+    def test_revenue_multiple_opening_falls_back_to_the_reference(self):
+        target = RuleBasedNegotiator("target")
+        history = [opening("1.2x annual revenue")]
+        response = self.respond(target, history, {"valuation": "1.2x annual revenue"})
+        expected = f"${1.4 * DEFAULT_REFERENCE_VALUATION / 1e6:,.1f} million"
+        self.assertEqual(proposed_terms(response)["valuation"], expected)
+        # The multiple cannot be priced, so it is countered instead of accepted
+        self.assertTrue(response.endswith("Company Negotiation State: pending"))
+
+    def test_later_money_offer_anchors_after_a_multiple(self):
+        target = RuleBasedNegotiator("target")
+        history = [
+            opening("1.2x annual revenue"),
+            {"role": "target", "message": "We need more."},
+            opening("$60 million"),
+        ]
+        response = self.respond(target, history, {"valuation": "$60 million"})
+        # Second own turn, one step down the curve from 1.4 times the anchor
+        expected = target.offer(1, 60e6, 60e6)["valuation"]
+        self.assertEqual(
+            proposed_terms(response)["valuation"], f"${expected / 1e6:,.1f} million"
+        )
+
+    def test_limits_stay_between_the_opening_offers(self):
+        # Anchored on the counterparty's opening, the last offers stop at the midpoint of the two openings
+        target = RuleBasedNegotiator("target")
+        last_turn = target.num_turns - 1
+        self.assertEqual(target.offer(last_turn, 50e6, 50e6)["valuation"], 60e6)
+        self.assertLess(target.offer(last_turn, 50e6)["valuation"], 50e6)
+        acquirer = RuleBasedNegotiator("acquirer")
+        self.assertEqual(acquirer.offer(last_turn, 100e6, 100e6)["valuation"], 85e6)
+
+    def test_persona_anchors_the_valuation_against_a_low_opener(self):
+        persona = {
+            "financial_info": (
+                "The company's valuation is estimated between $50 million and $100 million.",
+            )
+        }
+        target = RuleBasedNegotiator("target", persona=persona)
+        self.assertEqual(target.reference_valuation, 75e6)
+        acquirer = RuleBasedNegotiator("acquirer", counterpart=persona)
+        self.assertEqual(acquirer.reference_valuation, 75e6)
+
+        # A lowball opening neither accepted nor followed down
+        history = [opening("$20 million")]
+        response = self.respond(target, history, {"valuation": "$20 million"})
+        self.assertEqual(proposed_terms(response)["valuation"], "$105.0 million")
+        for turn_index in range(target.num_turns):
+            valuation = target.offer(turn_index, 75e6, 20e6)["valuation"]
+            self.assertGreaterEqual(valuation, 0.95 * 75e6)
+
+    def test_persona_anchored_target_accepts_a_high_opener(self):
+        persona = {
+            "financial_info": (
+                "The company's valuation is estimated between $50 million and $100 million.",
+            )
+        }
+        target = RuleBasedNegotiator("target", persona=persona)
+        history = [opening("$120 million")]
+        response = self.respond(target, history, {"valuation": "$120 million"})
+        self.assertTrue(response.endswith("Company Negotiation State: complete"))
+
+    def test_accepts_terms_better_than_its_next_offer(self):
+        target = RuleBasedNegotiator("target", reference_valuation=50e6)
+        term_sheet = {
+            "valuation": "$80 million",
+            "payment_structure": "100% cash",
+            "earn_out": "0% of the purchase price",
+            "due_diligence_timeline": "2 weeks",
+        }
+        response = self.respond(target, [opening("$80 million")], term_sheet)
+        self.assertTrue(response.endswith("Company Negotiation State: complete"))
+
+    def test_closing_round_accepts_terms_within_limits(self):
+        acquirer = RuleBasedNegotiator("acquirer", reference_valuation=50e6)
+        term_sheet = {"valuation": "$49 million", "payment_structure": "65% cash"}
+        history = [opening("$40 million"), {"role": "target", "message": "Counter."}]
+        self.assertIn(
+            "pending", self.respond(acquirer, history, term_sheet).splitlines()[-1]
+        )
+        for instruction in (CLOSING_ROUND_INSTRUCTION, BUDGET_CLOSING_INSTRUCTION):
+            response = self.respond(acquirer, history, term_sheet, [instruction])
+            self.assertTrue(response.endswith("Company Negotiation State: complete"))
+
+    def test_session_with_a_rule_based_target(self):
+        rng = random.Random(0)
+        backend = ScriptedBackend(opening("$50 million")["message"])
+        negotiation_log = NegotiationSession.run(
+            synthetic_persona(rng, "acquirer", "US"),
+            synthetic_persona(rng, "target", "India"),
+            backend,
+            num_rounds=2,
+            stream_content=False,
+            participants={"target": RuleBasedNegotiator("target")},
+            event_bus=EventBus(),
+        )
+        self.assertEqual(backend.num_calls, 2)
+        target_turns = [entry for entry in negotiation_log if entry["role"] == "target"]
+        self.assertEqual(
+            target_turns[0]["term_sheet_snapshot"]["valuation"], "$70.0 million"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from resources.persona_record import PersonaRecord
+from utilities.benchmark_utilities import synthetic_persona
+from utilities.persona_utilities import (
+    load_personas_from_file,
+    load_random_personas,
+    save_personas,
+)
+
+
+class PersonaLoadingTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        rng = random.Random(0)
+        self.personas = json.loads(
+            json.dumps(
+                {
+                    "acquirer": synthetic_persona(rng, "acquirer", "US"),
+                    "target": synthetic_persona(rng, "target", "India"),
+                }
+            )
+        )
+        self.filepath = save_personas(
+            self.personas["acquirer"], self.personas["target"], self.folder.name
+        )
+
+    def test_loaders_return_serializable_dictionaries_by_default(self):
+        acquirer, target = load_personas_from_file(self.filepath)
+        self.assertEqual({"acquirer": acquirer, "target": target}, self.personas)
+        json.dumps(acquirer)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            acquirer, target = load_random_personas(self.folder.name)
+        self.assertIsInstance(acquirer, dict)
+        self.assertEqual(target, self.personas["target"])
+
+    def test_compact_records_read_like_the_dictionaries(self):
+        acquirer, target = load_personas_from_file(self.filepath, compact=True)
+        self.assertIsInstance(acquirer, PersonaRecord)
+        self.assertEqual(
+            acquirer["business_descr"][0],
+            self.personas["acquirer"]["business_descr"][0],
+        )
+        self.assertEqual(
+            list(target["financial_info"]), self.personas["target"]["financial_info"]
+        )
+        self.assertEqual(target.get("country_based"), "India")
+        self.assertEqual(acquirer.to_dict(), self.personas["acquirer"])
+        with self.assertRaises(TypeError):
+            json.dumps(acquirer)
+
+    def test_saving_compact_records_materializes_them(self):
+        acquirer, target = load_personas_from_file(self.filepath, compact=True)
+        filepath = save_personas(
+            acquirer, target, os.path.join(self.folder.name, "copy")
+        )
+        with open(filepath) as f:
+            self.assertEqual(json.load(f), self.personas)
+
+    def test_missing_file(self):
+        self.assertEqual(load_personas_from_file("missing.json"), (None, None))
+        self.assertEqual(load_random_personas("missing_folder"), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
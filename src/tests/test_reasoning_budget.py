@@ -0,0 +1,81 @@
+import random
+import unittest
+
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.negotiation_session import NegotiationSession
+from utilities.benchmark_utilities import synthetic_persona
+from utilities.llm_utilities import prompt_llm
+
+LONG_REASONING = " ".join(f"step{i}" for i in range(40))
+TURN = f"""<think>{LONG_REASONING}</think>We hold at the offer on the table.
+```json
+{{"valuation": "$50 million"}}
+```
+Company Negotiation State: pending"""
+
+
+class ReasoningBudgetTest(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+
+        def respond(messages):
+            self.requests.append([dict(message) for message in messages])
+            return TURN
+
+        self.backend = ScriptedBackend(respond)
+        self.events = EventBus().bind("test")
+
+    def prompt(self, reasoning_budget):
+        call_info = {}
+        response, reasoning = prompt_llm(
+            [{"role": "user", "content": "Make an offer."}],
+            self.backend,
+            events=self.events,
+            reasoning_budget=reasoning_budget,
+            call_info=call_info,
+        )
+        return response, reasoning, call_info
+
+    def test_reasoning_within_budget_needs_one_request(self):
+        response, reasoning, call_info = self.prompt(100)
+        self.assertEqual(self.backend.num_calls, 1)
+        self.assertEqual(reasoning.split(), LONG_REASONING.split())
+        self.assertTrue(response.startswith("We hold"))
+        self.assertEqual(call_info["reasoning_tokens"], 40)
+        self.assertFalse(call_info["reasoning_budget_hit"])
+
+    def test_budget_hit_continues_with_forced_answer(self):
+        response, reasoning, call_info = self.prompt(5)
+        self.assertEqual(self.backend.num_calls, 2)
+        self.assertEqual(reasoning.split(), LONG_REASONING.split()[:5])
+        self.assertTrue(response.startswith("We hold"))
+        self.assertTrue(call_info["reasoning_budget_hit"])
+        self.assertEqual(call_info["reasoning_tokens"], 5)
+
+        # The continuation resumes the cut-off reasoning, closed by a forced </think>
+        continuation = self.requests[1][-1]
+        self.assertEqual(continuation["role"], "assistant")
+        self.assertIn("step4", continuation["content"])
+        self.assertNotIn("step5", continuation["content"])
+        self.assertTrue(continuation["content"].rstrip().endswith("</think>"))
+
+    def test_session_logs_reasoning_budget(self):
+        rng = random.Random(0)
+        negotiation_log = NegotiationSession.run(
+            synthetic_persona(rng, "acquirer", "US"),
+            synthetic_persona(rng, "target", "India"),
+            self.backend,
+            num_rounds=1,
+            stream_content=False,
+            reasoning_budget=5,
+            event_bus=EventBus(),
+        )
+        for entry in negotiation_log:
+            self.assertEqual(entry["reasoning_tokens"], 5)
+            self.assertTrue(entry["reasoning_budget_hit"])
+        self.assertEqual(self.backend.num_calls, 2 * len(negotiation_log))
+
+
+if __name__ == "__main__":
+    unittest.main()
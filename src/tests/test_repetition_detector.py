@@ -0,0 +1,92 @@
+import random
+import unittest
+
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.negotiation_session import NegotiationSession
+from resources.repetition_detector import RepetitionDetector
+from utilities.benchmark_utilities import synthetic_persona
+
+POSITION = "Our position is firm: the valuation reflects our growth, our customers and our team, and we will not move on it this round."
+OTHER_POSITION = "We see real synergies in distribution, but the diligence period must be long enough to review every supplier contract in detail."
+
+# The same prose every turn; the state line and JSON are ignored by the detector
+LOOPING_TURN = f"""{POSITION}
+Company Negotiation State: pending"""
+
+
+def run_looping_session(repetition_action):
+    rng = random.Random(0)
+    return NegotiationSession.run(
+        synthetic_persona(rng, "acquirer", "US"),
+        synthetic_persona(rng, "target", "India"),
+        ScriptedBackend(LOOPING_TURN),
+        num_rounds=10,
+        stream_content=False,
+        convergence_window=None,
+        repetition_action=repetition_action,
+        repair_turns=False,
+        event_bus=EventBus(),
+    )
+
+
+class RepetitionDetectorTest(unittest.TestCase):
+    def test_identical_messages_have_similarity_one(self):
+        detector = RepetitionDetector()
+        self.assertEqual(detector.update("acquirer", POSITION), 0.0)
+        self.assertEqual(detector.update("acquirer", POSITION), 1.0)
+
+    def test_different_messages_are_not_repeats(self):
+        detector = RepetitionDetector()
+        detector.update("acquirer", POSITION)
+        self.assertLess(detector.update("acquirer", OTHER_POSITION), 0.2)
+
+    def test_term_sheet_and_state_line_are_ignored(self):
+        detector = RepetitionDetector()
+        detector.update(
+            "target",
+            f'{POSITION}\n```json\n{{"valuation": "$40 million"}}\n```\nNegotiation State: pending',
+        )
+        similarity = detector.update(
+            "target",
+            f'{POSITION}\n```json\n{{"valuation": "$90 million"}}\n```\nNegotiation State: accept',
+        )
+        self.assertEqual(similarity, 1.0)
+
+    def test_parties_are_compared_with_themselves_only(self):
+        detector = RepetitionDetector(patience=1)
+        detector.update("acquirer", POSITION)
+        self.assertEqual(detector.update("target", POSITION), 0.0)
+        self.assertFalse(detector.is_stalled())
+
+    def test_stalls_after_patience_repeats(self):
+        detector = RepetitionDetector(patience=2)
+        detector.update("acquirer", POSITION)
+        detector.update("target", OTHER_POSITION)
+        detector.update("acquirer", POSITION)
+        self.assertFalse(detector.is_stalled())
+        detector.update("target", OTHER_POSITION)
+        self.assertTrue(detector.is_stalled())
+        detector.reset()
+        self.assertFalse(detector.is_stalled())
+
+
+class LoopDetectionTest(unittest.TestCase):
+    def test_stop_ends_a_looping_session(self):
+        negotiation_log = run_looping_session("stop")
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "stalled")
+        # Two opening turns, then two repeats reach the patience
+        self.assertEqual(len(negotiation_log), 4)
+
+    def test_inject_breaks_the_loop_once_before_stopping(self):
+        negotiation_log = run_looping_session("inject")
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "stalled")
+        self.assertGreater(len(negotiation_log), 4)
+
+    def test_disabled_detection_runs_all_rounds(self):
+        negotiation_log = run_looping_session(None)
+        self.assertEqual(negotiation_log[-1]["stop_reason"], "max_rounds")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from resources import search_index
+from resources.search_index import SearchIndex, tokenize
+
+
+def persona(name, country, authority):
+    return {
+        "country_based": country,
+        "business_descr": [f"{name} is a software company based in {country}."],
+        "cultural_profile": ["Formal and cautious in meetings."],
+        "authority_dynamics": [authority],
+        "financial_info": ["Annual revenue of $80 million."],
+        "unspoken_interests": ["Keep the engineering team together."],
+    }
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.histories = os.path.join(self.folder.name, "histories")
+        self.personas = os.path.join(self.folder.name, "personas")
+        os.makedirs(self.histories)
+        os.makedirs(self.personas)
+
+        self.write_personas(
+            "personas_1",
+            persona("Orion Labs", "India", "The board must approve every deal."),
+            persona("Vega Soft", "Germany", "The founder decides alone."),
+        )
+        self.write_negotiation(
+            "negotiation_1",
+            [
+                "Orion Labs offers Vega Soft a deal with IP retention for the founders.",
+                "Vega Soft wants IP retention and IP licensing guarantees, IP first.",
+                "We accept the earn-out.",
+            ],
+        )
+        self.write_negotiation(
+            "negotiation_2",
+            [
+                "A plain offer with an earn-out.",
+                "The earn-out is too long; IP is not discussed.",
+            ],
+        )
+
+    def write_personas(self, name, acquirer, target):
+        path = os.path.join(self.personas, f"{name}.json")
+        with open(path, "w") as f:
+            json.dump({"acquirer": acquirer, "target": target}, f)
+        return path
+
+    def write_negotiation(self, name, messages, mtime=None):
+        path = os.path.join(self.histories, f"{name}.json")
+        roles = ("acquirer", "target")
+        with open(path, "w") as f:
+            json.dump(
+                [
+                    {"role": roles[i % 2], "message": message, "reasoning": ""}
+                    for i, message in enumerate(messages)
+                ],
+                f,
+            )
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def build(self):
+        index = SearchIndex()
+        index.update(self.histories, self.personas)
+        return index
+
+    def assert_same_results(self, index, query, **filters):
+        fresh = self.build()
+        self.assertEqual(index.search(query, **filters), fresh.search(query, **filters))
+
+    def test_tokenize_drops_stopwords(self):
+        self.assertEqual(tokenize("The IP and the Earn-Out"), ["ip", "earn", "out"])
+
+    def test_bm25_ranks_more_frequent_terms_first(self):
+        results = self.build().search("IP retention")
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["turn"], 2)
+        self.assertGreater(results[0]["score"], results[1]["score"])
+
+    def test_match_any(self):
+        index = self.build()
+        self.assertEqual(len(index.search("retention earn", match_all=False)), 5)
+        self.assertEqual(index.search("retention earn"), [])
+
+    def test_filters(self):
+        index = self.build()
+        self.assertEqual(
+            [r["turn"] for r in index.search("IP", role="target", limit=5)], [2, 2]
+        )
+        self.assertEqual([r["turn"] for r in index.search("earn", turn=(1, 2))], [1, 2])
+        board = index.search("board", fields=["authority_dynamics"], country="India")
+        self.assertEqual(len(board), 1)
+        self.assertEqual(board[0]["role"], "acquirer")
+        self.assertEqual(index.search("board", country="Germany"), [])
+        self.assertEqual(index.search("board", role="bidder"), [])
+
+    def test_transcripts_are_linked_to_persona_countries(self):
+        results = self.build().search("licensing")
+        self.assertEqual(results[0]["country"], "germany")
+
+    def test_unchanged_files_are_not_reindexed(self):
+        index = self.build()
+        self.assertEqual(index.update(self.histories, self.personas), 0)
+
+    def test_reindexed_files_replace_their_documents(self):
+        index = self.build()
+        self.write_negotiation(
+            "negotiation_1", ["A new opening about escrow."], mtime=1e9
+        )
+        self.write_personas(
+            "personas_1",
+            persona("Orion Labs", "India", "The board must approve every deal."),
+            persona("Vega Soft", "Germany", "The founder decides alone."),
+        )
+        os.utime(os.path.join(self.personas, "personas_1.json"), (2e9, 2e9))
+        self.assertEqual(index.update(self.histories, self.personas), 2)
+
+        self.assertEqual(index.search("licensing"), [])
+        self.assertEqual(len(index.search("escrow")), 1)
+        self.assertEqual(len(index.persona_pairs), 1)
+        self.assertEqual(len(index), len(self.build()))
+        self.assert_same_results(index, "earn")
+        self.assert_same_results(index, "ip", match_all=False)
+
+    def test_deleted_files_are_dropped(self):
+        index = self.build()
+        os.remove(os.path.join(self.histories, "negotiation_1.json"))
+        self.assertEqual(index.update(self.histories, self.personas), 1)
+        self.assertNotIn(
+            os.path.join(self.histories, "negotiation_1.json"), index.sources
+        )
+        self.assertEqual(len(index.search("IP")), 1)
+        self.assert_same_results(index, "earn")
+
+    @mock.patch.object(search_index, "COMPACT_FRACTION", 2.0)
+    def test_idf_ignores_dead_documents_before_compaction(self):
+        index = self.build()
+        os.remove(os.path.join(self.histories, "negotiation_1.json"))
+        index.update(self.histories, self.personas)
+        self.assertGreater(index.num_dead_docs, 0)
+        self.assert_same_results(index, "earn")
+        self.assert_same_results(index, "plain offer", match_all=False)
+
+    @mock.patch.object(search_index, "COMPACT_FRACTION", 0.1)
+    def test_compaction_removes_dead_documents(self):
+        index = self.build()
+        num_documents = len(index.doc_length)
+        os.remove(os.path.join(self.histories, "negotiation_1.json"))
+        index.update(self.histories, self.personas)
+
+        self.assertEqual(index.num_dead_docs, 0)
+        self.assertEqual(len(index.doc_length), len(index))
+        self.assertLess(len(index.doc_length), num_documents)
+        self.assertNotIn("licensing", index.postings)
+        self.assert_same_results(index, "earn")
+        self.assert_same_results(index, "board", fields=["authority_dynamics"])
+
+        # New files keep indexing correctly after compaction
+        self.write_negotiation("negotiation_3", ["Escrow for the earn-out."])
+        index.update(self.histories, self.personas)
+        self.assert_same_results(index, "earn")
+
+    def test_save_and_load(self):
+        index = self.build()
+        path = index.save(os.path.join(self.folder.name, "index.pkl"))
+        loaded = SearchIndex.load(path)
+        self.assertEqual(loaded.search("IP"), index.search("IP"))
+        self.assertEqual(loaded.update(self.histories, self.personas), 0)
+
+    def test_indexes_of_another_layout_are_rebuilt(self):
+        index = self.build()
+        index.format = 1
+        path = index.save(os.path.join(self.folder.name, "index.pkl"))
+        loaded = SearchIndex.load(path)
+        self.assertEqual(len(loaded), 0)
+        self.assertGreater(loaded.update(self.histories, self.personas), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
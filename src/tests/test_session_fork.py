@@ -0,0 +1,202 @@
+import random
+import unittest
+
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.negotiation_session import NegotiationSession
+from tests.test_deadlines import speaker
+from utilities.benchmark_utilities import synthetic_persona
+from utilities.sweep_utilities import run_sweep_tree
+
+
+def counting_backend(label):
+    """
+    Backend whose every turn quotes a new valuation, numbered by call.
+    """
+    calls = []
+
+    def respond(messages):
+        calls.append(messages)
+        return f"""{label} offer number {len(calls)}.
+```json
+{{"valuation": "${10 * len(calls)} million"}}
+```
+Company Negotiation State: pending"""
+
+    backend = ScriptedBackend(respond)
+    backend.calls = calls
+    return backend
+
+
+def first_target_turn_fails_backend():
+    """
+    Backend whose target fails every attempt of its first turn (empty responses), so that turn is skipped.
+    """
+    acquirer_calls = []
+
+    def respond(messages):
+        if speaker(messages) == "acquirer":
+            acquirer_calls.append(messages)
+        elif len(acquirer_calls) < 2:
+            return ""
+        return f"""Offer number {len(acquirer_calls)}.
+```json
+{{"valuation": "${10 * len(acquirer_calls)} million"}}
+```
+Company Negotiation State: pending"""
+
+    return ScriptedBackend(respond)
+
+
+class SessionForkTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.acquirer = synthetic_persona(rng, "acquirer", "US")
+        self.target = synthetic_persona(rng, "target", "India")
+        self.parent_log = NegotiationSession.run(
+            self.acquirer,
+            self.target,
+            counting_backend("Parent"),
+            num_rounds=2,
+            stream_content=False,
+            event_bus=EventBus(),
+        )
+
+    def fork(self, parent_log, fork_turn, backend, num_rounds=2):
+        return NegotiationSession.fork(
+            parent_log,
+            fork_turn,
+            self.acquirer,
+            self.target,
+            backend,
+            num_rounds=num_rounds,
+            stream_content=False,
+            event_bus=EventBus(),
+        )
+
+    def test_fork_replays_inherited_turns_and_generates_the_rest(self):
+        backend = counting_backend("Fork")
+        fork_log = self.fork(self.parent_log, 2, backend)
+
+        # Only the two turns after the fork point are generated
+        self.assertEqual(backend.num_calls, 2)
+        self.assertEqual(len(fork_log), 4)
+        self.assertEqual(
+            [entry.get("inherited", False) for entry in fork_log],
+            [True, True, False, False],
+        )
+        for inherited, parent in zip(fork_log[:2], self.parent_log[:2]):
+            self.assertEqual(inherited["message"], parent["message"])
+            self.assertEqual(inherited["role"], parent["role"])
+        self.assertNotIn("session_config", fork_log[1])
+
+        # The fork resumes with the acquirer and sees the inherited turns in its prompt
+        self.assertEqual(fork_log[2]["role"], "acquirer")
+        self.assertTrue(fork_log[2]["message"].startswith("Fork offer number 1"))
+        self.assertEqual(fork_log[2]["term_sheet_snapshot"]["valuation"], "$10 million")
+        prompt = " ".join(message["content"] for message in backend.calls[0])
+        self.assertIn("Parent offer number 2", prompt)
+
+    def test_fork_records_its_lineage(self):
+        fork_log = self.fork(self.parent_log, 3, counting_backend("Fork"))
+        parent_config = self.parent_log[-1]["session_config"]
+        fork_config = fork_log[-1]["session_config"]
+        self.assertNotEqual(fork_config["session_id"], parent_config["session_id"])
+        self.assertEqual(
+            fork_config["lineage"],
+            [{"session_id": parent_config["session_id"], "fork_turn": 3}],
+        )
+
+        # Forking a fork extends the chain
+        grandchild_log = self.fork(fork_log, 1, counting_backend("Grandchild"))
+        self.assertEqual(
+            grandchild_log[-1]["session_config"]["lineage"],
+            fork_config["lineage"]
+            + [{"session_id": fork_config["session_id"], "fork_turn": 1}],
+        )
+
+    def test_fork_does_not_change_the_parent_log(self):
+        snapshot = dict(self.parent_log[0]["term_sheet_snapshot"])
+        self.fork(self.parent_log, 2, counting_backend("Fork"))
+        self.assertEqual(self.parent_log[0]["term_sheet_snapshot"], snapshot)
+        self.assertNotIn("inherited", self.parent_log[0])
+
+    def test_fork_of_every_turn_generates_nothing(self):
+        backend = counting_backend("Fork")
+        fork_log = self.fork(self.parent_log, len(self.parent_log), backend)
+        self.assertEqual(backend.num_calls, 0)
+        self.assertTrue(all(entry["inherited"] for entry in fork_log))
+        self.assertEqual(fork_log[-1]["stop_reason"], "max_rounds")
+
+    def test_fork_resumes_after_a_skipped_turn(self):
+        parent_log = NegotiationSession.run(
+            self.acquirer,
+            self.target,
+            first_target_turn_fails_backend(),
+            num_rounds=2,
+            stream_content=False,
+            event_bus=EventBus(),
+        )
+        self.assertEqual(
+            [(entry["role"], entry["round"]) for entry in parent_log],
+            [("acquirer", 1), ("acquirer", 2), ("target", 2)],
+        )
+
+        # The target's turn of round 2 comes next, not a third acquirer turn
+        fork_log = self.fork(parent_log, 2, counting_backend("Fork"))
+        self.assertEqual(
+            [(entry["role"], entry["round"]) for entry in fork_log],
+            [("acquirer", 1), ("acquirer", 2), ("target", 2)],
+        )
+        self.assertEqual(fork_log[-1]["stop_reason"], "max_rounds")
+        self.assertEqual(
+            fork_log[-1]["skipped_turns"], [{"round": 1, "role": "target"}]
+        )
+
+        # A fork before the skipped turn plays it and inherits no skipped turns
+        fork_log = self.fork(parent_log, 1, counting_backend("Fork"))
+        self.assertEqual(
+            [(entry["role"], entry["round"]) for entry in fork_log],
+            [("acquirer", 1), ("target", 1), ("acquirer", 2), ("target", 2)],
+        )
+        self.assertNotIn("skipped_turns", fork_log[-1])
+
+    def test_legacy_logs_resume_by_alternation(self):
+        parent_log = [
+            {key: value for key, value in entry.items() if key != "round"}
+            for entry in self.parent_log
+        ]
+        fork_log = self.fork(parent_log, 3, counting_backend("Fork"))
+        self.assertEqual(
+            [entry["role"] for entry in fork_log],
+            ["acquirer", "target", "acquirer", "target"],
+        )
+        self.assertEqual(fork_log[-1]["round"], 2)
+
+    def test_sweep_tree_segment_resumes_after_a_skipped_turn(self):
+        result = run_sweep_tree(
+            self.acquirer,
+            self.target,
+            first_target_turn_fails_backend(),
+            {"two_rounds": {}, "three_rounds": {2: {"num_rounds": 3}}},
+            {"num_rounds": 2, "stream_content": False},
+            event_bus=EventBus(),
+        )
+        for variant, num_rounds in (("two_rounds", 2), ("three_rounds", 3)):
+            log = result["logs"][variant]
+            self.assertEqual(
+                [(entry["role"], entry["round"]) for entry in log[:3]],
+                [("acquirer", 1), ("acquirer", 2), ("target", 2)],
+            )
+            self.assertEqual(log[-1]["round"], num_rounds)
+            self.assertEqual(log[-1]["skipped_turns"], [{"round": 1, "role": "target"}])
+
+    def test_fork_turn_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self.fork(
+                self.parent_log, len(self.parent_log) + 1, counting_backend("Fork")
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import unittest
+
+from resources.token_budget import TokenBudget
+
+
+class TokenBudgetTest(unittest.TestCase):
+    def test_charges_pass_on_to_the_parent(self):
+        sweep = TokenBudget(max_tokens=1000)
+        session = sweep.child(max_tokens=300)
+        session.charge(100, 50)
+        self.assertEqual(session.spent_tokens, 150)
+        self.assertEqual(sweep.spent_tokens, 150)
+        self.assertEqual(sweep.num_calls, 1)
+
+    def test_child_is_exhausted_with_its_parent(self):
+        sweep = TokenBudget(max_tokens=100)
+        session = sweep.child(max_tokens=1000)
+        sweep.charge(100, 0)
+        self.assertTrue(session.exhausted())
+
+    def test_reserve_commits_the_child_limit(self):
+        sweep = TokenBudget(max_tokens=1000)
+        first = sweep.child(max_tokens=600)
+        second = sweep.child(max_tokens=600)
+        self.assertTrue(sweep.reserve(first))
+        self.assertFalse(sweep.reserve(second))
+        self.assertFalse(sweep.committed())
+        self.assertEqual(sweep.stats()["running"], 1)
+
+    def test_spending_frees_the_reserved_part(self):
+        sweep = TokenBudget(max_tokens=1000)
+        first = sweep.child(max_tokens=600)
+        second = sweep.child(max_tokens=400)
+        self.assertTrue(sweep.reserve(first))
+        self.assertTrue(sweep.reserve(second))
+        self.assertTrue(sweep.committed())
+
+        # Only the unspent part of a reservation stays committed
+        first.charge(500, 0)
+        third = sweep.child(max_tokens=100)
+        self.assertFalse(sweep.reserve(third))
+        sweep.release(first)
+        self.assertTrue(sweep.reserve(third))
+        self.assertEqual(sweep.spent_tokens, 500)
+
+    def test_release_of_an_unknown_child_is_a_no_op(self):
+        sweep = TokenBudget(max_cost=1.0)
+        sweep.release(sweep.child(max_cost=0.5))
+        self.assertEqual(sweep.reservations, [])
+
+    def test_unlimited_children_reserve_nothing(self):
+        sweep = TokenBudget(max_tokens=100)
+        children = [sweep.child() for _ in range(5)]
+        self.assertTrue(all(sweep.reserve(child) for child in children))
+        self.assertFalse(sweep.committed())
+
+    def test_cost_reservations(self):
+        sweep = TokenBudget(
+            max_cost=1.0,
+            prompt_cost_per_million=1.0,
+            completion_cost_per_million=2.0,
+        )
+        session = sweep.child(max_cost=0.8)
+        self.assertTrue(sweep.reserve(session))
+        self.assertFalse(sweep.reserve(sweep.child(max_cost=0.5)))
+        self.assertAlmostEqual(session.charge(0, 100_000), 0.2)
+        sweep.release(session)
+        self.assertTrue(sweep.reserve(sweep.child(max_cost=0.5)))
+
+    def test_exhausted_budget_reserves_nothing(self):
+        sweep = TokenBudget(max_tokens=100)
+        sweep.charge(60, 40)
+        self.assertFalse(sweep.reserve(sweep.child()))
+
+    def test_state_file_survives_restarts(self):
+        with tempfile.TemporaryDirectory() as folder:
+            state_file = os.path.join(folder, "budget", "state.json")
+            budget = TokenBudget(max_tokens=1000, state_file=state_file)
+            budget.charge(10, 5)
+            budget.record("session", {"done": True})
+
+            restored = TokenBudget(max_tokens=1000, state_file=state_file)
+            self.assertEqual(restored.spent_tokens, 15)
+            self.assertEqual(restored.records, {"session": {"done": True}})
+            with open(state_file, "r") as f:
+                self.assertEqual(json.load(f)["num_calls"], 1)
+
+    def test_charges_save_the_spending_at_an_interval(self):
+        with tempfile.TemporaryDirectory() as folder:
+            state_file = os.path.join(folder, "state.json")
+            budget = TokenBudget(state_file=state_file, save_interval=3600)
+            session = budget.child()
+            for _ in range(3):
+                session.charge(10, 5)
+            self.assertFalse(os.path.exists(state_file))
+
+            # Records are saved right away, with the spending so far
+            budget.record("session", {"done": True})
+            with open(state_file, "r") as f:
+                self.assertEqual(json.load(f)["spent_tokens"], 45)
+            session.charge(10, 5)
+            self.assertEqual(TokenBudget(state_file=state_file).spent_tokens, 45)
+            budget.save()
+            self.assertEqual(TokenBudget(state_file=state_file).spent_tokens, 60)
+
+            # Without an interval every charge is saved
+            budget.save_interval = 0
+            session.charge(10, 5)
+            self.assertEqual(TokenBudget(state_file=state_file).num_calls, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
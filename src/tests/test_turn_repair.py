@@ -0,0 +1,101 @@
+import random
+import unittest
+
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.negotiation_session import NegotiationSession
+from utilities.benchmark_utilities import synthetic_persona
+
+REPAIR_SYSTEM_MESSAGE = "You complete the formatting of M&A negotiation statements."
+TERMS = """```json
+{"valuation": "$50 million", "payment_structure": "all cash"}
+```"""
+
+
+def repairing_backend(turn, repair):
+    """
+    Backend answering negotiation prompts with `turn` and repair prompts with `repair`.
+    """
+    prompts = []
+
+    def respond(messages):
+        if messages[0]["content"] == REPAIR_SYSTEM_MESSAGE:
+            prompts.append(messages[-1]["content"])
+            return repair
+        return turn
+
+    backend = ScriptedBackend(respond)
+    backend.repair_prompts = prompts
+    return backend
+
+
+class TurnRepairTest(unittest.TestCase):
+    def run_session(self, backend, **kwargs):
+        rng = random.Random(0)
+        return NegotiationSession.run(
+            synthetic_persona(rng, "acquirer", "US"),
+            synthetic_persona(rng, "target", "India"),
+            backend,
+            num_rounds=1,
+            stream_content=False,
+            event_bus=EventBus(),
+            **kwargs,
+        )
+
+    def test_missing_term_sheet_and_state_are_repaired(self):
+        backend = repairing_backend(
+            "We offer $50 million, paid in cash.",
+            f"{TERMS}\nCompany Negotiation State: pending",
+        )
+        negotiation_log = self.run_session(backend)
+
+        # One turn call and one repair call per turn
+        self.assertEqual(backend.num_calls, 4)
+        for entry in negotiation_log:
+            self.assertEqual(entry["repair"]["missing"], ["term_sheet", "state"])
+            self.assertEqual(entry["repair"]["repaired"], ["term_sheet", "state"])
+            self.assertEqual(entry["negotiation_state"], "pending")
+            self.assertEqual(entry["term_sheet_snapshot"]["valuation"], "$50 million")
+            self.assertTrue(entry["message"].startswith("We offer $50 million"))
+
+        # The repair prompt holds the statement, not the negotiation history
+        self.assertIn("We offer $50 million, paid in cash.", backend.repair_prompts[0])
+
+    def test_only_the_missing_state_is_requested(self):
+        backend = repairing_backend(
+            f"We offer $50 million.\n{TERMS}",
+            "Company Negotiation State: pending",
+        )
+        negotiation_log = self.run_session(backend)
+        self.assertEqual(negotiation_log[0]["repair"]["missing"], ["state"])
+        self.assertEqual(negotiation_log[0]["repair"]["repaired"], ["state"])
+        self.assertNotIn("```json", backend.repair_prompts[0].split("Statement:")[0])
+
+    def test_well_formed_turns_need_no_repair(self):
+        backend = repairing_backend(
+            f"We offer $50 million.\n{TERMS}\nCompany Negotiation State: pending",
+            "unused",
+        )
+        negotiation_log = self.run_session(backend)
+        self.assertEqual(backend.num_calls, 2)
+        self.assertTrue(all("repair" not in entry for entry in negotiation_log))
+
+    def test_failed_repair_is_recorded(self):
+        backend = repairing_backend("We offer $50 million.", "I cannot help.")
+        negotiation_log = self.run_session(backend)
+        self.assertEqual(negotiation_log[0]["repair"]["repaired"], [])
+
+    def test_repair_can_be_disabled(self):
+        backend = repairing_backend(
+            "We offer $50 million, paid in cash.",
+            f"{TERMS}\nCompany Negotiation State: pending",
+        )
+        negotiation_log = self.run_session(backend, repair_turns=False)
+        self.assertEqual(backend.num_calls, 2)
+        self.assertEqual(backend.repair_prompts, [])
+        self.assertTrue(all("repair" not in entry for entry in negotiation_log))
+        self.assertFalse(negotiation_log[-1]["session_config"]["repair_turns"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,370 @@
+import argparse
+import json
+import math
+import os
+import warnings
+from typing import Any, Optional
+
+import numpy as np
+
+from utilities.term_sheet_utilities import parse_money, parse_valuation
+from utilities.tracing_utilities import traced
+
+# Metrics computed for every session (completion rate is the mean of `completed`)
+METRICS = ("num_turns", "final_valuation", "reciprocity", "completed")
+
+# Stop reasons that count as a completed negotiation (both sides agreed; converged offers are not an agreement)
+COMPLETED_STOP_REASONS = ("both_complete", "bidder_selected")
+
+# Upper bound on resampled indices held in memory at once during bootstrapping
+BOOTSTRAP_BLOCK_ELEMENTS = 4_000_000
+
+
+def is_completed(negotiation_log: list[dict[str, Any]]) -> bool:
+    """
+    Tells whether both parties agreed: from the stop reason, or for logs saved before stop reasons were recorded, from the last two turns declaring 'complete' for different roles.
+
+    Args:
+        negotiation_log (list[dict[str, Any]]): A saved negotiation log.
+
+    Returns:
+        returns (bool): True if the negotiation completed.
+    """
+    if not negotiation_log:
+        return False
+    if "stop_reason" in negotiation_log[-1]:
+        return negotiation_log[-1]["stop_reason"] in COMPLETED_STOP_REASONS
+    last_turns = negotiation_log[-2:]
+    return (
+        len(last_turns) == 2
+        and all(entry.get("negotiation_state") == "complete" for entry in last_turns)
+        and last_turns[0].get("role") != last_turns[1].get("role")
+    )
+
+
+def session_metrics(negotiation_log: list[dict[str, Any]]) -> dict[str, float]:
+    """
+    Computes the comparison metrics of one negotiation.
+
+    Args:
+        negotiation_log (list[dict[str, Any]]): A saved negotiation log.
+
+    Returns:
+        returns (dict[str, float]): `num_turns`, `final_valuation` (money amount of the final term sheet), `reciprocity` (mean ratio of acquirer to target valuation concessions, as defined in the README; money amounts if any were quoted, else multiples) and `completed` (1.0 or 0.0, see `is_completed`). Metrics that cannot be determined are NaN.
+    """
+    if not negotiation_log:
+        return {metric: math.nan for metric in METRICS}
+
+    final_entry = negotiation_log[-1]
+    final_valuation = parse_money(
+        (final_entry.get("term_sheet_snapshot") or {}).get("valuation")
+    )
+
+    # Valuation on the table after each party's turns, in the session's main unit (money amounts if any were quoted, else multiples)
+    valuations = []
+    for entry in negotiation_log:
+        valuation = parse_valuation(
+            (entry.get("term_sheet_snapshot") or {}).get("valuation")
+        )
+        if valuation is not None and entry.get("role") in ("acquirer", "target"):
+            valuations.append((entry["role"], *valuation))
+    unit = (
+        "money"
+        if any(value_unit == "money" for _, _, value_unit in valuations)
+        else "multiple"
+    )
+    offers = {"acquirer": [], "target": []}
+    for role, value, value_unit in valuations:
+        if value_unit == unit:
+            offers[role].append(value)
+
+    # r(i) = |Δ acquirer offer(i)| / |Δ target offer(i)| over paired concessions
+    acquirer_deltas = np.abs(np.diff(offers["acquirer"]))
+    target_deltas = np.abs(np.diff(offers["target"]))
+    num_pairs = min(len(acquirer_deltas), len(target_deltas))
+    acquirer_deltas, target_deltas = (
+        acquirer_deltas[:num_pairs],
+        target_deltas[:num_pairs],
+    )
+    moved = target_deltas > 0
+    reciprocity = (
+        float(np.mean(acquirer_deltas[moved] / target_deltas[moved]))
+        if moved.any()
+        else math.nan
+    )
+
+    return {
+        "num_turns": float(len(negotiation_log)),
+        "final_valuation": final_valuation if final_valuation is not None else math.nan,
+        "reciprocity": reciprocity,
+        "completed": float(is_completed(negotiation_log)),
+    }
+
+
+@traced("analysis.load_sessions", "analysis")
+def load_sessions(
+    folder: str = "negotiation_histories",
+    group_by: tuple[str, ...] = ("acquirer_country", "target_country"),
+) -> tuple[list[tuple], np.ndarray]:
+    """
+    Loads every saved negotiation of a folder and computes its metrics.
+
+    Args:
+        folder (str, optional): Folder with negotiation log JSON files. Defaults to "negotiation_histories".
+        group_by (tuple[str, ...], optional): Session config fields (see `NegotiationSession`) that define a configuration. Defaults to the country pair.
+
+    Returns:
+        returns (tuple[list[tuple], np.ndarray]): The configuration of each session (one value per `group_by` field, 'unknown' for sessions saved without a config) and a `(num_sessions, len(METRICS))` metric matrix.
+    """
+    configs = []
+    rows = []
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(folder, filename), "r") as f:
+            negotiation_log = json.load(f)
+        if not negotiation_log:
+            continue
+
+        session_config = negotiation_log[-1].get("session_config") or {}
+        configs.append(
+            tuple(str(session_config.get(key, "unknown")) for key in group_by)
+        )
+        metrics = session_metrics(negotiation_log)
+        rows.append([metrics[metric] for metric in METRICS])
+
+    return configs, np.array(rows, dtype=np.float64).reshape(-1, len(METRICS))
+
+
+def bootstrap_means(
+    values: np.ndarray, num_bootstrap: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Draws bootstrap replicates of the mean of every metric column at once.
+
+    Args:
+        values (np.ndarray): `(num_sessions, num_metrics)` matrix; NaN marks a missing metric.
+        num_bootstrap (int): Number of bootstrap replicates.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        returns (np.ndarray): `(num_bootstrap, num_metrics)` replicate means (NaN where a replicate has no value).
+    """
+    num_sessions = len(values)
+    if num_sessions == 0:
+        return np.full((num_bootstrap, values.shape[1]), np.nan)
+
+    # Missing values count as zero with zero weight, so every metric shares one resample
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    weights = present.astype(np.float64)
+
+    # Replicates are drawn in blocks to bound the memory of the index matrix
+    block_size = max(1, BOOTSTRAP_BLOCK_ELEMENTS // num_sessions)
+    replicates = np.empty((num_bootstrap, values.shape[1]))
+    for start in range(0, num_bootstrap, block_size):
+        size = min(block_size, num_bootstrap - start)
+        indices = rng.integers(0, num_sessions, size=(size, num_sessions))
+        # Per-replicate counts of every session turn the resample into a matrix product
+        offsets = (np.arange(size) * num_sessions)[:, None]
+        counts = np.bincount(
+            (indices + offsets).ravel(), minlength=size * num_sessions
+        ).reshape(size, num_sessions)
+        sums = counts @ filled
+        totals = counts @ weights
+        with np.errstate(invalid="ignore", divide="ignore"):
+            replicates[start : start + size] = np.where(
+                totals > 0, sums / totals, np.nan
+            )
+    return replicates
+
+
+def _percentile_interval(
+    replicates: np.ndarray, confidence: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the percentile bootstrap interval of every column.
+    """
+    alpha = (1 - confidence) / 2
+    with np.errstate(invalid="ignore"):
+        low, high = np.nanquantile(replicates, [alpha, 1 - alpha], axis=0)
+    return low, high
+
+
+def cohens_d(values: np.ndarray, baseline: np.ndarray) -> np.ndarray:
+    """
+    Standardized mean difference (pooled standard deviation) of every metric column.
+
+    Args:
+        values (np.ndarray): Metric matrix of the compared configuration.
+        baseline (np.ndarray): Metric matrix of the baseline configuration.
+
+    Returns:
+        returns (np.ndarray): Cohen's d per metric (NaN if undefined).
+    """
+    n1 = np.sum(~np.isnan(values), axis=0)
+    n2 = np.sum(~np.isnan(baseline), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var1 = np.nanvar(values, axis=0, ddof=1) if len(values) > 1 else np.nan
+        var2 = np.nanvar(baseline, axis=0, ddof=1) if len(baseline) > 1 else np.nan
+        pooled = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2))
+        return (np.nanmean(values, axis=0) - np.nanmean(baseline, axis=0)) / pooled
+
+
+@traced("analysis.compare", "analysis")
+def compare_configurations(
+    configs: list[tuple],
+    metrics: np.ndarray,
+    baseline: Optional[tuple] = None,
+    num_bootstrap: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    """
+    Compares metric distributions across configurations with bootstrap confidence intervals, and against a baseline configuration with bootstrap intervals of the mean difference and Cohen's d.
+
+    Args:
+        configs (list[tuple]): Configuration of each session (see `load_sessions`).
+        metrics (np.ndarray): `(num_sessions, len(METRICS))` metric matrix.
+        baseline (Optional[tuple], optional): Configuration the others are compared to. Defaults to the configuration with the most sessions.
+        num_bootstrap (int, optional): Number of bootstrap replicates. Defaults to 2000.
+        confidence (float, optional): Confidence level of the intervals. Defaults to 0.95.
+        seed (int, optional): Seed of the bootstrap random generator. Defaults to 0.
+
+    Returns:
+        returns (list[dict[str, Any]]): One entry per configuration (baseline first) with `config`, `num_sessions` and, per metric, `mean`, `ci_low`, `ci_high` and (for non-baseline configurations) `diff`, `diff_ci_low`, `diff_ci_high` and `cohens_d`.
+    """
+    # Metrics missing for a whole group (e.g., no valuations) produce NaN without warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        rng = np.random.default_rng(seed)
+
+        # Group session rows by configuration
+        groups: dict[tuple, list[int]] = {}
+        for row, config in enumerate(configs):
+            groups.setdefault(config, []).append(row)
+        if not groups:
+            return []
+        if baseline is None or baseline not in groups:
+            baseline = max(groups, key=lambda config: len(groups[config]))
+
+        ordered = [baseline] + sorted(config for config in groups if config != baseline)
+        baseline_values = metrics[groups[baseline]]
+        baseline_replicates = bootstrap_means(baseline_values, num_bootstrap, rng)
+
+        report = []
+        for config in ordered:
+            values = metrics[groups[config]]
+            replicates = (
+                baseline_replicates
+                if config == baseline
+                else bootstrap_means(values, num_bootstrap, rng)
+            )
+            means = np.nanmean(values, axis=0)
+            ci_low, ci_high = _percentile_interval(replicates, confidence)
+
+            entry = {"config": config, "num_sessions": len(values), "metrics": {}}
+            if config != baseline:
+                # Independent resamples of both groups give the interval of the difference
+                diff_low, diff_high = _percentile_interval(
+                    replicates - baseline_replicates, confidence
+                )
+                effect_sizes = cohens_d(values, baseline_values)
+
+            for i, metric in enumerate(METRICS):
+                metric_entry = {
+                    "mean": float(means[i]),
+                    "ci_low": float(ci_low[i]),
+                    "ci_high": float(ci_high[i]),
+                }
+                if config != baseline:
+                    metric_entry.update(
+                        diff=float(means[i] - np.nanmean(baseline_values[:, i])),
+                        diff_ci_low=float(diff_low[i]),
+                        diff_ci_high=float(diff_high[i]),
+                        cohens_d=float(effect_sizes[i]),
+                    )
+                entry["metrics"][metric] = metric_entry
+            report.append(entry)
+
+    return report
+
+
+def format_report(
+    report: list[dict[str, Any]], group_by: tuple[str, ...], confidence: float = 0.95
+) -> str:
+    """
+    Renders a comparison report as Markdown tables (one per metric).
+
+    Args:
+        report (list[dict[str, Any]]): Output of `compare_configurations`.
+        group_by (tuple[str, ...]): Names of the configuration fields.
+        confidence (float, optional): Confidence level used for the intervals. Defaults to 0.95.
+
+    Returns:
+        returns (str): The Markdown report.
+    """
+
+    def fmt(value: float) -> str:
+        if math.isnan(value):
+            return "n/a"
+        return f"{value:,.3g}" if abs(value) < 1e4 else f"{value:,.0f}"
+
+    level = f"{confidence:.0%}"
+    lines = []
+    for metric in METRICS:
+        label = "completion rate" if metric == "completed" else metric
+        lines.append(f"### {label}\n")
+        lines.append(
+            f"| {' / '.join(group_by)} | Sessions | Mean | {level} CI | Δ vs baseline | {level} CI of Δ | Cohen's d |"
+        )
+        lines.append("|---|---|---|---|---|---|---|")
+        for i, entry in enumerate(report):
+            values = entry["metrics"][metric]
+            config = " / ".join(entry["config"]) + (" (baseline)" if i == 0 else "")
+            if i == 0:
+                diff_cols = "– | – | –"
+            else:
+                diff_cols = (
+                    f"{fmt(values['diff'])} | [{fmt(values['diff_ci_low'])}, {fmt(values['diff_ci_high'])}] | "
+                    f"{fmt(values['cohens_d'])}"
+                )
+            lines.append(
+                f"| {config} | {entry['num_sessions']} | {fmt(values['mean'])} | "
+                f"[{fmt(values['ci_low'])}, {fmt(values['ci_high'])}] | {diff_cols} |"
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Usage (from the `src` folder): python -m utilities.analysis_utilities --group-by prompt_variant
+    parser = argparse.ArgumentParser(
+        description="Compare stored negotiations grouped by configuration."
+    )
+    parser.add_argument("--histories", default="negotiation_histories")
+    parser.add_argument(
+        "--group-by", nargs="+", default=["acquirer_country", "target_country"]
+    )
+    parser.add_argument("--baseline", nargs="+", help="Baseline configuration values")
+    parser.add_argument("--bootstrap", type=int, default=2000)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    group_by = tuple(args.group_by)
+    configs, metrics = load_sessions(args.histories, group_by)
+    report = compare_configurations(
+        configs,
+        metrics,
+        baseline=tuple(args.baseline) if args.baseline else None,
+        num_bootstrap=args.bootstrap,
+        confidence=args.confidence,
+        seed=args.seed,
+    )
+    print(format_report(report, group_by, args.confidence))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
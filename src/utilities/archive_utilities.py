@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+
+from resources.corpus_archive import CorpusArchive
+
+
+def import_folders(
+    archive_folder: str,
+    histories_folder: str = "negotiation_histories",
+    personas_folder: str = "generated_personas",
+    codec: str = "gzip",
+) -> tuple[int, int]:
+    """
+    Packs the JSON files of the negotiation history and persona folders into a compressed archive. Files already in the archive are skipped, so the import can be re-run incrementally.
+
+    Args:
+        archive_folder (str): Destination archive directory.
+        histories_folder (str, optional): Folder with negotiation log JSON files. Defaults to "negotiation_histories".
+        personas_folder (str, optional): Folder with persona JSON files. Defaults to "generated_personas".
+        codec (str, optional): Compression codec for a new archive ('gzip' or 'zstd'). Defaults to "gzip".
+
+    Returns:
+        returns (tuple[int, int]): Number of imported negotiation logs and persona files.
+    """
+    counts = {"negotiation": 0, "personas": 0}
+
+    with CorpusArchive(archive_folder, codec=codec) as archive:
+        for kind, folder in (
+            ("negotiation", histories_folder),
+            ("personas", personas_folder),
+        ):
+            if not os.path.exists(folder):
+                continue
+
+            for filename in sorted(os.listdir(folder)):
+                key, extension = os.path.splitext(filename)
+                if extension != ".json" or key in archive:
+                    continue
+
+                with open(os.path.join(folder, filename), "r") as f:
+                    data = json.load(f)
+                if kind == "negotiation":
+                    archive.add_negotiation(key, data)
+                else:
+                    archive.add_personas(key, data)
+                counts[kind] += 1
+
+    print(
+        f"Imported {counts['negotiation']} negotiation logs and {counts['personas']} persona files into: {archive_folder}"
+    )
+    return counts["negotiation"], counts["personas"]
+
+
+def export_archive(
+    archive_folder: str,
+    histories_folder: str = "negotiation_histories",
+    personas_folder: str = "generated_personas",
+) -> tuple[int, int]:
+    """
+    Unpacks an archive back into one pretty-printed JSON file per negotiation log and persona pair.
+
+    Args:
+        archive_folder (str): Source archive directory.
+        histories_folder (str, optional): Destination folder for negotiation logs. Defaults to "negotiation_histories".
+        personas_folder (str, optional): Destination folder for persona files. Defaults to "generated_personas".
+
+    Returns:
+        returns (tuple[int, int]): Number of exported negotiation logs and persona files.
+    """
+    archive = CorpusArchive(archive_folder)
+    os.makedirs(histories_folder, exist_ok=True)
+    os.makedirs(personas_folder, exist_ok=True)
+
+    # Write every archived entry back to its original file name
+    negotiation_keys = archive.keys("negotiation")
+    for key in negotiation_keys:
+        with open(os.path.join(histories_folder, f"{key}.json"), "w") as f:
+            json.dump(archive.read_negotiation(key), f, indent=2)
+
+    persona_keys = archive.keys("personas")
+    for key in persona_keys:
+        with open(os.path.join(personas_folder, f"{key}.json"), "w") as f:
+            json.dump(archive.read_personas(key), f, indent=2)
+
+    print(
+        f"Exported {len(negotiation_keys)} negotiation logs and {len(persona_keys)} persona files from: {archive_folder}"
+    )
+    return len(negotiation_keys), len(persona_keys)
+
+
+if __name__ == "__main__":
+    # Usage (from the `src` folder): python -m utilities.archive_utilities import|export
+    parser = argparse.ArgumentParser(
+        description="Import or export the negotiation/persona corpus archive."
+    )
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--archive", default="corpus_archive")
+    parser.add_argument("--histories", default="negotiation_histories")
+    parser.add_argument("--personas", default="generated_personas")
+    parser.add_argument("--codec", default="gzip", choices=["gzip", "zstd"])
+    args = parser.parse_args()
+
+    if args.command == "import":
+        import_folders(args.archive, args.histories, args.personas, args.codec)
+    else:
+        export_archive(args.archive, args.histories, args.personas)
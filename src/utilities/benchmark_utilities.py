@@ -0,0 +1,444 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+from resources.event_stream import EventBus
+from resources.llm_backends import ScriptedBackend
+from resources.negotiation_session import NegotiationSession
+from utilities.llm_utilities import prompt_llm
+from utilities.negotiation_utilities import save_negotiation_log
+from visualize_negotiations.generate_negotiation_html import render_negotiation_html
+
+# Corpus sizes (number of logs) benchmarked by default; `--full` adds 10,000 logs
+DEFAULT_CORPUS_SIZES = (1, 100, 1000)
+FULL_CORPUS_SIZES = (1, 100, 1000, 10000)
+
+# Longest synthetic session (in turns)
+MAX_TURNS = 50
+
+DEFAULT_BASELINE_PATH = "benchmark_baseline.json"
+
+# Allowed relative drop in throughput / growth in peak memory before a result counts as a regression
+DEFAULT_THROUGHPUT_THRESHOLD = 0.25
+DEFAULT_MEMORY_THRESHOLD = 0.2
+
+# Each benchmark is repeated at least this long (best run counts)
+MIN_BENCHMARK_SECONDS = 0.3
+
+# Peak memory differences below this many KB are noise
+MEMORY_SLACK_KB = 64
+
+WORDS = (
+    "valuation synergy earn-out diligence timeline board approval revenue multiple "
+    "cash stock retention integration regulatory market share risk premium escrow "
+    "milestone leadership culture technology platform customers growth margin"
+).split()
+
+
+def _sentence(rng: random.Random, min_words: int = 8, max_words: int = 20) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, num_sentences: int) -> str:
+    return " ".join(_sentence(rng) for _ in range(num_sentences))
+
+
+def synthetic_persona(rng: random.Random, role: str, country: str) -> dict[str, Any]:
+    """
+    Builds a persona shaped like the output of `BusinessPersona.generate`.
+
+    Args:
+        rng (random.Random): Random number generator.
+        role (str): 'acquirer' or 'target'.
+        country (str): Country the company is based in.
+
+    Returns:
+        returns (dict[str, Any]): The persona.
+    """
+    name = f"{rng.choice(WORDS).capitalize()} {rng.choice(['Holdings', 'Systems', 'Group'])}"
+    persona = {"role_in_acquisition": role, "country_based": country}
+    for field in (
+        "business_descr",
+        "cultural_profile",
+        "authority_dynamics",
+        "financial_info",
+        "unspoken_interests",
+    ):
+        text = _paragraph(rng, 3)
+        if field == "business_descr":
+            text = f"{name} is a company based in {country}. {text}"
+        persona[field] = (text, _paragraph(rng, 4), _paragraph(rng, 2))
+    return persona
+
+
+def synthetic_log(rng: random.Random, num_turns: int) -> list[dict[str, Any]]:
+    """
+    Builds a negotiation log with realistic message shapes: a few paragraphs, a JSON term sheet and a state line per turn, with the valuation conceding over time.
+
+    Args:
+        rng (random.Random): Random number generator.
+        num_turns (int): Number of turns.
+
+    Returns:
+        returns (list[dict[str, Any]]): The log.
+    """
+    log = []
+    valuation = rng.uniform(50, 500)
+    for turn in range(num_turns):
+        valuation *= rng.uniform(0.95, 1.05)
+        term_sheet = {
+            "valuation": f"${valuation:.1f} million",
+            "payment_structure": f"{rng.randint(40, 90)}% cash, remainder in stock",
+            "earn_out": f"${rng.uniform(5, 50):.1f} million over {rng.randint(1, 4)} years",
+            "due_diligence_timeline": f"{rng.randint(4, 16)} weeks",
+            "other_key_terms": _sentence(rng),
+        }
+        state = "complete" if turn == num_turns - 1 else "pending"
+        message = (
+            f"{_paragraph(rng, rng.randint(3, 8))}\n\n"
+            f"```json\n{json.dumps(term_sheet, indent=2)}\n```\n\n"
+            f"**Company Negotiation State: [{state}]**"
+        )
+        log.append(
+            {
+                "role": "acquirer" if turn % 2 == 0 else "target",
+                "message": message,
+                "reasoning": _paragraph(rng, rng.randint(5, 15)),
+                # The real query repeats the whole history; a prefix keeps large corpora in memory
+                "query": _paragraph(rng, 10),
+                "negotiation_state": state,
+                "term_sheet_snapshot": term_sheet,
+            }
+        )
+    return log
+
+
+def synthetic_corpus(num_logs: int, seed: int = 0) -> list[list[dict[str, Any]]]:
+    """
+    Builds a corpus of logs from 2 to MAX_TURNS turns (short sessions are more common, like in real runs).
+
+    Args:
+        num_logs (int): Number of logs.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        returns (list[list[dict[str, Any]]]): The logs.
+    """
+    rng = random.Random(seed)
+    return [
+        synthetic_log(rng, min(MAX_TURNS, 2 + int(rng.expovariate(1 / 10))))
+        for _ in range(num_logs)
+    ]
+
+
+def _make_session(rng: random.Random) -> NegotiationSession:
+    # Constructing a session builds the system prompts only; no LLM call is made
+    return NegotiationSession(
+        synthetic_persona(rng, "acquirer", "US"),
+        synthetic_persona(rng, "target", "India"),
+        ScriptedBackend("unused"),
+        num_rounds=MAX_TURNS,
+        stream_content=False,
+        event_bus=EventBus(),
+    )
+
+
+def _streamed_text(entry: dict[str, Any]) -> str:
+    return f"<think>{entry['reasoning']}</think>\n\n{entry['message']}"
+
+
+def build_benchmarks(
+    corpus: list[list[dict[str, Any]]], workdir: str
+) -> dict[str, tuple[Callable[[], None], int]]:
+    """
+    Prepares the benchmarks for one corpus. Each benchmark is a function processing the whole corpus once, paired with its number of operations.
+
+    Args:
+        corpus (list[list[dict[str, Any]]]): Synthetic logs.
+        workdir (str): Scratch folder for benchmarks writing files.
+
+    Returns:
+        returns (dict[str, tuple[Callable[[], None], int]]): Benchmark names mapped to (function, operations per call).
+    """
+    rng = random.Random(1)
+    session = _make_session(rng)
+    persona = {"acquirer": session.acquirer, "target": session.target}
+    entries = [entry for log in corpus for entry in log]
+    messages = [entry["message"] for entry in entries]
+
+    def user_prompt() -> None:
+        for log in corpus:
+            session._create_user_prompt(log)
+
+    def extract_term_sheet() -> None:
+        for message in messages:
+            session._extract_term_sheet_from_response(message)
+
+    def extract_state() -> None:
+        for message in messages:
+            session._extract_negotiation_state(message)
+
+    def extract_company_name() -> None:
+        for log in corpus:
+            session._extract_company_name(session.acquirer["business_descr"][0])
+            session._extract_company_name(session.target["business_descr"][0])
+
+    # One LLM call per log, answering with the log's last turn (chunked like the real stream)
+    last_entries = [log[-1] for log in corpus]
+    backend = ScriptedBackend([_streamed_text(entry) for entry in last_entries])
+    events = EventBus().bind("bench")
+
+    def prompt_stream() -> None:
+        for _ in last_entries:
+            prompt_llm(
+                [{"role": "user", "content": "Respond."}],
+                backend,
+                stream_content=True,
+                events=events,
+            )
+
+    save_folder = os.path.join(workdir, "histories")
+
+    def save_logs() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for log in corpus:
+                save_negotiation_log(log, folder=save_folder)
+        shutil.rmtree(save_folder)
+
+    def render_html() -> None:
+        for log in corpus:
+            render_negotiation_html(log, persona)
+
+    return {
+        "create_user_prompt": (user_prompt, len(corpus)),
+        "extract_term_sheet": (extract_term_sheet, len(messages)),
+        "extract_negotiation_state": (extract_state, len(messages)),
+        "extract_company_name": (extract_company_name, 2 * len(corpus)),
+        "prompt_llm_stream": (prompt_stream, len(last_entries)),
+        "save_negotiation_log": (save_logs, len(corpus)),
+        "render_negotiation_html": (render_html, len(corpus)),
+    }
+
+
+def _reference_workload() -> None:
+    """
+    Fixed mix of string formatting, regex and JSON work, timed next to every benchmark. Throughput relative to it cancels out most of the machine's speed and load, so baselines stay comparable between runs.
+    """
+    record = {"valuation": "$120 million", "earn_out": "$10 million over 2 years"}
+    for i in range(2000):
+        text = f"Turn {i}: {json.dumps(record)} Company Negotiation State: [pending]"
+        REFERENCE_PATTERN.search(text)
+        json.loads(text[text.index("{") : text.rindex("}") + 1])
+
+
+REFERENCE_PATTERN = re.compile(r"Negotiation\s+State\s*[:\[]?\s*(pending|complete)")
+
+
+def _measure(function: Callable[[], None], repeat: int) -> tuple[float, float, float]:
+    """
+    Times a benchmark (best of at least `repeat` runs, alternating with the reference workload) and measures its peak memory in a separate run, since tracing allocations slows the code down.
+
+    Returns:
+        returns (tuple[float, float, float]): Best wall-clock seconds of the benchmark, best seconds of the reference workload and peak allocated KB.
+    """
+    best = best_reference = float("inf")
+    runs = 0
+    first_start = time.perf_counter()
+
+    # Small corpora are repeated for a while, so their timings are not dominated by noise
+    while runs < repeat or time.perf_counter() - first_start < MIN_BENCHMARK_SECONDS:
+        start = time.perf_counter()
+        _reference_workload()
+        best_reference = min(best_reference, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+        runs += 1
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, best_reference, (peak - baseline) / 1024
+
+
+def run_benchmarks(
+    corpus_sizes: tuple[int, ...] = DEFAULT_CORPUS_SIZES,
+    only: Optional[list[str]] = None,
+    seed: int = 0,
+) -> dict[str, dict[str, float]]:
+    """
+    Runs every benchmark on synthetic corpora of each size. Everything runs offline (LLM calls go to a scripted in-process backend).
+
+    Args:
+        corpus_sizes (tuple[int, ...], optional): Numbers of logs per corpus. Defaults to DEFAULT_CORPUS_SIZES.
+        only (Optional[list[str]], optional): Names of the benchmarks to run. Defaults to None (all).
+        seed (int, optional): Random seed of the corpora. Defaults to 0.
+
+    Returns:
+        returns (dict[str, dict[str, float]]): Results keyed by "<benchmark>[logs=<size>]", each with `ops`, `seconds`, `ops_per_s`, `relative_throughput` (operations per run of a fixed reference workload) and `peak_kb`.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in corpus_sizes:
+            corpus = synthetic_corpus(size, seed)
+            repeat = 3 if size <= 100 else 1
+            for name, (function, ops) in build_benchmarks(corpus, workdir).items():
+                if only and name not in only:
+                    continue
+                seconds, reference_seconds, peak_kb = _measure(function, repeat)
+                key = f"{name}[logs={size}]"
+                results[key] = {
+                    "ops": ops,
+                    "seconds": round(seconds, 6),
+                    "ops_per_s": round(ops / seconds, 1),
+                    # Operations per reference workload run, robust against machine speed and load
+                    "relative_throughput": round(ops * reference_seconds / seconds, 4),
+                    "peak_kb": round(peak_kb, 1),
+                }
+                print(
+                    f"{key:<45} {results[key]['ops_per_s']:>12,.0f} ops/s"
+                    f" {results[key]['relative_throughput']:>12,.2f} rel."
+                    f" {results[key]['peak_kb']:>12,.1f} KB peak",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def compare_to_baseline(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    throughput_threshold: float = DEFAULT_THROUGHPUT_THRESHOLD,
+    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD,
+) -> list[tuple[str, str]]:
+    """
+    Lists the benchmarks that regressed against a baseline.
+
+    Args:
+        results (dict[str, dict[str, float]]): Current results (see `run_benchmarks`).
+        baseline (dict[str, dict[str, float]]): Saved results to compare with.
+        throughput_threshold (float, optional): Allowed drop of throughput (a regression needs both ops/s and the relative throughput to drop by more). Defaults to 0.25.
+        memory_threshold (float, optional): Allowed relative growth of peak memory. Defaults to 0.2.
+
+    Returns:
+        returns (list[tuple[str, str]]): The result key and a description of each regression (empty if none).
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        expected = baseline[key]
+        # A real slowdown shows in both measures; machine load alone only in the raw one, and file-system noise (which the CPU-bound reference does not track) only in the relative one
+        floor = 1 - throughput_threshold
+        if (
+            result["relative_throughput"] < expected["relative_throughput"] * floor
+            and result["ops_per_s"] < expected["ops_per_s"] * floor
+        ):
+            regressions.append(
+                (
+                    key,
+                    f"{key}: relative throughput {result['relative_throughput']:,.2f} vs. baseline {expected['relative_throughput']:,.2f}"
+                    f" ({result['ops_per_s']:,.0f} vs. {expected['ops_per_s']:,.0f} ops/s)",
+                )
+            )
+        if (
+            result["peak_kb"] > expected["peak_kb"] * (1 + memory_threshold)
+            and result["peak_kb"] - expected["peak_kb"] > MEMORY_SLACK_KB
+        ):
+            regressions.append(
+                (
+                    key,
+                    f"{key}: peak memory {result['peak_kb']:,.1f} KB vs. baseline {expected['peak_kb']:,.1f} KB",
+                )
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    # Usage (from the `src` folder): python -m utilities.benchmark_utilities --save-baseline
+    #                                python -m utilities.benchmark_utilities --check
+    parser = argparse.ArgumentParser(
+        description="Benchmark the offline hot paths on synthetic negotiation corpora."
+    )
+    parser.add_argument("--full", action="store_true", help="Include 10,000 logs")
+    parser.add_argument("--sizes", nargs="+", type=int, default=None)
+    parser.add_argument("--only", nargs="+", default=None, help="Benchmark names")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument(
+        "--throughput-threshold", type=float, default=DEFAULT_THROUGHPUT_THRESHOLD
+    )
+    parser.add_argument(
+        "--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD
+    )
+    parser.add_argument("--json", default=None, help="Also write results to this file")
+    args = parser.parse_args()
+
+    sizes = tuple(
+        args.sizes or (FULL_CORPUS_SIZES if args.full else DEFAULT_CORPUS_SIZES)
+    )
+    results = run_benchmarks(sizes, args.only, args.seed)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        # Merge, so partial runs (--only/--sizes) refresh only their own entries
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline saved to: {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"No baseline found at {args.baseline} (run with --save-baseline)")
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(
+            results, baseline, args.throughput_threshold, args.memory_threshold
+        )
+        if regressions:
+            # Measure suspected regressions once more, so a noisy moment does not fail the check
+            keys = {key for key, _ in regressions}
+            rerun = run_benchmarks(
+                tuple(sorted({int(key.split("=")[1].rstrip("]")) for key in keys})),
+                sorted({key.split("[")[0] for key in keys}),
+                args.seed,
+            )
+            retry_results = {key: rerun[key] for key in keys}
+            regressions = compare_to_baseline(
+                retry_results,
+                baseline,
+                args.throughput_threshold,
+                args.memory_threshold,
+            )
+        if regressions:
+            print(
+                "Regressions:\n"
+                + "\n".join(f"- {description}" for _, description in regressions)
+            )
+            sys.exit(1)
+        print("No regressions against the baseline.")
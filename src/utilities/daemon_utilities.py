@@ -0,0 +1,156 @@
+import argparse
+import json
+import socket
+from typing import Any, Iterator
+
+# Socket the negotiation daemon listens on unless configured otherwise
+DEFAULT_SOCKET_PATH = "/tmp/negotiation_daemon.sock"
+
+
+def _send(
+    request: dict[str, Any], socket_path: str = DEFAULT_SOCKET_PATH
+) -> Iterator[dict[str, Any]]:
+    """
+    Sends one request to the daemon and yields every JSON line of its reply.
+
+    Args:
+        request (dict[str, Any]): The request, e.g. `{"op": "status", "job_id": "..."}`.
+        socket_path (str, optional): The daemon's Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Returns:
+        returns (Iterator[dict[str, Any]]): Decoded reply lines.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("r", encoding="utf-8") as replies:
+            for line in replies:
+                yield json.loads(line)
+
+
+def send_request(
+    request: dict[str, Any], socket_path: str = DEFAULT_SOCKET_PATH
+) -> dict[str, Any]:
+    """
+    Sends a single-reply request (submit, status, cancel, list, ping, shutdown) to the daemon.
+
+    Args:
+        request (dict[str, Any]): The request.
+        socket_path (str, optional): The daemon's Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Returns:
+        returns (dict[str, Any]): The daemon's reply. Raises RuntimeError if the daemon reports an error.
+    """
+    reply = next(_send(request, socket_path))
+    if not reply.get("ok"):
+        raise RuntimeError(reply.get("error", "Unknown daemon error"))
+    return reply
+
+
+def submit_job(
+    kind: str, params: dict[str, Any], socket_path: str = DEFAULT_SOCKET_PATH
+) -> str:
+    """
+    Submits a negotiation or persona job.
+
+    Args:
+        kind (str): 'negotiation' or 'personas'.
+        params (dict[str, Any]): Job parameters (e.g., `{"num_rounds": 5}` or `{"num_pairs": 10, "bulk": True}`).
+        socket_path (str, optional): The daemon's Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Returns:
+        returns (str): The ID of the queued job.
+    """
+    reply = send_request({"op": "submit", "kind": kind, "params": params}, socket_path)
+    return reply["job"]["job_id"]
+
+
+def get_job_status(
+    job_id: str, socket_path: str = DEFAULT_SOCKET_PATH
+) -> dict[str, Any]:
+    """
+    Returns a job's status, timings and result.
+
+    Args:
+        job_id (str): The job's ID.
+        socket_path (str, optional): The daemon's Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Returns:
+        returns (dict[str, Any]): The job summary.
+    """
+    return send_request({"op": "status", "job_id": job_id}, socket_path)["job"]
+
+
+def cancel_job(job_id: str, socket_path: str = DEFAULT_SOCKET_PATH) -> dict[str, Any]:
+    """
+    Cancels a job (running negotiations stop before their next turn).
+
+    Args:
+        job_id (str): The job's ID.
+        socket_path (str, optional): The daemon's Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Returns:
+        returns (dict[str, Any]): The job summary right after the cancellation request.
+    """
+    return send_request({"op": "cancel", "job_id": job_id}, socket_path)["job"]
+
+
+def stream_job_events(
+    job_id: str, since: int = 0, socket_path: str = DEFAULT_SOCKET_PATH
+) -> Iterator[dict[str, Any]]:
+    """
+    Yields a job's events (as dictionaries, see `resources/event_stream.py`) until the job finishes.
+
+    Args:
+        job_id (str): The job's ID.
+        since (int, optional): Index of the first event to receive. Defaults to 0 (replay from the start).
+        socket_path (str, optional): The daemon's Unix socket. Defaults to DEFAULT_SOCKET_PATH.
+
+    Returns:
+        returns (Iterator[dict[str, Any]]): The job's events.
+    """
+    for reply in _send({"op": "stream", "job_id": job_id, "since": since}, socket_path):
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "Unknown daemon error"))
+        if reply.get("done"):
+            return
+        yield reply["event"]
+
+
+if __name__ == "__main__":
+    # Usage (from the `src` folder): python -m utilities.daemon_utilities submit negotiation --wait
+    parser = argparse.ArgumentParser(
+        description="Talk to a running negotiation daemon."
+    )
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = subparsers.add_parser("submit")
+    submit_parser.add_argument("kind", choices=["negotiation", "personas"])
+    submit_parser.add_argument("--params", default="{}", help="Job parameters as JSON")
+    submit_parser.add_argument("--wait", action="store_true")
+    for command in ("status", "stream", "cancel"):
+        subparsers.add_parser(command).add_argument("job_id")
+    subparsers.add_parser("list")
+    subparsers.add_parser("ping")
+    subparsers.add_parser("shutdown")
+    args = parser.parse_args()
+
+    if args.command == "submit":
+        job_id = submit_job(args.kind, json.loads(args.params), args.socket)
+        print(job_id)
+        if args.wait:
+            for event in stream_job_events(job_id, socket_path=args.socket):
+                print(json.dumps(event))
+            print(json.dumps(get_job_status(job_id, args.socket), indent=2))
+    elif args.command == "stream":
+        for event in stream_job_events(args.job_id, socket_path=args.socket):
+            print(json.dumps(event))
+    elif args.command == "status":
+        print(json.dumps(get_job_status(args.job_id, args.socket), indent=2))
+    elif args.command == "cancel":
+        print(json.dumps(cancel_job(args.job_id, args.socket), indent=2))
+    else:
+        reply = send_request({"op": args.command}, args.socket)
+        print(json.dumps(reply, indent=2))
@@ -1,34 +1,78 @@
-from typing import Optional
+import time
+from typing import Any, Iterator, Optional, Union
 from openai import OpenAI
 
+from resources.event_stream import (
+    EventEmitter,
+    LLMError,
+    ReasoningBudgetHit,
+    ReasoningDone,
+    ReasoningStarted,
+    ResponseDone,
+    StatusMessage,
+    TokenChunk,
+    get_emitter,
+)
+from resources.deadlines import check_deadline
+from resources.llm_backends import LLMBackend, get_backend
+from resources.token_budget import estimate_tokens, usage_scope
+from utilities.tracing_utilities import is_tracing_enabled, span, traced
 
+DEFAULT_MODEL = "deepseek/r1-distill-llama-70b/fp-8"
+
+
+@traced("llm.prompt_with_retry", "llm")
 def prompt_llm_with_retry(
     messages: list[dict],
-    openAI_client: OpenAI,
+    openAI_client: Union[OpenAI, LLMBackend],
     max_attempts: int = 3,
     stream_content: bool = False,
+    events: Optional[EventEmitter] = None,
+    reasoning_budget: Optional[int] = None,
+    call_info: Optional[dict[str, Any]] = None,
 ) -> tuple[str, str, str]:
     """
-    Attempts up to `max_attempts` times to get a valid response from the LLM. If both the user-facing response and the 'thinking' text are returned, the function succeeds. Otherwise, it retries until the limit is reached.
+    Attempts up to `max_attempts` times to get a valid response from the LLM. If both the user-facing response and the 'thinking' text are returned, the function succeeds. Otherwise (e.g., a stream aborted as stalled by a `DeadlineBackend`), it retries until the limit is reached. Once the deadline of the current turn or session has passed, `DeadlineExceeded` is raised instead of another attempt (see `resources/deadlines.py`).
 
     Args:
         messages (list[dict]): A list of messages representing the conversation history, formatted for OpenAI Chat API.
-        openAI_client (OpenAI): An instance of the OpenAI client used to send the request.
+        openAI_client (Union[OpenAI, LLMBackend]): An OpenAI client or LLM backend used to send the request.
         max_attempts (int, optional): Maximum number of attempts to retry the LLM call on failure. Defaults to 3.
         stream_content (bool, optional): If True, streams the LLM response token-by-token. Defaults to False.
+        events (Optional[EventEmitter], optional): Emitter for progress events. Defaults to an unbound emitter on the default event bus.
+        reasoning_budget (Optional[int], optional): Maximum number of reasoning tokens before the answer is forced (see `prompt_llm`). Defaults to None (unlimited).
+        call_info (Optional[dict[str, Any]], optional): If given, filled with metadata about the successful call (see `prompt_llm`); token counts are summed over all attempts. Defaults to None.
 
     Returns:
         returns (tuple[str, str, str]): A tuple containing:
         response (final user-facing response generated by the LLM), reasoning (internal reasoning or explanation generated by the LLM), user_query (original user query extracted or derived from the message context)
     """
+    events = get_emitter(events)
+
+    # `prompt_llm` appends to the last message, so every attempt starts from the original prompt
+    original_content = messages[-1]["content"]
+
+    # Token usage summed over all attempts (failed attempts may have been billed too)
+    usage_totals = {"prompt_tokens": 0, "completion_tokens": 0}
+
     # Attempt to prompt LLM max_attempts times
     for i in range(1, max_attempts + 1):
         # Get response and reasoning from LLM
+        check_deadline()
+        messages[-1]["content"] = original_content
+        attempt_info = {}
         response, reasoning = prompt_llm(
             messages=messages,
             openAI_client=openAI_client,
             stream_content=stream_content,
+            events=events,
+            reasoning_budget=reasoning_budget,
+            call_info=attempt_info,
         )
+        for key in usage_totals:
+            usage_totals[key] += attempt_info.get(key, 0)
+        if call_info is not None:
+            call_info.update(attempt_info, **usage_totals)
         # Return response and reasoning if not empty
         if response:
             # Retrieves original query used to prompt LLM
@@ -38,8 +82,9 @@ def prompt_llm_with_retry(
                 reasoning,
                 user_query,
             )
-        print(
-            f"LLM response or reasoning empty, re-prompting (Attempt {i+1}/{max_attempts})"
+        events.emit(
+            StatusMessage,
+            text=f"LLM response or reasoning empty, re-prompting (Attempt {i+1}/{max_attempts})",
         )
 
     raise RuntimeError(
@@ -49,99 +94,404 @@ def prompt_llm_with_retry(
 
 def prompt_llm(
     messages: list[dict],
-    openAI_client: OpenAI,
-    model: str = "deepseek/r1-distill-llama-70b/fp-8",
+    openAI_client: Union[OpenAI, LLMBackend],
+    model: str = DEFAULT_MODEL,
     stream_content: bool = False,
+    events: Optional[EventEmitter] = None,
+    reasoning_budget: Optional[int] = None,
+    call_info: Optional[dict[str, Any]] = None,
 ) -> Optional[tuple[str, str]]:
     """
-    Sends prompt to LLM using the OpenAI client, with optional streaming. Splits response into internal 'thinking' segment and a final user-facing response, based on the presence of a `</think>` token in the LLM output.
+    Sends prompt to LLM through an LLM backend (OpenAI clients are wrapped in the OpenAI-compatible HTTP backend) and streams the answer. Splits response into internal 'thinking' segment and a final user-facing response, based on the presence of a `</think>` token in the LLM output.
+
+    If a reasoning budget is given and the streamed reasoning reaches it, the stream is cut off and the call is resumed with the partial reasoning closed by a forced `</think>`, so the model goes straight to its answer.
 
     Args:
         messages (list[dict]): A list of message dictionaries formatted for the OpenAI Chat API. The last message is modified to append a "<think>" token to guide the model.
-        openAI_client (OpenAI): An instance of the OpenAI client used to make the chat completion request.
+        openAI_client (Union[OpenAI, LLMBackend]): An OpenAI client or LLM backend used to make the chat completion request.
         model (str, optional): The model identifier to use for the request. Defaults to "deepseek/r1-distill-llama-70b/fp-8".
-        stream_content (bool, optional): If True, streams the response token by token to stdout. Defaults to False.
+        stream_content (bool, optional): If True, streams the response token by token as `TokenChunk` events. Defaults to False.
+        events (Optional[EventEmitter], optional): Emitter for progress events. Defaults to an unbound emitter on the default event bus.
+        reasoning_budget (Optional[int], optional): Maximum number of reasoning tokens (streamed chunks inside `<think>`, one token each for the default provider). Defaults to None (unlimited).
+        call_info (Optional[dict[str, Any]], optional): If given, filled with `reasoning_tokens`, `reasoning_budget` and `reasoning_budget_hit`, and with the call's `prompt_tokens`, `completion_tokens` and `usage_source` ('provider', or 'estimate' if the backend reported no usage). Defaults to None.
 
     Returns:
         returns (Optional[tuple[str, str]]): A tuple containing: `final_response` (user-facing part of the LLM response) and `think_response` (internal reasoning/thinking portion generated before `</think>`)
             Returns (None, None) if an error occurs during request or response processing.
     """
+    events = get_emitter(events)
+    backend = get_backend(openAI_client)
+
     # Append a <think> token to signal model to think (necessary for specific default model)
     messages[-1]["content"] += " <think>"
 
-    try:
-        # Call OpenAI Chat API
-        chatCompletion_response = openAI_client.chat.completions.create(
-            model=model, messages=messages, stream=stream_content
+    # Prompts sent and text received, for the local token estimate if the provider reports no usage
+    prompts = [messages]
+    parser = None
+
+    # Collect the usage reported by the backend for this call's requests
+    with usage_scope() as usage:
+        try:
+            try:
+                # Send request to the backend
+                with span("llm.request", "llm", model=model):
+                    chunks = backend.stream(messages, model)
+            except Exception as e:
+                # Catch exception (if call fails) and return empty response and reasoning
+                events.emit(LLMError, message=f"Error during call to LLM backend: {e}")
+                return None, None
+
+            # Response handling block (includes streaming handling)
+            try:
+                events.emit(StatusMessage, text="Trying to parse LLM response...\n")
+                parser = _ResponseParser(events, stream_content, reasoning_budget)
+
+                # Only time individual chunk waits when tracing is enabled
+                stream_stats = {}
+                timed_chunks = (
+                    _timed_chunks(chunks, stream_stats)
+                    if is_tracing_enabled()
+                    else chunks
+                )
+                # Iterate over the streamed text chunks
+                with span("llm.stream", "llm") as stream_span:
+                    for chunk_content in timed_chunks:
+                        if parser.feed(chunk_content):
+                            break
+
+                    if parser.budget_hit:
+                        # Stop the provider from generating (and billing) the rest of the reasoning
+                        _close(timed_chunks)
+                        _close(chunks)
+
+                        # Resume with the reasoning closed, so the model goes straight to its answer
+                        continuation_messages = messages + [
+                            {"role": "assistant", "content": parser.force_answer()}
+                        ]
+                        prompts.append(continuation_messages)
+                        with span(
+                            "llm.reasoning_continuation",
+                            "llm",
+                            reasoning_budget=reasoning_budget,
+                        ):
+                            continuation = backend.stream(
+                                continuation_messages,
+                                model,
+                                continue_final_message=True,
+                            )
+                        for chunk_content in continuation:
+                            parser.feed_answer(chunk_content)
+
+                    parser.done()
+                    stream_span.set(**stream_stats)
+
+                # Parse accumulated response it LLM thought
+                with span("llm.split_reasoning", "llm"):
+                    response, reasoning = parser.split()
+
+                if call_info is not None:
+                    call_info.update(parser.info())
+                return response, reasoning
+            except Exception as e:
+                events.emit(
+                    LLMError,
+                    message=f"Error during LLM response streaming: {e}\n{"~"*50}",
+                )
+                return None, None
+        finally:
+            # Failed calls are accounted for as well, they may have been billed
+            if call_info is not None:
+                call_info.update(_usage_info(usage, prompts, parser))
+
+
+async def aprompt_llm(
+    messages: list[dict],
+    openAI_client: Union[OpenAI, LLMBackend],
+    model: str = DEFAULT_MODEL,
+    stream_content: bool = False,
+    events: Optional[EventEmitter] = None,
+    reasoning_budget: Optional[int] = None,
+    call_info: Optional[dict[str, Any]] = None,
+) -> Optional[tuple[str, str]]:
+    """
+    Asynchronous version of `prompt_llm`, streaming through the backend's `astream`.
+
+    Args:
+        messages (list[dict]): A list of message dictionaries formatted for the OpenAI Chat API. The last message is modified to append a "<think>" token to guide the model.
+        openAI_client (Union[OpenAI, LLMBackend]): An OpenAI client or LLM backend used to make the chat completion request.
+        model (str, optional): The model identifier to use for the request. Defaults to "deepseek/r1-distill-llama-70b/fp-8".
+        stream_content (bool, optional): If True, streams the response token by token as `TokenChunk` events. Defaults to False.
+        events (Optional[EventEmitter], optional): Emitter for progress events. Defaults to an unbound emitter on the default event bus.
+        reasoning_budget (Optional[int], optional): Maximum number of reasoning tokens. Defaults to None (unlimited).
+        call_info (Optional[dict[str, Any]], optional): If given, filled like in `prompt_llm`. Defaults to None.
+
+    Returns:
+        returns (Optional[tuple[str, str]]): The user-facing response and the reasoning, or (None, None) if an error occurs.
+    """
+    events = get_emitter(events)
+    backend = get_backend(openAI_client)
+    messages[-1]["content"] += " <think>"
+
+    prompts = [messages]
+    parser = None
+    with usage_scope() as usage:
+        try:
+            parser = _ResponseParser(events, stream_content, reasoning_budget)
+            chunks = backend.astream(messages, model)
+            async for chunk_content in chunks:
+                if parser.feed(chunk_content):
+                    break
+
+            if parser.budget_hit:
+                await chunks.aclose()
+                continuation_messages = messages + [
+                    {"role": "assistant", "content": parser.force_answer()}
+                ]
+                prompts.append(continuation_messages)
+                async for chunk_content in backend.astream(
+                    continuation_messages, model, continue_final_message=True
+                ):
+                    parser.feed_answer(chunk_content)
+
+            parser.done()
+            response, reasoning = parser.split()
+            if call_info is not None:
+                call_info.update(parser.info())
+            return response, reasoning
+        except Exception as e:
+            events.emit(LLMError, message=f"Error during async LLM call: {e}\n{"~"*50}")
+            return None, None
+        finally:
+            if call_info is not None:
+                call_info.update(_usage_info(usage, prompts, parser))
+
+
+class _ResponseParser:
+    """
+    Incrementally tracks a streamed response: detects the `<think>` section, emits progress events, counts reasoning tokens against the budget and finally splits reasoning from the user-facing response.
+    """
+
+    __slots__ = (
+        "events",
+        "stream_content",
+        "reasoning_budget",
+        "accumulated_response",
+        "llm_thinking",
+        "reasoning_start",
+        "reasoning_tokens",
+        "budget_hit",
+    )
+
+    think_open_tag = "<think>"
+    think_close_tag = "</think>"
+
+    def __init__(
+        self,
+        events: EventEmitter,
+        stream_content: bool,
+        reasoning_budget: Optional[int],
+    ):
+        self.events = events
+        self.stream_content = stream_content
+        self.reasoning_budget = reasoning_budget
+        self.accumulated_response = ""
+        self.llm_thinking = False
+        self.reasoning_start = 0
+        self.reasoning_tokens = 0
+        self.budget_hit = False
+
+    def feed(self, chunk_content: str) -> bool:
+        """
+        Processes one streamed chunk.
+
+        Args:
+            chunk_content (str): The chunk's text.
+
+        Returns:
+            returns (bool): True once the reasoning budget is reached and the stream should be cut off.
+        """
+        if not chunk_content:
+            return False
+        self.accumulated_response += chunk_content
+
+        # Check if LLM is thinking
+        if chunk_content == self.think_open_tag:
+            self.llm_thinking = True
+            self.reasoning_start = len(self.accumulated_response)
+            self.events.emit(ReasoningStarted)
+            return False
+
+        # If LLM is thinking, check if it has finished thinking
+        if self.llm_thinking and chunk_content == self.think_close_tag:
+            self.llm_thinking = False
+            self.events.emit(
+                ReasoningDone,
+                reasoning_chars=len(self.accumulated_response)
+                - self.reasoning_start
+                - len(self.think_close_tag),
+            )
+            return False
+
+        # Cut the reasoning off once it reaches its budget
+        if self.llm_thinking:
+            self.reasoning_tokens += 1
+            if (
+                self.reasoning_budget is not None
+                and self.reasoning_tokens >= self.reasoning_budget
+            ):
+                self.budget_hit = True
+                return True
+            return False
+
+        # Emit the LLM response if it has finished thinking
+        if self.stream_content:
+            self.events.emit(TokenChunk, text=chunk_content)
+        return False
+
+    def force_answer(self) -> str:
+        """
+        Closes the cut-off reasoning and returns the partial assistant message (reasoning plus a forced `</think>`) to continue from.
+
+        Returns:
+            returns (str): The assistant message prefix for the continuation request.
+        """
+        reasoning = self.accumulated_response[self.reasoning_start :]
+        self.llm_thinking = False
+        self.events.emit(ReasoningDone, reasoning_chars=len(reasoning))
+        self.events.emit(
+            ReasoningBudgetHit,
+            reasoning_tokens=self.reasoning_tokens,
+            reasoning_budget=self.reasoning_budget,
         )
-    except Exception as e:
-        # Catch exception (if call fails) and return empty response and reasoning
-        print(f"Error during call to OpenAI Chat API: {e}")
-        return None, None
-
-    # Response handling block (includes streaming handling)
-    try:
-        print("Trying to parse LLM response...\n")
-        llm_thinking = False
-        buffer = ""
-        accumulated_response = ""
-        think_open_tag = "<think>"
-        think_close_tag = "</think>"
-
-        # Iterate over the streamed response chunk objects
-        for chunk in chatCompletion_response:
-            # Get response content
-            chunk_content = chunk.choices[0].delta.content
-            if not chunk_content:
-                continue
-            else:
-                accumulated_response += chunk_content
-
-            # Check if LLM is thinking
-            if chunk_content == think_open_tag:
-                llm_thinking = True
-                print("LLM thinking...")
-                continue
-
-            # If LLM is thinking, check if it has finished thinking
-            if llm_thinking and chunk_content == think_close_tag:
-                llm_thinking = False
-                continue
-
-            # Print the LLM response if it has finished thinking
-            if not llm_thinking:
-                buffer += chunk_content
-                if len(buffer) > 20 or "\n" in buffer:
-                    print(buffer.lstrip("\n"), end="", flush=True)
-                    buffer = ""
-
-        # Catch and print any unprinted buffer content
-        if buffer:
-            print(buffer.lstrip("\n"), end="", flush=True)
-
-        print()
-        # Parse accumulated response it LLM thought
+        self.accumulated_response += f"\n{self.think_close_tag}"
+        return f"{self.think_open_tag}{reasoning}\n{self.think_close_tag}\n\n"
+
+    def feed_answer(self, chunk_content: str) -> None:
+        """
+        Processes one chunk of the continuation (answer only).
+        """
+        if not chunk_content:
+            return
+        self.accumulated_response += chunk_content
+        if self.stream_content:
+            self.events.emit(TokenChunk, text=chunk_content)
+
+    def done(self) -> None:
+        self.events.emit(ResponseDone, response_chars=len(self.accumulated_response))
+
+    def split(self) -> tuple[str, str]:
+        """
+        Splits the accumulated text into the user-facing response and the reasoning.
+
+        Returns:
+            returns (tuple[str, str]): Response and reasoning (empty if the LLM did not think).
+        """
+        accumulated_response = self.accumulated_response
         if (
-            think_open_tag in accumulated_response
-            and think_close_tag in accumulated_response
+            self.think_open_tag in accumulated_response
+            and self.think_close_tag in accumulated_response
         ):
-            start = accumulated_response.index(think_open_tag)
-            end = accumulated_response.index(think_close_tag)
+            start = accumulated_response.index(self.think_open_tag)
+            end = accumulated_response.index(self.think_close_tag)
 
             # Reasoning is between the tags
-            reasoning = accumulated_response[start + len(think_open_tag) : end]
+            reasoning = accumulated_response[start + len(self.think_open_tag) : end]
 
             # Response is everything else
             response = (
                 accumulated_response[:start]
-                + accumulated_response[end + len(think_close_tag) :]
+                + accumulated_response[end + len(self.think_close_tag) :]
             ).lstrip("\n")
         else:
             # No explicit reasoning section
             response = accumulated_response.lstrip("\n")
             reasoning = ""
-
         return response, reasoning
-    except Exception as e:
-        print(f"Error during LLM response streaming: {e}\n{"~"*50}")
-        return None, None
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "reasoning_tokens": self.reasoning_tokens,
+            "reasoning_budget": self.reasoning_budget,
+            "reasoning_budget_hit": self.budget_hit,
+        }
+
+
+def _usage_info(
+    usage: dict[str, int],
+    prompts: list[list[dict]],
+    parser: Optional["_ResponseParser"],
+) -> dict[str, Any]:
+    """
+    Returns the token usage of a call: the usage reported by the provider, or a local estimate from the prompts sent and the text received if it reported none.
+
+    Args:
+        usage (dict[str, int]): Usage collected by `usage_scope`.
+        prompts (list[list[dict]]): Messages of every request of the call (a reasoning continuation is a second request).
+        parser (Optional[_ResponseParser]): Parser of the streamed response (None if the request failed).
+
+    Returns:
+        returns (dict[str, Any]): `prompt_tokens`, `completion_tokens` and `usage_source` ('provider' or 'estimate').
+    """
+    if usage["requests"]:
+        return {
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "usage_source": "provider",
+        }
+    return {
+        "prompt_tokens": sum(
+            estimate_tokens(message["content"])
+            for prompt in prompts
+            for message in prompt
+        ),
+        "completion_tokens": (
+            estimate_tokens(parser.accumulated_response) if parser else 0
+        ),
+        "usage_source": "estimate",
+    }
+
+
+def _close(iterator: Any) -> None:
+    """
+    Closes a chunk iterator if it supports closing (stops generation for streaming backends).
+    """
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
+
+
+def _timed_chunks(response: Any, stats: dict[str, Any]) -> Iterator[Any]:
+    """
+    Wraps a streamed response and records how long was spent waiting on the backend for chunks versus processing them. Used only while tracing is enabled.
+
+    Args:
+        response (Any): The backend's chunk iterator.
+        stats (dict[str, Any]): Populated with `first_chunk_ms`, `network_wait_ms`, `processing_ms` and `chunks` once the stream is exhausted.
+
+    Returns:
+        returns (Iterator[Any]): The response's chunks, unchanged.
+    """
+    start_ns = time.perf_counter_ns()
+    wait_ns = 0
+    num_chunks = 0
+    iterator = iter(response)
+
+    while True:
+        # Time spent inside next() is time spent waiting on the provider
+        wait_start_ns = time.perf_counter_ns()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            wait_ns += time.perf_counter_ns() - wait_start_ns
+            break
+        wait_ns += time.perf_counter_ns() - wait_start_ns
+
+        if num_chunks == 0:
+            stats["first_chunk_ms"] = (time.perf_counter_ns() - start_ns) / 1e6
+        num_chunks += 1
+        yield chunk
+
+    total_ns = time.perf_counter_ns() - start_ns
+    stats["network_wait_ms"] = wait_ns / 1e6
+    stats["processing_ms"] = (total_ns - wait_ns) / 1e6
+    stats["chunks"] = num_chunks
@@ -3,7 +3,10 @@ import json
 import os
 import uuid
 
+from utilities.tracing_utilities import traced
 
+
+@traced("io.save_negotiation_log", "io")
 def save_negotiation_log(log, folder="src/negotiation_histories"):
     """
     Saves the negotiation log to a uniquely named JSON file.
@@ -0,0 +1,622 @@
+import argparse
+import json
+import math
+import os
+from typing import Any, Optional
+
+import numpy as np
+
+from resources.participants import DEFAULT_REFERENCE_VALUATION, default_curves
+from utilities.term_sheet_utilities import (
+    _persona_text,
+    normalize_term_sheet,
+    parse_valuation,
+    stated_valuation_range,
+)
+from utilities.tracing_utilities import traced
+
+# Normalized terms the utilities are defined over (see `normalize_term_sheet`)
+TERMS = ("valuation", "cash_share", "earn_out_share", "diligence_weeks")
+
+# Weight of every term before the persona's stated priorities are added
+BASE_WEIGHTS = {
+    "valuation": 0.4,
+    "cash_share": 0.2,
+    "earn_out_share": 0.2,
+    "diligence_weeks": 0.2,
+}
+
+# Words in a persona's financial info and unspoken interests that raise a term's weight
+PRIORITY_KEYWORDS = {
+    "valuation": ("valuation", "premium", "price", "multiple", "return", "value"),
+    "cash_share": ("cash", "liquidity", "upfront", "debt", "immediate"),
+    "earn_out_share": (
+        "earn-out",
+        "earn out",
+        "milestone",
+        "performance",
+        "upside",
+        "retain",
+        "retention",
+    ),
+    "diligence_weeks": ("timeline", "quick", "swift", "speed", "urgen", "soon"),
+}
+
+# Weight added per matched priority keyword
+KEYWORD_WEIGHT = 0.05
+
+# Opening valuations relative to the target's stated valuation range (acquirer below its low end, target above its high end)
+ACQUIRER_OPENING_DISCOUNT = 0.8
+TARGET_OPENING_PREMIUM = 1.2
+
+# Largest share of its own stated valuation the acquirer will pay
+ACQUIRER_CAPACITY_SHARE = 0.5
+
+# Trade-off weights swept to trace the Pareto frontier (kept off 0 and 1 to break ties towards efficient outcomes)
+FRONTIER_POINTS = 101
+
+# Upper bound on array elements held in memory at once during frontier computations
+FRONTIER_BLOCK_ELEMENTS = 4_000_000
+
+
+class UtilityModel:
+    """
+    Additive utility of one party over the normalized terms of a term sheet. Each term scores 0 at the party's limit (reservation value) and 1 at its opening (aspiration) value, linearly in between; better values than the opening also score 1, values beyond the limit score below 0. Term scores are weighted by the party's priorities, renormalized over the terms a term sheet names.
+    """
+
+    __slots__ = ("role", "limits", "openings", "weights")
+
+    def __init__(
+        self,
+        role: str,
+        limits: dict[str, float],
+        openings: dict[str, float],
+        weights: dict[str, float],
+    ):
+        """
+        Args:
+            role (str): 'acquirer' or 'target'.
+            limits (dict[str, float]): Limit of every term in TERMS (valuation as an amount).
+            openings (dict[str, float]): Opening value of every term in TERMS.
+            weights (dict[str, float]): Priority of every term in TERMS (normalized to sum to 1).
+        """
+        self.role = role
+        self.limits = np.array([limits[term] for term in TERMS], dtype=np.float64)
+        self.openings = np.array([openings[term] for term in TERMS], dtype=np.float64)
+        weights = np.array([weights[term] for term in TERMS], dtype=np.float64)
+        self.weights = weights / weights.sum()
+
+    @classmethod
+    def from_personas(
+        cls,
+        role: str,
+        persona: Optional[dict[str, Any]],
+        counterpart: Optional[dict[str, Any]],
+        fallback_valuation: Optional[float] = None,
+    ) -> "UtilityModel":
+        """
+        Derives a party's utility from the personas' prose. Valuation limits and openings come from the target's stated valuation range (the acquirer's limit is also capped by its own stated valuation), the other terms from the typical positions of `default_curves`, and the weights from priority keywords in the party's financial info and unspoken interests.
+
+        Args:
+            role (str): 'acquirer' or 'target'.
+            persona (Optional[dict[str, Any]]): The party's persona.
+            counterpart (Optional[dict[str, Any]]): The other party's persona.
+            fallback_valuation (Optional[float], optional): Valuation the ranges are centered on if the target states none (e.g., the first valuation proposed). Defaults to DEFAULT_REFERENCE_VALUATION.
+
+        Returns:
+            returns (UtilityModel): The party's utility model.
+        """
+        curves = default_curves(role)
+        target, acquirer = (
+            (persona, counterpart) if role == "target" else (counterpart, persona)
+        )
+
+        # Valuation range of the target, from its financial info or around the fallback
+        valuation_range = stated_valuation_range(
+            _persona_text(target, "financial_info")
+        )
+        if valuation_range is None:
+            reference = fallback_valuation or DEFAULT_REFERENCE_VALUATION
+            valuation_range = (0.8 * reference, 1.2 * reference)
+        low, high = valuation_range
+
+        limits = {term: curve.limit for term, curve in curves.items()}
+        openings = {term: curve.start for term, curve in curves.items()}
+        if role == "acquirer":
+            openings["valuation"] = low * ACQUIRER_OPENING_DISCOUNT
+            limits["valuation"] = high
+            capacity = stated_valuation_range(_persona_text(acquirer, "financial_info"))
+            if capacity is not None:
+                limits["valuation"] = max(
+                    min(high, sum(capacity) / 2 * ACQUIRER_CAPACITY_SHARE),
+                    low,
+                )
+        else:
+            openings["valuation"] = high * TARGET_OPENING_PREMIUM
+            limits["valuation"] = low
+
+        # Stated priorities raise the weight of the terms they concern
+        text = (
+            _persona_text(persona, "financial_info")
+            + " "
+            + _persona_text(persona, "unspoken_interests")
+        ).lower()
+        weights = {
+            term: BASE_WEIGHTS[term]
+            + KEYWORD_WEIGHT
+            * sum(keyword in text for keyword in PRIORITY_KEYWORDS[term])
+            for term in TERMS
+        }
+        return cls(role, limits, openings, weights)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "UtilityModel":
+        """
+        Restores a model saved with `to_dict` (e.g., from a session config).
+        """
+        return cls(data["role"], data["limits"], data["openings"], data["weights"])
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Returns the model's parameters as JSON-serializable data.
+        """
+        return {
+            "role": self.role,
+            "limits": dict(zip(TERMS, self.limits.round(6).tolist())),
+            "openings": dict(zip(TERMS, self.openings.round(6).tolist())),
+            "weights": dict(zip(TERMS, self.weights.round(6).tolist())),
+        }
+
+    def utility(self, term_sheet: Optional[dict[str, Any]]) -> Optional[float]:
+        """
+        Scores a term sheet for the party.
+
+        Args:
+            term_sheet (Optional[dict[str, Any]]): Cumulative term sheet (e.g., a log entry's `term_sheet_snapshot`).
+
+        Returns:
+            returns (Optional[float]): The utility (1 for the party's opening terms, 0 at its limits), or None if no term can be parsed.
+        """
+        terms = term_vector(term_sheet)[None, :]
+        value = utilities(
+            terms, self.limits[None], self.openings[None], self.weights[None]
+        )
+        return None if np.isnan(value[0]) else float(value[0])
+
+    def __repr__(self) -> str:
+        return f"UtilityModel({self.role!r}, weights={self.weights.round(2).tolist()})"
+
+
+def session_models(
+    negotiation_log: list[dict[str, Any]],
+    personas: Optional[dict[str, Any]] = None,
+) -> tuple[UtilityModel, UtilityModel]:
+    """
+    Returns the acquirer's and target's utility models of a session, derived from its personas (or the models recorded in the session config of older logs when no personas are given), else centered on its first proposed valuation.
+
+    Args:
+        negotiation_log (list[dict[str, Any]]): A saved negotiation log.
+        personas (Optional[dict[str, Any]], optional): The session's persona file contents (`acquirer` and `target`). Defaults to None.
+
+    Returns:
+        returns (tuple[UtilityModel, UtilityModel]): Acquirer and target models.
+    """
+    session_config = (
+        (negotiation_log[-1].get("session_config") or {}) if negotiation_log else {}
+    )
+    recorded = session_config.get("utility_models")
+    if recorded and not personas:
+        return (
+            UtilityModel.from_dict(recorded["acquirer"]),
+            UtilityModel.from_dict(recorded["target"]),
+        )
+
+    # Only money amounts can center the valuation range (multiples have no scale)
+    first_valuation = next(
+        (
+            valuation[0]
+            for entry in negotiation_log
+            if (
+                valuation := parse_valuation(
+                    (entry.get("term_sheet_snapshot") or {}).get("valuation")
+                )
+            )
+            is not None
+            and valuation[1] == "money"
+        ),
+        None,
+    )
+    acquirer = (personas or {}).get("acquirer")
+    target = (personas or {}).get("target")
+    return (
+        UtilityModel.from_personas("acquirer", acquirer, target, first_valuation),
+        UtilityModel.from_personas("target", target, acquirer, first_valuation),
+    )
+
+
+def term_vector(term_sheet: Optional[dict[str, Any]]) -> np.ndarray:
+    """
+    Normalizes a term sheet into a vector over TERMS (NaN for terms that cannot be parsed).
+    """
+    terms = normalize_term_sheet(term_sheet)
+    return np.array([terms.get(term, np.nan) for term in TERMS], dtype=np.float64)
+
+
+def utilities(
+    terms: np.ndarray,
+    limits: np.ndarray,
+    openings: np.ndarray,
+    weights: np.ndarray,
+) -> np.ndarray:
+    """
+    Scores many term vectors at once, each with its own utility parameters.
+
+    Args:
+        terms (np.ndarray): `(num_rows, len(TERMS))` term vectors (NaN for missing terms).
+        limits (np.ndarray): `(num_rows, len(TERMS))` limits of the party scoring each row.
+        openings (np.ndarray): `(num_rows, len(TERMS))` openings.
+        weights (np.ndarray): `(num_rows, len(TERMS))` weights.
+
+    Returns:
+        returns (np.ndarray): `(num_rows,)` utilities (NaN for rows without any term).
+    """
+    present = ~np.isnan(terms)
+    scores = _term_scores(np.where(present, terms, 0.0), limits, openings)
+    weights = np.where(present, weights, 0.0)
+    totals = weights.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(totals > 0, (weights * scores).sum(axis=-1) / totals, np.nan)
+
+
+def _term_scores(
+    values: np.ndarray, limits: np.ndarray, openings: np.ndarray
+) -> np.ndarray:
+    """
+    Position of every value between its limit (0) and opening (1), capped at 1.
+    """
+    span = openings - limits
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(
+            span != 0,
+            (values - limits) / np.where(span != 0, span, 1.0),
+            np.where(values == limits, 1.0, -1.0),
+        )
+    return np.minimum(scores, 1.0)
+
+
+def pareto_frontiers(
+    acquirer_params: tuple[np.ndarray, np.ndarray, np.ndarray],
+    target_params: tuple[np.ndarray, np.ndarray, np.ndarray],
+    present: np.ndarray,
+    num_points: int = FRONTIER_POINTS,
+) -> np.ndarray:
+    """
+    Traces the Pareto frontier of many sessions at once. With additive, piecewise-linear utilities every point of the frontier maximizes a weighted sum of both utilities, and each term can be maximized on its own at one of the limits or openings of either party, so the frontier is exact at the swept trade-off weights.
+
+    Args:
+        acquirer_params (tuple[np.ndarray, np.ndarray, np.ndarray]): `(num_rows, len(TERMS))` limits, openings and weights of the acquirer.
+        target_params (tuple[np.ndarray, np.ndarray, np.ndarray]): The same for the target.
+        present (np.ndarray): `(num_rows, len(TERMS))` mask of the terms the frontier is over (the terms a scored term sheet names, so it is comparable to its utilities).
+        num_points (int, optional): Number of swept trade-off weights. Defaults to FRONTIER_POINTS.
+
+    Returns:
+        returns (np.ndarray): `(num_rows, num_points, 2)` frontier points (acquirer and target utility), from the target's best to the acquirer's best outcome.
+    """
+    a_limits, a_openings, a_weights = acquirer_params
+    t_limits, t_openings, t_weights = target_params
+
+    # Candidate values of every term: the breakpoints of both utilities
+    candidates = np.stack([a_limits, a_openings, t_limits, t_openings], axis=-1)
+    a_weights = np.where(present, a_weights, 0.0)
+    t_weights = np.where(present, t_weights, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        a_weights = a_weights / a_weights.sum(axis=-1, keepdims=True)
+        t_weights = t_weights / t_weights.sum(axis=-1, keepdims=True)
+    a_utilities = a_weights[..., None] * _term_scores(
+        candidates, a_limits[..., None], a_openings[..., None]
+    )
+    t_utilities = t_weights[..., None] * _term_scores(
+        candidates, t_limits[..., None], t_openings[..., None]
+    )
+
+    # The weighted sum is maximized term by term, in blocks to bound memory
+    lambdas = np.linspace(0.001, 0.999, num_points)
+    num_rows = len(candidates)
+    frontiers = np.empty((num_rows, num_points, 2))
+    block_size = max(1, FRONTIER_BLOCK_ELEMENTS // (num_points * len(TERMS) * 4))
+    for start in range(0, num_rows, block_size):
+        rows = slice(start, start + block_size)
+        a_block = a_utilities[rows][:, None]
+        t_block = t_utilities[rows][:, None]
+        scores = (
+            lambdas[None, :, None, None] * a_block
+            + (1 - lambdas)[None, :, None, None] * t_block
+        )
+        best = np.argmax(scores, axis=-1)[..., None]
+        frontiers[rows, :, 0] = np.take_along_axis(
+            np.broadcast_to(a_block, scores.shape), best, axis=-1
+        )[..., 0].sum(axis=-1)
+        frontiers[rows, :, 1] = np.take_along_axis(
+            np.broadcast_to(t_block, scores.shape), best, axis=-1
+        )[..., 0].sum(axis=-1)
+    return frontiers
+
+
+def frontier_distances(points: np.ndarray, frontiers: np.ndarray) -> np.ndarray:
+    """
+    Euclidean distance of every utility point to its frontier polyline (0 for Pareto-efficient outcomes).
+
+    Args:
+        points (np.ndarray): `(num_rows, 2)` acquirer and target utilities.
+        frontiers (np.ndarray): `(num_rows, num_points, 2)` frontiers (see `pareto_frontiers`).
+
+    Returns:
+        returns (np.ndarray): `(num_rows,)` distances (NaN where a point or frontier is undefined).
+    """
+    starts, ends = frontiers[:, :-1], frontiers[:, 1:]
+    segments = ends - starts
+    offsets = points[:, None, :] - starts
+    lengths = (segments**2).sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        position = np.clip(
+            np.where(lengths > 0, (offsets * segments).sum(axis=-1) / lengths, 0.0),
+            0.0,
+            1.0,
+        )
+    gaps = offsets - position[..., None] * segments
+    with np.errstate(invalid="ignore"):
+        return np.sqrt(np.min((gaps**2).sum(axis=-1), axis=-1))
+
+
+@traced("pareto.score_corpus", "analysis")
+def score_corpus(
+    logs: list[list[dict[str, Any]]],
+    models: list[tuple[UtilityModel, UtilityModel]],
+    num_points: int = FRONTIER_POINTS,
+) -> dict[str, np.ndarray]:
+    """
+    Scores every turn of many sessions for both parties and measures its distance to the session's Pareto frontier, all in flat NumPy arrays.
+
+    Args:
+        logs (list[list[dict[str, Any]]]): Negotiation logs.
+        models (list[tuple[UtilityModel, UtilityModel]]): Acquirer and target model of every log (see `session_models`).
+        num_points (int, optional): Number of swept trade-off weights per frontier. Defaults to FRONTIER_POINTS.
+
+    Returns:
+        returns (dict[str, np.ndarray]): Per turn (`num_turns` rows in session order): `session` (index into `logs`), `turn`, `role` (0 acquirer, 1 target), `acquirer_utility`, `target_utility` and `frontier_distance`. Per session: `final_acquirer_utility`, `final_target_utility`, `final_distance`, `acquirer_concession` and `target_concession` (drop of each party's own utility from its first to the final term sheet). Undefined values are NaN.
+    """
+    num_sessions = len(logs)
+    lengths = np.array([len(log) for log in logs], dtype=np.int64)
+    session = np.repeat(np.arange(num_sessions), lengths)
+    starts = np.cumsum(lengths) - lengths
+    turn = np.arange(len(session)) - np.repeat(starts, lengths)
+
+    # Term sheets repeat between turns, so each distinct one is parsed once
+    parsed: dict[str, np.ndarray] = {}
+    rows = []
+    roles = []
+    for log in logs:
+        for entry in log:
+            snapshot = entry.get("term_sheet_snapshot") or {}
+            key = json.dumps(snapshot, sort_keys=True, default=str)
+            if key not in parsed:
+                parsed[key] = term_vector(snapshot)
+            rows.append(parsed[key])
+            roles.append(0 if entry.get("role") == "acquirer" else 1)
+    terms = np.array(rows, dtype=np.float64).reshape(-1, len(TERMS))
+    role = np.array(roles, dtype=np.int64)
+
+    # Parameters of both parties, per session and gathered per turn
+    params = {}
+    for side, index in (("acquirer", 0), ("target", 1)):
+        stacked = [
+            np.array([getattr(pair[index], name) for pair in models]).reshape(
+                -1, len(TERMS)
+            )
+            for name in ("limits", "openings", "weights")
+        ]
+        params[side] = tuple(values[session] for values in stacked)
+    acquirer_utility = utilities(terms, *params["acquirer"])
+    target_utility = utilities(terms, *params["target"])
+
+    # Frontiers depend on the session and the terms named, so each combination is traced once
+    present = ~np.isnan(terms)
+    combination = session * (1 << len(TERMS)) + present @ (1 << np.arange(len(TERMS)))
+    unique, first_row, inverse = np.unique(
+        combination, return_index=True, return_inverse=True
+    )
+    frontiers = pareto_frontiers(
+        tuple(values[first_row] for values in params["acquirer"]),
+        tuple(values[first_row] for values in params["target"]),
+        present[first_row],
+        num_points,
+    )
+    points = np.stack([acquirer_utility, target_utility], axis=-1)
+    distance = np.empty(len(points))
+    block_size = max(1, FRONTIER_BLOCK_ELEMENTS // (num_points * 2))
+    for start in range(0, len(points), block_size):
+        rows = slice(start, start + block_size)
+        distance[rows] = frontier_distances(points[rows], frontiers[inverse[rows]])
+
+    # Final outcome of every session
+    final_rows = starts + lengths - 1
+    has_turns = lengths > 0
+    final = {}
+    for name, values in (
+        ("final_acquirer_utility", acquirer_utility),
+        ("final_target_utility", target_utility),
+        ("final_distance", distance),
+    ):
+        final[name] = np.full(num_sessions, np.nan)
+        final[name][has_turns] = values[final_rows[has_turns]]
+
+    # Concession: own utility of the first term sheet a party's turn left on the table minus the final one
+    for name, own_role, own_utility, final_name in (
+        ("acquirer_concession", 0, acquirer_utility, "final_acquirer_utility"),
+        ("target_concession", 1, target_utility, "final_target_utility"),
+    ):
+        valid = np.flatnonzero((role == own_role) & ~np.isnan(own_utility))
+        first_sessions, first_index = np.unique(session[valid], return_index=True)
+        final[name] = np.full(num_sessions, np.nan)
+        final[name][first_sessions] = (
+            own_utility[valid[first_index]] - final[final_name][first_sessions]
+        )
+
+    return {
+        "session": session,
+        "turn": turn,
+        "role": role,
+        "acquirer_utility": acquirer_utility,
+        "target_utility": target_utility,
+        "frontier_distance": distance,
+        **final,
+    }
+
+
+def concession_paths(scores: dict[str, np.ndarray], session_index: int) -> np.ndarray:
+    """
+    Returns a session's path through utility space, e.g. for plotting.
+
+    Args:
+        scores (dict[str, np.ndarray]): Output of `score_corpus`.
+        session_index (int): Index of the session in the scored logs.
+
+    Returns:
+        returns (np.ndarray): `(num_turns, 2)` acquirer and target utility after each turn.
+    """
+    rows = scores["session"] == session_index
+    return np.stack(
+        [scores["acquirer_utility"][rows], scores["target_utility"][rows]], axis=-1
+    )
+
+
+def rank_sessions(
+    scores: dict[str, np.ndarray], by: str = "final_distance"
+) -> np.ndarray:
+    """
+    Orders sessions by a per-session score, ascending (most efficient first for distances), with undefined values last.
+
+    Args:
+        scores (dict[str, np.ndarray]): Output of `score_corpus`.
+        by (str, optional): Per-session score to rank by. Defaults to "final_distance".
+
+    Returns:
+        returns (np.ndarray): Session indices in rank order.
+    """
+    values = scores[by]
+    return np.lexsort((values, np.isnan(values)))
+
+
+@traced("pareto.load_corpus", "analysis")
+def load_corpus(
+    folder: str = "negotiation_histories",
+    personas_folder: Optional[str] = "generated_personas",
+) -> tuple[
+    list[str], list[list[dict[str, Any]]], list[tuple[UtilityModel, UtilityModel]]
+]:
+    """
+    Loads every saved negotiation of a folder with the utility models of its parties. Sessions are matched to persona files by sorted order (as `generate_negotiation_html` does) when both folders hold the same number of files.
+
+    Args:
+        folder (str, optional): Folder with negotiation log JSON files. Defaults to "negotiation_histories".
+        personas_folder (Optional[str], optional): Folder with the sessions' persona files. Defaults to "generated_personas".
+
+    Returns:
+        returns (tuple[list[str], list[list[dict[str, Any]]], list[tuple[UtilityModel, UtilityModel]]]): File names, logs and models.
+    """
+    filenames = sorted(name for name in os.listdir(folder) if name.endswith(".json"))
+    persona_files = []
+    if personas_folder and os.path.isdir(personas_folder):
+        persona_files = sorted(
+            name for name in os.listdir(personas_folder) if name.endswith(".json")
+        )
+    paired = len(persona_files) == len(filenames)
+
+    names, logs, models = [], [], []
+    for i, filename in enumerate(filenames):
+        with open(os.path.join(folder, filename), "r") as f:
+            negotiation_log = json.load(f)
+        if not negotiation_log:
+            continue
+        personas = None
+        if paired:
+            with open(os.path.join(personas_folder, persona_files[i]), "r") as f:
+                personas = json.load(f)
+        names.append(filename)
+        logs.append(negotiation_log)
+        models.append(session_models(negotiation_log, personas))
+    return names, logs, models
+
+
+def format_ranking(
+    names: list[str], scores: dict[str, np.ndarray], limit: Optional[int] = None
+) -> str:
+    """
+    Renders the session ranking as a Markdown table.
+
+    Args:
+        names (list[str]): Name of every session.
+        scores (dict[str, np.ndarray]): Output of `score_corpus`.
+        limit (Optional[int], optional): Number of sessions shown. Defaults to None (all).
+
+    Returns:
+        returns (str): The Markdown table.
+    """
+
+    def fmt(value: float) -> str:
+        return "n/a" if math.isnan(value) else f"{value:.3f}"
+
+    lines = [
+        "| Session | Acquirer utility | Target utility | Distance to frontier | Acquirer concession | Target concession |",
+        "|---|---|---|---|---|---|",
+    ]
+    for index in rank_sessions(scores)[:limit]:
+        lines.append(
+            f"| {names[index]} | {fmt(scores['final_acquirer_utility'][index])} | "
+            f"{fmt(scores['final_target_utility'][index])} | {fmt(scores['final_distance'][index])} | "
+            f"{fmt(scores['acquirer_concession'][index])} | {fmt(scores['target_concession'][index])} |"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Usage (from the `src` folder): python -m utilities.pareto_utilities --json pareto.json
+    parser = argparse.ArgumentParser(
+        description="Score stored negotiations with persona-derived utilities and rank them by distance to the Pareto frontier."
+    )
+    parser.add_argument("--histories", default="negotiation_histories")
+    parser.add_argument("--personas", default="generated_personas")
+    parser.add_argument("--top", type=int, help="Only show the best N sessions")
+    parser.add_argument(
+        "--json", help="Also write per-session scores and utility paths to this file"
+    )
+    args = parser.parse_args()
+
+    names, logs, models = load_corpus(args.histories, args.personas)
+    scores = score_corpus(logs, models)
+    print(format_ranking(names, scores, args.top))
+
+    if args.json:
+        sessions = []
+        for index, name in enumerate(names):
+            session = {"file": name}
+            for key in (
+                "final_acquirer_utility",
+                "final_target_utility",
+                "final_distance",
+                "acquirer_concession",
+                "target_concession",
+            ):
+                value = float(scores[key][index])
+                session[key] = None if math.isnan(value) else value
+            session["path"] = [
+                [None if math.isnan(value) else value for value in point]
+                for point in concession_paths(scores, index).tolist()
+            ]
+            session["models"] = {
+                "acquirer": models[index][0].to_dict(),
+                "target": models[index][1].to_dict(),
+            }
+            sessions.append(session)
+        with open(args.json, "w") as f:
+            json.dump(sessions, f, indent=2)
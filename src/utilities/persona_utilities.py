@@ -8,10 +8,15 @@ from typing import Any, Optional
 from openai import OpenAI
 
 from resources.business_persona import BusinessPersona
+from resources.corpus_archive import CorpusArchive
+from resources.event_stream import EventBus, PersonasSaved, get_event_bus
+from resources.persona_record import PersonaRecord
+from utilities.tracing_utilities import traced
 
 
 def load_random_personas(
     folder: str = "generated_personas",
+    compact: bool = False,
 ) -> tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]:
     """
     Attempts to load random acquirer and target business personas from a JSON file in `folder`, otherwise returns empty personas.
@@ -19,6 +24,7 @@ def load_random_personas(
     Args:
         folder (str, optional): The path to the folder containing previously saved persona JSON files.
                                 Defaults to "generated_personas".
+        compact (bool, optional): If True, personas are loaded as compact `PersonaRecord`s (see `load_personas_from_file`). Defaults to False.
 
     Returns:
         returns (tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]): A tuple containing the loaded acquirer and target personas.
@@ -40,7 +46,7 @@ def load_random_personas(
     filepath = os.path.join(folder, chosen_file)
 
     # Load personas from selected file
-    loaded_acquirer, loaded_target = load_personas_from_file(filepath)
+    loaded_acquirer, loaded_target = load_personas_from_file(filepath, compact)
 
     # Print sucess and personas' descriptions if personas are not empty
     if loaded_acquirer and loaded_target:
@@ -51,20 +57,60 @@ def load_random_personas(
     return loaded_acquirer, loaded_target
 
 
+def load_random_personas_from_archive(
+    archive_folder: str = "corpus_archive",
+) -> tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]:
+    """
+    Attempts to load random acquirer and target business personas from a compressed corpus archive, picking the pair from the archive index instead of scanning a folder.
+
+    Args:
+        archive_folder (str, optional): The path to the corpus archive. Defaults to "corpus_archive".
+
+    Returns:
+        returns (tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]): A tuple containing the loaded acquirer and target personas.
+        Each element is either a dictionary representing the persona (if successfully loaded), or None if the archive holds no personas.
+    """
+    # Return empty personas if archive DNE
+    if not os.path.exists(os.path.join(archive_folder, "index.json")):
+        return None, None
+
+    # Randomly choose persona pair from index
+    archive = CorpusArchive(archive_folder)
+    key = archive.random_key("personas")
+    if key is None:
+        return None, None
+
+    data = archive.read_personas(key)
+    loaded_acquirer, loaded_target = data.get("acquirer"), data.get("target")
+
+    # Print sucess and personas' descriptions if personas are not empty
+    if loaded_acquirer and loaded_target:
+        print(f"\nPersonas successfully loaded from {archive_folder} ({key}):")
+        print("- ACQUIRER:", loaded_acquirer["business_descr"][0])
+        print("- TARGET:", loaded_target["business_descr"][0], "\n")
+
+    return loaded_acquirer, loaded_target
+
+
+@traced("io.load_personas", "io")
 def load_personas_from_file(
     filepath: str,
+    compact: bool = False,
 ) -> tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]:
     """
     Loads acquirer and target personas from a specified filepath.
 
     Args:
         filepath (str): The filepath to load personas from.
+        compact (bool, optional): If True, personas are returned as read-only `PersonaRecord`s that keep only the field responses in memory and read reasoning and queries from the file on access (use `to_dict()` before serializing them). Defaults to False.
 
     Returns:
         returns (tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]): A tuple containing the loaded acquirer and target personas.
-        Each element is either a dictionary representing the persona (if successfully loaded), or None if the file is not found.
+        Each element is either a dictionary (or compact record) representing the persona (if successfully loaded), or None if the file is not found.
     """
     try:
+        if compact:
+            return PersonaRecord.load_pair(filepath)
         with open(filepath, "r") as f:
             data = json.load(f)
             return data.get("acquirer"), data.get("target")
@@ -77,6 +123,7 @@ def create_personas(
     target_countries: list,
     openAI_client: OpenAI,
     folder: str = "src/generated_personas",
+    event_bus: Optional[EventBus] = None,
 ) -> tuple[dict[str, Any], dict[str, Any]]:
     """
     Creates and saves new acquirer-target personas with random countries in ONE unique file in specified folder.
@@ -86,17 +133,21 @@ def create_personas(
         target_countries (list[str]): A list of country names to randomly select from for the target business persona.
         openAI_client (OpenAI): An instance of the OpenAI client used to access LLM via API.
         folder (str, optional): The folder path where the generated persona file will be saved. Defaults to "generated_personas".
+        event_bus (Optional[EventBus], optional): Bus receiving progress events. Defaults to the process-wide bus (console output).
 
     Returns:
         returns (tuple[dict[str, Any], dict[str, Any]]): A tuple containing two dictionaries — the generated acquirer persona and target persona.
     """
+    # Progress of both personas is reported under one ID
+    events = (event_bus or get_event_bus()).bind(uuid.uuid4().hex[:6])
+
     # Randomly choose an acquiring and target country for businesses
     acquirer_country = random.choice(acquiring_countries)
     target_country = random.choice(target_countries)
 
     # Generate two sets of personas (one for acquirer and one for target business)
     acquirer_persona = BusinessPersona.generate(
-        "acquirer", acquirer_country, openAI_client
+        "acquirer", acquirer_country, openAI_client, events=events
     )
     target_persona = BusinessPersona.generate(
         "target",
@@ -104,17 +155,66 @@ def create_personas(
         openAI_client,
         acquiring_business_descr=acquirer_persona["business_descr"][0],
         acquiring_business_financal_info=acquirer_persona["financial_info"][0],
+        events=events,
     )
 
     # Save generated personas
     filepath = save_personas(
         acquirer_persona=acquirer_persona, target_persona=target_persona, folder=folder
     )
-    print(f"New personas created and saved to: {filepath}\n")
+    events.emit(PersonasSaved, filepath=filepath)
 
     return acquirer_persona, target_persona
 
 
+def create_personas_bulk(
+    num_pairs: int,
+    acquiring_countries: list,
+    target_countries: list,
+    openAI_client: OpenAI,
+    folder: str = "src/generated_personas",
+    batch_size: int = 5,
+    event_bus: Optional[EventBus] = None,
+) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+    """
+    Creates and saves many acquirer-target persona pairs with random countries, requesting several complete pairs per structured LLM call. Each pair is saved to its own unique file in specified folder.
+
+    Args:
+        num_pairs (int): Number of persona pairs to create.
+        acquiring_countries (list[str]): A list of country names to randomly select from for the acquiring business personas.
+        target_countries (list[str]): A list of country names to randomly select from for the target business personas.
+        openAI_client (OpenAI): An instance of the OpenAI client used to access LLM via API.
+        folder (str, optional): The folder path where the generated persona files will be saved. Defaults to "generated_personas".
+        batch_size (int, optional): Number of persona pairs requested per LLM call. Defaults to 5.
+        event_bus (Optional[EventBus], optional): Bus receiving progress events. Defaults to the process-wide bus (console output).
+
+    Returns:
+        returns (list[tuple[dict[str, Any], dict[str, Any]]]): The generated acquirer and target personas of every pair that could be generated.
+    """
+    events = (event_bus or get_event_bus()).bind(uuid.uuid4().hex[:6])
+
+    # Randomly choose an acquiring and target country for each pair
+    country_pairs = [
+        (random.choice(acquiring_countries), random.choice(target_countries))
+        for _ in range(num_pairs)
+    ]
+
+    # Generate all pairs in batches and save each pair in its own file
+    persona_pairs = BusinessPersona.generate_bulk(
+        country_pairs, openAI_client, batch_size=batch_size, events=events
+    )
+    for acquirer_persona, target_persona in persona_pairs:
+        filepath = save_personas(
+            acquirer_persona=acquirer_persona,
+            target_persona=target_persona,
+            folder=folder,
+        )
+        events.emit(PersonasSaved, filepath=filepath)
+
+    return persona_pairs
+
+
+@traced("io.save_personas", "io")
 def save_personas(
     acquirer_persona: dict[str, Any],
     target_persona: dict[str, Any],
@@ -151,6 +251,11 @@ def save_personas(
     data["acquirer"] = acquirer_persona
     data["target"] = target_persona
 
+    # Compact records are read-only views of a file, so materialize them
+    for role, persona in data.items():
+        if isinstance(persona, PersonaRecord):
+            data[role] = persona.to_dict()
+
     # Save object as json to filepath
     with open(filepath, "w") as f:
         json.dump(data, f, indent=2)
@@ -0,0 +1,72 @@
+import argparse
+
+from resources.search_index import SearchIndex
+
+
+def search_corpus(
+    query: str,
+    index_path: str = "search_index.pkl",
+    histories_folder: str = "negotiation_histories",
+    personas_folder: str = "generated_personas",
+    **filters,
+) -> list[dict]:
+    """
+    Brings the saved search index up to date with the persona and negotiation folders, then runs a query against it.
+
+    Args:
+        query (str): Free-text query (e.g., "board approval").
+        index_path (str, optional): Saved index file. Defaults to "search_index.pkl".
+        histories_folder (str, optional): Folder with negotiation log JSON files. Defaults to "negotiation_histories".
+        personas_folder (str, optional): Folder with persona JSON files. Defaults to "generated_personas".
+        **filters: Passed to `SearchIndex.search` (fields, role, country, turn, match_all, limit).
+
+    Returns:
+        returns (list[dict]): Ranked search results.
+    """
+    index = SearchIndex.load(index_path)
+    if index.update(histories_folder, personas_folder):
+        index.save(index_path)
+    return index.search(query, **filters)
+
+
+if __name__ == "__main__":
+    # Usage (from the `src` folder): python -m utilities.search_utilities "IP retention" --role target
+    parser = argparse.ArgumentParser(
+        description="Search negotiation transcripts, reasoning and personas."
+    )
+    parser.add_argument("query")
+    parser.add_argument("--index", default="search_index.pkl")
+    parser.add_argument("--histories", default="negotiation_histories")
+    parser.add_argument("--personas", default="generated_personas")
+    parser.add_argument("--field", action="append", dest="fields")
+    parser.add_argument("--role", choices=["acquirer", "target"])
+    parser.add_argument("--country")
+    parser.add_argument("--turn", type=int, nargs="+", help="Turn or turn range")
+    parser.add_argument("--any", action="store_true", help="Match any query term")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    index = SearchIndex.load(args.index)
+    if index.update(args.histories, args.personas):
+        index.save(args.index)
+    results = index.search(
+        args.query,
+        fields=args.fields,
+        role=args.role,
+        country=args.country,
+        turn=(
+            tuple(args.turn)
+            if args.turn and len(args.turn) == 2
+            else (args.turn or [None])[0]
+        ),
+        match_all=not args.any,
+        limit=args.limit,
+    )
+
+    for result in results:
+        location = f"turn {result['turn']}" if result["turn"] else "persona"
+        print(
+            f"{result['score']:.2f}  {result['path']}  {location}  "
+            f"{result['role']} ({result['country'] or 'unknown'})  {result['field']}"
+        )
+        print(f"    {index.snippet(result, args.query)}")
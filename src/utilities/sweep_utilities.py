@@ -0,0 +1,442 @@
+import argparse
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Optional, Union
+
+from dotenv import load_dotenv
+from openai import OpenAI
+
+from resources.business_persona import PERSONA_FIELDS
+from resources.event_stream import EventBus, ProgressSink
+from resources.live_monitor import LiveMonitor
+from resources.llm_backends import DeadlineBackend, LLMBackend
+from resources.negotiation_session import NegotiationSession
+from resources.token_budget import TokenBudget
+from utilities.negotiation_utilities import save_negotiation_log
+from utilities.persona_utilities import load_personas_from_file
+
+
+def run_sweep(
+    persona_files: list[str],
+    openAI_client: Union[OpenAI, LLMBackend],
+    budget: TokenBudget,
+    repeats: int = 1,
+    session_max_tokens: Optional[int] = None,
+    session_max_cost: Optional[float] = None,
+    max_workers: int = 4,
+    histories_folder: str = "negotiation_histories",
+    event_bus: Optional[EventBus] = None,
+    **session_kwargs: Any,
+) -> dict[str, Any]:
+    """
+    Runs a batch of negotiation sessions (every persona pair `repeats` times) under a sweep budget.
+
+    Each session gets a child budget with the session limits, which is reserved in the sweep budget before the session is launched. Once the sweep budget is committed (spent, or reserved by running sessions), no further sessions are launched; running ones are wound down by their own closing rounds. Finished sessions are recorded in the budget's records (and state file), so a restarted sweep skips them and continues with the spending so far.
+
+    Args:
+        persona_files (list[str]): Persona files of the pairs to negotiate.
+        openAI_client (Union[OpenAI, LLMBackend]): OpenAI client or LLM backend shared by all sessions.
+        budget (TokenBudget): Budget of the whole sweep (give it a `state_file` to resume after restarts).
+        repeats (int, optional): Sessions per persona pair. Defaults to 1.
+        session_max_tokens (Optional[int], optional): Token limit of each session. Defaults to None (only the sweep limit applies).
+        session_max_cost (Optional[float], optional): Cost limit of each session. Defaults to None.
+        max_workers (int, optional): Sessions running at once. Defaults to 4.
+        histories_folder (str, optional): Folder the negotiation logs are saved to. Defaults to "negotiation_histories".
+        event_bus (Optional[EventBus], optional): Bus receiving the sessions' events. Defaults to the process-wide bus.
+        **session_kwargs (Any): Further arguments of `NegotiationSession.run` (e.g., `num_rounds`, `participants`).
+
+    Returns:
+        returns (dict[str, Any]): `completed` (sessions finished in this run), `skipped` (finished before a restart), `not_launched` (left out by the budget) and the sweep budget's `budget` stats.
+    """
+    finished = budget.records
+    tags = session_kwargs.pop("tags", None) or {}
+    pending = [
+        (f"{os.path.basename(persona_file)}#{repeat}", persona_file)
+        for persona_file in persona_files
+        for repeat in range(repeats)
+    ]
+    skipped = sum(1 for key, _ in pending if key in finished)
+    pending = [
+        (key, persona_file) for key, persona_file in pending if key not in finished
+    ]
+    completed = 0
+
+    def run_session(key: str, persona_file: str, session_budget: TokenBudget) -> None:
+        try:
+            acquirer, target = load_personas_from_file(persona_file)
+            if not acquirer or not target:
+                raise ValueError(f"No valid personas found in {persona_file}.")
+            negotiation_log = NegotiationSession.run(
+                acquirer=acquirer,
+                target=target,
+                openAI_client=openAI_client,
+                event_bus=event_bus,
+                budget=session_budget,
+                tags={"sweep_session": key, **tags},
+                **session_kwargs,
+            )
+            negotiation_file = (
+                save_negotiation_log(negotiation_log, folder=histories_folder)
+                if negotiation_log
+                else None
+            )
+            budget.record(
+                key,
+                {
+                    "negotiation_file": negotiation_file,
+                    "stop_reason": (
+                        negotiation_log[-1].get("stop_reason")
+                        if negotiation_log
+                        else None
+                    ),
+                    "tokens": session_budget.spent_tokens,
+                    "cost": session_budget.spent_cost,
+                },
+            )
+        finally:
+            budget.release(session_budget)
+
+    running: set[Future] = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending:
+            # Wait for a free worker
+            if len(running) >= max_workers:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                completed += _collect(done)
+                continue
+
+            # Launch the next session only if the sweep budget can still cover it
+            session_budget = budget.child(session_max_tokens, session_max_cost)
+            if not budget.reserve(session_budget):
+                if not running:
+                    break
+                # Running sessions may finish under their limits and free part of their reservations
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                completed += _collect(done)
+                continue
+
+            key, persona_file = pending.pop(0)
+            running.add(executor.submit(run_session, key, persona_file, session_budget))
+
+        done, _ = wait(running)
+        completed += _collect(done)
+
+    # Charges save the spending only every few seconds
+    budget.save()
+    return {
+        "completed": completed,
+        "skipped": skipped,
+        "not_launched": len(pending),
+        "budget": budget.stats(),
+    }
+
+
+class SweepNode:
+    """
+    One segment of a sweep tree: the turns `start_turn` to `end_turn` played with one set of settings. The turns before `start_turn` are inherited from the parent node, and the children continue from `end_turn` with the settings that differ between the variants below.
+    """
+
+    def __init__(self, settings: dict[str, Any], start_turn: int):
+        self.settings = settings
+        self.start_turn = start_turn
+        self.end_turn: Optional[int] = None
+        self.children: list[SweepNode] = []
+
+        # Variants whose sessions end in this node (leaves only)
+        self.variants: list[str] = []
+        self.log: Optional[list[dict[str, Any]]] = None
+
+    def __repr__(self) -> str:
+        return f"SweepNode(turns {self.start_turn}-{self.end_turn}, {len(self.children)} children, variants={self.variants})"
+
+
+def plan_sweep_tree(
+    variants: dict[str, dict[int, dict[str, Any]]],
+    base_settings: Optional[dict[str, Any]] = None,
+) -> SweepNode:
+    """
+    Arranges sweep variants in a tree that shares their common turn prefixes. A variant is a set of settings changes, each applied from a turn on; variants share turns until the first turn at which their settings differ.
+
+    Settings are `NegotiationSession.run` arguments (e.g., `num_rounds`, `reasoning_budget`, `participants`, or `openAI_client` for a different model in later turns) and persona field overrides under `acquirer` and `target` (e.g., `{"target": {"unspoken_interests": "..."}}`).
+
+    Args:
+        variants (dict[str, dict[int, dict[str, Any]]]): Variant names mapped to `{turn: settings applied from that turn on}`.
+        base_settings (Optional[dict[str, Any]], optional): Settings shared by all variants from the first turn. Defaults to None.
+
+    Returns:
+        returns (SweepNode): Root of the tree.
+    """
+    base_settings = base_settings or {}
+    names = list(variants)
+    root = SweepNode(_settings_at(base_settings, variants[names[0]], 0), 0)
+    _split(root, names, variants, base_settings)
+    return root
+
+
+def _split(
+    node: SweepNode,
+    names: list[str],
+    variants: dict[str, dict[int, dict[str, Any]]],
+    base_settings: dict[str, Any],
+) -> None:
+    """
+    Ends a node at the first turn where the settings of its variants change or diverge and builds its children.
+    """
+    change_turns = sorted(
+        {turn for name in names for turn in variants[name] if turn >= node.start_turn}
+    )
+    for turn in change_turns:
+        groups: dict[str, tuple[dict[str, Any], list[str]]] = {}
+        for name in names:
+            settings = _settings_at(base_settings, variants[name], turn)
+            groups.setdefault(_settings_key(settings), (settings, []))[1].append(name)
+        if len(groups) == 1 and next(iter(groups)) == _settings_key(node.settings):
+            continue
+
+        node.end_turn = turn
+        for settings, group_names in groups.values():
+            child = SweepNode(settings, turn)
+            _split(child, group_names, variants, base_settings)
+            node.children.append(child)
+        return
+    node.variants = names
+
+
+def _settings_at(
+    base_settings: dict[str, Any], changes: dict[int, dict[str, Any]], turn: int
+) -> dict[str, Any]:
+    """
+    Returns a variant's settings at a turn: the base settings updated by every change made up to it (persona overrides are merged field by field).
+    """
+    settings = {
+        key: dict(value) if key in ("acquirer", "target") else value
+        for key, value in base_settings.items()
+    }
+    for change_turn in sorted(changes):
+        if change_turn > turn:
+            break
+        for key, value in changes[change_turn].items():
+            if key in ("acquirer", "target"):
+                settings[key] = {**settings.get(key, {}), **value}
+            else:
+                settings[key] = value
+    return settings
+
+
+def _settings_key(settings: dict[str, Any]) -> str:
+    # Objects (backends, participants) compare by identity through their repr
+    return json.dumps(settings, sort_keys=True, default=repr)
+
+
+def run_sweep_tree(
+    acquirer: dict[str, Any],
+    target: dict[str, Any],
+    openAI_client: Union[OpenAI, LLMBackend],
+    variants: dict[str, dict[int, dict[str, Any]]],
+    base_settings: Optional[dict[str, Any]] = None,
+    budget: Optional[TokenBudget] = None,
+    max_workers: int = 4,
+    event_bus: Optional[EventBus] = None,
+) -> dict[str, Any]:
+    """
+    Runs sweep variants of one persona pair, generating every shared turn prefix once (see `plan_sweep_tree`). Each tree node is a session segment ending at its children's fork turn; children fork from it with `NegotiationSession.fork`, and sibling segments run in parallel. A segment that ends before its fork turn (e.g., both parties completed) is passed on to its variants as it is.
+
+    Args:
+        acquirer (dict[str, Any]): Acquirer company persona.
+        target (dict[str, Any]): Target company persona.
+        openAI_client (Union[OpenAI, LLMBackend]): OpenAI client or LLM backend (variants may set their own `openAI_client`).
+        variants (dict[str, dict[int, dict[str, Any]]]): Variant names mapped to `{turn: settings applied from that turn on}`.
+        base_settings (Optional[dict[str, Any]], optional): Settings shared by all variants. Defaults to None.
+        budget (Optional[TokenBudget], optional): Sweep budget every segment is charged to. Defaults to None.
+        max_workers (int, optional): Segments running at once. Defaults to 4.
+        event_bus (Optional[EventBus], optional): Bus receiving the sessions' events. Defaults to the process-wide bus.
+
+    Returns:
+        returns (dict[str, Any]): `logs` (variant names mapped to their full logs), `generated_turns` (turns generated for the whole tree), `variant_turns` (turns of all variant logs together, what independent runs would generate) and the `tree` root.
+    """
+    root = plan_sweep_tree(variants, base_settings)
+    logs: dict[str, list[dict[str, Any]]] = {}
+    generated_turns = 0
+
+    def run_node(node: SweepNode, parent_log: Optional[list[dict[str, Any]]]) -> int:
+        settings = dict(node.settings)
+        acquirer_persona = _override_persona(acquirer, settings.pop("acquirer", None))
+        target_persona = _override_persona(target, settings.pop("target", None))
+        client = settings.pop("openAI_client", openAI_client)
+        session_kwargs = {
+            "event_bus": event_bus,
+            "max_turns": node.end_turn,
+            "budget": budget.child() if budget is not None else None,
+            **settings,
+        }
+
+        # Segments after a finished negotiation have nothing left to generate
+        if parent_log is not None and parent_log[-1].get("stop_reason") != "max_turns":
+            node.log = parent_log
+            return 0
+        if node.end_turn == node.start_turn:
+            node.log = parent_log or []
+            return 0
+
+        if parent_log is None:
+            node.log = NegotiationSession.run(
+                acquirer_persona, target_persona, client, **session_kwargs
+            )
+        else:
+            node.log = NegotiationSession.fork(
+                parent_log,
+                node.start_turn,
+                acquirer_persona,
+                target_persona,
+                client,
+                **session_kwargs,
+            )
+        return sum(1 for entry in node.log if not entry.get("inherited"))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {executor.submit(run_node, root, None): root}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                generated_turns += future.result()
+                for variant in node.variants:
+                    logs[variant] = node.log
+                for child in node.children:
+                    parent_log = node.log if node.log else None
+                    running[executor.submit(run_node, child, parent_log)] = child
+
+    if budget is not None:
+        budget.save()
+    return {
+        "logs": logs,
+        "generated_turns": generated_turns,
+        "variant_turns": sum(len(log) for log in logs.values()),
+        "tree": root,
+    }
+
+
+def _override_persona(
+    persona: dict[str, Any], overrides: Optional[dict[str, Any]]
+) -> dict[str, Any]:
+    """
+    Returns a persona with some fields replaced (generated fields are given as their response text).
+    """
+    if not overrides:
+        return persona
+    persona = dict(persona)
+    for key, value in overrides.items():
+        persona[key] = [value, "", ""] if key in PERSONA_FIELDS else value
+    return persona
+
+
+def _collect(done: set[Future]) -> int:
+    """
+    Counts the finished sessions, re-raising the first session error.
+    """
+    for future in done:
+        future.result()
+    return len(done)
+
+
+if __name__ == "__main__":
+    # Usage (from the `src` folder): python -m utilities.sweep_utilities --max-cost 5 --prompt-price 0.4 --completion-price 0.4
+    parser = argparse.ArgumentParser(
+        description="Run negotiation sessions for all persona files under a token and cost budget."
+    )
+    parser.add_argument("--personas", default="generated_personas")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--num-rounds", type=int, default=10)
+    parser.add_argument("--max-tokens", type=int, default=None)
+    parser.add_argument("--max-cost", type=float, default=None)
+    parser.add_argument("--session-max-tokens", type=int, default=None)
+    parser.add_argument("--session-max-cost", type=float, default=None)
+    parser.add_argument("--call-max-tokens", type=int, default=None)
+    parser.add_argument(
+        "--prompt-price",
+        type=float,
+        default=0.0,
+        help="Price per million prompt tokens.",
+    )
+    parser.add_argument(
+        "--completion-price",
+        type=float,
+        default=0.0,
+        help="Price per million completion tokens.",
+    )
+    parser.add_argument("--state", default="sweep_state.json")
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument("--histories", default="negotiation_histories")
+    parser.add_argument(
+        "--monitor-port",
+        type=int,
+        default=None,
+        help="Serve a live monitor of the running sessions on this local port",
+    )
+    parser.add_argument(
+        "--first-token-timeout",
+        type=float,
+        default=None,
+        help="Abort and retry LLM streams without a first chunk after this many seconds",
+    )
+    parser.add_argument(
+        "--chunk-timeout",
+        type=float,
+        default=None,
+        help="Abort and retry LLM streams that send no chunk for this many seconds",
+    )
+    parser.add_argument("--turn-timeout", type=float, default=None)
+    parser.add_argument("--session-timeout", type=float, default=None)
+    args = parser.parse_args()
+
+    load_dotenv()
+    openAI_client = OpenAI(
+        base_url="https://api.inference.net/v1",
+        api_key=os.getenv("INFERENCE_API_KEY"),
+    )
+    if args.first_token_timeout is not None or args.chunk_timeout is not None:
+        openAI_client = DeadlineBackend(
+            openAI_client,
+            first_token_timeout=args.first_token_timeout,
+            chunk_timeout=args.chunk_timeout,
+        )
+    sweep_budget = TokenBudget(
+        max_tokens=args.max_tokens,
+        max_cost=args.max_cost,
+        max_call_tokens=args.call_max_tokens,
+        prompt_cost_per_million=args.prompt_price,
+        completion_cost_per_million=args.completion_price,
+        state_file=args.state,
+    )
+    event_bus = EventBus([ProgressSink()])
+    if args.monitor_port is not None:
+        monitor = LiveMonitor(port=args.monitor_port).start()
+        event_bus.subscribe(monitor.sink)
+        print(f"Live monitor: {monitor.url}")
+    persona_files = sorted(
+        os.path.join(args.personas, filename)
+        for filename in os.listdir(args.personas)
+        if filename.endswith(".json")
+    )
+    summary = run_sweep(
+        persona_files,
+        openAI_client,
+        sweep_budget,
+        repeats=args.repeats,
+        session_max_tokens=args.session_max_tokens,
+        session_max_cost=args.session_max_cost,
+        max_workers=args.max_workers,
+        histories_folder=args.histories,
+        event_bus=event_bus,
+        num_rounds=args.num_rounds,
+        turn_timeout=args.turn_timeout,
+        session_timeout=args.session_timeout,
+    )
+    print(
+        f"Sweep finished: {summary['completed']} sessions completed, {summary['skipped']} already done, "
+        f"{summary['not_launched']} not launched (budget). Spent {summary['budget']['spent_tokens']} tokens, "
+        f"{summary['budget']['spent_cost']:.4f} in cost."
+    )
+    if isinstance(openAI_client, DeadlineBackend):
+        print(f"Stream outcomes: {json.dumps(openAI_client.stats())}")
@@ -0,0 +1,264 @@
+import re
+from collections.abc import Sequence
+from typing import Any, Optional
+
+# Multipliers for magnitude words used in LLM-written money amounts
+MAGNITUDES = {
+    "thousand": 1e3,
+    "k": 1e3,
+    "million": 1e6,
+    "mn": 1e6,
+    "m": 1e6,
+    "billion": 1e9,
+    "bn": 1e9,
+    "b": 1e9,
+}
+
+# Conversion factors for timeline units into weeks
+WEEKS_PER_UNIT = {
+    "day": 1 / 7,
+    "week": 1.0,
+    "month": 52 / 12,
+    "year": 52.0,
+}
+
+NUMBER = r"(\d+(?:,\d{3})*(?:\.\d+)?)"
+NUMBER_RANGE = NUMBER + r"(?:\s*(?:-|–|to)\s*" + NUMBER + r")?"
+
+MONEY_PATTERN = re.compile(
+    r"[$€£¥]\s*" + NUMBER_RANGE + r"\s*(thousand|million|billion|mn|bn|k|m|b)?\b",
+    flags=re.IGNORECASE,
+)
+MULTIPLE_PATTERN = re.compile(NUMBER_RANGE + r"\s*(?:x|times)\b", flags=re.IGNORECASE)
+PERCENT_PATTERN = re.compile(NUMBER_RANGE + r"\s*%")
+CASH_PATTERN = re.compile(NUMBER + r"\s*%\s*(?:in\s+)?cash", flags=re.IGNORECASE)
+STOCK_PATTERN = re.compile(
+    NUMBER + r"\s*%\s*(?:in\s+)?(?:stock|equity|shares)", flags=re.IGNORECASE
+)
+DURATION_PATTERN = re.compile(
+    NUMBER_RANGE + r"\s*(day|week|month|year)s?\b", flags=re.IGNORECASE
+)
+
+# Stated valuation in persona financial info, e.g. "valuation is estimated between $50 million and $100 million"
+VALUATION_SENTENCE_PATTERN = re.compile(r"valu\w*(?:[^.]|\.\d)*", flags=re.IGNORECASE)
+MONEY_RANGE_PATTERN = re.compile(
+    MONEY_PATTERN.pattern
+    + r"(?:\s*(?:-|–|to|and)\s*[$€£¥]?\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(thousand|million|billion|mn|bn|k|m|b)?\b)?",
+    flags=re.IGNORECASE,
+)
+
+
+def _to_float(number: str) -> float:
+    """
+    Converts a matched number string (possibly containing thousands separators) into a float.
+
+    Args:
+        number (str): Number string such as "1,250.5".
+
+    Returns:
+        returns (float): The parsed number.
+    """
+    return float(number.replace(",", ""))
+
+
+def _range_midpoint(low: str, high: Optional[str]) -> float:
+    """
+    Returns the midpoint of a matched numeric range, or the single value if no upper bound was matched.
+
+    Args:
+        low (str): Lower (or only) bound of the range.
+        high (Optional[str]): Upper bound of the range, if present.
+
+    Returns:
+        returns (float): Midpoint of the range.
+    """
+    if high is None:
+        return _to_float(low)
+    return (_to_float(low) + _to_float(high)) / 2
+
+
+def parse_money(text: Any) -> Optional[float]:
+    """
+    Parses the first money amount (e.g., "$62.5 million", "$1.2bn") in a term sheet value.
+
+    Args:
+        text (Any): Term sheet value; non-string values are ignored.
+
+    Returns:
+        returns (Optional[float]): The amount in base currency units, or None if no amount was found.
+    """
+    if not isinstance(text, str):
+        return None
+
+    match = MONEY_PATTERN.search(text)
+    if not match:
+        return None
+
+    # Scale amount by its magnitude word (if any)
+    amount = _range_midpoint(match.group(1), match.group(2))
+    magnitude = match.group(3)
+    if magnitude:
+        amount *= MAGNITUDES[magnitude.lower()]
+    return amount
+
+
+def parse_valuation(text: Any) -> Optional[tuple[float, str]]:
+    """
+    Parses a valuation, which LLMs give either as a money amount or as a revenue/EBITDA multiple (e.g., "1.4x annual revenue"). The two are not comparable, so the unit is returned with the value.
+
+    Args:
+        text (Any): The term sheet's valuation value.
+
+    Returns:
+        returns (Optional[tuple[float, str]]): The money amount with unit 'money', or the multiple with unit 'multiple' if no amount is present. None if neither was found.
+    """
+    money = parse_money(text)
+    if money is not None:
+        return money, "money"
+
+    if not isinstance(text, str):
+        return None
+    match = MULTIPLE_PATTERN.search(text)
+    if match:
+        return _range_midpoint(match.group(1), match.group(2)), "multiple"
+    return None
+
+
+def _persona_text(persona: Optional[dict[str, Any]], field: str) -> str:
+    """
+    Returns the response of a persona field ('' if missing).
+    """
+    value = persona.get(field) if persona else None
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        value = value[0] if len(value) else None
+    return value if isinstance(value, str) else ""
+
+
+def stated_valuation_range(text: str) -> Optional[tuple[float, float]]:
+    """
+    Extracts the valuation range a persona's financial info states (e.g., "valuation is estimated between $50 million and $100 million").
+
+    Args:
+        text (str): The persona's financial info.
+
+    Returns:
+        returns (Optional[tuple[float, float]]): Low and high end of the range (equal for a single amount), or None if no valuation is stated.
+    """
+    for sentence in VALUATION_SENTENCE_PATTERN.findall(text or ""):
+        match = MONEY_RANGE_PATTERN.search(sentence)
+        if not match:
+            continue
+        low, high, magnitude, second, second_magnitude = match.groups()
+        # The high end is part of the first amount ("$50-100 million") or a second amount ("$50 million and $100 million", "$20–$30 million")
+        if high is None and second is not None:
+            high, high_magnitude = second, second_magnitude or magnitude
+        else:
+            high, high_magnitude = high or low, magnitude
+        low_magnitude = magnitude or high_magnitude
+        return (
+            _to_float(low) * MAGNITUDES.get((low_magnitude or "").lower(), 1.0),
+            _to_float(high) * MAGNITUDES.get((high_magnitude or "").lower(), 1.0),
+        )
+    return None
+
+
+def parse_cash_share(text: Any) -> Optional[float]:
+    """
+    Parses the cash share of a payment structure (e.g., "70% cash, 30% stock" -> 0.7).
+
+    Args:
+        text (Any): The term sheet's payment structure value.
+
+    Returns:
+        returns (Optional[float]): Cash fraction in [0, 1], or None if it could not be determined.
+    """
+    if not isinstance(text, str):
+        return None
+
+    # Prefer an explicit cash percentage, otherwise infer it from the stock percentage
+    cash_match = CASH_PATTERN.search(text)
+    if cash_match:
+        return _to_float(cash_match.group(1)) / 100
+    stock_match = STOCK_PATTERN.search(text)
+    if stock_match:
+        return 1 - _to_float(stock_match.group(1)) / 100
+
+    # All-cash or all-stock deals without percentages
+    lowered = text.lower()
+    if "all cash" in lowered or "all-cash" in lowered:
+        return 1.0
+    if "all stock" in lowered or "all-stock" in lowered:
+        return 0.0
+    return None
+
+
+def parse_earn_out(text: Any, valuation: Optional[float] = None) -> Optional[float]:
+    """
+    Parses an earn-out as a fraction of the purchase price. Percentages are used directly; money amounts are divided by the valuation when one is known.
+
+    Args:
+        text (Any): The term sheet's earn-out value.
+        valuation (Optional[float], optional): Parsed valuation used to convert money amounts into a fraction. Defaults to None.
+
+    Returns:
+        returns (Optional[float]): Earn-out fraction of the purchase price, or None if it could not be determined.
+    """
+    if not isinstance(text, str):
+        return None
+
+    percent_match = PERCENT_PATTERN.search(text)
+    if percent_match:
+        return _range_midpoint(percent_match.group(1), percent_match.group(2)) / 100
+
+    money = parse_money(text)
+    if money is not None and valuation:
+        return money / valuation
+    return None
+
+
+def parse_duration_weeks(text: Any) -> Optional[float]:
+    """
+    Parses the first duration in a timeline value (e.g., "60 days", "8-10 weeks") into weeks.
+
+    Args:
+        text (Any): The term sheet's due diligence timeline value.
+
+    Returns:
+        returns (Optional[float]): Duration in weeks, or None if no duration was found.
+    """
+    if not isinstance(text, str):
+        return None
+
+    match = DURATION_PATTERN.search(text)
+    if not match:
+        return None
+    amount = _range_midpoint(match.group(1), match.group(2))
+    return amount * WEEKS_PER_UNIT[match.group(3).lower()]
+
+
+def normalize_term_sheet(term_sheet: Optional[dict[str, Any]]) -> dict[str, float]:
+    """
+    Converts the free-text headline terms of a term sheet into comparable numbers. Terms that cannot be parsed are left out.
+
+    Args:
+        term_sheet (Optional[dict[str, Any]]): Cumulative term sheet (e.g., a log entry's `term_sheet_snapshot`).
+
+    Returns:
+        returns (dict[str, float]): Mapping with any of `valuation` (a money amount), `valuation_multiple` (a valuation given only as a revenue/EBITDA multiple), `cash_share`, `earn_out_share` and `diligence_weeks`.
+    """
+    if not term_sheet:
+        return {}
+
+    # Money amounts and multiples get separate keys, so they are never compared with each other
+    valuation, unit = parse_valuation(term_sheet.get("valuation")) or (None, None)
+    money_valuation = valuation if unit == "money" else None
+    terms = {
+        "valuation": money_valuation,
+        "valuation_multiple": valuation if unit == "multiple" else None,
+        "cash_share": parse_cash_share(term_sheet.get("payment_structure")),
+        "earn_out_share": parse_earn_out(term_sheet.get("earn_out"), money_valuation),
+        "diligence_weeks": parse_duration_weeks(
+            term_sheet.get("due_diligence_timeline")
+        ),
+    }
+    return {key: value for key, value in terms.items() if value is not None}
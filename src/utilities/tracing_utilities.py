@@ -0,0 +1,213 @@
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable
+
+# Global tracing state (spans are only recorded while enabled)
+_tracing_enabled = False
+_trace_events: list[dict[str, Any]] = []
+_thread_names: dict[int, str] = {}
+_trace_lock = threading.Lock()
+_trace_origin_ns = time.perf_counter_ns()
+
+
+class _NoOpSpan:
+    """
+    Shared context manager returned by `span` while tracing is disabled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoOpSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, **args: Any) -> None:
+        return None
+
+
+_NO_OP_SPAN = _NoOpSpan()
+
+
+class _Span:
+    """
+    Context manager that records one Chrome trace 'complete' event covering its body.
+    """
+
+    __slots__ = ("name", "category", "args", "start_ns")
+
+    def __init__(self, name: str, category: str, args: dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self) -> "_Span":
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _record_event(
+            {
+                "name": self.name,
+                "cat": self.category,
+                "ph": "X",
+                "ts": (self.start_ns - _trace_origin_ns) / 1000,
+                "dur": (end_ns - self.start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": self.args,
+            }
+        )
+
+    def set(self, **args: Any) -> None:
+        """
+        Attaches extra arguments to the span (e.g., results only known inside its body).
+        """
+        self.args.update(args)
+
+
+def _record_event(event: dict[str, Any]) -> None:
+    """
+    Appends a trace event to the global buffer.
+
+    Args:
+        event (dict[str, Any]): Chrome trace event.
+    """
+    with _trace_lock:
+        _trace_events.append(event)
+        _thread_names[event["tid"]] = threading.current_thread().name
+
+
+def enable_tracing() -> None:
+    """
+    Starts recording spans.
+    """
+    global _tracing_enabled
+    _tracing_enabled = True
+
+
+def disable_tracing() -> None:
+    """
+    Stops recording spans. Already recorded events are kept until `clear_trace` is called.
+    """
+    global _tracing_enabled
+    _tracing_enabled = False
+
+
+def is_tracing_enabled() -> bool:
+    """
+    Checks whether spans are currently being recorded.
+
+    Returns:
+        returns (bool): True if tracing is enabled.
+    """
+    return _tracing_enabled
+
+
+def clear_trace() -> None:
+    """
+    Discards all recorded trace events.
+    """
+    with _trace_lock:
+        _trace_events.clear()
+        _thread_names.clear()
+
+
+def span(name: str, category: str = "app", **args: Any) -> Any:
+    """
+    Returns a context manager that records the wall-clock time of its body as a trace span. While tracing is disabled a shared no-op object is returned, so the overhead is a single flag check.
+
+    Args:
+        name (str): Span name shown in the timeline (e.g., "llm.stream").
+        category (str, optional): Span category used for filtering in the viewer. Defaults to "app".
+        **args (Any): Extra JSON-serializable arguments attached to the span.
+
+    Returns:
+        returns (Any): A context manager with a `set(**args)` method for attaching results.
+    """
+    if not _tracing_enabled:
+        return _NO_OP_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name: str, category: str = "app") -> Callable:
+    """
+    Decorator that wraps every call of a function in a trace span.
+
+    Args:
+        name (str): Span name shown in the timeline.
+        category (str, optional): Span category. Defaults to "app".
+
+    Returns:
+        returns (Callable): The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracing_enabled:
+                return func(*args, **kwargs)
+            with _Span(name, category, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def export_chrome_trace(filepath: str = "traces/trace.json") -> str:
+    """
+    Writes all recorded spans in Chrome trace-event JSON format, which can be opened as a timeline in chrome://tracing or Perfetto. Every thread (e.g., each concurrently running session) gets its own named track.
+
+    Args:
+        filepath (str, optional): Destination file. Defaults to "traces/trace.json".
+
+    Returns:
+        returns (str): The path of the written trace file.
+    """
+    with _trace_lock:
+        events = list(_trace_events)
+        thread_names = dict(_thread_names)
+
+    # Name each thread's track so concurrent sessions are easy to tell apart
+    metadata = [
+        {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": pid,
+            "tid": tid,
+            "args": {"name": thread_names.get(tid, f"thread-{tid}")},
+        }
+        for pid, tid in sorted({(event["pid"], event["tid"]) for event in events})
+    ]
+
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filepath, "w") as f:
+        json.dump(
+            {"traceEvents": metadata + events, "displayTimeUnit": "ms"},
+            f,
+        )
+
+    print(f"Trace with {len(events)} spans saved to: {filepath}")
+    return filepath
+
+
+def get_trace_events() -> list[dict[str, Any]]:
+    """
+    Returns a copy of the recorded trace events.
+
+    Returns:
+        returns (list[dict[str, Any]]): Recorded Chrome trace events.
+    """
+    with _trace_lock:
+        return list(_trace_events)
@@ -0,0 +1 @@
+window.DASHBOARD_DATA = {"num_sessions":5,"completion_rate":1.0,"pairs":{"Canada → Brazil":{"sessions":1,"completion_rate":1.0,"curve":[1.0,1.5,1.2,1.3,1.25,1.25,1.25,1.25]},"Canada → India":{"sessions":1,"completion_rate":1.0,"curve":[1.0,1.0182,1.0182,1.0182]},"Canada → Singapore":{"sessions":1,"completion_rate":1.0,"curve":[1.0,1.2727,1.0909,1.1818,1.1364,1.1591,1.1455,1.1455,1.1455]},"France → Brazil":{"sessions":1,"completion_rate":1.0,"curve":[1.0,1.25,1.125,1.1667,1.15,1.1667,1.1625,1.1667,1.1667]},"US → India":{"sessions":1,"completion_rate":1.0,"curve":[1.0,1.25,1.0833,1.1667,1.125,1.1667,1.1458,1.1667,1.1667,1.1667,1.1667,1.1667,1.1667,1.1667,1.1667,1.1667]}},"turn_histogram":{"4":1,"8":1,"9":2,"16":1},"stop_reasons":{"unknown":5},"latency_ms":{"turns":0,"mean":null,"p50":null,"p95":null},"reasoning_tokens":{"turns":0,"mean":null,"budget_hits":0},"sessions":[["negotiation_20250421_202706_64c2b7","Canada → India",4,"unknown",28000000.0,true],["negotiation_20250421_200625_89647e","France → Brazil",9,"unknown",140000000.0,true],["negotiation_20250421_194218_e8080e","Canada → Brazil",8,"unknown",62500000.0,true],["negotiation_20250410_143827_fa99d7","US → India",16,"unknown",null,true],["negotiation_20250410_140657_b2750b","Canada → Singapore",9,"unknown",63000000.0,true]]};
@@ -0,0 +1,373 @@
+import json
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+from utilities.analysis_utilities import session_metrics
+from utilities.term_sheet_utilities import parse_valuation
+
+# Set up base directories
+base_path = Path(__file__).resolve().parents[1]
+history_dir = base_path / "negotiation_histories"
+persona_dir = base_path / "generated_personas"
+output_dir = base_path / "visualize_negotiations"
+
+# Per-session summaries (reused across runs) and the aggregates rendered by the page
+CACHE_FILE = "dashboard_cache.json"
+DATA_FILE = "dashboard_data.js"
+PAGE_FILE = "dashboard.html"
+
+# Concession curves are averaged over at most this many turns
+MAX_CURVE_TURNS = 50
+
+# Version of the cached summaries; summaries of another version are recomputed
+SUMMARY_VERSION = 2
+
+
+def summarize_session(log: list[dict], personas: Optional[dict] = None) -> dict:
+    """
+    Reduces a negotiation log to the few numbers the dashboard aggregates.
+
+    Args:
+        log (list[dict]): A saved negotiation log.
+        personas (Optional[dict], optional): The session's persona file contents, for the countries of logs saved without a session config. Defaults to None.
+
+    Returns:
+        returns (dict): Country pair, turn count, stop reason, metrics, per-turn valuation relative to the first offer, and latency/token stats where the log has them.
+    """
+    config = log[-1].get("session_config") or {}
+    metrics = session_metrics(log)
+
+    # Country pair from the session config, else from the personas
+    countries = [
+        config.get(f"{role}_country")
+        or ((personas or {}).get(role) or {}).get("country_based")
+        or "unknown"
+        for role in ("acquirer", "target")
+    ]
+
+    # Valuation on the table after each turn, relative to the first offer (turns quoting the other unit, money or multiple, are left out)
+    curve = []
+    first_valuation = None
+    for entry in log[:MAX_CURVE_TURNS]:
+        valuation = parse_valuation(
+            (entry.get("term_sheet_snapshot") or {}).get("valuation")
+        )
+        if valuation is not None and first_valuation is None:
+            first_valuation = valuation
+        curve.append(
+            round(valuation[0] / first_valuation[0], 4)
+            if valuation is not None
+            and first_valuation[0]
+            and valuation[1] == first_valuation[1]
+            else None
+        )
+
+    # Turns a fork copied from its parent were generated (and timed) in the parent session
+    generated = [entry for entry in log if not entry.get("inherited")]
+    latencies = [entry["latency_ms"] for entry in generated if "latency_ms" in entry]
+    reasoning_tokens = [
+        entry["reasoning_tokens"]
+        for entry in generated
+        if entry.get("reasoning_tokens") is not None
+    ]
+    return {
+        "pair": f"{countries[0]} → {countries[1]}",
+        "num_turns": len(log),
+        "stop_reason": log[-1].get("stop_reason", "unknown"),
+        "completed": bool(metrics["completed"]),
+        "final_valuation": (
+            None
+            if math.isnan(metrics["final_valuation"])
+            else metrics["final_valuation"]
+        ),
+        "curve": curve,
+        "latencies_ms": latencies,
+        "reasoning_tokens": reasoning_tokens,
+        "budget_hits": sum(
+            bool(entry.get("reasoning_budget_hit")) for entry in generated
+        ),
+    }
+
+
+def update_cache(cache: dict) -> int:
+    """
+    Summarizes negotiation logs that are new or changed since the cache was written and drops deleted ones. Logs are matched to persona files by sorted order (as `generate_negotiation_html` does) when both folders hold the same number of files.
+
+    Args:
+        cache (dict): Cache mapping log file names to `{"mtime", "summary"}`; updated in place.
+
+    Returns:
+        returns (int): Number of logs summarized.
+    """
+    num_updated = 0
+    seen = set()
+    log_files = sorted(history_dir.glob("*.json"))
+    persona_files = sorted(persona_dir.glob("*.json"))
+    if len(persona_files) != len(log_files):
+        persona_files = [None] * len(log_files)
+    for log_file, persona_file in zip(log_files, persona_files):
+        seen.add(log_file.name)
+        mtime = log_file.stat().st_mtime
+        cached = cache.get(log_file.name)
+        if (
+            cached is not None
+            and cached["mtime"] == mtime
+            and cached.get("version") == SUMMARY_VERSION
+        ):
+            continue
+
+        with open(log_file, "r") as f:
+            log = json.load(f)
+        if not log:
+            continue
+
+        # Only logs saved without a session config need their persona file
+        personas = None
+        if persona_file is not None and not log[-1].get("session_config"):
+            with open(persona_file, "r") as f:
+                personas = json.load(f)
+        cache[log_file.name] = {
+            "mtime": mtime,
+            "version": SUMMARY_VERSION,
+            "summary": summarize_session(log, personas),
+        }
+        num_updated += 1
+
+    for name in set(cache) - seen:
+        del cache[name]
+    return num_updated
+
+
+def _percentile(sorted_values: list, fraction: float):
+    if not sorted_values:
+        return None
+    return sorted_values[
+        min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    ]
+
+
+def aggregate(cache: dict) -> dict:
+    """
+    Computes the dashboard aggregates from the per-session summaries.
+
+    Args:
+        cache (dict): Per-session summaries (see `update_cache`).
+
+    Returns:
+        returns (dict): Totals, completion rate by country pair, turn-count histogram, stop reasons, mean concession curve per country pair, latency/token stats and the session list.
+    """
+    by_pair = {}
+    turn_histogram = {}
+    stop_reasons = {}
+    latencies = []
+    reasoning_tokens = []
+    budget_hits = 0
+    sessions = []
+
+    for name, cached in sorted(cache.items(), reverse=True):
+        summary = cached["summary"]
+        pair = by_pair.setdefault(
+            summary["pair"],
+            {"sessions": 0, "completed": 0, "curve_sums": [], "curve_counts": []},
+        )
+        pair["sessions"] += 1
+        pair["completed"] += summary["completed"]
+
+        # Running sums per turn give the mean concession curve
+        for turn, value in enumerate(summary["curve"]):
+            if len(pair["curve_sums"]) <= turn:
+                pair["curve_sums"].append(0.0)
+                pair["curve_counts"].append(0)
+            if value is not None:
+                pair["curve_sums"][turn] += value
+                pair["curve_counts"][turn] += 1
+
+        turns = str(summary["num_turns"])
+        turn_histogram[turns] = turn_histogram.get(turns, 0) + 1
+        stop_reasons[summary["stop_reason"]] = (
+            stop_reasons.get(summary["stop_reason"], 0) + 1
+        )
+        latencies.extend(summary["latencies_ms"])
+        reasoning_tokens.extend(summary["reasoning_tokens"])
+        budget_hits += summary["budget_hits"]
+
+        # Sessions link to their transcript page if it was generated
+        stem = Path(name).stem
+        sessions.append(
+            [
+                stem,
+                summary["pair"],
+                summary["num_turns"],
+                summary["stop_reason"],
+                summary["final_valuation"],
+                (output_dir / f"{stem}.html").exists(),
+            ]
+        )
+
+    completion_by_pair = {
+        pair: {
+            "sessions": values["sessions"],
+            "completion_rate": round(values["completed"] / values["sessions"], 4),
+            "curve": [
+                round(total / count, 4) if count else None
+                for total, count in zip(values["curve_sums"], values["curve_counts"])
+            ],
+        }
+        for pair, values in sorted(by_pair.items())
+    }
+
+    latencies.sort()
+    return {
+        "num_sessions": len(cache),
+        "completion_rate": (
+            round(sum(p["completed"] for p in by_pair.values()) / len(cache), 4)
+            if cache
+            else None
+        ),
+        "pairs": completion_by_pair,
+        "turn_histogram": dict(sorted(turn_histogram.items(), key=lambda i: int(i[0]))),
+        "stop_reasons": stop_reasons,
+        "latency_ms": {
+            "turns": len(latencies),
+            "mean": round(sum(latencies) / len(latencies), 1) if latencies else None,
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+        },
+        "reasoning_tokens": {
+            "turns": len(reasoning_tokens),
+            "mean": (
+                round(sum(reasoning_tokens) / len(reasoning_tokens), 1)
+                if reasoning_tokens
+                else None
+            ),
+            "budget_hits": budget_hits,
+        },
+        "sessions": sessions,
+    }
+
+
+PAGE_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0"/>
+  <title>LLM Negotiation Dashboard</title>
+  <style>
+    body { font-family: Arial, sans-serif; background: #f9f9f9; padding: 40px; color: #333; line-height: 1.6; }
+    h1 { text-align: center; margin-bottom: 24px; }
+    .cards { display: flex; gap: 16px; flex-wrap: wrap; margin-bottom: 24px; }
+    .card { background: #fff; border-radius: 8px; box-shadow: 0 2px 6px rgba(0,0,0,0.05); padding: 16px; flex: 1; min-width: 160px; }
+    .card .value { font-size: 28px; font-weight: bold; color: #007acc; }
+    section { background: #fff; border-radius: 8px; box-shadow: 0 2px 6px rgba(0,0,0,0.05); padding: 16px; margin-bottom: 24px; }
+    table { border-collapse: collapse; width: 100%; }
+    th, td { text-align: left; padding: 6px 10px; border-bottom: 1px solid #eee; }
+    .bar { background: #1a73e8; height: 14px; border-radius: 3px; }
+    a { color: #007acc; }
+  </style>
+  <script src="dashboard_data.js"></script>
+</head>
+<body>
+  <h1>LLM Negotiation Dashboard</h1>
+  <div class="cards" id="cards"></div>
+  <section><h2>Completion Rate by Country Pair</h2><table id="pairs"></table></section>
+  <section><h2>Turn Count Histogram</h2><table id="turns"></table></section>
+  <section><h2>Valuation Concession Curves</h2><p>Mean valuation on the table per turn, relative to the first offer.</p><svg id="curves" width="100%" height="320"></svg><div id="legend"></div></section>
+  <section><h2>Sessions</h2><table id="sessions"></table></section>
+<script>
+  const data = window.DASHBOARD_DATA;
+  const fmt = v => v === null || v === undefined ? "n/a" : v.toLocaleString();
+  const pct = v => v === null || v === undefined ? "n/a" : (100 * v).toFixed(1) + "%";
+  const colors = ["#1a73e8", "#4caf50", "#e8710a", "#d93025", "#9334e6", "#12b5cb", "#f9ab00", "#5f6368"];
+
+  document.getElementById("cards").innerHTML = [
+    ["Sessions", fmt(data.num_sessions)],
+    ["Completion Rate", pct(data.completion_rate)],
+    ["Turn Latency p50 / p95 (ms)", `${fmt(data.latency_ms.p50)} / ${fmt(data.latency_ms.p95)}`],
+    ["Mean Reasoning Tokens", fmt(data.reasoning_tokens.mean)],
+    ["Reasoning Budget Hits", fmt(data.reasoning_tokens.budget_hits)],
+  ].map(([label, value]) => `<div class="card"><div>${label}</div><div class="value">${value}</div></div>`).join("");
+
+  const bar = (fraction) => `<div class="bar" style="width:${Math.round(300 * fraction)}px"></div>`;
+  document.getElementById("pairs").innerHTML = "<tr><th>Pair</th><th>Sessions</th><th>Completion</th><th></th></tr>" +
+    Object.entries(data.pairs).map(([pair, p]) =>
+      `<tr><td>${pair}</td><td>${p.sessions}</td><td>${pct(p.completion_rate)}</td><td>${bar(p.completion_rate)}</td></tr>`).join("");
+
+  const maxCount = Math.max(1, ...Object.values(data.turn_histogram));
+  document.getElementById("turns").innerHTML = "<tr><th>Turns</th><th>Sessions</th><th></th></tr>" +
+    Object.entries(data.turn_histogram).map(([turns, count]) =>
+      `<tr><td>${turns}</td><td>${count}</td><td>${bar(count / maxCount)}</td></tr>`).join("");
+
+  // Concession curves as SVG polylines (one per country pair)
+  const svg = document.getElementById("curves");
+  const width = svg.clientWidth || 800, height = 320, pad = 40;
+  const pairs = Object.entries(data.pairs).filter(([, p]) => p.curve.some(v => v !== null));
+  const values = pairs.flatMap(([, p]) => p.curve.filter(v => v !== null));
+  const maxTurns = Math.max(2, ...pairs.map(([, p]) => p.curve.length));
+  const low = Math.min(1, ...values), high = Math.max(1, ...values);
+  const x = t => pad + (width - 2 * pad) * t / (maxTurns - 1);
+  const y = v => height - pad - (height - 2 * pad) * (v - low) / ((high - low) || 1);
+  svg.innerHTML = `<line x1="${pad}" y1="${y(1)}" x2="${width - pad}" y2="${y(1)}" stroke="#ccc" stroke-dasharray="4"/>` +
+    `<text x="4" y="${y(high) + 4}" font-size="11">${high.toFixed(2)}</text><text x="4" y="${y(low) + 4}" font-size="11">${low.toFixed(2)}</text>` +
+    pairs.map(([, p], i) => {
+      const points = p.curve.map((v, t) => v === null ? null : `${x(t)},${y(v)}`).filter(Boolean).join(" ");
+      return `<polyline fill="none" stroke-width="2" stroke="${colors[i % colors.length]}" points="${points}"/>`;
+    }).join("");
+  document.getElementById("legend").innerHTML = pairs.map(([pair], i) =>
+    `<span style="color:${colors[i % colors.length]}">■</span> ${pair}`).join("&nbsp;&nbsp; ");
+
+  document.getElementById("sessions").innerHTML = "<tr><th>Session</th><th>Pair</th><th>Turns</th><th>Stop Reason</th><th>Final Valuation</th></tr>" +
+    data.sessions.map(([name, pair, turns, stopReason, valuation, hasPage]) =>
+      `<tr><td>${hasPage ? `<a href="${name}.html">${name}</a>` : name}</td><td>${pair}</td><td>${turns}</td><td>${stopReason}</td><td>${fmt(valuation)}</td></tr>`).join("");
+</script>
+</body>
+</html>
+"""
+
+
+def generate_dashboard() -> Path:
+    """
+    Updates the session cache, writes the aggregates data file and the static dashboard page.
+
+    Returns:
+        returns (Path): Path of the dashboard page.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = output_dir / CACHE_FILE
+
+    cache = {}
+    if cache_path.exists():
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+
+    num_updated = update_cache(cache)
+    if num_updated or not cache_path.exists():
+        temp_path = cache_path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(temp_path, cache_path)
+
+    # Aggregates are loaded with a script tag, so the page also works from file://
+    data = aggregate(cache)
+    with open(output_dir / DATA_FILE, "w", encoding="utf-8") as f:
+        f.write(
+            "window.DASHBOARD_DATA = "
+            + json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+            + ";\n"
+        )
+
+    page_path = output_dir / PAGE_FILE
+    with open(page_path, "w", encoding="utf-8") as f:
+        f.write(PAGE_HTML)
+
+    print(
+        f"✅ Dashboard generated: {page_path.name} "
+        f"({data['num_sessions']} sessions, {num_updated} newly summarized)"
+    )
+    return page_path
+
+
+if __name__ == "__main__":
+    # Usage (from the `src` folder): python -m visualize_negotiations.generate_dashboard
+    generate_dashboard()
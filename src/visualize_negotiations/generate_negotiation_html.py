@@ -6,14 +6,6 @@ base_path = Path(__file__).resolve().parents[1]
 history_dir = base_path / "negotiation_histories"
 persona_dir = base_path / "generated_personas"
 output_dir = base_path / "visualize_negotiations"
-output_dir.mkdir(parents=True, exist_ok=True)
-
-# Gather matching JSON files
-negotiation_files = sorted(history_dir.glob("*.json"))
-persona_files = sorted(persona_dir.glob("*.json"))
-
-if len(negotiation_files) != len(persona_files):
-    raise ValueError("Mismatch between negotiation and persona files.")
 
 
 # Format a persona section with role-based coloring
@@ -32,15 +24,8 @@ def format_persona_section(title, data, role_class):
     """
 
 
-# Generate HTML for each file pair
-for neg_file, per_file in zip(negotiation_files, persona_files):
-    negotiation_file_name = neg_file.stem
-    output_path = output_dir / f"{negotiation_file_name}.html"
-
-    with open(neg_file, "r") as nf, open(per_file, "r") as pf:
-        log = json.load(nf)
-        persona = json.load(pf)
-
+# Render the transcript page of one negotiation
+def render_negotiation_html(log, persona):
     html = """<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -146,8 +131,33 @@ for neg_file, per_file in zip(negotiation_files, persona_files):
 </body>
 </html>
 """
+    return html
+
+
+# Generate HTML for each file pair
+def generate_negotiation_html():
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Gather matching JSON files
+    negotiation_files = sorted(history_dir.glob("*.json"))
+    persona_files = sorted(persona_dir.glob("*.json"))
+
+    if len(negotiation_files) != len(persona_files):
+        raise ValueError("Mismatch between negotiation and persona files.")
+
+    for neg_file, per_file in zip(negotiation_files, persona_files):
+        negotiation_file_name = neg_file.stem
+        output_path = output_dir / f"{negotiation_file_name}.html"
+
+        with open(neg_file, "r") as nf, open(per_file, "r") as pf:
+            log = json.load(nf)
+            persona = json.load(pf)
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(render_negotiation_html(log, persona))
+
+        print(f"✅ Generated: {output_path.name}")
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
 
-    print(f"✅ Generated: {output_path.name}")
+if __name__ == "__main__":
+    generate_negotiation_html()